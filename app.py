@@ -1,6 +1,8 @@
 import os
 import time
 import csv
+import threading
+import uuid
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -12,65 +14,87 @@ from PIL import Image
 from gtts import gTTS
 
 import torch
-torch.set_num_threads(1) 
 
-from transformers import CLIPProcessor, CLIPModel
+from artguide.audio_store import audio_key
+from artguide.coarse import SEARCH_MODES, search_mode
+from artguide.embedding_cache import image_digest
+from artguide.engine import ArtGuideEngine
+from artguide.filtering import parse_filters, search_records
+from artguide.streaming import StreamTimer, description_stream
+from artguide.tuning import apply_profile, memory_usage
+from artguide.zero_shot import apply_prediction, zero_shot_enabled
 
-# LLM Integration (Gemini API)
-try:
-    from google import genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-    print("Warning: google-genai not installed. Using placeholder descriptions.")
+# Thread settings from the host's runtime profile (scripts/autotune.py);
+# interactive requests are embedded one at a time, so tune for latency
+runtime_settings = apply_profile(mode="latency")
 
 # ============================================================================
 # Configuration
 # ============================================================================
 
-# Load CLIP model for embeddings
-device = "cuda" if torch.cuda.is_available() else "cpu"
-clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(device)
-clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-
-# ============================================================================
-# Data Loading
-# ============================================================================
-
 # Paths (adjust as needed)
 INDEX_PATH = "models/faiss.index"
 META_PATH = "models/metadata.parquet"
 LOG_PATH = "app/logs/telemetry.csv"
 SAMPLE_IMAGES_DIR = "data/sample_images/"
 
-# Load FAISS index + metadata
-if os.path.exists(INDEX_PATH) and os.path.exists(META_PATH):
-    index = faiss.read_index(INDEX_PATH)
-    metadata = pd.read_parquet(META_PATH)
-else:
-    index = None
-    metadata = pd.DataFrame(columns=["artist", "title", "period", "image_path"])
-
-# Ensure log directory
-os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-if not os.path.exists(LOG_PATH):
-    with open(LOG_PATH, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["timestamp", "artist", "confidence", "response_time"])
-
-# Initialize Gemini API client (if API key available)
-gemini_client = None
-if GEMINI_AVAILABLE:
-    api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-    if api_key:
-        try:
-            gemini_client = genai.Client(api_key=api_key)
-            print("✓ Gemini API client initialized successfully")
-        except Exception as e:
-            print(f"Warning: Failed to initialize Gemini client: {e}")
-            gemini_client = None
-    else:
-        print("Info: GOOGLE_API_KEY not set. Using placeholder descriptions.")
+# CLIP model, embedding backend, FAISS index + metadata and the Gemini client
+# are loaded lazily on first use (see artguide/engine.py); call engine.warmup()
+# to load everything up front.
+device = "cuda" if torch.cuda.is_available() else "cpu"
+engine = ArtGuideEngine(INDEX_PATH, META_PATH, device=device)
+
+_demo = None
+_ENGINE_ATTRIBUTES = ("clip_model", "clip_processor", "preprocessor", "embedding_backend", "embedding_cache", "index", "metadata_store", "metadata", "embedding_store", "two_stage", "zero_shot", "gemini_client", "llm", "description_cache", "descriptions", "flights", "latency_budget", "audio_store")
+
+
+def __getattr__(name):
+    """Expose engine components as lazy module attributes (e.g. app.metadata)."""
+    if name in _ENGINE_ATTRIBUTES:
+        return getattr(engine, name)
+    if name == "demo":
+        global _demo
+        if _demo is None:
+            _demo = build_demo()
+        return _demo
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+TELEMETRY_COLUMNS = ["timestamp", "artist", "confidence", "response_time", "ttft"]
+_telemetry_ready = False
+_telemetry_lock = threading.Lock()
+
+
+def _prepare_telemetry_log():
+    """Create the telemetry CSV, or extend the header of a log started before ttft was recorded."""
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    if not os.path.exists(LOG_PATH):
+        with open(LOG_PATH, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(TELEMETRY_COLUMNS)
+        return
+    # Old rows just lack the ttft field
+    with open(LOG_PATH, newline="") as f:
+        lines = f.readlines()
+    if lines and lines[0].strip() == ",".join(TELEMETRY_COLUMNS[:-1]):
+        lines[0] = ",".join(TELEMETRY_COLUMNS) + "\n"
+        with open(LOG_PATH, "w", newline="") as f:
+            f.writelines(lines)
+
+
+def log_telemetry(artist, confidence, response_time, ttft):
+    """Append one request to the telemetry CSV (the file is prepared on the first write)."""
+    global _telemetry_ready
+    with _telemetry_lock:
+        if not _telemetry_ready:
+            _prepare_telemetry_log()
+            _telemetry_ready = True
+        with open(LOG_PATH, "a", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                time.strftime("%Y-%m-%d %H:%M:%S"), artist, confidence, response_time,
+                round(ttft, 3) if ttft is not None else ""
+            ])
 
 
 def embed_image(img: Image.Image) -> np.ndarray:
@@ -99,8 +123,15 @@ def embed_image(img: Image.Image) -> np.ndarray:
     
     Notes:
         - Uses GPU if available (cuda) for faster inference
-        - Preprocessing (resizing, normalization) is handled by CLIPProcessor
+        - Inference runs on the backend selected by `model.backend` in settings.yaml
+          (PyTorch fp32 by default, optionally ONNX Runtime or int8 quantized)
+        - Preprocessing (resizing, normalization) uses CLIPProcessor, as the
+          index was built with it; `model.preprocess: fast` selects the
+          draft-mode path in artguide/preprocess.py (the catalog must be
+          embedded with it too, see check_catalog_preprocessor)
         - No gradients are computed (inference only)
+        - Results are cached by image content hash (see artguide/embedding_cache.py);
+          the returned array is read-only
     
     Raises:
         ValueError: If img is None or not a valid PIL Image
@@ -110,15 +141,13 @@ def embed_image(img: Image.Image) -> np.ndarray:
     if not isinstance(img, Image.Image):
         raise ValueError(f"Expected PIL.Image.Image, got {type(img)}")
     
-    inputs = clip_processor(images=img, return_tensors="pt").to(device)
-    with torch.no_grad():
-        emb = clip_model.get_image_features(**inputs)
-    emb = emb.cpu().numpy().astype("float32")
-    emb /= np.linalg.norm(emb)  # L2 normalization for cosine similarity
+    # Backend returns L2-normalized embeddings for cosine similarity;
+    # identical images are served from the content-addressed cache
+    emb = engine.embedding_cache.get_or_compute(image_digest(img), lambda: engine.embed([img]))
     return emb
 
 
-def search_index(img: Image.Image, k: int = 5):
+def search_index(img: Image.Image, k: int = 5, mode: str = None, filters: dict = None):
     """
     Search the FAISS vector database for similar artworks.
     
@@ -128,11 +157,18 @@ def search_index(img: Image.Image, k: int = 5):
     Args:
         img (PIL.Image.Image): Query image to search for
         k (int): Number of top results to return (default: 5)
+        mode (str): "flat" (scan the FAISS index) or "two_stage" (score
+                    per-artist centroids first, then search only the best
+                    groups exactly). Default: retrieval.search_mode in settings.yaml
+        filters (dict): Optional metadata predicates, e.g. {"location": "Room 2"}
+                        or {"period": ["Impressionism", "Post-Impressionism"]}
+                        (columns: period, artist, location; case-insensitive).
+                        Applied inside the FAISS search, not by post-filtering
         
     Returns:
-        tuple: (results_df, embedding) where:
-            - results_df (pd.DataFrame): Top-k results with columns [artist, title, period, 
-                                        image_path, distance]. Sorted by distance (ascending).
+        tuple: (results, embedding) where:
+            - results (list[dict]): Top-k records with keys [artwork_id, artist, title,
+                                    period, image_path, distance]. Sorted by distance (ascending).
             - embedding (np.ndarray): The query image embedding (1, 512)
             
             Returns (None, None) if index is not loaded or empty.
@@ -140,33 +176,37 @@ def search_index(img: Image.Image, k: int = 5):
     Example:
         >>> img = Image.open("photo.jpg")
         >>> results, emb = search_index(img, k=3)
-        >>> results[['artist', 'distance']]
-                   artist  distance
-        0       Van Gogh      0.15
-        1          Monet      0.23
-        2        Picasso      0.31
+        >>> [(r['artist'], round(r['distance'], 2)) for r in results]
+        [('Van Gogh', 0.15), ('Monet', 0.23), ('Picasso', 0.31)]
     
     Notes:
         - Lower distance = higher similarity
         - FAISS uses L2 distance, not cosine (but embeddings are normalized)
+        - Records come from the columnar metadata store (no pandas per query)
+        - Compressed indexes (ivf_pq / pq / binary) are re-ranked exactly against
+          the float16 embedding store, so the ranking matches the flat index
         - Returns None if no index is loaded (graceful degradation)
     
     Raises:
-        ValueError: If k is invalid (not positive integer)
+        ValueError: If k is invalid (not positive integer), mode is unknown or
+                    a filter column is not supported
     """
     # Validate inputs
     if img is None:
         return None, None
     if not isinstance(k, int) or k <= 0:
         raise ValueError(f"k must be a positive integer, got {k}")
-    if index is None or len(metadata) == 0:
+    mode = mode or search_mode()
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {SEARCH_MODES}, got {mode}")
+    filters = parse_filters(filters)
+    index, metadata_store = engine.index, engine.metadata_store
+    if index is None or len(metadata_store) == 0:
         return None, None
 
     emb = embed_image(img)
-    D, I = index.search(emb, k)
-    results = metadata.iloc[I[0]].copy()
-    results["distance"] = D[0]
-    return results, emb
+    searcher = engine.two_stage if mode == "two_stage" else engine.searcher
+    return search_records(searcher, metadata_store, emb, k, [filters], engine.partitions)[0], emb
 
 
 def generate_description(artist: str, title: str, period: str) -> str:
@@ -192,8 +232,27 @@ def generate_description(artist: str, title: str, period: str) -> str:
     
     Notes:
         - Uses Gemini 2.5 Flash if GOOGLE_API_KEY environment variable is set
+        - Catalog artworks are answered from models/descriptions.jsonl when
+          scripts/pregenerate_descriptions.py has been run
+        - Gemini answers are cached per artwork and prompt (models/description_cache,
+          shared with the AI server workers; see cache.description_* in settings.yaml)
         - Falls back to placeholder template if API unavailable
         - Response typically 150-300 words in tour-guide conversational style
+        - generate_description_stream yields the same text in chunks as it arrives
+    """
+    return "".join(generate_description_stream(artist, title, period))
+
+
+def generate_description_stream(artist: str, title: str, period: str):
+    """
+    Stream the description of an artwork (see generate_description).
+
+    Pre-generated and cached descriptions arrive as a single chunk right
+    away; Gemini answers are yielded as they are produced, so the first
+    words can be shown long before the full 300-400 words are done.
+
+    Yields:
+        str: Description chunks (concatenated they form the description)
     """
     # Input validation
     if not artist or not isinstance(artist, str):
@@ -203,37 +262,14 @@ def generate_description(artist: str, title: str, period: str) -> str:
     if not period or not isinstance(period, str):
         period = "Unknown Period"
     
-    if gemini_client is not None:
-        try:
-            prompt = f"""You are an enthusiastic and knowledgeable art museum tour guide. Generate a comprehensive, engaging description for this artwork.
-
-**Artwork Details:**
-- Artist: {artist}
-- Title: {title}
-- Period/Style: {period}
-
-**Instructions:**
-Create a detailed 300-400 word description structured in the following sections:
+    yield from description_stream(
+        artist, title, period, engine.llm, engine.description_cache, engine.descriptions,
+        placeholder_description(artist, title, period), engine.flights
+    )
 
-1. **Introduction** (2-3 sentences): Welcome visitors and introduce the artwork with enthusiasm
-2. **Artist Background** (3-4 sentences): Discuss the artist's significance, life, and contribution to art history
-3. **Artistic Analysis** (4-5 sentences): Analyze the techniques, style, colors, composition, and visual elements
-4. **Historical Context** (3-4 sentences): Explain the period, movement, and cultural significance
-5. **Legacy & Impact** (2-3 sentences): Describe the artwork's influence and importance today
 
-Write in a warm, conversational tone that educates and inspires museum visitors. Use vivid language and make art history accessible to everyone."""
-            
-            response = gemini_client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
-            
-            return response.text
-        except Exception as e:
-            print(f"Warning: Gemini API call failed: {e}. Using placeholder.")
-            # Fall through to placeholder
-    
-    # Placeholder fallback (when Gemini unavailable)
+def placeholder_description(artist: str, title: str, period: str) -> str:
+    """Template description shown when Gemini is unavailable (or slower than the latency budget)."""
     return f"""This is '{title}' by {artist}, created during the {period} period.
 
 {artist} was a renowned artist whose work exemplified the {period} movement. 
@@ -245,35 +281,47 @@ a key moment in the evolution of art. For more detailed information about this
 specific work, please consult museum resources or art historical databases."""
 
 
-def generate_audio(text, output_path="app/logs/narration.mp3"):
+def generate_audio(text, lang="en"):
     """
     Generate audio narration from text using Google Text-to-Speech.
     
+    Narrations are kept in a content-addressed store (engine.audio_store):
+    every text gets its own file, named after the hash of text and
+    language, and a narration heard before is not synthesized again.
+    
     Args:
         text (str): The description text to convert to speech
-        output_path (str): Path where audio file will be saved
+        lang (str): Narration language
         
     Returns:
-        str: Path to generated audio file, or None if generation fails
+        str: Path to the audio file, or None if generation fails
         
     Example:
         >>> audio_path = generate_audio("This is Starry Night by Van Gogh...")
         >>> print(audio_path)
-        app/logs/narration.mp3
+        app/logs/audio/3f/3f9c...e1.mp3
     """
     if not text or not isinstance(text, str):
         print("Warning: Invalid text for audio generation")
         return None
     
-    try:
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
+    def synthesize(path):
         # Generate audio using gTTS
-        tts = gTTS(text=text, lang='en', slow=False)
-        tts.save(output_path)
-        
-        return output_path
+        tts = gTTS(text=text, lang=lang, slow=False)
+        tts.save(path)
+    
+    def narration():
+        return store.get_or_synthesize(text, lang, synthesize)
+    
+    try:
+        store = engine.audio_store
+        # Identical narrations requested at the same time are synthesized once
+        flights = engine.flights
+        audio_path = narration() if flights is None else flights.do(f"audio:{audio_key(text, lang)}", narration)
+        stats = store.stats()
+        print(f"Narration: {audio_path} (audio cache hit rate {stats['hit_rate']:.0%}, "
+              f"{stats['files']} files, {stats['bytes'] / 1e6:.1f} MB)")
+        return audio_path
     except Exception as e:
         print(f"Error generating audio: {e}")
         return None
@@ -295,39 +343,102 @@ def recognize(img, show_context):
         show_context (bool): If True, include similar artworks in description
         
     Returns:
-        tuple: (label, preview_image, description) where:
+        tuple: (label, preview_image, description, audio_path, description_handle) where:
             - label (str): Recognition result with artist and confidence
             - preview_image (PIL.Image.Image): The input image for display
             - description (str): Generated description (+ context if requested)
+            - audio_path (str): Narration MP3, or None
+            - description_handle (str): Handle for fetch_description when the
+              description is still being generated, otherwise None
     
     Example:
         >>> img = Image.open("photo.jpg")
-        >>> label, img_preview, desc = recognize(img, show_context=True)
+        >>> label, img_preview, desc, audio, handle = recognize(img, show_context=True)
         >>> print(label)
         Recognized: Van Gogh (confidence 0.9234)
         >>> print(desc[:50])
         This is 'Starry Night' by Van Gogh, created in...
     
+    Latency budget:
+        A description that is not ready within generation.description_budget_seconds
+        is returned as the placeholder text together with a handle; generation
+        continues in the background, the full text can be fetched with
+        fetch_description(handle) and also lands in the description cache for
+        the next request.
+    
     Side Effects:
-        - Logs request to telemetry CSV (timestamp, artist, confidence, response_time)
+        - Logs request to telemetry CSV (timestamp, artist, confidence, response_time, ttft)
         - Prints are for debugging (remove in production)
     
     Error Handling:
         - Returns error message if no index loaded
         - Gracefully handles search failures
     """
+    handle = uuid.uuid4().hex
+    result = None
+    for result in recognize_stream(img, show_context, wait=False, handle=handle):
+        pass
+    budget = engine.latency_budget
+    # Descriptions finished within the budget are not kept for fetching
+    pending = budget is not None and budget.fetch(handle) is not None
+    return (*result, handle if pending else None)
+
+
+def fetch_description(handle):
+    """
+    Description that missed the latency budget in recognize().
+
+    Args:
+        handle: description_handle returned by recognize
+
+    Returns:
+        {'status': 'pending'}, {'status': 'complete', 'text': ...},
+        {'status': 'error', 'message': ...}, or None for unknown (or
+        expired) handles - see LatencyBudget.fetch
+    """
+    budget = engine.latency_budget
+    return None if budget is None else budget.fetch(handle)
+
+
+def recognize_stream(img, show_context, wait=True, handle=None):
+    """
+    Streaming version of recognize, used by the Gradio UI.
+
+    Yields the recognition label and preview as soon as the search is done,
+    then the description text as it grows, and finally the audio narration
+    (gTTS needs the complete text). When no text has arrived within the
+    latency budget, the placeholder is shown meanwhile and replaced by the
+    description once it arrives.
+
+    Args:
+        img: User-uploaded artwork image
+        show_context: Include similar artworks in the description
+        wait: After showing the placeholder, keep waiting for the description
+              (False: narrate the placeholder and stop; the description is
+              finished in the background)
+        handle: Latency budget handle of the description (default: a new
+                one; the Gradio UI only needs the textbox updates, recognize
+                passes its own to fetch the text later)
+
+    Yields:
+        tuple: (label, preview_image, description_so_far, audio_path or None)
+    """
     # Input validation
     if img is None:
-        return "Error: No image provided", None, "Please upload an image to recognize an artwork."
+        yield "Error: No image provided", None, "Please upload an image to recognize an artwork.", None
+        return
     
     start_time = time.time()
     results, emb = search_index(img, k=5)
 
-    if results is None:
-        return "No index loaded.", None, "N/A"
+    if not results:
+        yield "No index loaded.", None, "N/A", None
+        return
 
-    # Top-1 recognition
-    top1 = results.iloc[0]
+    # Top-1 recognition (zero-shot mode: artist/period from the text-prompt matrix,
+    # title and image from the best neighbour by that artist)
+    prediction = engine.zero_shot.classify(emb) if zero_shot_enabled() else None
+    top1 = apply_prediction(results, prediction)
     artist, title, period, conf = (
         top1["artist"],
         top1.get("title", "Unknown"),
@@ -335,14 +446,6 @@ def recognize(img, show_context):
         float(top1["distance"]),
     )
 
-    description = generate_description(artist, title, period)
-    response_time = round(time.time() - start_time, 2)
-
-    # Log telemetry
-    with open(LOG_PATH, "a", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow([time.strftime("%Y-%m-%d %H:%M:%S"), artist, conf, response_time])
-
     # Load the recognized database artwork image
     try:
         database_img_path = top1.get("image_path", None)
@@ -354,87 +457,153 @@ def recognize(img, show_context):
         print(f"Error loading database image: {e}")
         database_img = img  # Fallback to uploaded image on error
 
+    # Show the recognition right away, then stream the description into it
+    label = f"Recognized: {artist}"
+    yield label, database_img, "", None
+
+    description = ""
+    budget = engine.latency_budget
+    if budget is None:
+        chunks = generate_description_stream(artist, title, period)
+    else:
+        chunks = budget.stream(handle or uuid.uuid4().hex, lambda: generate_description_stream(artist, title, period))
+    timer = StreamTimer(start_time)
+    for chunk in timer.wrap(chunks):
+        if chunk is None:
+            # Over budget: placeholder now, replaced as soon as the description arrives
+            description = placeholder_description(artist, title, period)
+            yield label, database_img, description + "\n\n(The full description is on its way...)", None
+            if not wait:
+                break
+            description = ""
+            continue
+        description += chunk
+        yield label, database_img, description, None
+    response_time = round(time.time() - start_time, 2)
+
+    # Log telemetry (ttft: time until the first description text was shown; empty if none was)
+    log_telemetry(artist, conf, response_time, timer.ttft)
+
     # Generate audio narration
     if show_context:
-        neighbors = results[["artist", "title", "period", "distance"]].to_dict(orient="records")
+        neighbors = [{key: r.get(key) for key in ("artist", "title", "period", "distance")} for r in results]
         full_description = description + "\nContext: " + str(neighbors)
     else:
         full_description = description
     
     audio_path = generate_audio(full_description)
     
-    return f"Recognized: {artist}", database_img, full_description, audio_path
-
-
-sample_images = []
-sample_labels = {}
-if os.path.exists(SAMPLE_IMAGES_DIR):
-    for file in sorted(os.listdir(SAMPLE_IMAGES_DIR)):
-        if file.lower().endswith((".jpg", ".jpeg", ".png")):
-            full_path = os.path.join(SAMPLE_IMAGES_DIR, file)
-            sample_images.append(full_path)
-            # Create friendly label from filename (e.g., "Monet_artwork_1.jpg" -> "Monet - Artwork 1")
-            label = file.replace("_", " ").replace(".jpg", "").replace(".jpeg", "").replace(".png", "").title()
-            sample_labels[full_path] = label
-
-# Gradio UI
-with gr.Blocks() as demo:
-    gr.Markdown("# 🖼️ Art Guide – Demo App")
-    gr.Markdown("Upload an artwork photo to receive AI-powered recognition and description.")
-    
-    with gr.Row():
-        with gr.Column():
-            img_input = gr.Image(type="pil", label="Upload artwork photo")
-            sample = gr.Dropdown(
-                choices=[(sample_labels.get(p, p), p) for p in sample_images] if sample_images else [],
-                label="Or choose a sample image",
-                type="value"
-            )
-            show_context = gr.Checkbox(label="Show retrieved context", value=False)
-            run_btn = gr.Button("Recognize Artwork")
-        with gr.Column():
-            label_output = gr.Textbox(label="Recognition Result")
-            desc_output = gr.Textbox(label="Description", lines=12, max_lines=20)
-            img_output = gr.Image(label="Preview")
-            audio_output = gr.Audio(label="Audio Narration", autoplay=True)
-
-    def run_pipeline(uploaded, sample_path, show_context):
-        """Process image from upload or sample selection with validation."""
-        try:
-            # Validate and load image
-            if uploaded is None and sample_path:
-                if not os.path.exists(sample_path):
-                    return "Error: Sample image not found", None, f"Sample image path is invalid: {sample_path}", None
-                try:
-                    uploaded = Image.open(sample_path)
-                except Exception as e:
-                    return "Error: Failed to load sample", None, f"Could not open sample image: {str(e)}", None
-            
-            if uploaded is None:
-                return "No image provided", None, "Please upload an image or select a sample artwork.", None
-            
-            # Validate image is a PIL Image
-            if not isinstance(uploaded, Image.Image):
-                return "Error: Invalid image format", None, "Please provide a valid image file.", None
-            
-            # Run recognition
-            return recognize(uploaded, show_context)
-        except Exception as e:
-            return "Error during processing", None, f"An unexpected error occurred: {str(e)}", None
+    yield label, database_img, full_description, audio_path
+
+
+def list_sample_images(sample_dir=SAMPLE_IMAGES_DIR):
+    """
+    Collect sample images for the Gradio dropdown.
+    
+    Returns:
+        tuple: (sample_images, sample_labels) - list of paths and {path: friendly label}
+    """
+    sample_images = []
+    sample_labels = {}
+    if os.path.exists(sample_dir):
+        for file in sorted(os.listdir(sample_dir)):
+            if file.lower().endswith((".jpg", ".jpeg", ".png")):
+                full_path = os.path.join(sample_dir, file)
+                sample_images.append(full_path)
+                # Create friendly label from filename (e.g., "Monet_artwork_1.jpg" -> "Monet - Artwork 1")
+                label = file.replace("_", " ").replace(".jpg", "").replace(".jpeg", "").replace(".png", "").title()
+                sample_labels[full_path] = label
+    return sample_images, sample_labels
+
+
+def run_pipeline(uploaded, sample_path, show_context):
+    """
+    Process image from upload or sample selection with validation.
+
+    A generator, so Gradio shows the recognition first and then streams the
+    description (see recognize_stream).
+    """
+    try:
+        # Validate and load image
+        if uploaded is None and sample_path:
+            if not os.path.exists(sample_path):
+                yield "Error: Sample image not found", None, f"Sample image path is invalid: {sample_path}", None
+                return
+            try:
+                uploaded = Image.open(sample_path)
+            except Exception as e:
+                yield "Error: Failed to load sample", None, f"Could not open sample image: {str(e)}", None
+                return
+        
+        if uploaded is None:
+            yield "No image provided", None, "Please upload an image or select a sample artwork.", None
+            return
+        
+        # Validate image is a PIL Image
+        if not isinstance(uploaded, Image.Image):
+            yield "Error: Invalid image format", None, "Please provide a valid image file.", None
+            return
+        
+        # Run recognition
+        yield from recognize_stream(uploaded, show_context)
+    except Exception as e:
+        yield "Error during processing", None, f"An unexpected error occurred: {str(e)}", None
+
+
+def build_demo():
+    """
+    Build the Gradio UI.
+    
+    Returns:
+        gr.Blocks: The Art Guide demo app (not launched)
+    """
+    sample_images, sample_labels = list_sample_images()
+    
+    with gr.Blocks() as demo:
+        gr.Markdown("# 🖼️ Art Guide – Demo App")
+        gr.Markdown("Upload an artwork photo to receive AI-powered recognition and description.")
+    
+        with gr.Row():
+            with gr.Column():
+                img_input = gr.Image(type="pil", label="Upload artwork photo")
+                sample = gr.Dropdown(
+                    choices=[(sample_labels.get(p, p), p) for p in sample_images] if sample_images else [],
+                    label="Or choose a sample image",
+                    type="value"
+                )
+                show_context = gr.Checkbox(label="Show retrieved context", value=False)
+                run_btn = gr.Button("Recognize Artwork")
+            with gr.Column():
+                label_output = gr.Textbox(label="Recognition Result")
+                desc_output = gr.Textbox(label="Description", lines=12, max_lines=20)
+                img_output = gr.Image(label="Preview")
+                audio_output = gr.Audio(label="Audio Narration", autoplay=True)
+
+        run_btn.click(run_pipeline, inputs=[img_input, sample, show_context], outputs=[label_output, img_output, desc_output, audio_output])
+        sample.change(run_pipeline, inputs=[img_input, sample, show_context], outputs=[label_output, img_output, desc_output, audio_output])
+    
+    return demo
 
-    run_btn.click(run_pipeline, inputs=[img_input, sample, show_context], outputs=[label_output, img_output, desc_output, audio_output])
-    sample.change(run_pipeline, inputs=[img_input, sample, show_context], outputs=[label_output, img_output, desc_output, audio_output])
 
 if __name__ == "__main__":
     print("=" * 60)
     print("🎨 Art Guide - AI-Powered Artwork Recognition")
     print("=" * 60)
+    print("Warming up models...")
+    engine.warmup()
+    print("Startup time per component:")
+    print(engine.startup_report())
+    print("=" * 60)
     print(f"Device: {device.upper()}")
     print(f"Model: CLIP ViT-B/32")
+    print(f"Embedding backend: {engine.embedding_backend.name}")
+    print(f"Threads: intra-op {runtime_settings['intra_op_threads']}, "
+          f"inter-op {runtime_settings['inter_op_threads']} ({runtime_settings['source']})")
     print(f"Index: {INDEX_PATH}")
-    print(f"Artworks loaded: {len(metadata)}")
+    print(f"Artworks loaded: {len(engine.metadata_store)}")
+    print(f"Memory (MB): {memory_usage()}")
     print("=" * 60)
     print("Starting Gradio interface at http://localhost:7860")
     print("Press Ctrl+C to stop")
     print("=" * 60)
-    demo.launch(server_name="0.0.0.0", server_port=7860)
+    build_demo().launch(server_name="0.0.0.0", server_port=7860)
@@ -0,0 +1,9 @@
+"""
+Shared building blocks for the Art Guide system.
+
+Modules in this package are used by the monolithic Gradio app (app.py),
+the distributed AI server (distributed/ai_server.py) and the offline
+dataset scripts (scripts/).
+
+Authors: AlBeSa Team
+"""
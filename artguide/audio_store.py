@@ -0,0 +1,172 @@
+"""
+Content-addressed store for narration audio.
+
+gTTS used to write every narration to the single path
+app/logs/narration.mp3: concurrent visitors overwrote each other's audio,
+and the same description was synthesized again for every visitor. The
+store keeps one MP3 per narration, named after a hash of the text and
+language, so
+
+    - different narrations never share a path (a file is written once,
+      with an atomic rename, and not modified afterwards)
+    - a description heard before is answered from disk without a gTTS call
+
+The file modification time records the last use. When a new file pushes
+the store over `max_bytes`, the least recently used files are deleted.
+
+Example:
+    >>> store = audio_store_from_settings()
+    >>> path = store.get_or_synthesize(text, "en", lambda path: gTTS(text=text, lang="en").save(path))
+    >>> store.stats()
+    {'hits': 3, 'misses': 1, 'hit_rate': 0.75, 'evictions': 0, 'files': 1, 'bytes': 412032, ...}
+"""
+
+import hashlib
+import os
+import threading
+
+from artguide.config import get_setting
+
+DEFAULT_AUDIO_DIR = "app/logs/audio"
+DEFAULT_AUDIO_MAX_MB = 200
+AUDIO_SUFFIX = ".mp3"
+
+
+def audio_key(text, lang="en"):
+    """Hash of the narration text and language (the file name in the store)."""
+    return hashlib.blake2b(f"{lang}\n{text}".encode("utf-8"), digest_size=20).hexdigest()
+
+
+class AudioStore:
+    """
+    Directory of narration files shared by all processes on a host.
+
+    Thread-safe; concurrent writers of the same narration produce the
+    same file, and readers never see a partial one.
+    """
+
+    def __init__(self, directory=DEFAULT_AUDIO_DIR, max_bytes=DEFAULT_AUDIO_MAX_MB * 1024 * 1024):
+        """
+        Args:
+            directory: Where the MP3 files are kept
+            max_bytes: Size bound of the store (0 = unbounded)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, key):
+        """File of a narration key (whether or not it exists yet)."""
+        return os.path.join(self.directory, key[:2], f"{key}{AUDIO_SUFFIX}")
+
+    def _files(self):
+        """(mtime, size, path) of every narration file."""
+        files = []
+        if not os.path.isdir(self.directory):
+            return files
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(AUDIO_SUFFIX):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue  # evicted by another process
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def get(self, key):
+        """Path of a stored narration (marked as recently used), or None."""
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            path = None
+        with self._lock:
+            if path is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return path
+
+    def put(self, key, write):
+        """
+        Store a narration.
+
+        Args:
+            key: audio_key of the narration
+            write: Function writing the MP3 to the path it is given
+
+        Returns:
+            Path of the stored file
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._evict(keep=path)
+        return path
+
+    def get_or_synthesize(self, text, lang, synthesize):
+        """
+        Path of the narration of text, calling synthesize(path) on a miss.
+
+        Raises:
+            Exception: Errors of synthesize (nothing is stored then)
+        """
+        key = audio_key(text, lang)
+        return self.get(key) or self.put(key, synthesize)
+
+    def _evict(self, keep=None):
+        """Delete the least recently used files until the store fits max_bytes."""
+        if self.max_bytes <= 0:
+            return
+        files = self._files()
+        excess = sum(size for _, size, _ in files) - self.max_bytes
+        for _, size, path in sorted(files):
+            if excess <= 0:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            excess -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size."""
+        files = self._files()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "files": len(files),
+                "bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def audio_store_from_settings():
+    """
+    Create the narration store configured in settings.yaml
+    (cache.audio_dir / audio_max_mb, or the AUDIO_CACHE_DIR and
+    AUDIO_CACHE_MB environment variables).
+    """
+    directory = get_setting("cache", "audio_dir", DEFAULT_AUDIO_DIR, env="AUDIO_CACHE_DIR")
+    max_mb = float(get_setting("cache", "audio_max_mb", DEFAULT_AUDIO_MAX_MB, env="AUDIO_CACHE_MB") or 0)
+    return AudioStore(directory, int(max_mb * 1024 * 1024))
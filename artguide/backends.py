@@ -0,0 +1,253 @@
+"""
+Selectable CPU inference backends for the CLIP vision tower.
+
+Backends take preprocessed `pixel_values` (as produced by CLIPProcessor) and
+return L2-normalized image embeddings, matching `get_image_features`.
+
+    pytorch     - fp32 PyTorch CLIPModel (default)
+    torch_int8  - PyTorch with dynamically quantized int8 Linear layers
+    onnx_fp32   - vision tower exported to ONNX, run with ONNX Runtime
+    onnx_int8   - ONNX export with dynamic int8 weight quantization
+
+The backend is chosen with `model.backend` in settings.yaml or the
+EMBED_BACKEND environment variable.
+"""
+
+import copy
+import os
+import time
+
+import numpy as np
+import torch
+
+from artguide.config import get_setting
+from artguide.embedding import embed_pixel_values, normalize_embeddings
+
+# ONNX Runtime is optional
+try:
+    import onnxruntime as ort
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+BACKENDS = ("pytorch", "torch_int8", "onnx_fp32", "onnx_int8")
+DEFAULT_BACKEND = "pytorch"
+DEFAULT_ONNX_DIR = "models/onnx"
+PARITY_THRESHOLD = 0.99
+
+
+class TorchBackend:
+    """fp32 PyTorch CLIP vision tower (the reference implementation)."""
+
+    name = "pytorch"
+
+    def __init__(self, model, device="cpu"):
+        self.model = model
+        self.device = device
+
+    def embed(self, pixel_values):
+        """
+        Embed a batch of preprocessed images.
+
+        Args:
+            pixel_values: Array or tensor of shape (n, 3, 224, 224)
+
+        Returns:
+            L2-normalized float32 array of shape (n, 512)
+        """
+        return embed_pixel_values(pixel_values, self.model, self.device)
+
+
+class TorchDynamicQuantBackend(TorchBackend):
+    """PyTorch CLIP with int8 dynamically quantized Linear layers (CPU only)."""
+
+    name = "torch_int8"
+
+    def __init__(self, model, device="cpu"):
+        quantized = torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(model).to("cpu").eval(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(quantized, "cpu")
+
+
+class _VisionTower(torch.nn.Module):
+    """Vision encoder + projection, i.e. CLIPModel.get_image_features."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.vision_model = model.vision_model
+        self.visual_projection = model.visual_projection
+
+    def forward(self, pixel_values):
+        pooled = self.vision_model(pixel_values=pixel_values).pooler_output
+        return self.visual_projection(pooled)
+
+
+def export_vision_onnx(model, onnx_path, image_size=224):
+    """
+    Export the CLIP vision tower to ONNX with a dynamic batch dimension.
+
+    Args:
+        model: CLIP model
+        onnx_path: Output .onnx file
+        image_size: Input resolution expected by the model
+
+    Returns:
+        str: onnx_path
+    """
+    os.makedirs(os.path.dirname(onnx_path) or ".", exist_ok=True)
+    tower = _VisionTower(copy.deepcopy(model).to("cpu").eval()).eval()
+    dummy = torch.zeros(1, 3, image_size, image_size)
+    torch.onnx.export(
+        tower,
+        (dummy,),
+        onnx_path,
+        input_names=["pixel_values"],
+        output_names=["image_embeds"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+        opset_version=17,
+        dynamo=False,
+    )
+    return onnx_path
+
+
+def quantize_onnx(fp32_path, int8_path):
+    """Write a dynamically int8-quantized copy of an ONNX model."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+class OnnxBackend:
+    """CLIP vision tower run with ONNX Runtime on CPU."""
+
+    def __init__(self, model, onnx_dir=DEFAULT_ONNX_DIR, quantize=False, num_threads=None):
+        """
+        Args:
+            model: CLIP model (used to export the ONNX graph if it is not on disk yet)
+            onnx_dir: Directory holding clip_vision_fp32.onnx / clip_vision_int8.onnx
+            quantize: Use the int8 dynamically quantized graph
+            num_threads: ONNX Runtime intra-op threads (None = same as torch.get_num_threads(),
+                         i.e. the runtime profile applied at startup)
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime is not installed")
+
+        self.name = "onnx_int8" if quantize else "onnx_fp32"
+        fp32_path = os.path.join(onnx_dir, "clip_vision_fp32.onnx")
+        int8_path = os.path.join(onnx_dir, "clip_vision_int8.onnx")
+        if not os.path.exists(fp32_path):
+            print(f"Exporting CLIP vision tower to {fp32_path}...")
+            export_vision_onnx(model, fp32_path)
+        path = fp32_path
+        if quantize:
+            if not os.path.exists(int8_path):
+                print(f"Quantizing ONNX model to {int8_path}...")
+                quantize_onnx(fp32_path, int8_path)
+            path = int8_path
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = int(num_threads or torch.get_num_threads())
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def embed(self, pixel_values):
+        """
+        Embed a batch of preprocessed images.
+
+        Args:
+            pixel_values: Array or tensor of shape (n, 3, 224, 224)
+
+        Returns:
+            L2-normalized float32 array of shape (n, 512)
+        """
+        if isinstance(pixel_values, torch.Tensor):
+            pixel_values = pixel_values.cpu().numpy()
+        pixel_values = np.ascontiguousarray(pixel_values, dtype="float32")
+        (features,) = self.session.run(["image_embeds"], {"pixel_values": pixel_values})
+        return normalize_embeddings(features)
+
+
+def create_backend(name, model, device="cpu", onnx_dir=None, num_threads=None):
+    """
+    Build an embedding backend by name.
+
+    Falls back to the PyTorch backend (with a warning) if the requested
+    backend cannot be created, e.g. when onnxruntime is not installed.
+
+    Args:
+        name: One of BACKENDS
+        model: Loaded CLIP model
+        device: torch device of the model
+        onnx_dir: Directory for exported ONNX graphs
+        num_threads: ONNX Runtime intra-op threads, fixed when the session is
+                     created (None = torch.get_num_threads())
+
+    Returns:
+        Backend object with an embed(pixel_values) method
+
+    Raises:
+        ValueError: If name is not a known backend
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{name}', expected one of {BACKENDS}")
+    onnx_dir = onnx_dir or get_setting("model", "onnx_dir", DEFAULT_ONNX_DIR)
+
+    try:
+        if name == "torch_int8":
+            return TorchDynamicQuantBackend(model, device)
+        if name in ("onnx_fp32", "onnx_int8"):
+            return OnnxBackend(model, onnx_dir, quantize=(name == "onnx_int8"), num_threads=num_threads)
+    except Exception as e:
+        print(f"Warning: Could not create '{name}' embedding backend: {e}. Using pytorch.")
+
+    return TorchBackend(model, device)
+
+
+def backend_from_settings(model, device="cpu", num_threads=None):
+    """Create the backend configured in settings.yaml / EMBED_BACKEND (num_threads: see create_backend)."""
+    name = get_setting("model", "backend", DEFAULT_BACKEND, env="EMBED_BACKEND")
+    return create_backend(name, model, device, num_threads=num_threads)
+
+
+def parity_check(backend, reference, pixel_values, threshold=PARITY_THRESHOLD):
+    """
+    Compare a backend's embeddings with the reference backend.
+
+    Args:
+        backend: Backend under test
+        reference: Reference backend (normally TorchBackend)
+        pixel_values: Batch of preprocessed images
+        threshold: Minimum acceptable cosine similarity per image
+
+    Returns:
+        tuple: (passed, min_cosine)
+    """
+    expected = reference.embed(pixel_values)
+    actual = backend.embed(pixel_values)
+    cosines = np.sum(expected * actual, axis=1)
+    min_cosine = float(cosines.min())
+    return min_cosine >= threshold, min_cosine
+
+
+def measure_latency(backend, pixel_values, repeats=10, warmup=2):
+    """
+    Time backend.embed on a batch.
+
+    Returns:
+        dict with mean_ms, p50_ms, p95_ms and per_image_ms
+    """
+    for _ in range(warmup):
+        backend.embed(pixel_values)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.embed(pixel_values)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    return {
+        "mean_ms": float(timings.mean()),
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p95_ms": float(np.percentile(timings, 95)),
+        "per_image_ms": float(timings.mean() / len(pixel_values)),
+    }
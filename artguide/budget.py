@@ -0,0 +1,208 @@
+"""
+Latency budget for description generation.
+
+Embedding and search take tens of milliseconds; a Gemini description on a
+cache miss takes seconds. With a budget, the caller waits for the
+description only that long: when it is not ready in time the caller
+answers with the placeholder text right away, and the generation keeps
+running on a background thread. Its result is written to the description
+cache as usual, and can be fetched by handle (the request id) - or handed
+to `on_complete`, which the AI server uses to publish it for the interface
+server's /api/description/<request_id> endpoint.
+
+Example:
+    >>> budget = latency_budget_from_settings()
+    >>> text = budget.run(request_id, lambda: generate_description(artist, title, period))
+    >>> if text is None:  # over budget: answer with the placeholder, fetch the text later
+    ...     budget.fetch(request_id)
+    {'status': 'pending'}
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from artguide.config import get_setting
+
+DEFAULT_DESCRIPTION_BUDGET = 3.0
+KEEP_SECONDS = 300
+# Redis state of descriptions that missed the budget, per request id (written
+# by the AI server, read by the interface server's /api/description/<id>)
+PENDING_DESCRIPTION_PREFIX = "artguide:pending_description:"
+
+
+class _Result:
+    """Chunks of one background computation, readable while they are produced."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.deferred = False
+        self.finished_at = None
+        self.cond = threading.Condition()
+
+
+class LatencyBudget:
+    """
+    Waits at most `seconds` for a computation; slower ones finish in the background.
+
+    Thread-safe. Results that missed the budget are kept for `keep_seconds`
+    after they finished (see fetch).
+    """
+
+    def __init__(self, seconds=DEFAULT_DESCRIPTION_BUDGET, max_workers=8, keep_seconds=KEEP_SECONDS):
+        """
+        Args:
+            seconds: Budget in seconds
+            max_workers: Background threads (computations beyond this wait in a queue)
+            keep_seconds: How long finished background results stay fetchable
+        """
+        self.seconds = seconds
+        self.keep_seconds = keep_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="background")
+        self._results = {}
+        self._lock = threading.Lock()
+        self._counts = {"in_budget": 0, "deferred": 0, "completed_late": 0, "failed": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _produce(self, handle, result, start, on_complete):
+        try:
+            for chunk in start():
+                with result.cond:
+                    result.chunks.append(chunk)
+                    result.cond.notify_all()
+        except Exception as e:
+            with result.cond:
+                result.error = e
+        with result.cond:
+            result.done = True
+            result.finished_at = time.time()
+            deferred = result.deferred
+            result.cond.notify_all()
+        if not deferred:
+            return
+        if result.error is not None:
+            print(f"Warning: Background description {handle} failed: {result.error}")
+            self._count("failed")
+        else:
+            self._count("completed_late")
+        if on_complete is not None:
+            try:
+                on_complete("".join(result.chunks), result.error)
+            except Exception as e:
+                print(f"Warning: Could not publish background description {handle}: {e}")
+
+    def _prune(self):
+        cutoff = time.time() - self.keep_seconds
+        with self._lock:
+            for handle in [h for h, r in self._results.items() if r.finished_at and r.finished_at < cutoff]:
+                del self._results[handle]
+
+    def stream(self, handle, start, on_complete=None):
+        """
+        Yield the chunks of start(), computed on a background thread.
+
+        When no chunk has arrived within the budget, None is yielded once
+        (show the placeholder) before the chunks that follow. The
+        computation continues when the caller stops reading; its complete
+        text can then be fetched with `handle`.
+
+        Args:
+            handle: Identifier of the computation (e.g. the request id)
+            start: Zero-argument function returning an iterator of str chunks
+            on_complete: Called with (text, error) when a computation that
+                         missed the budget has finished
+
+        Yields:
+            str chunks, and None when the budget ran out before the first one
+        """
+        self._prune()
+        result = _Result()
+        with self._lock:
+            self._results[handle] = result
+        self._pool.submit(self._produce, handle, result, start, on_complete)
+        deadline = time.time() + self.seconds
+        position = 0
+        while True:
+            with result.cond:
+                while len(result.chunks) == position and not result.done:
+                    remaining = None if result.deferred or position else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        result.deferred = True
+                        break
+                    result.cond.wait(remaining)
+                new, done, error, deferred = result.chunks[position:], result.done, result.error, result.deferred
+            if not new and not done:
+                self._count("deferred")
+                yield None
+                continue
+            yield from new
+            position += len(new)
+            if error is not None:
+                raise error
+            if done and position == len(result.chunks):
+                break
+        if not deferred:
+            self._count("in_budget")
+            with self._lock:
+                self._results.pop(handle, None)  # the caller has the whole text
+
+    def run(self, handle, fn, on_complete=None):
+        """
+        fn() if it returns within the budget, otherwise None (fn keeps running;
+        see fetch and on_complete).
+        """
+        chunks = self.stream(handle, lambda: iter([fn()]), on_complete)
+        first = next(chunks)
+        if first is None:
+            chunks.close()
+            return None
+        return first + "".join(chunks)
+
+    def fetch(self, handle):
+        """
+        State of a computation that missed the budget.
+
+        Returns:
+            {'status': 'pending'}, {'status': 'complete', 'text': ...},
+            {'status': 'error', 'message': ...}, or None for unknown
+            (or expired) handles
+        """
+        with self._lock:
+            result = self._results.get(handle)
+        if result is None:
+            return None
+        with result.cond:
+            if not result.done:
+                return {"status": "pending"}
+            if result.error is not None:
+                return {"status": "error", "message": str(result.error)}
+            return {"status": "complete", "text": "".join(result.chunks)}
+
+    def stats(self):
+        """Requests answered within the budget, deferred, and deferred ones finished / failed since."""
+        with self._lock:
+            return dict(self._counts)
+
+
+def description_budget():
+    """Description budget in seconds from settings.yaml (generation.description_budget_seconds / DESCRIPTION_BUDGET)."""
+    return float(get_setting("generation", "description_budget_seconds", DEFAULT_DESCRIPTION_BUDGET,
+                             env="DESCRIPTION_BUDGET"))
+
+
+def latency_budget_from_settings(max_workers=8):
+    """
+    Create the description LatencyBudget configured in settings.yaml.
+
+    Returns:
+        LatencyBudget, or None when the budget is 0 (always wait for the description)
+    """
+    seconds = description_budget()
+    if seconds <= 0:
+        return None
+    return LatencyBudget(seconds, max_workers=max_workers)
@@ -0,0 +1,280 @@
+"""
+Artwork catalog: ID-mapped FAISS index + metadata + versioned manifest.
+
+Every artwork has a stable integer `artwork_id`. The FAISS index returns
+these IDs (see artguide.indexing), and the metadata DataFrame is indexed by
+them, so artworks can be added, deleted or replaced without re-embedding
+or renumbering the rest of the catalog.
+
+The catalog also keeps the embedding store (models/embeddings.npy +
+embedding_ids.npy, see artguide.store) in sync with the index, so serving
+processes can memory-map the raw embeddings.
+
+Each write bumps the version in models/manifest.json, which records the
+catalog size, the next free ID, the image preprocessing path the
+embeddings were computed with and a short history of changes. Files are
+replaced atomically (write to a temporary file, then rename), and the
+manifest is written last.
+"""
+
+import json
+import os
+import time
+
+import faiss
+import numpy as np
+import pandas as pd
+
+from artguide.indexing import index_ids, reconstruct_all, remove_ids, stores_exact_vectors, with_ids
+from artguide.preprocess import preprocessor_name
+from artguide.store import EmbeddingStore, embedding_dtype, save_embedding_store
+
+ID_COLUMN = "artwork_id"
+DEFAULT_MANIFEST_PATH = "models/manifest.json"
+MAX_HISTORY = 100
+
+
+def ensure_ids(metadata):
+    """
+    Give metadata an artwork_id column and index it by that column.
+
+    Metadata written before stable IDs existed gets IDs equal to row
+    positions, which is what its FAISS index returns.
+
+    Returns:
+        The DataFrame, indexed by artwork_id
+    """
+    if ID_COLUMN not in metadata.columns:
+        metadata.insert(0, ID_COLUMN, np.arange(len(metadata), dtype="int64"))
+    metadata.index = metadata[ID_COLUMN].to_numpy(dtype="int64")
+    return metadata
+
+
+def load_metadata(path):
+    """Read metadata parquet, indexed by artwork_id."""
+    return ensure_ids(pd.read_parquet(path))
+
+
+def lookup(metadata, ids):
+    """
+    Metadata rows for FAISS result IDs, in result order.
+
+    IDs of -1 (fewer than k results) are skipped.
+    """
+    ids = np.asarray(ids)
+    return metadata.loc[ids[ids >= 0]]
+
+
+def manifest_path_for(index_path):
+    """Manifest file stored next to the FAISS index."""
+    return os.path.join(os.path.dirname(index_path) or ".", os.path.basename(DEFAULT_MANIFEST_PATH))
+
+
+def load_manifest(path):
+    """Read a manifest (empty dict if there is none yet)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _replace_atomically(path, write):
+    """Call write(tmp_path) and move the result over path."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+class Catalog:
+    """
+    Incrementally updatable artwork catalog.
+
+    Example:
+        >>> catalog = Catalog.load("models/faiss.index", "models/metadata.parquet")
+        >>> ids = catalog.add(embeddings, [{"artist": "Claude Monet", ...}])
+        >>> catalog.delete([17])
+        >>> catalog.save("daily update")
+        {'version': 4, 'ntotal': 1203, ...}
+    """
+
+    def __init__(self, index, metadata, index_path, meta_path, manifest=None, manifest_path=None,
+                 embeddings=None):
+        """
+        Args:
+            index: FAISS index (made ID-mapped if it is not)
+            metadata: Metadata DataFrame (given an artwork_id column if missing)
+            index_path: Where save() writes the index
+            meta_path: Where save() writes the metadata
+            manifest: Current manifest dict (None for a new catalog)
+            manifest_path: Manifest file (default: manifest.json next to the index)
+            embeddings: float32 embeddings in metadata row order (default:
+                        recovered from the index when it stores them exactly;
+                        None disables the embedding store)
+        """
+        self.index = with_ids(index)
+        self.metadata = ensure_ids(metadata)
+        if embeddings is None:
+            recovered = reconstruct_all(self.index)
+            if recovered is not None:
+                stored_ids, vectors = recovered
+                order = np.argsort(stored_ids)
+                rows = order[np.searchsorted(stored_ids, self.metadata.index.to_numpy(), sorter=order)]
+                embeddings = vectors[rows]
+        self.embeddings = None if embeddings is None else np.asarray(embeddings, dtype="float32")
+        self.index_path = index_path
+        self.meta_path = meta_path
+        self.manifest_path = manifest_path or manifest_path_for(index_path)
+        self.manifest = manifest or {}
+        self._changes = {"added": 0, "deleted": 0, "replaced": 0}
+
+    @classmethod
+    def load(cls, index_path, meta_path, manifest_path=None):
+        """Load the catalog from disk."""
+        manifest_path = manifest_path or manifest_path_for(index_path)
+        index = with_ids(faiss.read_index(index_path))
+        metadata = load_metadata(meta_path)
+        embeddings = None
+        if not stores_exact_vectors(index):
+            # Lossy (PQ) index: the stored embeddings are the only full-precision copy
+            store = EmbeddingStore.open(os.path.dirname(index_path) or ".", mmap=False)
+            if store is not None and np.array_equal(np.sort(metadata.index.to_numpy()), store.ids):
+                embeddings = store.get(metadata.index.to_numpy())
+        return cls(
+            index, metadata, index_path, meta_path, load_manifest(manifest_path), manifest_path, embeddings
+        )
+
+    @property
+    def version(self):
+        return self.manifest.get("version", 0)
+
+    @property
+    def next_id(self):
+        """Smallest ID that has never been handed out."""
+        used = int(self.metadata[ID_COLUMN].max()) + 1 if len(self.metadata) else 0
+        return max(self.manifest.get("next_id", 0), used)
+
+    def add(self, embeddings, rows):
+        """
+        Append artworks.
+
+        Args:
+            embeddings: float32 array (n, dimension), L2-normalized
+            rows: List of n metadata dicts
+
+        Returns:
+            np.ndarray: The new artwork IDs
+        """
+        if len(rows) != len(embeddings):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(rows)} metadata rows")
+        ids = np.arange(self.next_id, self.next_id + len(rows), dtype="int64")
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        self.index.add_with_ids(embeddings, ids)
+        if self.embeddings is not None:
+            self.embeddings = np.concatenate([self.embeddings, embeddings])
+        new_rows = pd.DataFrame(rows)
+        new_rows.insert(0, ID_COLUMN, ids)
+        self.metadata = ensure_ids(pd.concat([self.metadata, new_rows], ignore_index=True))
+        self.manifest["next_id"] = int(ids[-1]) + 1 if len(ids) else self.next_id
+        self._changes["added"] += len(ids)
+        return ids
+
+    def delete(self, ids):
+        """
+        Remove artworks by ID. Unknown IDs are ignored.
+
+        Returns:
+            int: Number of artworks removed
+        """
+        ids = np.asarray([i for i in ids if i in self.metadata.index], dtype="int64")
+        if len(ids) == 0:
+            return 0
+        self.manifest["next_id"] = self.next_id  # never reuse deleted IDs
+        self.index, removed = remove_ids(self.index, ids)
+        if self.embeddings is not None:
+            self.embeddings = self.embeddings[~self.metadata.index.isin(ids)]
+        self.metadata = self.metadata.drop(index=ids)
+        self._changes["deleted"] += len(ids)
+        return removed
+
+    def replace(self, artwork_id, embedding, row=None):
+        """
+        Replace the image (and optionally the metadata) of an artwork, keeping its ID.
+
+        Args:
+            artwork_id: Existing artwork ID
+            embedding: New embedding, shape (dimension,) or (1, dimension)
+            row: Metadata fields to update (None keeps the current row)
+
+        Raises:
+            KeyError: If the artwork does not exist
+        """
+        if artwork_id not in self.metadata.index:
+            raise KeyError(f"Unknown artwork_id {artwork_id}")
+        embedding = np.asarray(embedding, dtype="float32").reshape(1, -1)
+        self.index, _ = remove_ids(self.index, [artwork_id])
+        self.index.add_with_ids(embedding, np.array([artwork_id], dtype="int64"))
+        if self.embeddings is not None:
+            self.embeddings[self.metadata.index.get_loc(artwork_id)] = embedding[0]
+        for column, value in (row or {}).items():
+            if column not in self.metadata.columns:
+                self.metadata[column] = None
+            self.metadata.at[artwork_id, column] = value
+        self._changes["replaced"] += 1
+
+    def check(self):
+        """
+        Verify that index and metadata describe the same artworks.
+
+        Raises:
+            ValueError: If the IDs differ
+        """
+        stored = np.sort(index_ids(self.index))
+        expected = np.sort(self.metadata.index.to_numpy())
+        if not np.array_equal(stored, expected):
+            raise ValueError(f"Index holds {len(stored)} IDs but metadata has {len(expected)} rows")
+        if self.embeddings is not None and len(self.embeddings) != len(self.metadata):
+            raise ValueError(f"{len(self.embeddings)} stored embeddings for {len(self.metadata)} artworks")
+
+    def save(self, action="update", changes=None):
+        """
+        Write index, metadata and a new manifest version.
+
+        Args:
+            action: Short description recorded in the manifest history
+            changes: Counts recorded in the history (default: the added /
+                     deleted / replaced counts since the last save)
+
+        Returns:
+            dict: The new manifest
+        """
+        self.check()
+        _replace_atomically(self.index_path, lambda p: faiss.write_index(self.index, p))
+        _replace_atomically(self.meta_path, lambda p: self.metadata.to_parquet(p, index=False))
+        if self.embeddings is not None:
+            save_embedding_store(os.path.dirname(self.index_path) or ".", self.metadata.index, self.embeddings)
+
+        version = self.version + 1
+        now = time.strftime("%Y-%m-%d %H:%M:%S")
+        history = self.manifest.get("history", [])
+        history.append({"version": version, "action": action, "timestamp": now, **(changes or self._changes)})
+        self.manifest = {
+            "version": version,
+            "updated_at": now,
+            "index_file": os.path.basename(self.index_path),
+            "metadata_file": os.path.basename(self.meta_path),
+            "index_type": type(faiss.downcast_index(getattr(self.index, "index", self.index))).__name__,
+            "ntotal": int(self.index.ntotal),
+            "next_id": self.next_id,
+            "embedding_store": None if self.embeddings is None else str(embedding_dtype()),
+            "preprocess": preprocessor_name(),  # queries must be preprocessed the same way
+            "history": history[-MAX_HISTORY:],
+        }
+        _replace_atomically(self.manifest_path, lambda p: _write_json(self.manifest, p))
+        self._changes = {"added": 0, "deleted": 0, "replaced": 0}
+        return self.manifest
+
+
+def _write_json(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
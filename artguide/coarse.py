@@ -0,0 +1,221 @@
+"""
+Two-stage (coarse-to-fine) retrieval over artist or period groups.
+
+The catalog is naturally clustered by artist. Two-stage search first scores
+the query against one centroid per group (the normalized mean embedding of
+the group's artworks) and then runs an exact L2 search over the vectors of
+the best `n_groups` groups only:
+
+    query -> centroids (n_groups_total dot products) -> top groups
+          -> exact scan of those groups' vectors -> top-k
+
+Centroids and the group layout are computed by scripts/prepare_dataset.py
+and stored in models/centroids.npz; the vectors come from the embedding
+store (or the index). Enable with `retrieval.search_mode: two_stage`.
+"""
+
+import os
+
+import numpy as np
+
+from artguide.config import get_setting
+from artguide.indexing import reconstruct_all, with_ids
+
+SEARCH_MODES = ("flat", "two_stage")
+DEFAULT_SEARCH_MODE = "flat"
+DEFAULT_GROUP_COLUMN = "artist_key"
+DEFAULT_N_GROUPS = 2
+DEFAULT_CENTROIDS_PATH = "models/centroids.npz"
+MISSING_DISTANCE = np.finfo("float32").max  # what FAISS reports for missing results
+
+
+def search_mode():
+    """Retrieval mode from settings.yaml / SEARCH_MODE ("flat" or "two_stage")."""
+    mode = get_setting("retrieval", "search_mode", DEFAULT_SEARCH_MODE, env="SEARCH_MODE")
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}")
+    return mode
+
+
+def coarse_settings():
+    """Group column and number of groups searched in two-stage mode."""
+    return {
+        "group_column": get_setting("retrieval", "group_by", DEFAULT_GROUP_COLUMN),
+        "n_groups": int(get_setting("retrieval", "coarse_groups", DEFAULT_N_GROUPS, env="COARSE_GROUPS")),
+    }
+
+
+def centroids_path():
+    """Centroid file from settings.yaml (index.centroids_path)."""
+    return get_setting("index", "centroids_path", DEFAULT_CENTROIDS_PATH)
+
+
+class TwoStageIndex:
+    """
+    Group centroids + group-contiguous catalog vectors.
+
+    `search` has the FAISS signature, so it can stand in for the index.
+
+    Example:
+        >>> coarse = TwoStageIndex.build(embeddings, ids, metadata["artist_key"])
+        >>> D, I = coarse.search(query, 5, n_groups=2)
+    """
+
+    def __init__(self, labels, centroids, ids, offsets, vectors=None, group_column=DEFAULT_GROUP_COLUMN,
+                 n_groups=DEFAULT_N_GROUPS):
+        """
+        Args:
+            labels: Group names, one per centroid
+            centroids: float32 (n_labels, dimension), L2-normalized
+            ids: Artwork IDs ordered by group
+            offsets: Group g owns ids[offsets[g]:offsets[g + 1]]
+            vectors: float32 embeddings aligned with `ids` (attach later if None)
+            group_column: Metadata column the groups come from
+            n_groups: Default number of groups searched per query
+        """
+        self.labels = np.asarray(labels, dtype=object)
+        self.centroids = np.ascontiguousarray(centroids, dtype="float32")
+        self.ids = np.asarray(ids, dtype="int64")
+        self.offsets = np.asarray(offsets, dtype="int64")
+        self.group_column = group_column
+        self.n_groups = n_groups
+        self.vectors = None
+        if vectors is not None:
+            self.attach(vectors)
+
+    @property
+    def ntotal(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, embeddings, ids, groups, group_column=DEFAULT_GROUP_COLUMN, n_groups=DEFAULT_N_GROUPS):
+        """
+        Compute centroids and the group layout.
+
+        Args:
+            embeddings: float32 (n, dimension) catalog embeddings
+            ids: Artwork IDs, one per row
+            groups: Group label per row (e.g. metadata["artist_key"])
+        """
+        embeddings = np.asarray(embeddings, dtype="float32")
+        groups = np.asarray([str(g) for g in groups], dtype=object)
+        labels, inverse = np.unique(groups, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        counts = np.bincount(inverse, minlength=len(labels))
+        centroids = np.stack([embeddings[inverse == g].mean(axis=0) for g in range(len(labels))])
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(labels, centroids, np.asarray(ids)[order], offsets, embeddings[order], group_column, n_groups)
+
+    def save(self, path):
+        """Write centroids and group layout (not the vectors) to an .npz file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, labels=self.labels.astype(str), centroids=self.centroids, ids=self.ids,
+                 offsets=self.offsets, group_column=np.array(self.group_column))
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path, n_groups=DEFAULT_N_GROUPS):
+        """Read centroids and layout; call attach() with the vectors before searching."""
+        with np.load(path) as data:
+            return cls(data["labels"].astype(object), data["centroids"], data["ids"], data["offsets"],
+                       group_column=str(data["group_column"]), n_groups=n_groups)
+
+    def matches(self, ids):
+        """Whether the layout covers exactly these artwork IDs (False after catalog edits)."""
+        return np.array_equal(np.sort(self.ids), np.sort(np.asarray(ids, dtype="int64")))
+
+    def attach(self, vectors):
+        """Set the float32 vectors, aligned with self.ids."""
+        self.vectors = np.ascontiguousarray(vectors, dtype="float32")
+        self._norms = (self.vectors ** 2).sum(axis=1)
+        return self
+
+    def search(self, queries, k, n_groups=None, allowed_ids=None):
+        """
+        Coarse-to-fine search.
+
+        Args:
+            queries: float32 (n, dimension)
+            k: Results per query
+            n_groups: Groups scanned per query (default: self.n_groups)
+            allowed_ids: Optional artwork IDs to restrict the search to; only
+                         groups containing one of them are candidates
+
+        Returns:
+            tuple: (D, I) squared L2 distances and artwork IDs, shape (n, k),
+                   padded with -1 like FAISS
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype="float32"))
+        scores = queries @ self.centroids.T
+        allowed = None
+        if allowed_ids is not None:
+            allowed = np.isin(self.ids, allowed_ids)
+            has_allowed = np.add.reduceat(allowed.astype("int64"), self.offsets[:-1]) > 0 if len(allowed) else allowed
+            scores[:, ~has_allowed] = -np.inf
+        n_groups = min(n_groups or self.n_groups, len(self.labels))
+        top_groups = np.argsort(-scores, axis=1)[:, :n_groups]
+
+        D = np.full((len(queries), k), MISSING_DISTANCE, dtype="float32")
+        I = np.full((len(queries), k), -1, dtype="int64")
+        for q, query in enumerate(queries):
+            # Groups are contiguous, so each one is scanned as a view (no gather)
+            blocks = [slice(self.offsets[g], self.offsets[g + 1]) for g in top_groups[q]]
+            rows = np.concatenate([np.arange(b.start, b.stop) for b in blocks])
+            distances = np.concatenate([self._norms[b] - 2 * (self.vectors[b] @ query) for b in blocks])
+            distances += query @ query
+            if allowed is not None:
+                keep = allowed[rows]
+                rows, distances = rows[keep], distances[keep]
+            n = min(k, len(rows))
+            if n == 0:
+                continue
+            best = np.argpartition(distances, n - 1)[:n] if n < len(rows) else np.arange(len(rows))
+            best = best[np.argsort(distances[best])]
+            D[q, :n] = np.maximum(distances[best], 0)
+            I[q, :n] = self.ids[rows[best]]
+        return D, I
+
+
+def vector_source(index, embedding_store=None):
+    """
+    Callable returning float32 catalog vectors for artwork IDs.
+
+    Uses the embedding store when there is one, otherwise the vectors stored
+    in the (exact) FAISS index.
+    """
+    if embedding_store is not None:
+        return embedding_store.get
+    recovered = reconstruct_all(with_ids(index))
+    if recovered is None:
+        raise ValueError("Two-stage search needs the embedding store for lossy (PQ) indexes")
+    stored_ids, vectors = recovered
+    order = np.argsort(stored_ids)
+    return lambda ids: vectors[order[np.searchsorted(stored_ids, ids, sorter=order)]]
+
+
+def load_two_stage(metadata_store, vectors_for, path=None, settings=None):
+    """
+    Load the centroid file, rebuilding it in memory if the catalog changed.
+
+    Args:
+        metadata_store: MetadataStore of the served catalog (IDs and group column)
+        vectors_for: Callable mapping artwork IDs to float32 vectors (see vector_source)
+        path: Centroid file (default: centroids_path())
+        settings: coarse_settings() override
+
+    Returns:
+        TwoStageIndex with vectors attached
+    """
+    path = path or centroids_path()
+    settings = settings or coarse_settings()
+    group_column, n_groups = settings["group_column"], settings["n_groups"]
+    if os.path.exists(path):
+        coarse = TwoStageIndex.load(path, n_groups)
+        if coarse.group_column == group_column and coarse.matches(metadata_store.ids):
+            return coarse.attach(vectors_for(coarse.ids))
+    print(f"Info: Centroids in {path} do not match the catalog; recomputing them by '{group_column}'")
+    ids = metadata_store.ids
+    return TwoStageIndex.build(vectors_for(ids), ids, metadata_store.column(group_column), group_column, n_groups)
@@ -0,0 +1,61 @@
+"""
+Access to settings.yaml.
+
+Values are read once from the repository's settings.yaml (or the file named
+by the ARTGUIDE_SETTINGS environment variable). Environment variables take
+precedence over the file so deployments can override single values.
+"""
+
+import os
+
+import yaml
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETTINGS_PATH = os.getenv("ARTGUIDE_SETTINGS", os.path.join(PROJECT_ROOT, "settings.yaml"))
+
+_settings = None
+
+
+def load_settings(path=None):
+    """
+    Load settings from YAML.
+
+    Args:
+        path: Settings file path (default: SETTINGS_PATH). When given, the
+              file is read fresh and not cached.
+
+    Returns:
+        dict: Parsed settings, or an empty dict if the file is missing
+    """
+    global _settings
+    if path is None and _settings is not None:
+        return _settings
+
+    settings_path = path or SETTINGS_PATH
+    try:
+        with open(settings_path) as f:
+            settings = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        settings = {}
+
+    if path is None:
+        _settings = settings
+    return settings
+
+
+def get_setting(section, key, default=None, env=None):
+    """
+    Look up a single setting.
+
+    Args:
+        section: Top-level section in settings.yaml (e.g. "model")
+        key: Key within the section
+        default: Value returned when the setting is not defined
+        env: Optional environment variable that overrides the file
+
+    Returns:
+        The setting value (environment overrides are returned as strings)
+    """
+    if env and os.getenv(env) is not None:
+        return os.getenv(env)
+    return (load_settings().get(section) or {}).get(key, default)
@@ -0,0 +1,392 @@
+"""
+Persistent cache for LLM artwork descriptions.
+
+A tour-guide description depends only on the artwork (artist, title,
+period), the prompt text and the model, and the catalog holds a finite
+number of artworks - so after the first visitor, every recognition of a
+popular painting can skip the 7-15 s Gemini round-trip. Entries are keyed
+by a hash of all of these, so editing the prompt or switching models
+invalidates old descriptions instead of serving them.
+
+Backends (settings.yaml `cache.description_backend`):
+    file  - one JSON file per description in a directory, shared by all
+            processes on a host (app.py and every ai_server.py worker)
+    redis - shared by all hosts of a distributed deployment
+    none  - no caching
+
+Both backends expire entries after `description_ttl_seconds` and keep at
+most `description_max_items`, evicting the least recently used ones.
+
+Example:
+    >>> cache = description_cache_from_settings()
+    >>> key = description_key(artist, title, period, description_prompt(artist, title, period))
+    >>> cache.get(key) or cache.put(key, generate(...))
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from artguide.config import get_setting
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+DESCRIPTION_MODEL = "gemini-2.5-flash"
+DEFAULT_DESCRIPTION_DIR = "models/description_cache"
+DEFAULT_DESCRIPTION_TTL = 30 * 24 * 3600
+DEFAULT_DESCRIPTION_MAX_ITEMS = 10_000
+REDIS_KEY_PREFIX = "artguide:description:"
+REDIS_LRU_KEY = "artguide:description_lru"
+RESCAN_SECONDS = 300
+
+PROMPT_TEMPLATE = """You are an enthusiastic and knowledgeable art museum tour guide. Generate a comprehensive, engaging description for this artwork.
+
+**Artwork Details:**
+- Artist: {artist}
+- Title: {title}
+- Period/Style: {period}
+
+**Instructions:**
+Create a detailed 300-400 word description structured in the following sections:
+
+1. **Introduction** (2-3 sentences): Welcome visitors and introduce the artwork with enthusiasm
+2. **Artist Background** (3-4 sentences): Discuss the artist's significance, life, and contribution to art history
+3. **Artistic Analysis** (4-5 sentences): Analyze the techniques, style, colors, composition, and visual elements
+4. **Historical Context** (3-4 sentences): Explain the period, movement, and cultural significance
+5. **Legacy & Impact** (2-3 sentences): Describe the artwork's influence and importance today
+
+Write in a warm, conversational tone that educates and inspires museum visitors. Use vivid language and make art history accessible to everyone."""
+
+
+def description_prompt(artist, title, period):
+    """Gemini prompt for one artwork's tour-guide description."""
+    return PROMPT_TEMPLATE.format(artist=artist, title=title, period=period)
+
+
+def description_key(artist, title, period, prompt, model=DESCRIPTION_MODEL):
+    """
+    Cache key of a description.
+
+    Args:
+        artist, title, period: Artwork metadata the description was written for
+        prompt: Full prompt text sent to the model
+        model: Model name
+
+    Returns:
+        str: Hex digest
+    """
+    h = hashlib.blake2b(digest_size=20)
+    for part in (model, artist, title, period, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class DescriptionCache:
+    """
+    Base class: hit/miss counters and the get-or-generate helper.
+
+    Subclasses implement `_load(key)` (returns the description or None) and
+    `_store(key, description)`.
+    """
+
+    name = "none"
+
+    def __init__(self, ttl=DEFAULT_DESCRIPTION_TTL, max_items=DEFAULT_DESCRIPTION_MAX_ITEMS):
+        """
+        Args:
+            ttl: Seconds a description stays valid (0 = never expires)
+            max_items: Maximum number of cached descriptions
+        """
+        self.ttl = ttl
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _load(self, key):
+        return None
+
+    def _store(self, key, description):
+        pass
+
+    def get(self, key):
+        """
+        Look up a description.
+
+        Returns:
+            str or None on a miss (also for expired entries and backend errors)
+        """
+        try:
+            description = self._load(key)
+        except Exception as e:
+            print(f"Warning: Description cache lookup failed: {e}")
+            description = None
+        with self._lock:
+            if description is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return description
+
+    def put(self, key, description):
+        """Store a description (errors are logged, never raised). Returns the description."""
+        try:
+            self._store(key, description)
+        except Exception as e:
+            print(f"Warning: Could not write description cache entry: {e}")
+        return description
+
+    def get_or_generate(self, key, generate):
+        """
+        Return the cached description for key, calling generate() on a miss.
+
+        generate() may return None (e.g. the LLM is unavailable); nothing is
+        cached then, so a fallback text never shadows a later LLM answer.
+        """
+        description = self.get(key)
+        if description is None:
+            description = generate()
+            if description is not None:
+                self.put(key, description)
+        return description
+
+    def size(self):
+        return 0
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size."""
+        size = self.size()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size": size,
+                "max_items": self.max_items,
+            }
+
+
+class FileDescriptionCache(DescriptionCache):
+    """
+    Directory of JSON entries shared by all processes on a host.
+
+    The file modification time records the last use: hits touch the file,
+    and when a write pushes the cache over `max_items` the least recently
+    used files are deleted, down to 90% of `max_items`. Writes are atomic
+    renames, so concurrent workers never read partial entries.
+
+    The number of entries is tracked in memory and only recounted from the
+    directory when it crosses `max_items` or every RESCAN_SECONDS (entries
+    written by other processes), so writes and stats() do not scan the
+    directory each time.
+    """
+
+    name = "file"
+
+    def __init__(self, directory=DEFAULT_DESCRIPTION_DIR, ttl=DEFAULT_DESCRIPTION_TTL,
+                 max_items=DEFAULT_DESCRIPTION_MAX_ITEMS):
+        super().__init__(ttl, max_items)
+        self.directory = directory
+        self._count = None  # approximate number of entries (None until the first scan)
+        self._scanned_at = 0.0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _entries(self):
+        """(mtime, path) of every entry."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    try:
+                        entries.append((entry.stat().st_mtime, entry.path))
+                    except FileNotFoundError:
+                        pass  # evicted by another worker
+        return entries
+
+    def _rescan(self):
+        """Scan the directory and reset the entry count."""
+        entries = self._entries()
+        with self._lock:
+            self._count = len(entries)
+            self._scanned_at = time.time()
+        return entries
+
+    def _adjust_count(self, delta):
+        with self._lock:
+            if self._count is not None:
+                self._count = max(0, self._count + delta)
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            entry = {}
+        if "description" not in entry or (self.ttl and time.time() - entry.get("created", 0) > self.ttl):
+            try:
+                os.remove(path)
+                self._adjust_count(-1)
+            except FileNotFoundError:
+                pass
+            return None
+        os.utime(path)  # mark as recently used
+        return entry["description"]
+
+    def _store(self, key, description):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        is_new = not os.path.exists(path)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"description": description, "created": time.time()}, f)
+        os.replace(tmp_path, path)
+        if is_new:
+            self._adjust_count(1)
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            due = (self._count is None or self._count > self.max_items
+                   or time.time() - self._scanned_at > RESCAN_SECONDS)
+        if due:
+            self._evict()
+
+    def _evict(self):
+        """Recount the entries and delete the least recently used ones beyond max_items."""
+        entries = self._rescan()
+        if len(entries) <= self.max_items:
+            return
+        # Evict down to a low-water mark so the next writes do not rescan right away
+        target = self.max_items - self.max_items // 10
+        removed = 0
+        for _, path in sorted(entries)[:len(entries) - target]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            removed += 1
+        self._adjust_count(-removed)
+        with self._lock:
+            self.evictions += removed
+
+    def size(self):
+        """Approximate number of entries (exact after a scan, updated by this process's writes)."""
+        with self._lock:
+            count = self._count
+        return count if count is not None else len(self._rescan())
+
+
+class RedisDescriptionCache(DescriptionCache):
+    """
+    Redis entries shared by all hosts.
+
+    Each description is a string key with the TTL as Redis expiry; a sorted
+    set scores keys by last use so writes can trim the cache to `max_items`.
+    Members whose key has expired are dropped from the set: all those not
+    used within the TTL before counting, others when a lookup misses.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, ttl=DEFAULT_DESCRIPTION_TTL, max_items=DEFAULT_DESCRIPTION_MAX_ITEMS):
+        """
+        Args:
+            client: redis.Redis connection
+        """
+        super().__init__(ttl, max_items)
+        self.client = client
+
+    def _load(self, key):
+        value = self.client.get(REDIS_KEY_PREFIX + key)
+        if value is None:
+            self.client.zrem(REDIS_LRU_KEY, key)  # expired (or never stored)
+            return None
+        self.client.zadd(REDIS_LRU_KEY, {key: time.time()})
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    def _store(self, key, description):
+        pipe = self.client.pipeline()
+        pipe.set(REDIS_KEY_PREFIX + key, description.encode("utf-8"), ex=self.ttl or None)
+        pipe.zadd(REDIS_LRU_KEY, {key: time.time()})
+        pipe.execute()
+        self._evict()
+
+    def _prune_expired(self):
+        """Drop members not used within the TTL (their keys were written even earlier, so they have expired)."""
+        if self.ttl:
+            self.client.zremrangebyscore(REDIS_LRU_KEY, "-inf", time.time() - self.ttl)
+
+    def _evict(self):
+        """Delete the least recently used entries beyond max_items."""
+        if self.max_items <= 0:
+            return
+        self._prune_expired()
+        excess = self.client.zcard(REDIS_LRU_KEY) - self.max_items
+        if excess <= 0:
+            return
+        for key, _ in self.client.zpopmin(REDIS_LRU_KEY, excess):
+            key = key.decode("utf-8") if isinstance(key, bytes) else key
+            if self.client.delete(REDIS_KEY_PREFIX + key):
+                with self._lock:
+                    self.evictions += 1
+
+    def size(self):
+        try:
+            self._prune_expired()
+            return self.client.zcard(REDIS_LRU_KEY)
+        except Exception:
+            return 0
+
+
+def description_cache_from_settings(redis_client=None):
+    """
+    Create the description cache configured in settings.yaml
+    (cache.description_backend / description_dir / description_ttl_seconds /
+    description_max_items, or the DESCRIPTION_CACHE, DESCRIPTION_CACHE_DIR,
+    DESCRIPTION_CACHE_TTL and DESCRIPTION_CACHE_SIZE environment variables).
+
+    Args:
+        redis_client: Existing Redis connection for the redis backend
+                      (default: connect to REDIS_HOST / REDIS_PORT)
+
+    Returns:
+        DescriptionCache (the base class caches nothing for backend "none")
+    """
+    backend = str(get_setting("cache", "description_backend", "file", env="DESCRIPTION_CACHE") or "none").lower()
+    ttl = int(get_setting("cache", "description_ttl_seconds", DEFAULT_DESCRIPTION_TTL, env="DESCRIPTION_CACHE_TTL") or 0)
+    max_items = int(get_setting("cache", "description_max_items", DEFAULT_DESCRIPTION_MAX_ITEMS,
+                                env="DESCRIPTION_CACHE_SIZE") or 0)
+
+    if backend == "redis":
+        if redis_client is None:
+            if not REDIS_AVAILABLE:
+                print("Warning: redis not installed. Description cache disabled.")
+                return DescriptionCache(ttl, max_items)
+            redis_client = redis.Redis(host=os.getenv("REDIS_HOST", "localhost"),
+                                       port=int(os.getenv("REDIS_PORT", 6379)), db=0)
+        return RedisDescriptionCache(redis_client, ttl, max_items)
+    if backend == "file":
+        directory = get_setting("cache", "description_dir", DEFAULT_DESCRIPTION_DIR, env="DESCRIPTION_CACHE_DIR")
+        return FileDescriptionCache(directory, ttl, max_items)
+    if backend != "none":
+        print(f"Warning: Unknown description cache backend '{backend}'. Description cache disabled.")
+    return DescriptionCache(ttl, max_items)
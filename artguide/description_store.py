@@ -0,0 +1,102 @@
+"""
+Pre-generated catalog descriptions (models/descriptions.jsonl).
+
+scripts/pregenerate_descriptions.py writes one JSON line per catalog
+artwork, keyed like the description cache (artwork + prompt hash, see
+artguide/description_cache.py). `recognize` and the AI server look the
+recognized artwork up here first, so catalog items are answered without
+an LLM call. The file is append-only: an interrupted job resumes from
+the keys already present, and readers ignore a truncated last line.
+
+Readers re-read the file when its modification time changes, so a job
+that finishes after the servers started is picked up without a restart.
+
+Example:
+    >>> store = DescriptionStore(descriptions_path("models/metadata.parquet"))
+    >>> store.get(description_key(artist, title, period, description_prompt(artist, title, period)))
+"""
+
+import json
+import os
+import threading
+
+DESCRIPTIONS_FILE = "descriptions.jsonl"
+
+
+def descriptions_path(meta_path):
+    """Sidecar file next to the catalog metadata."""
+    return os.path.join(os.path.dirname(meta_path) or ".", DESCRIPTIONS_FILE)
+
+
+def read_descriptions(path):
+    """
+    Parse a descriptions file.
+
+    Returns:
+        dict: key -> entry dict (with at least 'description'); {} if the file is missing
+    """
+    entries = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # line cut off by an interrupted write
+                if isinstance(entry, dict) and entry.get("key") and entry.get("description"):
+                    entries[entry["key"]] = entry
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def append_descriptions(path, entries):
+    """
+    Append entries (dicts with 'key' and 'description') and flush them to disk.
+
+    Called after every finished artwork, so at most the line being
+    written is lost when the job is killed.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "ab+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")  # close a line cut off by an interrupted run
+    with open(path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class DescriptionStore:
+    """Read-only view of a descriptions file, reloaded when the file changes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    self._entries = read_descriptions(self.path) if mtime is not None else {}
+                    self._mtime = mtime
+
+    def get(self, key):
+        """Pre-generated description for a cache key, or None."""
+        self._refresh()
+        entry = self._entries.get(key)
+        return entry["description"] if entry is not None else None
+
+    def __len__(self):
+        self._refresh()
+        return len(self._entries)
@@ -0,0 +1,227 @@
+"""
+Batched CLIP embedding pipeline.
+
+Image decoding and CLIP preprocessing (resize, center crop, normalization;
+CLIPProcessor or the fast path, as configured with model.preprocess, so
+the catalog matches the queries) run in a pool of worker processes, while the main process feeds the model
+one forward pass per batch. Used by scripts/prepare_dataset.py to index
+large collections.
+"""
+
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import torch
+from PIL import Image
+from transformers import CLIPProcessor, CLIPModel
+
+from artguide.preprocess import PREPROCESSORS, FastClipPreprocessor, preprocessor_name
+
+CLIP_MODEL_NAME = "openai/clip-vit-base-patch32"
+DEFAULT_BATCH_SIZE = 32
+
+# Preprocessing function used inside worker processes (set by _init_worker):
+# PIL image -> pixel_values of shape (3, 224, 224)
+_worker_preprocess = None
+
+
+def load_clip_model(model_name=CLIP_MODEL_NAME, device=None):
+    """
+    Load CLIP model and processor.
+
+    Args:
+        model_name: Hugging Face model identifier
+        device: torch device (cuda/cpu); auto-detected if None
+
+    Returns:
+        tuple: (model, processor, device)
+    """
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = CLIPModel.from_pretrained(model_name).to(device)
+    model.eval()
+    processor = CLIPProcessor.from_pretrained(model_name)
+    return model, processor, device
+
+
+def normalize_embeddings(embeddings):
+    """
+    L2-normalize embeddings row by row.
+
+    Args:
+        embeddings: Array of shape (n, d)
+
+    Returns:
+        float32 array of shape (n, d) with unit-length rows
+    """
+    embeddings = np.asarray(embeddings, dtype="float32")
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def embed_pixel_values(pixel_values, model, device):
+    """
+    Run one CLIP forward pass over a batch of preprocessed images.
+
+    Args:
+        pixel_values: Array or tensor of shape (n, 3, 224, 224)
+        model: CLIP model
+        device: torch device
+
+    Returns:
+        L2-normalized float32 array of shape (n, 512)
+    """
+    if not isinstance(pixel_values, torch.Tensor):
+        pixel_values = torch.from_numpy(np.ascontiguousarray(pixel_values))
+    with torch.no_grad():
+        features = model.get_image_features(pixel_values=pixel_values.to(device))
+    if not isinstance(features, torch.Tensor):
+        features = features.pooler_output
+    return normalize_embeddings(features.cpu().numpy())
+
+
+def embed_images(images, model, processor, device):
+    """
+    Embed a list of PIL images with a single forward pass.
+
+    Args:
+        images: List of PIL Images (RGB)
+        model: CLIP model
+        processor: CLIP processor
+        device: torch device
+
+    Returns:
+        L2-normalized float32 array of shape (len(images), 512)
+    """
+    inputs = processor(images=images, return_tensors="pt")
+    return embed_pixel_values(inputs["pixel_values"], model, device)
+
+
+def _init_worker(image_processor, preprocess="clip"):
+    """Set up the preprocessing path ("clip" or "fast") in the worker process."""
+    global _worker_preprocess
+    if preprocess == "fast":
+        fast = FastClipPreprocessor.from_clip_processor(image_processor)
+        _worker_preprocess = lambda img: fast([img])[0]
+    else:
+        _worker_preprocess = lambda img: image_processor(images=img.convert("RGB"), return_tensors="np")["pixel_values"][0]
+
+
+def _preprocess_path(image_path):
+    """
+    Decode and preprocess a single image file (runs in a worker).
+
+    Returns:
+        tuple: (pixel_values of shape (3, 224, 224) or None, error message or None)
+    """
+    try:
+        with Image.open(image_path) as img:
+            pixels = _worker_preprocess(img)  # the fast path decodes JPEGs in draft mode
+        return pixels.astype("float32"), None
+    except Exception as e:
+        return None, str(e)
+
+
+class BatchEmbeddingPipeline:
+    """
+    Embed image files in batches.
+
+    Worker processes decode and preprocess images; the model runs one
+    forward pass per `batch_size` images. Results keep the input order.
+    """
+
+    def __init__(self, model, processor, device, batch_size=DEFAULT_BATCH_SIZE,
+                 num_workers=None, log_every=10, preprocess=None):
+        """
+        Args:
+            model: CLIP model
+            processor: CLIP processor
+            device: torch device
+            batch_size: Number of images per forward pass
+            num_workers: Preprocessing processes (0 = preprocess in the main process,
+                         None = one per CPU core minus one)
+            log_every: Print progress every `log_every` batches
+            preprocess: "clip" or "fast" (default: model.preprocess, the path
+                        queries are preprocessed with)
+        """
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
+        preprocess = preprocess or preprocessor_name()
+        if preprocess not in PREPROCESSORS:
+            raise ValueError(f"Unknown preprocessor '{preprocess}', expected one of {PREPROCESSORS}")
+        if num_workers is None:
+            num_workers = max(1, (os.cpu_count() or 2) - 1)
+        self.model = model
+        self.image_processor = getattr(processor, "image_processor", processor)
+        self.device = device
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+        self.log_every = log_every
+        self.preprocess = preprocess
+
+    def _preprocessed(self, image_paths):
+        """Yield (pixel_values, error) per path, in order."""
+        if self.num_workers == 0:
+            _init_worker(self.image_processor, self.preprocess)
+            for path in image_paths:
+                yield _preprocess_path(path)
+            return
+
+        chunksize = max(1, self.batch_size // self.num_workers)
+        with Pool(self.num_workers, initializer=_init_worker,
+                  initargs=(self.image_processor, self.preprocess)) as pool:
+            yield from pool.imap(_preprocess_path, image_paths, chunksize=chunksize)
+
+    def run(self, image_paths):
+        """
+        Embed all images.
+
+        Args:
+            image_paths: List of image file paths
+
+        Returns:
+            tuple: (embeddings, valid_indices) where embeddings has shape
+                   (len(valid_indices), 512) and valid_indices are the positions
+                   in `image_paths` that were embedded successfully.
+        """
+        total = len(image_paths)
+        embeddings = []
+        valid_indices = []
+        batch = []
+        batch_indices = []
+        batches_done = 0
+        start = time.time()
+
+        def flush():
+            nonlocal batches_done
+            embeddings.append(embed_pixel_values(np.stack(batch), self.model, self.device))
+            valid_indices.extend(batch_indices)
+            batch.clear()
+            batch_indices.clear()
+            batches_done += 1
+            if batches_done % self.log_every == 0:
+                elapsed = time.time() - start
+                print(f"  Processed {len(valid_indices)}/{total} images "
+                      f"({len(valid_indices) / elapsed:.1f} images/sec)")
+
+        for i, (pixels, error) in enumerate(self._preprocessed(image_paths)):
+            if pixels is None:
+                print(f"Error processing {image_paths[i]}: {error}")
+                continue
+            batch.append(pixels)
+            batch_indices.append(i)
+            if len(batch) == self.batch_size:
+                flush()
+        if batch:
+            flush()
+
+        elapsed = max(time.time() - start, 1e-9)
+        print(f"  Embedded {len(valid_indices)}/{total} images in {elapsed:.1f}s "
+              f"({len(valid_indices) / elapsed:.1f} images/sec)")
+
+        if not embeddings:
+            return np.zeros((0, 0), dtype="float32"), valid_indices
+        return np.concatenate(embeddings), valid_indices
@@ -0,0 +1,174 @@
+"""
+Content-addressed cache for image embeddings.
+
+Embeddings are keyed by a hash of the image content (raw file bytes, or the
+decoded pixels when only a PIL image is available), so repeated uploads of
+the same photo and sample images from the Gradio dropdown skip the CLIP
+forward pass.
+
+Two tiers:
+    memory - LRU dictionary bounded by `max_items`
+    disk   - optional directory of .npy files that survives restarts
+
+Entries are namespaced by embedding backend and preprocessing path, since
+those produce (slightly) different vectors for the same image.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from artguide.config import get_setting
+
+DEFAULT_MAX_ITEMS = 1024
+
+
+def image_digest(image):
+    """
+    Content hash of an image.
+
+    Args:
+        image: Raw encoded bytes (preferred: no decode needed) or a PIL Image.
+               Images opened from a file that are still undecoded are hashed
+               over the file bytes (same key as uploading that file); other
+               images over mode, size and pixel data.
+
+    Returns:
+        str: Hex digest
+    """
+    h = hashlib.blake2b(digest_size=20)
+    filename = getattr(image, "filename", None)
+    if isinstance(image, Image.Image) and filename and getattr(image, "tile", None) and os.path.isfile(filename):
+        with open(filename, "rb") as f:
+            image = f.read()
+    if isinstance(image, Image.Image):
+        h.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+        h.update(image.tobytes())
+    else:
+        h.update(b"bytes:")
+        h.update(image)
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + optional disk) embedding cache.
+
+    Example:
+        >>> cache = EmbeddingCache(max_items=512, disk_dir="models/embedding_cache")
+        >>> emb = cache.get_or_compute(image_digest(data), lambda: embed_image(img))
+        >>> cache.stats()
+        {'hits': 0, 'disk_hits': 0, 'misses': 1, 'hit_rate': 0.0, 'size': 1, ...}
+    """
+
+    def __init__(self, max_items=DEFAULT_MAX_ITEMS, disk_dir=None, namespace=""):
+        """
+        Args:
+            max_items: Maximum number of embeddings kept in memory (0 disables the memory tier)
+            disk_dir: Directory for the persistent tier (None disables it)
+            namespace: Prefix separating incompatible embeddings (e.g. backend name)
+        """
+        self.max_items = max_items
+        self.disk_dir = os.path.join(disk_dir, namespace) if disk_dir and namespace else disk_dir
+        self.namespace = namespace
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.npy")
+
+    def _remember(self, key, embedding):
+        """Insert into the memory tier, evicting the least recently used entry."""
+        if self.max_items <= 0:
+            return
+        embedding.setflags(write=False)  # shared between callers
+        with self._lock:
+            self._memory[key] = embedding
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Look up an embedding.
+
+        Returns:
+            np.ndarray or None on a miss
+        """
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    embedding = np.load(path)
+                except (OSError, ValueError):
+                    embedding = None
+                if embedding is not None:
+                    self._remember(key, embedding)
+                    with self._lock:
+                        self.disk_hits += 1
+                    return embedding
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, embedding):
+        """Store an embedding in memory and (if enabled) on disk."""
+        embedding = np.asarray(embedding, dtype="float32")
+        self._remember(key, embedding)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, embedding)
+                os.replace(tmp_path, path)  # atomic: readers never see partial files
+            except OSError as e:
+                print(f"Warning: Could not write embedding cache entry: {e}")
+
+    def get_or_compute(self, key, compute):
+        """Return the cached embedding for key, computing and storing it on a miss."""
+        embedding = self.get(key)
+        if embedding is None:
+            embedding = compute()
+            self.put(key, embedding)
+        return embedding
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "size": len(self._memory),
+                "max_items": self.max_items,
+            }
+
+
+def cache_from_settings(namespace=""):
+    """
+    Create the embedding cache configured in settings.yaml
+    (cache.embedding_max_items / cache.embedding_dir, or the
+    EMBED_CACHE_SIZE / EMBED_CACHE_DIR environment variables).
+    """
+    max_items = int(get_setting("cache", "embedding_max_items", DEFAULT_MAX_ITEMS, env="EMBED_CACHE_SIZE"))
+    disk_dir = get_setting("cache", "embedding_dir", None, env="EMBED_CACHE_DIR") or None
+    return EmbeddingCache(max_items=max_items, disk_dir=disk_dir, namespace=namespace)
@@ -0,0 +1,301 @@
+"""
+Lazily initialized recognition engine.
+
+Holds the heavy resources of the recognition pipeline (CLIP model and
+processor, embedding backend, FAISS index + metadata, Gemini client) and
+loads each of them on first use instead of at import time. Loading is
+thread-safe, and the time spent on every component is recorded in
+`startup_times` so cold-start regressions are visible.
+"""
+
+import os
+import threading
+import time
+
+import pandas as pd
+import torch
+from PIL import Image
+from transformers import CLIPProcessor, CLIPModel
+
+from artguide.audio_store import audio_store_from_settings
+from artguide.backends import backend_from_settings
+from artguide.budget import latency_budget_from_settings
+from artguide.catalog import load_manifest, manifest_path_for
+from artguide.coarse import load_two_stage, search_mode, vector_source
+from artguide.description_cache import description_cache_from_settings
+from artguide.description_store import DescriptionStore, descriptions_path
+from artguide.embedding import CLIP_MODEL_NAME
+from artguide.embedding_cache import cache_from_settings
+from artguide.filtering import PartitionCache
+from artguide.indexing import apply_search_settings
+from artguide.llm import llm_from_settings, llm_timeouts
+from artguide.metadata_store import MetadataStore
+from artguide.mock_llm import llm_provider, mock_client_from_env
+from artguide.preprocess import check_catalog_preprocessor, preprocessor_from_settings, preprocessor_name
+from artguide.rerank import is_compressed, with_rerank
+from artguide.singleflight import coalescer_from_settings
+from artguide.store import EmbeddingStore, load_mode, read_index
+from artguide.zero_shot import ZeroShotClassifier, zero_shot_enabled
+
+# LLM Integration (Gemini API) is optional
+try:
+    from google import genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+    print("Warning: google-genai not installed. Using placeholder descriptions.")
+
+EMPTY_METADATA_COLUMNS = ["artist", "title", "period", "image_path"]
+
+
+class ArtGuideEngine:
+    """
+    Lazily loaded CLIP + FAISS + Gemini resources.
+
+    Attributes are loaded on first access:
+        clip_model, clip_processor, preprocessor, embedding_backend, embedding_cache,
+        index, metadata_store, metadata, embedding_store, searcher, partitions, two_stage,
+        zero_shot, gemini_client, llm, description_cache, descriptions, flights,
+        latency_budget, audio_store
+
+    `metadata_store` is the columnar lookup used on every search; `metadata`
+    is a DataFrame view of it, built only for offline-style consumers
+    (e.g. the zero-shot prompt builder).
+
+    With `index.load_mode: mmap` the index and embedding store are memory-mapped
+    and shared with other processes on the host. The embedding store is always
+    mapped for compressed indexes, whose candidates are re-ranked against it
+    (`searcher`).
+
+    Example:
+        >>> engine = ArtGuideEngine("models/faiss.index", "models/metadata.parquet")
+        >>> engine.warmup()  # optional: load everything and run a dummy forward pass
+        >>> engine.startup_times
+        {'clip_model': 2.81, 'embedding_backend': 0.0, 'catalog': 0.01, ...}
+    """
+
+    def __init__(self, index_path, meta_path, model_name=CLIP_MODEL_NAME, device=None):
+        """
+        Args:
+            index_path: FAISS index file
+            meta_path: Metadata parquet file
+            model_name: Hugging Face CLIP model identifier
+            device: torch device (auto-detected if None)
+        """
+        self.index_path = index_path
+        self.meta_path = meta_path
+        self.model_name = model_name
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.startup_times = {}
+        self._lock = threading.RLock()
+        self._loaded = {}
+
+    def _get(self, name, loader):
+        """Return component `name`, loading it once (thread-safe)."""
+        if name in self._loaded:
+            return self._loaded[name]
+        with self._lock:
+            if name not in self._loaded:
+                start = time.perf_counter()
+                value = loader()
+                self.startup_times[name] = round(time.perf_counter() - start, 3)
+                self._loaded[name] = value
+        return self._loaded[name]
+
+    def is_loaded(self, name):
+        """Whether component `name` has been initialized."""
+        return name in self._loaded
+
+    # ------------------------------------------------------------------
+    # Components
+    # ------------------------------------------------------------------
+
+    @property
+    def clip_model(self):
+        return self._get("clip_model", self._load_clip_model)
+
+    @property
+    def clip_processor(self):
+        return self._get("clip_processor", lambda: CLIPProcessor.from_pretrained(self.model_name))
+
+    @property
+    def preprocessor(self):
+        processor = self.clip_processor  # timed separately
+        return self._get("preprocessor", lambda: preprocessor_from_settings(processor))
+
+    @property
+    def embedding_backend(self):
+        model = self.clip_model  # timed separately
+        return self._get("embedding_backend", lambda: backend_from_settings(model, self.device))
+
+    @property
+    def embedding_cache(self):
+        namespace = f"{self.embedding_backend.name}-{preprocessor_name()}"
+        return self._get("embedding_cache", lambda: cache_from_settings(namespace))
+
+    @property
+    def index(self):
+        return self._catalog()[0]
+
+    @property
+    def metadata_store(self):
+        return self._catalog()[1]
+
+    @property
+    def metadata(self):
+        store = self.metadata_store  # timed separately
+        return self._get("metadata", store.to_frame)
+
+    @property
+    def embedding_store(self):
+        """Catalog embeddings next to the index (None if there is no store)."""
+        index = self.index  # timed separately
+        return self._get("embedding_store", lambda: EmbeddingStore.open(
+            os.path.dirname(self.index_path) or ".", mmap=load_mode() == "mmap" or is_compressed(index)
+        ))
+
+    @property
+    def searcher(self):
+        """Index for flat-mode search: re-ranks compressed (PQ / binary) candidates exactly."""
+        index, store = self.index, self.embedding_store  # timed separately
+        return self._get("searcher", lambda: with_rerank(index, store))
+
+    @property
+    def partitions(self):
+        """PartitionCache for metadata-filtered searches (filled on first use of each filter)."""
+        metadata_store, store = self.metadata_store, self.embedding_store  # timed separately
+        return self._get("partitions", lambda: PartitionCache(metadata_store, store))
+
+    @property
+    def two_stage(self):
+        """TwoStageIndex over artist/period centroids (retrieval.search_mode: two_stage)."""
+        index, metadata_store = self._catalog()  # timed separately
+        store = self.embedding_store
+        return self._get("two_stage", lambda: load_two_stage(metadata_store, vector_source(index, store)))
+
+    @property
+    def zero_shot(self):
+        """ZeroShotClassifier over the catalog's artists/periods (text matrix cached on disk)."""
+        metadata = self.metadata  # timed separately
+        return self._get("zero_shot", lambda: ZeroShotClassifier.load_or_build(
+            metadata, lambda: self.clip_model, lambda: self.clip_processor, self.device,
+            model_name=self.model_name
+        ))
+
+    @property
+    def gemini_client(self):
+        return self._get("gemini_client", self._load_gemini_client)
+
+    @property
+    def llm(self):
+        """LLMClient around gemini_client: deadlines, bounded concurrency, circuit breaker (None without a client)."""
+        client = self.gemini_client  # timed separately
+        return self._get("llm", lambda: llm_from_settings(client))
+
+    @property
+    def description_cache(self):
+        """Cache of Gemini descriptions (file / redis backend, see settings.yaml)."""
+        return self._get("description_cache", description_cache_from_settings)
+
+    @property
+    def descriptions(self):
+        """DescriptionStore of pre-generated catalog descriptions (next to the metadata)."""
+        return self._get("descriptions", lambda: DescriptionStore(descriptions_path(self.meta_path)))
+
+    @property
+    def flights(self):
+        """Coalescer sharing identical in-flight descriptions / narrations between threads (None if disabled)."""
+        return self._get("flights", coalescer_from_settings)
+
+    @property
+    def latency_budget(self):
+        """LatencyBudget: how long recognition waits for a description (None = always wait)."""
+        return self._get("latency_budget", latency_budget_from_settings)
+
+    @property
+    def audio_store(self):
+        """AudioStore of narration MP3s, one file per text + language (LRU-bounded)."""
+        return self._get("audio_store", audio_store_from_settings)
+
+    def _load_clip_model(self):
+        model = CLIPModel.from_pretrained(self.model_name).to(self.device)
+        model.eval()
+        return model
+
+    def _catalog(self):
+        return self._get("catalog", self._load_catalog)
+
+    def _load_catalog(self):
+        """Load FAISS index + metadata store (both or neither)."""
+        if os.path.exists(self.index_path) and os.path.exists(self.meta_path):
+            # Refuse a catalog embedded with another preprocessing path than the queries
+            check_catalog_preprocessor(load_manifest(manifest_path_for(self.index_path)))
+            index = read_index(self.index_path)  # memory-mapped with index.load_mode: mmap
+            apply_search_settings(index)  # nprobe / efSearch for approximate indexes
+            return index, MetadataStore.load(self.meta_path)
+        return None, MetadataStore.from_frame(pd.DataFrame(columns=EMPTY_METADATA_COLUMNS))
+
+    def _load_gemini_client(self):
+        """Initialize Gemini API client (if API key available), or the mock LLM."""
+        if llm_provider() == "mock":
+            return mock_client_from_env()
+        if not GEMINI_AVAILABLE:
+            return None
+        api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            print("Info: GOOGLE_API_KEY not set. Using placeholder descriptions.")
+            return None
+        try:
+            # HTTP timeout (ms) as a backstop for the LLMClient deadline
+            client = genai.Client(api_key=api_key, http_options={"timeout": int(llm_timeouts()[0] * 1000)})
+            print("✓ Gemini API client initialized successfully")
+            return client
+        except Exception as e:
+            print(f"Warning: Failed to initialize Gemini client: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Inference
+    # ------------------------------------------------------------------
+
+    def embed(self, images):
+        """
+        Embed a list of PIL images.
+
+        Returns:
+            L2-normalized float32 array of shape (len(images), 512)
+        """
+        return self.embedding_backend.embed(self.preprocessor(images))
+
+    def warmup(self):
+        """
+        Load every component and run a dummy forward pass.
+
+        Returns:
+            dict: Seconds spent initializing each component
+        """
+        with self._lock:
+            self.clip_model
+            self.preprocessor
+            self.embedding_backend
+            self.embedding_cache
+            self._catalog()
+            self.embedding_store
+            self.searcher
+            if search_mode() == "two_stage" and self.index is not None:
+                self.two_stage
+            if zero_shot_enabled():
+                self.zero_shot
+            self.gemini_client
+
+            start = time.perf_counter()
+            self.embed([Image.new("RGB", (224, 224))])
+            self.startup_times["warmup_forward"] = round(time.perf_counter() - start, 3)
+        return dict(self.startup_times)
+
+    def startup_report(self):
+        """Human-readable per-component startup times."""
+        lines = [f"  {name:<18} {seconds:.3f}s" for name, seconds in self.startup_times.items()]
+        total = sum(self.startup_times.values())
+        lines.append(f"  {'total':<18} {total:.3f}s")
+        return "\n".join(lines)
@@ -0,0 +1,245 @@
+"""
+Metadata-filtered vector search.
+
+Visitors are usually in a single gallery, so a query can be restricted to
+artworks matching metadata predicates - period, artist and location
+(gallery) - e.g. {"location": "Room 2", "period": ["Impressionism"]}.
+
+The filter is resolved to artwork IDs on the columnar metadata store and
+applied inside the search rather than by over-fetching and dropping
+results afterwards. A PartitionCache remembers the most recently used
+resolved filters (filters come from clients, so the number of cached
+partitions is bounded as well as their subindex rows):
+
+    small partitions     - (e.g. one gallery) get their own exact fp16 FAISS
+                           subindex built from the embedding store, so the
+                           query only touches the gallery's vectors
+    larger partitions    - are searched in the main index with a FAISS ID
+                           selector (flat / ivf_* / hnsw), an exact scan of
+                           the store (pq / binary, see RerankIndex) or only
+                           the matching groups (two_stage)
+
+Example:
+    >>> partitions = PartitionCache(metadata_store, embedding_store)
+    >>> filters = parse_filters({"location": "Room 2"})
+    >>> search_records(searcher, metadata_store, embedding, 5, [filters], partitions)[0]
+    [{'artwork_id': 17, 'location': 'Room 2', ..., 'distance': 0.12}, ...]
+"""
+
+import threading
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+
+from artguide.coarse import TwoStageIndex
+from artguide.config import get_setting
+from artguide.indexing import selector_params, supports_selector
+from artguide.rerank import RerankIndex
+
+FILTER_COLUMNS = ("period", "artist", "location")
+DEFAULT_FILTER_CACHE_ROWS = 50_000   # ~50 MB of fp16 partition subindexes for 512-d embeddings
+DEFAULT_FILTER_CACHE_ENTRIES = 256   # resolved filters kept (each holds its int64 artwork IDs)
+
+
+def parse_filters(filters):
+    """
+    Normalize a filter specification.
+
+    Args:
+        filters: {column: value or list of values} (None / empty values are
+                 ignored), or None
+
+    Returns:
+        dict: {column: [values]}, or None when nothing is filtered
+
+    Raises:
+        ValueError: For a column outside FILTER_COLUMNS or a non-dict spec
+    """
+    if not filters:
+        return None
+    if not isinstance(filters, dict):
+        raise ValueError(f"filters must be a mapping of column to value(s), got {type(filters).__name__}")
+    parsed = {}
+    for column, values in filters.items():
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"Cannot filter on '{column}', expected one of {FILTER_COLUMNS}")
+        if values is None:
+            continue
+        if isinstance(values, str):
+            values = [values]
+        values = [str(value).strip() for value in values if str(value).strip()]
+        if values:
+            parsed[column] = values
+    return parsed or None
+
+
+def filter_key(filters):
+    """Hashable form of parsed filters (queries with equal keys are searched together)."""
+    if not filters:
+        return None
+    return tuple(sorted((column, tuple(sorted(values))) for column, values in filters.items()))
+
+
+def filter_cache_rows():
+    """Vectors kept in cached partition subindexes (0 = always search the main index)."""
+    return int(get_setting("retrieval", "filter_cache_rows", DEFAULT_FILTER_CACHE_ROWS, env="FILTER_CACHE_ROWS") or 0)
+
+
+def filter_cache_entries():
+    """Resolved filters kept by a PartitionCache (0 = resolve every filter on each search)."""
+    return int(get_setting("retrieval", "filter_cache_entries", DEFAULT_FILTER_CACHE_ENTRIES,
+                           env="FILTER_CACHE_ENTRIES") or 0)
+
+
+class Partition:
+    """
+    A resolved filter.
+
+    Attributes:
+        allowed_ids: int64 artwork IDs matching the filter
+        subindex: Exact ID-mapped fp16 index over just these artworks, or None
+    """
+
+    def __init__(self, allowed_ids, subindex=None):
+        self.allowed_ids = allowed_ids
+        self.subindex = subindex
+
+    @property
+    def rows(self):
+        """Vectors held in the subindex (0 without one)."""
+        return self.allowed_ids.size if self.subindex is not None else 0
+
+
+class PartitionCache:
+    """
+    LRU cache of resolved filters for one catalog version.
+
+    Partitions of up to half the row budget get a subindex. The least
+    recently used partitions are dropped when the subindexes exceed the
+    row budget or more than `max_entries` filters are cached.
+    """
+
+    def __init__(self, metadata_store, embedding_store=None, max_rows=None, max_entries=None):
+        """
+        Args:
+            metadata_store: MetadataStore the filters are resolved on
+            embedding_store: EmbeddingStore the subindexes are built from
+                             (None = no subindexes)
+            max_rows: Row budget for subindexes (default: filter_cache_rows())
+            max_entries: Number of cached partitions (default: filter_cache_entries())
+        """
+        self.metadata_store = metadata_store
+        self.embedding_store = embedding_store
+        self.max_rows = filter_cache_rows() if max_rows is None else max_rows
+        self.max_entries = filter_cache_entries() if max_entries is None else max_entries
+        self.stats = {"hits": 0, "misses": 0, "subindexes": 0, "evictions": 0}
+        self._partitions = OrderedDict()
+        self._subindex_rows = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._partitions)
+
+    def get(self, filters):
+        """Partition for parsed filters (resolved and cached on first use)."""
+        key = filter_key(filters)
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is not None:
+                self._partitions.move_to_end(key)
+                self.stats["hits"] += 1
+                return partition
+        partition = self._build(filters)
+        with self._lock:
+            self.stats["misses"] += 1
+            if self.max_entries <= 0:
+                return partition
+            if key in self._partitions:  # resolved concurrently by another thread
+                self._drop(key)
+            self._partitions[key] = partition
+            self._subindex_rows += partition.rows
+            while self._partitions and (len(self._partitions) > self.max_entries
+                                        or self._subindex_rows > self.max_rows):
+                self._drop(next(iter(self._partitions)))
+                self.stats["evictions"] += 1
+        return partition
+
+    def _drop(self, key):
+        self._subindex_rows -= self._partitions.pop(key).rows
+
+    def _build(self, filters):
+        allowed_ids = self.metadata_store.matching_ids(filters)
+        if self.embedding_store is None or not 0 < len(allowed_ids) <= self.max_rows // 2:
+            return Partition(allowed_ids)
+        vectors = self.embedding_store.get(allowed_ids)
+        subindex = faiss.IndexIDMap2(faiss.IndexScalarQuantizer(vectors.shape[1], faiss.ScalarQuantizer.QT_fp16))
+        subindex.add_with_ids(vectors, allowed_ids)
+        self.stats["subindexes"] += 1
+        return Partition(allowed_ids, subindex)
+
+
+def filtered_search(searcher, queries, k, allowed_ids=None):
+    """
+    searcher.search restricted to artwork IDs.
+
+    Args:
+        searcher: FAISS index, RerankIndex or TwoStageIndex
+        queries: float32 (n, dimension)
+        k: Results per query
+        allowed_ids: Artwork IDs to search (None = whole catalog)
+
+    Returns:
+        tuple: (D, I) like index.search
+
+    Raises:
+        ValueError: For pq / binary indexes served without the embedding store
+    """
+    if allowed_ids is None:
+        return searcher.search(queries, k)
+    if isinstance(searcher, (RerankIndex, TwoStageIndex)):
+        return searcher.search(queries, k, allowed_ids=allowed_ids)
+    if not supports_selector(searcher):
+        raise ValueError("Filtered search on pq / binary indexes needs the embedding store (index.rerank_factor > 0)")
+    selector = faiss.IDSelectorBatch(np.asarray(allowed_ids, dtype="int64"))
+    return searcher.search(np.atleast_2d(queries), k, params=selector_params(searcher, selector))
+
+
+def search_records(searcher, metadata_store, queries, k, filters=None, partitions=None):
+    """
+    Search a batch of queries, each with its own (optional) filters.
+
+    Queries sharing the same filters are searched with one call.
+
+    Args:
+        searcher: FAISS index, RerankIndex or TwoStageIndex
+        metadata_store: MetadataStore of the searched catalog
+        queries: float32 (n, dimension)
+        k: Results per query
+        filters: Per query, parsed filters or None (default: no filters)
+        partitions: PartitionCache of this catalog (default: resolve the
+                    filters on every call, no subindexes)
+
+    Returns:
+        list: Per query, the result records (with a 'distance' key)
+    """
+    queries = np.atleast_2d(queries)
+    filters = filters or [None] * len(queries)
+    groups = {}
+    for row, query_filters in enumerate(filters):
+        groups.setdefault(filter_key(query_filters), (query_filters, []))[1].append(row)
+
+    results = [None] * len(queries)
+    for query_filters, rows in groups.values():
+        if not query_filters:
+            D, I = searcher.search(queries[rows], k)
+        else:
+            partition = partitions.get(query_filters) if partitions is not None else Partition(
+                metadata_store.matching_ids(query_filters))
+            if partition.subindex is not None:
+                D, I = partition.subindex.search(queries[rows], k)
+            else:
+                D, I = filtered_search(searcher, queries[rows], k, partition.allowed_ids)
+        for position, row in enumerate(rows):
+            results[row] = metadata_store.records(I[position], D[position])
+    return results
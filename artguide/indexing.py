@@ -0,0 +1,375 @@
+"""
+Configurable FAISS index construction and search parameters.
+
+Index types (settings.yaml `index.type`, or INDEX_TYPE):
+
+    flat      - exhaustive IndexFlatL2 (exact; the recall baseline)
+    ivf_flat  - inverted lists over k-means cells, full vectors
+    ivf_pq    - inverted lists with product-quantized codes
+    pq        - exhaustive scan over product-quantized codes (pq_m bytes per vector)
+    binary    - exhaustive Hamming scan over 1 bit per dimension (rotated LSH codes)
+    hnsw      - HNSW graph over full vectors (no training)
+
+The compressed types (ivf_pq, pq, binary) are meant to be served with
+exact re-ranking against the embedding store, see artguide/rerank.py. The
+binary type can only be served that way (with_rerank refuses it otherwise).
+
+IVF and PQ indexes are trained on a random sample of the catalog. The
+search-time knobs (`nprobe` for IVF, `efSearch` for HNSW) are stored in the
+index file with a sensible default and can be overridden on the serving
+side with `index.nprobe` / `index.ef_search` (FAISS_NPROBE / FAISS_EF_SEARCH).
+
+All index types but binary use squared L2 distance on normalized
+embeddings, so distances stay comparable with the flat index (and with the
+exp(-distance) confidence); pq / ivf_pq approximate it from the codes. The
+binary type (IndexLSH) returns Hamming distances between codes - 0 to
+`dimension` differing bits - which are not L2 distances; the re-ranking
+step replaces them with exact squared L2.
+
+Indexes built with `ids` return stable artwork IDs instead of row
+positions: IVF indexes store IDs natively, flat and HNSW indexes are
+wrapped in an IndexIDMap2.
+"""
+
+import math
+import time
+
+import faiss
+import numpy as np
+
+from artguide.config import get_setting
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "pq", "binary", "hnsw")
+DEFAULT_INDEX_TYPE = "flat"
+DEFAULT_PQ_M = 64            # sub-quantizers (512-d -> 64 bytes per vector)
+DEFAULT_HNSW_M = 32          # graph neighbours per node
+DEFAULT_TRAIN_SIZE = 100_000
+DEFAULT_NPROBE = 16
+DEFAULT_EF_SEARCH = 64
+MIN_POINTS_PER_CENTROID = 39  # below this FAISS k-means warns and clusters poorly
+
+
+def default_nlist(n_vectors):
+    """Number of IVF cells for a catalog of n_vectors (~4 * sqrt(n), trainable)."""
+    nlist = int(4 * math.sqrt(max(n_vectors, 1)))
+    return max(1, min(nlist, n_vectors // MIN_POINTS_PER_CENTROID))
+
+
+def factory_string(index_type, n_vectors, dimension, nlist=None, pq_m=DEFAULT_PQ_M, hnsw_m=DEFAULT_HNSW_M):
+    """
+    FAISS index_factory description for an index type.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        n_vectors: Catalog size (used to size IVF and PQ)
+        dimension: Embedding dimension
+        nlist: IVF cells (default: default_nlist(n_vectors))
+        pq_m: PQ sub-quantizers (must divide dimension)
+        hnsw_m: HNSW neighbours per node
+
+    Returns:
+        str: e.g. "IVF1024,PQ64x8"
+
+    Raises:
+        ValueError: For an unknown index type or invalid PQ size
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}', expected one of {INDEX_TYPES}")
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "hnsw":
+        return f"HNSW{hnsw_m}"
+    if index_type == "binary":
+        return "LSHrt"  # random rotation + per-dimension trained thresholds, `dimension` bits
+
+    nlist = nlist or default_nlist(n_vectors)
+    if index_type == "ivf_flat":
+        return f"IVF{nlist},Flat"
+
+    if dimension % pq_m:
+        raise ValueError(f"pq_m={pq_m} must divide the embedding dimension {dimension}")
+    # 2**nbits centroids per sub-quantizer need ~39 training points each; use fewer bits for small catalogs
+    nbits = max(1, min(8, int(math.log2(max(n_vectors // MIN_POINTS_PER_CENTROID, 2)))))
+    if index_type == "pq":
+        return f"PQ{pq_m}x{nbits}"
+    return f"IVF{nlist},PQ{pq_m}x{nbits}"
+
+
+def build_faiss_index(embeddings, index_type=DEFAULT_INDEX_TYPE, nlist=None, pq_m=DEFAULT_PQ_M,
+                      hnsw_m=DEFAULT_HNSW_M, train_size=DEFAULT_TRAIN_SIZE, seed=0, ids=None):
+    """
+    Build (train if needed) and fill a FAISS index.
+
+    Args:
+        embeddings: float32 array (n, dimension), L2-normalized
+        index_type: One of INDEX_TYPES
+        nlist: IVF cells (default: sized from the catalog)
+        pq_m: PQ sub-quantizers
+        hnsw_m: HNSW neighbours per node
+        train_size: Maximum number of vectors sampled for IVF/PQ training
+        seed: Random seed for the training sample
+        ids: Optional int64 artwork IDs (one per row); the index then returns
+             these IDs instead of row positions
+
+    Returns:
+        faiss.Index with all embeddings added and default search parameters set
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    n, dimension = embeddings.shape
+    description = factory_string(index_type, n, dimension, nlist, pq_m, hnsw_m)
+    index = faiss.index_factory(dimension, description, faiss.METRIC_L2)
+
+    if not index.is_trained:
+        sample = embeddings
+        if n > train_size:
+            rows = np.random.default_rng(seed).choice(n, train_size, replace=False)
+            sample = embeddings[np.sort(rows)]
+        print(f"  Training {description} on {len(sample)} vectors...")
+        index.train(sample)
+
+    if ids is None:
+        index.add(embeddings)
+    else:
+        if faiss.try_extract_index_ivf(index) is None:
+            index = faiss.IndexIDMap2(index)
+        index.add_with_ids(embeddings, np.asarray(ids, dtype="int64"))
+    set_search_params(index, nprobe=DEFAULT_NPROBE, ef_search=DEFAULT_EF_SEARCH)
+    return index
+
+
+def has_ids(index):
+    """Whether the index returns stored IDs (ID map or IVF) rather than row positions."""
+    return hasattr(index, "id_map") or faiss.try_extract_index_ivf(index) is not None
+
+
+def with_ids(index):
+    """
+    Make a position-addressed index ID-mapped, using row positions as IDs.
+
+    Indexes written before artworks had stable IDs return row positions;
+    wrapping them with identity IDs keeps every existing result unchanged.
+
+    Returns:
+        The index itself if it already has IDs, otherwise an IndexIDMap2
+    """
+    if has_ids(index):
+        return index
+    vectors = index.reconstruct_n(0, index.ntotal)
+    empty = faiss.clone_index(index)
+    empty.reset()
+    mapped = faiss.IndexIDMap2(empty)
+    mapped.add_with_ids(vectors, np.arange(len(vectors), dtype="int64"))
+    return mapped
+
+
+def index_ids(index):
+    """All IDs stored in an ID-mapped index (in storage order)."""
+    if hasattr(index, "id_map"):
+        return faiss.vector_to_array(index.id_map).astype("int64")
+    ivf = faiss.extract_index_ivf(index)
+    invlists = ivf.invlists
+    ids = [
+        faiss.rev_swig_ptr(invlists.get_ids(cell), invlists.list_size(cell)).copy()
+        for cell in range(ivf.nlist) if invlists.list_size(cell)
+    ]
+    return np.concatenate(ids).astype("int64") if ids else np.empty(0, dtype="int64")
+
+
+def stores_exact_vectors(index):
+    """Whether an ID-mapped index keeps the full-precision vectors (everything but PQ / binary codes)."""
+    if hasattr(index, "id_map"):
+        return not isinstance(faiss.downcast_index(index.index), (faiss.IndexPQ, faiss.IndexLSH))
+    return isinstance(faiss.downcast_index(faiss.extract_index_ivf(index)), faiss.IndexIVFFlat)
+
+
+def reconstruct_all(index):
+    """
+    Recover the stored vectors of an ID-mapped index.
+
+    Returns:
+        tuple: (ids, float32 vectors), or None for lossy (PQ / binary) indexes
+    """
+    if not stores_exact_vectors(index):
+        return None
+    if hasattr(index, "id_map"):
+        return index_ids(index), faiss.downcast_index(index.index).reconstruct_n(0, index.ntotal)
+    ivf = faiss.downcast_index(faiss.extract_index_ivf(index))
+    ids = index_ids(index)
+    ivf.set_direct_map_type(faiss.DirectMap.Hashtable)  # IDs are not sequential
+    try:
+        return ids, ivf.reconstruct_batch(ids)
+    finally:
+        ivf.set_direct_map_type(faiss.DirectMap.NoMap)
+
+
+def remove_ids(index, ids):
+    """
+    Remove vectors by ID.
+
+    HNSW graphs do not support removal; for those the remaining vectors
+    are re-added to a fresh graph with the same parameters.
+
+    Args:
+        index: ID-mapped index (see with_ids)
+        ids: IDs to remove
+
+    Returns:
+        tuple: (index, number of vectors removed) - the index object may be new
+    """
+    ids = np.asarray(ids, dtype="int64")
+    try:
+        return index, int(index.remove_ids(ids))
+    except RuntimeError:
+        pass
+
+    inner = faiss.downcast_index(index.index)
+    stored = index_ids(index)
+    keep = ~np.isin(stored, ids)
+    vectors = inner.reconstruct_n(0, index.ntotal)[keep]
+    rebuilt = faiss.clone_index(inner)
+    rebuilt.reset()
+    rebuilt = faiss.IndexIDMap2(rebuilt)
+    rebuilt.add_with_ids(vectors, stored[keep])
+    return rebuilt, int((~keep).sum())
+
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    """
+    Set runtime search parameters on whichever index type is loaded.
+
+    Parameters that do not apply to the index (e.g. nprobe on HNSW) are
+    ignored. Also works through ID-map wrappers.
+
+    Args:
+        index: faiss.Index
+        nprobe: IVF cells visited per query
+        ef_search: HNSW candidate list size per query
+
+    Returns:
+        dict: Parameters that were applied
+    """
+    applied = {}
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe:
+        ivf.nprobe = min(int(nprobe), ivf.nlist)
+        applied["nprobe"] = ivf.nprobe
+
+    inner = faiss.downcast_index(index.index) if hasattr(index, "index") and hasattr(index, "id_map") else index
+    if hasattr(inner, "hnsw") and ef_search:
+        inner.hnsw.efSearch = int(ef_search)
+        applied["ef_search"] = inner.hnsw.efSearch
+    return applied
+
+
+def returns_hamming(index):
+    """Whether index.search returns Hamming distances between binary codes instead of L2 (binary type)."""
+    if index is None:
+        return False
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else faiss.downcast_index(index)
+    return isinstance(inner, faiss.IndexLSH)
+
+
+def supports_selector(index):
+    """Whether index.search accepts an ID selector (all types but pq / binary)."""
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    return not isinstance(inner, (faiss.IndexPQ, faiss.IndexLSH))
+
+
+def selector_params(index, selector):
+    """
+    Search parameters restricting a search to `selector`, keeping the
+    index's current nprobe / efSearch.
+
+    The selector must stay referenced until the search has run.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    inner = faiss.downcast_index(index.index) if hasattr(index, "id_map") else index
+    if hasattr(inner, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def index_settings():
+    """Index construction settings from settings.yaml (with env overrides)."""
+    nlist = get_setting("index", "nlist", None, env="FAISS_NLIST")
+    return {
+        "index_type": get_setting("index", "type", DEFAULT_INDEX_TYPE, env="INDEX_TYPE"),
+        "nlist": int(nlist) if nlist else None,
+        "pq_m": int(get_setting("index", "pq_m", DEFAULT_PQ_M)),
+        "hnsw_m": int(get_setting("index", "hnsw_m", DEFAULT_HNSW_M)),
+        "train_size": int(get_setting("index", "train_size", DEFAULT_TRAIN_SIZE)),
+    }
+
+
+def apply_search_settings(index):
+    """
+    Apply serving-side nprobe / efSearch from settings.yaml
+    (index.nprobe / index.ef_search, or FAISS_NPROBE / FAISS_EF_SEARCH).
+
+    Returns:
+        dict: Parameters that were applied (empty if none configured)
+    """
+    if index is None:
+        return {}
+    nprobe = get_setting("index", "nprobe", None, env="FAISS_NPROBE")
+    ef_search = get_setting("index", "ef_search", None, env="FAISS_EF_SEARCH")
+    return set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+
+
+def recall_at_k(index, baseline, queries, k=5):
+    """
+    Fraction of the baseline's top-k neighbours that the index also returns.
+
+    Args:
+        index: Index under test
+        baseline: Exact index (IndexFlatL2) over the same vectors and IDs
+        queries: float32 array (n, dimension)
+        k: Neighbours per query
+
+    Returns:
+        float: recall@k in [0, 1]
+    """
+    _, expected = baseline.search(queries, k)
+    _, actual = index.search(queries, k)
+    hits = sum(len(set(e) & set(a)) for e, a in zip(expected, actual))
+    return hits / expected.size
+
+
+def evaluate_index(index, embeddings, k=5, n_queries=200, seed=0):
+    """
+    Compare an index against the exact flat baseline.
+
+    Queries are catalog vectors with a small perturbation, so the result
+    reflects "photo of a known artwork" lookups rather than exact matches.
+
+    Args:
+        index: Index under test (filled with `embeddings`, in order)
+        embeddings: float32 array the index was built from
+        k: Neighbours per query
+        n_queries: Number of sampled queries
+
+    Returns:
+        dict: recall_at_k, latency_ms (per query, index) and flat_latency_ms
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(embeddings), min(n_queries, len(embeddings)), replace=False)
+    queries = embeddings[rows] + rng.normal(0, 0.01, (len(rows), embeddings.shape[1])).astype("float32")
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    baseline = faiss.IndexFlatL2(embeddings.shape[1])
+    baseline.add(embeddings)
+
+    def per_query_ms(idx):
+        start = time.perf_counter()
+        for q in queries:
+            idx.search(q.reshape(1, -1), k)
+        return (time.perf_counter() - start) * 1000 / len(queries)
+
+    return {
+        "recall_at_k": recall_at_k(index, baseline, queries, k),
+        "latency_ms": per_query_ms(index),
+        "flat_latency_ms": per_query_ms(baseline),
+    }
@@ -0,0 +1,281 @@
+"""
+Concurrent LLM execution with deadlines and a circuit breaker.
+
+The Gemini SDK call is synchronous and has no deadline of its own, so a
+stalled request used to block the AI server until it returned. LLMClient
+runs calls on a small thread pool that shares one SDK client (and with it
+one HTTP connection pool):
+
+    - at most `max_concurrency` calls are in flight; callers wait for a
+      slot only until their deadline
+    - every call has a deadline (`first_chunk_timeout` until the first
+      streamed chunk, `timeout` for the whole answer); the caller gets
+      LLMUnavailable when it expires, whatever the SDK thread is doing
+    - a CircuitBreaker counts consecutive failures and timeouts; while it
+      is open calls fail immediately, so callers fall back to the
+      placeholder text without waiting for a dead API
+
+Example:
+    >>> llm = llm_from_settings(genai.Client(api_key=key))
+    >>> for chunk in llm.stream(prompt):
+    ...     print(chunk, end="")
+    >>> llm.stats()
+    {'state': 'closed', 'in_flight': 0, 'calls': 1, 'timeouts': 0, ...}
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from artguide.config import get_setting
+from artguide.description_cache import DESCRIPTION_MODEL
+
+DEFAULT_LLM_TIMEOUT = 30.0
+DEFAULT_FIRST_CHUNK_TIMEOUT = 10.0
+DEFAULT_LLM_CONCURRENCY = 4
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET = 30.0
+
+
+class LLMUnavailable(RuntimeError):
+    """The LLM call was not made or did not finish in time (breaker open, no slot, deadline)."""
+
+
+def stream_llm(client, prompt, model=DESCRIPTION_MODEL):
+    """
+    Yield the text chunks of an LLM answer as they arrive.
+
+    Clients without `generate_content_stream` answer in one chunk.
+    """
+    stream = getattr(client.models, "generate_content_stream", None)
+    if stream is None:
+        yield client.models.generate_content(model=model, contents=prompt).text
+        return
+    for chunk in stream(model=model, contents=prompt):
+        if chunk.text:
+            yield chunk.text
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    - calls go through; `failure_threshold` failures in a row open it
+    open      - calls are rejected until `reset_seconds` have passed
+    half_open - one trial call goes through, the others are still rejected;
+                its success closes the breaker, its failure opens it for
+                another period
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_FAILURES, reset_seconds=DEFAULT_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.time() - self._opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def allow(self):
+        """
+        Whether a call may be made now.
+
+        While half open only the first caller is admitted (the trial call);
+        the others are rejected until it records a success or a failure, or
+        gives its turn back with `release`.
+        """
+        with self._lock:
+            state = self._state()
+            if state == "half_open":
+                if self._trial:
+                    return False
+                self._trial = True
+            return state != "open"
+
+    def release(self):
+        """Give back the half-open trial of an admitted call that ended without an outcome."""
+        with self._lock:
+            self._trial = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            state = self._state()
+            if state == "half_open" or (state == "closed" and self.failures >= self.failure_threshold):
+                self._opened_at = time.time()
+                self.opened += 1
+                print(f"Warning: LLM circuit breaker opened after {self.failures} failures "
+                      f"(retrying in {self.reset_seconds:g}s)")
+
+
+class LLMClient:
+    """
+    Bounded, deadline-aware access to one shared LLM client.
+
+    Thread-safe: any number of request threads may call `generate` /
+    `stream` concurrently.
+    """
+
+    def __init__(self, client, max_concurrency=DEFAULT_LLM_CONCURRENCY, timeout=DEFAULT_LLM_TIMEOUT,
+                 first_chunk_timeout=DEFAULT_FIRST_CHUNK_TIMEOUT, breaker=None, model=DESCRIPTION_MODEL):
+        """
+        Args:
+            client: Gemini client (or MockGeminiClient), shared by all calls
+            max_concurrency: Maximum calls in flight
+            timeout: Seconds until a whole answer must be complete
+            first_chunk_timeout: Seconds until the first chunk of a streamed answer
+            breaker: CircuitBreaker (default: a new one with default settings)
+            model: Model name
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.first_chunk_timeout = min(first_chunk_timeout, timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.model = model
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._counts = {"calls": 0, "in_flight": 0, "timeouts": 0, "errors": 0, "rejected": 0}
+
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._counts[name] += delta
+
+    def _start(self, deadline):
+        """Check the breaker and take a concurrency slot (released by the worker thread)."""
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise LLMUnavailable("circuit breaker open")
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.time())):
+            self.breaker.release()
+            self._count("rejected")
+            raise LLMUnavailable(f"all {self.max_concurrency} LLM slots busy")
+        self._count("calls")
+        self._count("in_flight")
+
+    def _finish(self):
+        self._count("in_flight", -1)
+        self._slots.release()
+
+    def _fail(self, error):
+        self._count("timeouts" if isinstance(error, LLMUnavailable) else "errors")
+        self.breaker.record_failure()
+        raise error
+
+    def stream(self, prompt):
+        """
+        Yield the answer to a prompt in chunks.
+
+        Raises:
+            LLMUnavailable: Breaker open, no free slot or a deadline passed
+            Exception: Errors raised by the client
+        """
+        start = time.time()
+        first_deadline, deadline = start + self.first_chunk_timeout, start + self.timeout
+        self._start(first_deadline)
+        chunks = queue.Queue()
+
+        def produce():
+            try:
+                for chunk in stream_llm(self.client, prompt, self.model):
+                    chunks.put(("chunk", chunk))
+                chunks.put(("end", None))
+            except Exception as e:
+                chunks.put(("error", e))
+            finally:
+                self._finish()
+
+        self._pool.submit(produce)
+        waiting_for_first = True
+        settled = False
+        try:
+            while True:
+                try:
+                    kind, value = chunks.get(timeout=max(0.0, (first_deadline if waiting_for_first else deadline) - time.time()))
+                except queue.Empty:
+                    limit = self.first_chunk_timeout if waiting_for_first else self.timeout
+                    settled = True
+                    self._fail(LLMUnavailable(f"no {'first chunk' if waiting_for_first else 'complete answer'} "
+                                              f"within {limit:g}s"))
+                if kind == "chunk":
+                    waiting_for_first = False
+                    yield value
+                elif kind == "end":
+                    settled = True
+                    self.breaker.record_success()
+                    return
+                else:
+                    settled = True
+                    self._fail(value)
+        finally:
+            if not settled:
+                # The caller stopped reading: a half-open trial without outcome is given back
+                self.breaker.release()
+
+    def generate(self, prompt):
+        """The complete answer to a prompt (same errors as stream)."""
+        return "".join(self.stream(prompt))
+
+    def stats(self):
+        """Breaker state and call counters."""
+        with self._lock:
+            counts = dict(self._counts)
+        return {"state": self.breaker.state, "breaker_opened": self.breaker.opened, **counts}
+
+
+def llm_timeouts():
+    """(timeout, first_chunk_timeout) in seconds from settings.yaml (LLM_TIMEOUT / LLM_FIRST_CHUNK_TIMEOUT)."""
+    return (
+        float(get_setting("generation", "timeout_seconds", DEFAULT_LLM_TIMEOUT, env="LLM_TIMEOUT")),
+        float(get_setting("generation", "first_chunk_timeout_seconds", DEFAULT_FIRST_CHUNK_TIMEOUT,
+                          env="LLM_FIRST_CHUNK_TIMEOUT")),
+    )
+
+
+def llm_from_settings(client):
+    """
+    Wrap an LLM client with the limits configured in settings.yaml
+    (generation.max_concurrency / timeout_seconds / first_chunk_timeout_seconds /
+    breaker_failures / breaker_reset_seconds, or the LLM_CONCURRENCY,
+    LLM_TIMEOUT, LLM_FIRST_CHUNK_TIMEOUT, LLM_BREAKER_FAILURES and
+    LLM_BREAKER_RESET environment variables).
+
+    Returns:
+        LLMClient, or None when client is None
+    """
+    if client is None:
+        return None
+    timeout, first_chunk_timeout = llm_timeouts()
+    breaker = CircuitBreaker(
+        int(get_setting("generation", "breaker_failures", DEFAULT_BREAKER_FAILURES, env="LLM_BREAKER_FAILURES")),
+        float(get_setting("generation", "breaker_reset_seconds", DEFAULT_BREAKER_RESET, env="LLM_BREAKER_RESET")),
+    )
+    return LLMClient(
+        client,
+        max_concurrency=int(get_setting("generation", "max_concurrency", DEFAULT_LLM_CONCURRENCY,
+                                        env="LLM_CONCURRENCY")),
+        timeout=timeout,
+        first_chunk_timeout=first_chunk_timeout,
+        breaker=breaker,
+    )
@@ -0,0 +1,172 @@
+"""
+Columnar, pandas-free artwork metadata for the search hot path.
+
+`metadata.parquet` is read once and turned into plain NumPy columns:
+text columns are dictionary-encoded (an object array of interned strings
+plus an int32 code per artwork), numeric columns stay as typed arrays.
+Looking up the k results of a query is then a few fancy-indexing
+operations that return plain dicts, instead of building, copying and
+converting a pandas DataFrame for every request.
+
+Example:
+    >>> store = MetadataStore.load("models/metadata.parquet")
+    >>> D, I = index.search(embedding, 5)
+    >>> store.records(I[0], D[0])[0]
+    {'artwork_id': 17, 'artist': 'Claude Monet', 'title': 'Water Lilies', ..., 'distance': 0.12}
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from artguide.catalog import ID_COLUMN, ensure_ids, load_metadata
+
+
+def _encode_text(values):
+    """Dictionary-encode a column of strings (None for missing values)."""
+    labels = {}
+    codes = np.empty(len(values), dtype="int32")
+    for row, value in enumerate(values):
+        if isinstance(value, float) and value != value:  # NaN
+            value = None
+        elif isinstance(value, str):
+            value = sys.intern(value)
+        code = labels.get(value)
+        if code is None:
+            code = labels[value] = len(labels)
+        codes[row] = code
+    label_array = np.empty(len(labels), dtype=object)
+    label_array[:] = list(labels)
+    return label_array, codes
+
+
+class MetadataStore:
+    """
+    Read-only artwork metadata addressed by artwork_id.
+
+    Attributes:
+        ids: int64 artwork IDs in row order
+        columns: Column names (artwork_id first)
+    """
+
+    def __init__(self, ids, columns):
+        """
+        Args:
+            ids: int64 artwork IDs, one per row
+            columns: List of (name, labels, values) - `labels` is an object
+                     array of strings with `values` as int32 codes into it,
+                     or None when `values` holds the column itself
+        """
+        self.ids = np.asarray(ids, dtype="int64")
+        self._columns = columns
+        self.columns = [name for name, _, _ in columns]
+        # Dense artwork_id -> row table (IDs are small, never-reused integers)
+        size = int(self.ids.max()) + 1 if len(self.ids) else 0
+        self._row_of = np.full(size, -1, dtype="int64")
+        self._row_of[self.ids] = np.arange(len(self.ids))
+
+    @classmethod
+    def from_frame(cls, metadata):
+        """Build the store from a metadata DataFrame (given artwork IDs if missing)."""
+        metadata = ensure_ids(metadata.copy())
+        columns = []
+        for name in metadata.columns:
+            series = metadata[name]
+            if series.dtype.kind in "biuf":
+                columns.append((name, None, series.to_numpy()))
+            else:
+                labels, codes = _encode_text(series.tolist())
+                columns.append((name, labels, codes))
+        return cls(metadata.index.to_numpy(), columns)
+
+    @classmethod
+    def load(cls, path):
+        """Read metadata parquet into a store."""
+        return cls.from_frame(load_metadata(path))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, artwork_id):
+        return 0 <= artwork_id < len(self._row_of) and self._row_of[artwork_id] >= 0
+
+    def rows(self, ids):
+        """
+        Row positions of artwork IDs.
+
+        Raises:
+            KeyError: If an ID is not in the catalog
+        """
+        ids = np.asarray(ids, dtype="int64")
+        valid = (ids >= 0) & (ids < len(self._row_of))
+        rows = np.full(len(ids), -1, dtype="int64")
+        rows[valid] = self._row_of[ids[valid]]
+        if (rows < 0).any():
+            raise KeyError(f"Unknown artwork IDs: {ids[rows < 0].tolist()}")
+        return rows
+
+    def column(self, name, rows=None):
+        """Values of one column as a Python list (all rows, or the given row positions)."""
+        for column_name, labels, values in self._columns:
+            if column_name == name:
+                picked = values if rows is None else values[rows]
+                return (picked if labels is None else labels[picked]).tolist()
+        raise KeyError(name)
+
+    def matching_ids(self, filters):
+        """
+        Artwork IDs whose columns match every filter (case-insensitive).
+
+        Args:
+            filters: {column: [values]} - a row matches a column if its value
+                     equals any of the values
+
+        Returns:
+            np.ndarray: int64 artwork IDs, in row order
+
+        Raises:
+            ValueError: If the catalog has no such column
+        """
+        keep = np.ones(len(self.ids), dtype=bool)
+        for name, wanted in filters.items():
+            column = next((c for c in self._columns if c[0] == name), None)
+            if column is None:
+                raise ValueError(f"Catalog has no '{name}' column to filter on (rebuild it with prepare_dataset.py)")
+            _, labels, values = column
+            wanted = {str(value).casefold() for value in wanted}
+            if labels is None:
+                keep &= np.isin(values.astype(str), list(wanted))
+                continue
+            # Compare the few distinct labels, then select rows by code
+            codes = [code for code, label in enumerate(labels) if isinstance(label, str) and label.casefold() in wanted]
+            keep &= np.isin(values, codes)
+        return self.ids[keep]
+
+    def records(self, ids, distances=None):
+        """
+        Metadata of FAISS results as plain dicts, in result order.
+
+        Args:
+            ids: Artwork IDs from index.search (-1 entries are skipped)
+            distances: Matching distances, added as a 'distance' key
+
+        Returns:
+            list[dict]: One record per valid ID
+        """
+        ids = np.asarray(ids)
+        keep = ids >= 0
+        rows = self.rows(ids[keep])
+        names = list(self.columns)
+        values = [self.column(name, rows) for name in names]
+        if distances is not None:
+            names.append("distance")
+            values.append(np.asarray(distances, dtype="float32")[keep].tolist())
+        return [dict(zip(names, row)) for row in zip(*values)]
+
+    def to_frame(self):
+        """Metadata as a DataFrame indexed by artwork_id (for offline / non-hot-path use)."""
+        frame = pd.DataFrame({name: self.column(name) for name in self.columns}, columns=self.columns)
+        if len(frame) == 0:
+            frame[ID_COLUMN] = frame[ID_COLUMN].astype("int64")
+        return ensure_ids(frame)
@@ -0,0 +1,123 @@
+"""
+Local stand-in for the Gemini client.
+
+MockGeminiClient answers `client.models.generate_content(model=..., contents=prompt)`
+like google-genai does, with a deterministic description built from the
+artwork details in the prompt. Latency and failure rate are configurable,
+so batch jobs, retries and timeouts can be exercised without network or
+an API key. Select it for serving with `generation.provider: mock`
+(LLM_PROVIDER=mock).
+
+Example:
+    >>> client = MockGeminiClient(latency=0.2, failure_rate=0.1)
+    >>> client.models.generate_content(model="gemini-2.5-flash", contents=prompt).text
+"""
+
+import os
+import random
+import re
+import threading
+import time
+
+from artguide.config import get_setting
+
+DETAIL_PATTERN = re.compile(r"^- (Artist|Title|Period/Style): (.*)$", re.MULTILINE)
+
+
+def llm_provider():
+    """Configured description generator: gemini (default) or mock."""
+    return str(get_setting("generation", "provider", "gemini", env="LLM_PROVIDER") or "gemini").lower()
+
+
+def mock_client_from_env():
+    """MockGeminiClient with the MOCK_LLM_LATENCY / MOCK_LLM_CHUNK_DELAY seconds (default 0)."""
+    return MockGeminiClient(latency=float(os.getenv("MOCK_LLM_LATENCY", 0)),
+                            chunk_delay=float(os.getenv("MOCK_LLM_CHUNK_DELAY", 0)))
+
+
+class MockResponse:
+    """generate_content result: the description is in `text`."""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class MockModels:
+    """The `client.models` namespace of MockGeminiClient."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content(self, model, contents):
+        return MockResponse(self._client.complete(contents))
+
+    def generate_content_stream(self, model, contents):
+        for chunk in self._client.stream(contents):
+            yield MockResponse(chunk)
+
+
+class MockGeminiClient:
+    """
+    Deterministic offline LLM.
+
+    Attributes:
+        calls: Number of generate_content calls so far (including failed ones)
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None, chunk_delay=0.0, chunk_words=8):
+        """
+        Args:
+            latency: Seconds each call sleeps (simulated round-trip; time to
+                     the first chunk when streaming)
+            failure_rate: Probability that a call raises RuntimeError
+            seed: Random seed for the simulated failures
+            chunk_delay: Seconds between streamed chunks
+            chunk_words: Words per streamed chunk
+        """
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunk_words = chunk_words
+        self.failure_rate = failure_rate
+        self.models = MockModels(self)
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _call(self):
+        """Count the call, wait the simulated latency and maybe fail."""
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        if self.latency:
+            time.sleep(self.latency)
+        if fail:
+            raise RuntimeError("Mock LLM: simulated 503 Service Unavailable")
+
+    def stream(self, prompt):
+        """Yield the description for a prompt in chunks of chunk_words words."""
+        self._call()
+        words = self.describe(prompt).split(" ")
+        for start in range(0, len(words), self.chunk_words):
+            if start and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            end = start + self.chunk_words
+            yield " ".join(words[start:end]) + (" " if end < len(words) else "")
+
+    def complete(self, prompt):
+        """Description for a prompt built by description_prompt()."""
+        self._call()
+        return self.describe(prompt)
+
+    @staticmethod
+    def describe(prompt):
+        """The deterministic description text for a prompt."""
+        details = dict(DETAIL_PATTERN.findall(prompt))
+        artist = details.get("Artist", "Unknown Artist")
+        title = details.get("Title", "Untitled")
+        period = details.get("Period/Style", "Unknown Period")
+        return (
+            f"Welcome! Before you stands '{title}' by {artist}.\n\n"
+            f"{artist} was one of the defining voices of {period}, and this work shows why: "
+            f"its composition, colour and brushwork carry the ideas of the movement.\n\n"
+            f"'{title}' remains a touchstone of {period} art and continues to inspire visitors today."
+        )
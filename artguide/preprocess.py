@@ -0,0 +1,211 @@
+"""
+Fast CLIP image preprocessing.
+
+Equivalent to CLIPProcessor's image pipeline (resize shortest edge, center
+crop, rescale, normalize) but:
+
+- JPEGs that have not been decoded yet are decoded directly at reduced scale
+  with PIL draft mode (DCT scaling), so a 4032x3024 phone photo is never
+  materialized at full resolution;
+- rescale + normalization is one vectorized NumPy pass into a preallocated
+  float32 buffer of shape (n, 3, crop, crop) (optionally reused per thread).
+
+The output has the same layout as CLIPProcessor(...)["pixel_values"], but
+not the same values (draft-mode decoding and PIL resizing differ from
+CLIPProcessor by up to ~25% relative L2 on large JPEGs). Queries must be
+preprocessed like the catalog was embedded: the catalog pipeline
+(artguide/embedding.py) uses the configured path too, the manifest records
+it, and serving refuses a catalog built with the other one (see
+check_catalog_preprocessor).
+"""
+
+import threading
+
+import numpy as np
+from PIL import Image
+
+from artguide.config import get_setting
+
+# OpenAI CLIP preprocessing constants (openai/clip-vit-base-patch32)
+CLIP_IMAGE_SIZE = 224
+CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
+
+PREPROCESSORS = ("fast", "clip")
+DEFAULT_PREPROCESSOR = "clip"
+CATALOG_DEFAULT_PREPROCESSOR = "clip"  # catalogs whose manifest predates the `preprocess` field
+
+
+def draft_for_size(img, shortest_edge=CLIP_IMAGE_SIZE):
+    """
+    Let PIL decode a JPEG at the smallest DCT scale that still covers `shortest_edge`.
+
+    Only has an effect on JPEG images that have not been loaded yet; other
+    images are returned unchanged.
+
+    Args:
+        img: PIL Image (typically straight from Image.open)
+        shortest_edge: Minimum size of the shorter side after decoding
+
+    Returns:
+        The same image object (configured for reduced-scale decoding)
+    """
+    if getattr(img, "format", None) != "JPEG" or not getattr(img, "tile", None):
+        return img
+    width, height = img.size
+    scale = shortest_edge / min(width, height)
+    if scale < 1:
+        # draft() picks the largest reduction that keeps both sides >= the requested size
+        img.draft("RGB", (max(1, int(width * scale)), max(1, int(height * scale))))
+    return img
+
+
+class FastClipPreprocessor:
+    """
+    Vectorized CLIP preprocessing with draft-mode JPEG decoding.
+
+    Example:
+        >>> preprocess = FastClipPreprocessor()
+        >>> pixel_values = preprocess([Image.open("photo.jpg")])
+        >>> pixel_values.shape
+        (1, 3, 224, 224)
+    """
+
+    def __init__(self, size=CLIP_IMAGE_SIZE, crop_size=CLIP_IMAGE_SIZE,
+                 mean=CLIP_MEAN, std=CLIP_STD, resample=Image.BICUBIC, reuse_buffer=False):
+        """
+        Args:
+            size: Target length of the shortest edge after resizing
+            crop_size: Side of the square center crop
+            mean: Per-channel normalization mean
+            std: Per-channel normalization std
+            resample: PIL resampling filter for the resize
+            reuse_buffer: Write every call into the same per-thread buffer instead
+                          of allocating a new one. The result is then only valid
+                          until the next call on the same thread (fine when it is
+                          fed straight into the model).
+        """
+        self.size = size
+        self.reuse_buffer = reuse_buffer
+        self.crop_size = crop_size
+        self.resample = resample
+        std = np.asarray(std, dtype="float32")
+        # (x / 255 - mean) / std  ==  x * scale - offset
+        self._scale = (1.0 / (255.0 * std)).reshape(3, 1, 1)
+        self._offset = (np.asarray(mean, dtype="float32") / std).reshape(3, 1, 1)
+        self._local = threading.local()
+
+    @classmethod
+    def from_clip_processor(cls, processor, **kwargs):
+        """Build a preprocessor with the same settings as a CLIPProcessor."""
+        image_processor = getattr(processor, "image_processor", processor)
+        size = image_processor.size
+        crop = image_processor.crop_size
+        return cls(
+            size=size.get("shortest_edge", CLIP_IMAGE_SIZE),
+            crop_size=crop.get("height", CLIP_IMAGE_SIZE),
+            mean=image_processor.image_mean,
+            std=image_processor.image_std,
+            **kwargs
+        )
+
+    def _buffer(self, n):
+        """Output buffer with room for n images (per-thread and reused if reuse_buffer)."""
+        if not self.reuse_buffer:
+            return np.empty((n, 3, self.crop_size, self.crop_size), dtype="float32")
+        buf = getattr(self._local, "buffer", None)
+        if buf is None or buf.shape[0] < n:
+            buf = np.empty((n, 3, self.crop_size, self.crop_size), dtype="float32")
+            self._local.buffer = buf
+        return buf[:n]
+
+    def resize_and_crop(self, img):
+        """
+        Decode (draft mode for JPEG), resize shortest edge and center crop.
+
+        Returns:
+            uint8 array of shape (crop_size, crop_size, 3)
+        """
+        draft_for_size(img, self.size)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+
+        width, height = img.size
+        if width <= height:
+            new_width, new_height = self.size, int(self.size * height / width)
+        else:
+            new_width, new_height = int(self.size * width / height), self.size
+        if (new_width, new_height) != (width, height):
+            img = img.resize((new_width, new_height), resample=self.resample)
+
+        left = (new_width - self.crop_size) // 2
+        top = (new_height - self.crop_size) // 2
+        img = img.crop((left, top, left + self.crop_size, top + self.crop_size))
+        return np.asarray(img, dtype=np.uint8)
+
+    def __call__(self, images):
+        """
+        Preprocess a list of PIL images.
+
+        With reuse_buffer=True the returned array is a view of a per-thread
+        buffer that the next call on the same thread overwrites.
+
+        Args:
+            images: List of PIL Images (any mode)
+
+        Returns:
+            float32 array of shape (len(images), 3, crop_size, crop_size)
+        """
+        if isinstance(images, Image.Image):
+            images = [images]
+        out = self._buffer(len(images))
+        for i, img in enumerate(images):
+            pixels = self.resize_and_crop(img).transpose(2, 0, 1)  # HWC -> CHW
+            np.multiply(pixels, self._scale, out=out[i])
+            out[i] -= self._offset
+        return out
+
+
+def preprocessor_name():
+    """Preprocessing path selected in settings.yaml / PREPROCESS ("fast" or "clip")."""
+    return get_setting("model", "preprocess", DEFAULT_PREPROCESSOR, env="PREPROCESS")
+
+
+def check_catalog_preprocessor(manifest):
+    """
+    Verify that the catalog was embedded with the configured preprocessing path.
+
+    Args:
+        manifest: Catalog manifest dict (its `preprocess` field, written by
+                  Catalog.save; missing for catalogs built with CLIPProcessor
+                  before it was recorded)
+
+    Raises:
+        ValueError: If the catalog and the query preprocessing differ
+    """
+    built_with = (manifest or {}).get("preprocess", CATALOG_DEFAULT_PREPROCESSOR)
+    name = preprocessor_name()
+    if built_with != name:
+        raise ValueError(f"Catalog was embedded with preprocess '{built_with}' but model.preprocess is '{name}'; "
+                         f"set model.preprocess: {built_with} or rebuild the catalog (scripts/prepare_dataset.py)")
+
+
+def preprocessor_from_settings(clip_processor):
+    """
+    Create the preprocessing function selected by `model.preprocess`
+    in settings.yaml (or the PREPROCESS environment variable).
+
+    Args:
+        clip_processor: Loaded CLIPProcessor (used directly for "clip",
+                        and as the source of sizes/mean/std for "fast")
+
+    Returns:
+        Callable mapping a list of PIL images to pixel_values (n, 3, 224, 224)
+    """
+    name = preprocessor_name()
+    if name not in PREPROCESSORS:
+        raise ValueError(f"Unknown preprocessor '{name}', expected one of {PREPROCESSORS}")
+    if name == "fast":
+        # Pixel values go straight into the model, so the buffer can be reused
+        return FastClipPreprocessor.from_clip_processor(clip_processor, reuse_buffer=True)
+    return lambda images: clip_processor(images=images, return_tensors="pt")["pixel_values"]
@@ -0,0 +1,252 @@
+"""
+Hot reload of a published catalog.
+
+Catalog writes (scripts/prepare_dataset.py, scripts/ingest.py) bump the
+version in models/manifest.json, which is written last. A serving process
+picks up a new version without restarting:
+
+    1. IndexWatcher notices it - a "reload" control message on the Redis
+       channel artguide:control (scripts/publish_index.py), or the manifest
+       poll every `index.reload_poll_seconds`
+    2. load_snapshot() reads index, metadata and embedding store in the
+       watcher's background thread and checks that they agree
+    3. the worker takes the ready snapshot between requests and swaps it
+       in with plain assignments, so no request sees a half-loaded catalog
+
+Example:
+    >>> watcher = IndexWatcher(lambda: load_snapshot(INDEX_PATH, META_PATH),
+    ...                        lambda: catalog_version(INDEX_PATH), current_version=3)
+    >>> watcher.start()
+    >>> snapshot = watcher.take()   # in the request loop; None until a new version is ready
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from artguide.catalog import load_manifest, manifest_path_for
+from artguide.config import get_setting
+from artguide.filtering import PartitionCache
+from artguide.indexing import apply_search_settings, has_ids, index_ids
+from artguide.metadata_store import MetadataStore
+from artguide.preprocess import check_catalog_preprocessor
+from artguide.rerank import is_compressed, with_rerank
+from artguide.store import EmbeddingStore, load_mode, read_index
+
+CONTROL_CHANNEL = "artguide:control"
+RELOAD_ACTION = "reload"
+DEFAULT_POLL_SECONDS = 30
+
+
+def reload_poll_seconds():
+    """Manifest poll interval in seconds (0 = only reload on control messages)."""
+    return float(get_setting("index", "reload_poll_seconds", DEFAULT_POLL_SECONDS, env="INDEX_RELOAD_POLL") or 0)
+
+
+def catalog_version(index_path):
+    """Published catalog version (0 when the catalog has no manifest)."""
+    return load_manifest(manifest_path_for(index_path)).get("version", 0)
+
+
+class CatalogSnapshot:
+    """
+    One consistent, fully loaded catalog version.
+
+    Attributes:
+        index: FAISS index (search parameters applied)
+        metadata_store: MetadataStore for the same artworks
+        embedding_store: EmbeddingStore, or None
+        version: Manifest version
+        search_params: Search parameters applied to the index (nprobe / efSearch)
+        zero_shot: Optional ZeroShotClassifier built for this catalog
+        two_stage: Optional TwoStageIndex for coarse-to-fine search
+        searcher: The index, or a RerankIndex over it for compressed index types
+        partitions: PartitionCache for metadata-filtered searches
+    """
+
+    def __init__(self, index, metadata_store, embedding_store=None, version=0, search_params=None,
+                 zero_shot=None, two_stage=None):
+        self.index = index
+        self.metadata_store = metadata_store
+        self.embedding_store = embedding_store
+        self.version = version
+        self.search_params = search_params or {}
+        self.zero_shot = zero_shot
+        self.two_stage = two_stage
+        self.searcher = with_rerank(index, embedding_store)
+        self.partitions = PartitionCache(metadata_store, embedding_store)
+
+
+def check_snapshot(index, metadata_store, manifest=None):
+    """
+    Verify that index, metadata and manifest describe the same artworks.
+
+    Raises:
+        ValueError: If they disagree
+    """
+    if index.ntotal != len(metadata_store):
+        raise ValueError(f"Index holds {index.ntotal} vectors but metadata has {len(metadata_store)} rows")
+    if manifest and manifest.get("ntotal", index.ntotal) != index.ntotal:
+        raise ValueError(f"Manifest lists {manifest['ntotal']} artworks but the index holds {index.ntotal}")
+    ids = index_ids(index) if has_ids(index) else np.arange(index.ntotal)
+    if not np.array_equal(np.sort(ids), np.sort(metadata_store.ids)):
+        raise ValueError("Index and metadata artwork IDs differ")
+
+
+def load_snapshot(index_path, meta_path):
+    """
+    Load and check the published catalog.
+
+    Raises:
+        ValueError: If the files are inconsistent, the catalog was
+                    republished while it was being read (retry later), or
+                    it was embedded with another preprocessing path
+    """
+    manifest_path = manifest_path_for(index_path)
+    before = load_manifest(manifest_path)
+    index = read_index(index_path)
+    search_params = apply_search_settings(index)
+    metadata_store = MetadataStore.load(meta_path)
+    embedding_store = EmbeddingStore.open(os.path.dirname(index_path) or ".",
+                                          mmap=load_mode() == "mmap" or is_compressed(index))
+    after = load_manifest(manifest_path)
+
+    if before.get("version") != after.get("version"):
+        raise ValueError(f"Catalog republished while loading (version {before.get('version')} -> {after.get('version')})")
+    check_snapshot(index, metadata_store, after)
+    check_catalog_preprocessor(after)
+    if embedding_store is not None and not np.array_equal(embedding_store.ids, np.sort(metadata_store.ids)):
+        print("Warning: Embedding store does not match the catalog; ignoring it")
+        embedding_store = None
+    return CatalogSnapshot(index, metadata_store, embedding_store, after.get("version", 0), search_params)
+
+
+def publish_reload(redis_client, version=None):
+    """
+    Ask every subscribed worker to reload the catalog.
+
+    Returns:
+        int: Number of workers that received the message
+    """
+    message = {"action": RELOAD_ACTION, "version": version, "timestamp": time.time()}
+    return redis_client.publish(CONTROL_CHANNEL, json.dumps(message))
+
+
+def parse_control_message(message):
+    """
+    Decode a pub/sub message from the control channel.
+
+    Returns:
+        dict: The message payload, or None if it is not a reload request
+    """
+    if not message or message.get("type") != "message":
+        return None
+    try:
+        payload = json.loads(message["data"])
+    except (TypeError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) and payload.get("action") == RELOAD_ACTION else None
+
+
+class IndexWatcher:
+    """
+    Background loader for new catalog versions.
+
+    The watcher thread only loads; swapping is left to the caller (take()),
+    which runs between requests.
+    """
+
+    def __init__(self, loader, version_source, current_version=0, poll_seconds=None, pubsub=None):
+        """
+        Args:
+            loader: Callable returning a CatalogSnapshot (e.g. load_snapshot)
+            version_source: Callable returning the published version
+            current_version: Version that is being served
+            poll_seconds: Manifest poll interval (default: reload_poll_seconds())
+            pubsub: Redis PubSub subscribed to CONTROL_CHANNEL (optional)
+        """
+        self.loader = loader
+        self.version_source = version_source
+        self.current_version = current_version
+        self.poll_seconds = reload_poll_seconds() if poll_seconds is None else poll_seconds
+        self.pubsub = pubsub
+        self.stats = {"reloads": 0, "failures": 0}
+        self._ready = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the watcher thread."""
+        self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def request_reload(self):
+        """Trigger a reload from this process (same as a control message)."""
+        self._wake.set()
+
+    def take(self):
+        """Return the newly loaded snapshot once (None if there is none)."""
+        with self._lock:
+            snapshot, self._ready = self._ready, None
+        return snapshot
+
+    def check(self, force=False):
+        """
+        Load the published catalog if it is newer than the current one.
+
+        Args:
+            force: Reload even if the version did not change
+
+        Returns:
+            CatalogSnapshot, or None if nothing was loaded
+        """
+        if not force and self.version_source() <= self.current_version:
+            return None
+        try:
+            snapshot = self.loader()
+        except Exception as e:
+            self.stats["failures"] += 1
+            print(f"Warning: Catalog reload failed, keeping version {self.current_version}: {e}")
+            return None
+        with self._lock:
+            self._ready = snapshot
+        self.current_version = snapshot.version
+        self.stats["reloads"] += 1
+        print(f"Catalog version {snapshot.version} loaded ({len(snapshot.metadata_store)} artworks), "
+              f"swapping in before the next request")
+        return snapshot
+
+    def _wait_for_request(self, timeout):
+        """Block up to `timeout` seconds; True if a reload was explicitly requested."""
+        if self.pubsub is not None and not self._wake.is_set():
+            message = parse_control_message(self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout))
+            if message is not None:
+                version = message.get("version")
+                return version is None or version > self.current_version
+            return self._wake.is_set()
+        return self._wake.wait(timeout)
+
+    def _run(self):
+        next_poll = time.monotonic() + self.poll_seconds
+        while not self._stop.is_set():
+            requested = self._wait_for_request(min(self.poll_seconds or 1.0, 1.0))
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            if requested:
+                self.check(force=True)
+            elif self.poll_seconds and time.monotonic() >= next_poll:
+                self.check()
+            else:
+                continue
+            next_poll = time.monotonic() + self.poll_seconds
@@ -0,0 +1,144 @@
+"""
+Exact re-ranking of compressed-index candidates.
+
+With a compressed index type (ivf_pq, pq or binary, see
+artguide/indexing.py) each worker keeps only the codes in RAM - 64 bytes
+per artwork instead of 2 KB of float32. The codes are good at finding
+the right neighbourhood but not at ordering it, so the search asks the
+index for `k * rerank_factor` candidates and orders those by their exact
+L2 distance to the float16 vectors of the embedding store
+(models/embeddings.npy). The store is memory-mapped, so only the pages of
+the candidate rows are touched and they are shared between all workers on
+a host. Distances are exact squared L2, like IndexFlatL2's, so the
+confidence computed from them does not change.
+
+Example:
+    >>> searcher = with_rerank(index, EmbeddingStore.open("models"))
+    >>> D, I = searcher.search(query, 5)
+"""
+
+import faiss
+import numpy as np
+
+from artguide.coarse import MISSING_DISTANCE
+from artguide.config import get_setting
+from artguide.indexing import has_ids, returns_hamming, selector_params, stores_exact_vectors, supports_selector
+
+DEFAULT_RERANK_FACTOR = 10
+
+
+def rerank_factor():
+    """Candidates fetched per requested result for re-ranking (0 = return the codes' ranking)."""
+    return int(get_setting("index", "rerank_factor", DEFAULT_RERANK_FACTOR, env="RERANK_FACTOR") or 0)
+
+
+def is_compressed(index):
+    """Whether an ID-mapped index ranks by lossy codes (ivf_pq / pq / binary)."""
+    return index is not None and has_ids(index) and not stores_exact_vectors(index)
+
+
+def exact_topk(queries, vectors, ids, k):
+    """
+    Exact squared-L2 top-k of every query over a small vector set.
+
+    Returns:
+        tuple: (D, I) shape (n_queries, k), padded with -1 like FAISS
+    """
+    D = np.full((len(queries), k), MISSING_DISTANCE, dtype="float32")
+    I = np.full((len(queries), k), -1, dtype="int64")
+    n = min(k, len(ids))
+    if n == 0:
+        return D, I
+    distances = (vectors ** 2).sum(axis=1) - 2 * (queries @ vectors.T) + (queries ** 2).sum(axis=1, keepdims=True)
+    best = np.argpartition(distances, n - 1, axis=1)[:, :n] if n < len(ids) else np.tile(np.arange(n), (len(queries), 1))
+    best = np.take_along_axis(best, np.argsort(np.take_along_axis(distances, best, axis=1), axis=1), axis=1)
+    D[:, :n] = np.maximum(np.take_along_axis(distances, best, axis=1), 0)
+    I[:, :n] = np.asarray(ids)[best]
+    return D, I
+
+
+class RerankIndex:
+    """
+    Compressed index + exact re-ranking against the embedding store.
+
+    `search` has the FAISS signature, so it can stand in for the index.
+    """
+
+    def __init__(self, index, embedding_store, factor=DEFAULT_RERANK_FACTOR):
+        """
+        Args:
+            index: ID-mapped compressed FAISS index (candidate generation)
+            embedding_store: EmbeddingStore holding the same artwork IDs
+            factor: Candidates fetched per requested result
+        """
+        self.index = index
+        self.embedding_store = embedding_store
+        self.factor = factor
+
+    @property
+    def ntotal(self):
+        return self.index.ntotal
+
+    def search(self, queries, k, allowed_ids=None):
+        """
+        Search the codes for k * factor candidates and return the exact top-k.
+
+        Args:
+            queries: float32 (n, dimension)
+            k: Results per query
+            allowed_ids: Optional artwork IDs to restrict the search to. Index
+                         types without ID selectors (pq, binary) scan exactly
+                         these vectors of the store instead of the codes.
+
+        Returns:
+            tuple: (D, I) squared L2 distances and artwork IDs, shape (n, k),
+                   padded with -1 like FAISS
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype="float32"))
+        n_candidates = min(k * self.factor, max(self.index.ntotal, 1))
+        if allowed_ids is None:
+            _, candidates = self.index.search(queries, n_candidates)
+        elif supports_selector(self.index):
+            selector = faiss.IDSelectorBatch(np.asarray(allowed_ids, dtype="int64"))
+            _, candidates = self.index.search(queries, n_candidates, params=selector_params(self.index, selector))
+        else:
+            return exact_topk(queries, self.embedding_store.get(allowed_ids), allowed_ids, k)
+
+        D = np.full((len(queries), k), MISSING_DISTANCE, dtype="float32")
+        I = np.full((len(queries), k), -1, dtype="int64")
+        for q, query in enumerate(queries):
+            ids = candidates[q][candidates[q] >= 0]
+            if len(ids) == 0:
+                continue
+            vectors = self.embedding_store.get(ids)
+            distances = ((vectors - query) ** 2).sum(axis=1)
+            best = np.argsort(distances, kind="stable")[:k]
+            D[q, :len(best)] = distances[best]
+            I[q, :len(best)] = ids[best]
+        return D, I
+
+
+def with_rerank(index, embedding_store, factor=None):
+    """
+    The searcher for flat-mode queries.
+
+    Args:
+        index: FAISS index (or None)
+        embedding_store: EmbeddingStore, or None
+        factor: Candidates per result (default: rerank_factor())
+
+    Returns:
+        RerankIndex for a compressed index with an embedding store (and a
+        factor > 0), otherwise the index itself
+
+    Raises:
+        ValueError: For a binary index that cannot be re-ranked (its Hamming
+                    distances would be read as L2 distances)
+    """
+    factor = rerank_factor() if factor is None else factor
+    if factor > 0 and embedding_store is not None and is_compressed(index):
+        return RerankIndex(index, embedding_store, factor)
+    if returns_hamming(index):
+        raise ValueError("Binary indexes return Hamming distances and are only served with re-ranking "
+                         "(embedding store and index.rerank_factor > 0)")
+    return index
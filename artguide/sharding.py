@@ -0,0 +1,160 @@
+"""
+Catalog sharding for scatter-gather search.
+
+A sharded catalog splits the artworks into N partitions, each a complete
+catalog of its own (ID-mapped FAISS index, metadata, embedding store and
+manifest) under models/shards/shard_<i>/, described by models/shards/shards.json.
+Artwork IDs stay global, so the per-shard top-k lists can be merged into
+the global top-k by distance alone.
+
+Shard workers (distributed/shard_server.py) each serve one partition; the
+AI server fans a query out to all of them over Redis and merges the answers
+(distributed/shard_router.py). The wire format of that exchange lives here
+so both sides agree on it.
+"""
+
+import base64
+import heapq
+import json
+import os
+import zlib
+
+import numpy as np
+
+from artguide.catalog import Catalog, ID_COLUMN, _replace_atomically, _write_json, load_manifest, manifest_path_for
+from artguide.config import get_setting
+from artguide.indexing import build_faiss_index
+
+DEFAULT_SHARDS_DIR = "models/shards"
+LAYOUT_FILE = "shards.json"
+DEFAULT_SHARD_TIMEOUT_MS = 250
+SHARD_QUEUE_PREFIX = "artguide:shard:"
+SHARD_REPLY_PREFIX = "artguide:shard_replies:"
+SHARD_REPLY_TTL_SECONDS = 60
+
+
+def shard_count():
+    """Number of shards the AI server fans out to (0 = search the local catalog)."""
+    return int(get_setting("sharding", "shards", 0, env="INDEX_SHARDS") or 0)
+
+
+def shard_timeout_ms():
+    """How long a fan-out waits for shard answers before returning partial results."""
+    return float(get_setting("sharding", "timeout_ms", DEFAULT_SHARD_TIMEOUT_MS, env="SHARD_TIMEOUT_MS"))
+
+
+def shards_dir():
+    """Directory holding the shard catalogs and shards.json."""
+    return get_setting("sharding", "dir", DEFAULT_SHARDS_DIR, env="SHARDS_DIR")
+
+
+def shard_paths(directory, shard):
+    """(index_path, meta_path) of one shard."""
+    shard_dir = os.path.join(directory, f"shard_{shard:03d}")
+    return os.path.join(shard_dir, "faiss.index"), os.path.join(shard_dir, "metadata.parquet")
+
+
+def shard_queue(shard):
+    """Redis list a shard worker pops search requests from."""
+    return f"{SHARD_QUEUE_PREFIX}{shard}:requests"
+
+
+def assign_shards(ids, n_shards, keys=None):
+    """
+    Shard number of every artwork.
+
+    Args:
+        ids: Artwork IDs
+        n_shards: Number of shards
+        keys: Optional partition key per artwork (e.g. museum); artworks with
+              the same key land on the same shard. Default: artwork_id % n_shards
+
+    Returns:
+        np.ndarray: int shard numbers
+    """
+    if keys is None:
+        return np.asarray(ids, dtype="int64") % n_shards
+    return np.array([zlib.crc32(str(key).encode("utf-8")) % n_shards for key in keys], dtype="int64")
+
+
+def write_shards(embeddings, metadata, n_shards, directory=DEFAULT_SHARDS_DIR, key_column=None, **index_params):
+    """
+    Partition a catalog and write one catalog per shard plus shards.json.
+
+    Args:
+        embeddings: float32 embeddings in metadata row order
+        metadata: Metadata DataFrame with an artwork_id column
+        n_shards: Number of shards
+        directory: Output directory
+        key_column: Metadata column to partition by (default: artwork_id modulo)
+        **index_params: Passed to build_faiss_index (index_type, nlist, ...)
+
+    Returns:
+        dict: The layout written to shards.json
+    """
+    ids = metadata[ID_COLUMN].to_numpy(dtype="int64")
+    keys = metadata[key_column].tolist() if key_column else None
+    assignment = assign_shards(ids, n_shards, keys)
+
+    counts, versions = [], []
+    for shard in range(n_shards):
+        rows = np.flatnonzero(assignment == shard)
+        index_path, meta_path = shard_paths(directory, shard)
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        index = build_faiss_index(embeddings[rows], ids=ids[rows], **index_params)
+        manifest_path = manifest_path_for(index_path)
+        catalog = Catalog(index, metadata.iloc[rows].copy(), index_path, meta_path,
+                          load_manifest(manifest_path), manifest_path, embeddings[rows])
+        manifest = catalog.save("rebuild", changes={"added": len(rows), "deleted": 0, "replaced": 0})
+        counts.append(len(rows))
+        versions.append(manifest["version"])
+
+    layout = {
+        "shards": n_shards,
+        "partition": key_column or f"{ID_COLUMN} % shards",
+        "counts": counts,
+        "versions": versions,
+    }
+    _replace_atomically(os.path.join(directory, LAYOUT_FILE), lambda p: _write_json(layout, p))
+    return layout
+
+
+def load_layout(directory=DEFAULT_SHARDS_DIR):
+    """Read shards.json (empty dict if the catalog is not sharded)."""
+    path = os.path.join(directory, LAYOUT_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def encode_queries(embeddings):
+    """JSON-safe float32 query matrix."""
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    return {"shape": list(embeddings.shape), "data": base64.b64encode(embeddings.tobytes()).decode("ascii")}
+
+
+def decode_queries(payload):
+    """Inverse of encode_queries."""
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype="float32").reshape(payload["shape"])
+
+
+def merge_topk(shard_results, k):
+    """
+    Merge per-shard result lists into the global top-k.
+
+    Args:
+        shard_results: One entry per answering shard, each a list (one per
+                       query) of result records with a 'distance' key
+        k: Results per query
+
+    Returns:
+        list: Per query, the k records with the smallest distance
+    """
+    if not shard_results:
+        return []
+    n_queries = len(shard_results[0])
+    return [
+        heapq.nsmallest(k, (r for results in shard_results for r in results[q]), key=lambda r: r["distance"])
+        for q in range(n_queries)
+    ]
@@ -0,0 +1,246 @@
+"""
+Single-flight coalescing of identical concurrent computations.
+
+A tour group photographing the same painting sends a burst of identical
+requests within seconds. Without coalescing each one misses the
+description cache (the first answer is not written yet) and pays for its
+own LLM call. With it, the first caller for a key is the leader and does
+the work; concurrent callers for the same key share the leader's result:
+
+    in-process   - followers read the leader's chunks as they arrive, so
+                   streaming still works for every caller
+    across       - the leader holds a Redis lock (artguide:flight:<key>)
+    workers        and publishes the complete result under
+                   artguide:flight_result:<key>; followers in other
+                   workers wait for it, or compute it themselves when the
+                   leader fails or the lock expires
+
+Example:
+    >>> flights = coalescer_from_settings(redis_client)
+    >>> for chunk in flights.stream(key, lambda: llm.stream(prompt)):
+    ...     send(chunk)
+    >>> flights.stats()
+    {'leaders': 1, 'shared_local': 5, 'shared_remote': 2, 'saved': 7}
+"""
+
+import os
+import threading
+import time
+import uuid
+
+from artguide.config import get_setting
+from artguide.llm import llm_timeouts
+
+LOCK_PREFIX = "artguide:flight:"
+RESULT_PREFIX = "artguide:flight_result:"
+RESULT_TTL = 60
+POLL_SECONDS = 0.05
+
+
+class FlightAbandoned(RuntimeError):
+    """The leader stopped before finishing (its caller went away)."""
+
+
+class _Flight:
+    """Chunks of one in-flight computation, readable while they are produced."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def publish(self, chunk=None, done=False, error=None):
+        with self.cond:
+            if chunk is not None:
+                self.chunks.append(chunk)
+            self.done = self.done or done
+            self.error = self.error or error
+            self.cond.notify_all()
+
+    def follow(self):
+        """Yield every chunk of the flight, from the first one, until it ends."""
+        position = 0
+        while True:
+            with self.cond:
+                while len(self.chunks) == position and not self.done and self.error is None:
+                    self.cond.wait()
+                new, done, error = self.chunks[position:], self.done, self.error
+            yield from new
+            position += len(new)
+            if error is not None:
+                raise error
+            if done and position == len(self.chunks):
+                return
+
+
+class SingleFlight:
+    """
+    In-process single-flight.
+
+    Thread-safe; keys are strings. Errors of the leader are raised in all
+    followers.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def stream(self, key, start):
+        """
+        Chunks of start() for key, shared with concurrent callers.
+
+        Args:
+            key: Coalescing key
+            start: Zero-argument function returning an iterator of chunks;
+                   called only by the leader
+
+        Returns:
+            Iterator of chunks
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+            else:
+                self.shared += 1
+        return self._lead(key, flight, start) if leader else flight.follow()
+
+    def _lead(self, key, flight, start):
+        try:
+            for chunk in start():
+                flight.publish(chunk)
+                yield chunk
+            flight.publish(done=True)
+        except Exception as e:
+            flight.publish(error=e)
+            raise
+        finally:
+            if not flight.done and flight.error is None:
+                flight.publish(error=FlightAbandoned(f"leader for {key} stopped early"))
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def do(self, key, fn):
+        """fn() for key, computed once for all concurrent callers (the result is one 'chunk')."""
+        return list(self.stream(key, lambda: iter([fn()])))[0]  # run to the end so the flight is closed
+
+
+class Coalescer:
+    """
+    In-process single-flight, optionally extended across workers with Redis.
+
+    Only complete results are shared between workers (followers there get
+    the text in one piece); callers in the leader's own process stream it.
+    """
+
+    def __init__(self, redis_client=None, lock_ttl=60.0, wait_timeout=30.0):
+        """
+        Args:
+            redis_client: Redis connection for cross-worker coalescing (None = this process only)
+            lock_ttl: Seconds until an abandoned leader lock expires
+            wait_timeout: Seconds a follower in another worker waits before computing itself
+        """
+        self.client = redis_client
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.local = SingleFlight()
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self.shared_remote = 0
+
+    def stream(self, key, start):
+        """Chunks of start() for key, shared with concurrent callers here and in other workers."""
+        return self.local.stream(key, lambda: self._remote_stream(key, start))
+
+    def do(self, key, fn):
+        """fn() for key, computed once for all concurrent callers in this process."""
+        return self.local.do(key, fn)
+
+    def _remote_stream(self, key, start):
+        if self.client is None:
+            yield from start()
+            return
+        try:
+            result = self.client.get(RESULT_PREFIX + key)
+            leader = result is None and self.client.set(
+                LOCK_PREFIX + key, self._owner, nx=True, px=int(self.lock_ttl * 1000)
+            )
+        except Exception as e:
+            print(f"Warning: Redis coalescing unavailable: {e}")
+            yield from start()
+            return
+
+        if result is None and not leader:
+            result = self._wait_for_result(key)
+        if result is not None:
+            with self._lock:
+                self.shared_remote += 1
+            yield result.decode("utf-8") if isinstance(result, bytes) else result
+            return
+
+        parts = []
+        try:
+            for chunk in start():
+                parts.append(chunk)
+                yield chunk
+            if leader:
+                self.client.set(RESULT_PREFIX + key, "".join(parts).encode("utf-8"), ex=RESULT_TTL)
+        finally:
+            if leader:
+                self._release(key)
+
+    def _wait_for_result(self, key):
+        """The leader's result, or None when it failed, vanished or took too long."""
+        deadline = time.time() + self.wait_timeout
+        while time.time() < deadline:
+            result = self.client.get(RESULT_PREFIX + key)
+            if result is not None:
+                return result
+            if not self.client.exists(LOCK_PREFIX + key):
+                return self.client.get(RESULT_PREFIX + key)  # finished between the two reads, or failed
+            time.sleep(POLL_SECONDS)
+        return None
+
+    def _release(self, key):
+        try:
+            owner = self.client.get(LOCK_PREFIX + key)
+            if owner is not None and (owner.decode() if isinstance(owner, bytes) else owner) == self._owner:
+                self.client.delete(LOCK_PREFIX + key)
+        except Exception as e:
+            print(f"Warning: Could not release coalescing lock: {e}")
+
+    def stats(self):
+        """Leaders (computations done) and shared calls (computations saved)."""
+        shared_local = self.local.shared
+        with self._lock:
+            shared_remote = self.shared_remote
+        return {
+            "leaders": self.local.leaders,
+            "shared_local": shared_local,
+            "shared_remote": shared_remote,
+            "saved": shared_local + shared_remote,
+        }
+
+
+def coalescer_from_settings(redis_client=None):
+    """
+    Create the coalescer configured in settings.yaml (generation.coalesce:
+    local | redis | none, or the COALESCE environment variable).
+
+    Args:
+        redis_client: Redis connection used for "redis" (without one the
+                      coalescer stays process-local)
+
+    Returns:
+        Coalescer, or None for "none"
+    """
+    mode = str(get_setting("generation", "coalesce", "redis", env="COALESCE") or "none").lower()
+    if mode == "none":
+        return None
+    timeout = llm_timeouts()[0]
+    return Coalescer(redis_client if mode == "redis" else None, lock_ttl=timeout + 5, wait_timeout=timeout)
@@ -0,0 +1,149 @@
+"""
+Shared, memory-mapped catalog storage.
+
+Two pieces of the catalog can be opened as read-only memory maps so that
+every worker process on a host shares the same page-cache pages instead of
+holding a private copy:
+
+    FAISS index      - read with IO_FLAG_MMAP_IFC (flat codes, HNSW storage
+                       and IVF inverted lists are mapped, not copied)
+    embedding store  - models/embeddings.npy (float16 or float32, one row
+                       per artwork, sorted by artwork_id) + models/embedding_ids.npy
+
+The loading mode is `index.load_mode` in settings.yaml (INDEX_LOAD_MODE):
+"memory" reads private copies, "mmap" maps the files.
+"""
+
+import os
+
+import faiss
+import numpy as np
+
+from artguide.config import get_setting
+
+LOAD_MODES = ("memory", "mmap")
+DEFAULT_LOAD_MODE = "memory"
+DEFAULT_EMBEDDING_DTYPE = "float16"
+EMBEDDINGS_FILE = "embeddings.npy"
+EMBEDDING_IDS_FILE = "embedding_ids.npy"
+
+
+def load_mode():
+    """Catalog loading mode from settings.yaml / INDEX_LOAD_MODE ("memory" or "mmap")."""
+    mode = get_setting("index", "load_mode", DEFAULT_LOAD_MODE, env="INDEX_LOAD_MODE")
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown index load mode '{mode}', expected one of {LOAD_MODES}")
+    return mode
+
+
+def embedding_dtype():
+    """Storage dtype of the embedding store (index.embedding_dtype: float16 or float32)."""
+    return np.dtype(get_setting("index", "embedding_dtype", DEFAULT_EMBEDDING_DTYPE))
+
+
+def read_index(path, mmap=None):
+    """
+    Read a FAISS index, memory-mapped if requested.
+
+    Args:
+        path: Index file
+        mmap: Map the file instead of copying it (default: load_mode() == "mmap")
+
+    Returns:
+        faiss.Index (read-only when memory-mapped)
+    """
+    if mmap is None:
+        mmap = load_mode() == "mmap"
+    if not mmap:
+        return faiss.read_index(path)
+    # MMAP_IFC maps flat codes, HNSW storage and IVF inverted lists in place
+    return faiss.read_index(path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+
+
+def store_paths(directory):
+    """(embeddings, ids) file paths of the store in `directory`."""
+    return os.path.join(directory, EMBEDDINGS_FILE), os.path.join(directory, EMBEDDING_IDS_FILE)
+
+
+class EmbeddingStore:
+    """
+    Catalog embeddings addressed by artwork_id.
+
+    Example:
+        >>> store = EmbeddingStore.open("models")          # memory-mapped
+        >>> store.get([3, 17]).shape
+        (2, 512)
+    """
+
+    def __init__(self, ids, vectors):
+        """
+        Args:
+            ids: int64 artwork IDs, sorted ascending
+            vectors: (len(ids), dimension) float16/float32 array or memmap
+        """
+        self.ids = ids
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def nbytes(self):
+        return self.vectors.nbytes + self.ids.nbytes
+
+    @classmethod
+    def open(cls, directory, mmap=True):
+        """
+        Open the store in `directory`.
+
+        Returns:
+            EmbeddingStore, or None if the directory has no store
+        """
+        vectors_path, ids_path = store_paths(directory)
+        if not (os.path.exists(vectors_path) and os.path.exists(ids_path)):
+            return None
+        mmap_mode = "r" if mmap else None
+        return cls(np.load(ids_path, mmap_mode=mmap_mode), np.load(vectors_path, mmap_mode=mmap_mode))
+
+    def positions(self, ids):
+        """
+        Row positions of artwork IDs.
+
+        Raises:
+            KeyError: If an ID is not in the store
+        """
+        ids = np.asarray(ids, dtype="int64")
+        rows = np.searchsorted(self.ids, ids)
+        rows = np.minimum(rows, len(self.ids) - 1)
+        if len(self.ids) == 0 or not np.array_equal(self.ids[rows], ids):
+            raise KeyError(f"Artwork IDs not in embedding store: {sorted(set(ids.tolist()) - set(self.ids[rows].tolist()))}")
+        return rows
+
+    def get(self, ids):
+        """float32 embeddings of the given artwork IDs, in the given order."""
+        return np.asarray(self.vectors[self.positions(ids)], dtype="float32")
+
+
+def save_embedding_store(directory, ids, vectors, dtype=None):
+    """
+    Write the embedding store (rows sorted by ID), replacing files atomically.
+
+    Args:
+        directory: Output directory (normally next to faiss.index)
+        ids: Artwork IDs
+        vectors: float32 embeddings, one row per ID
+        dtype: Storage dtype (default: embedding_dtype())
+
+    Returns:
+        int: Bytes written for the embedding matrix
+    """
+    ids = np.asarray(ids, dtype="int64")
+    order = np.argsort(ids, kind="stable")
+    vectors = np.ascontiguousarray(np.asarray(vectors)[order], dtype=dtype or embedding_dtype())
+    vectors_path, ids_path = store_paths(directory)
+    os.makedirs(directory or ".", exist_ok=True)
+    for path, array in ((ids_path, ids[order]), (vectors_path, vectors)):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, array)
+        os.replace(tmp_path, path)
+    return vectors.nbytes
@@ -0,0 +1,114 @@
+"""
+Streaming description generation.
+
+A 300-400 word Gemini answer takes seconds to complete, but its first
+words arrive much earlier. `description_stream` yields the description
+chunk by chunk - pre-generated and cached descriptions as one chunk right
+away, LLM answers as they are produced - so the UI can show text as soon
+as it exists. Time-to-first-token (TTFT) is the latency users perceive
+and is measured with StreamTimer.
+
+Example:
+    >>> timer = StreamTimer()
+    >>> for chunk in timer.wrap(description_stream(artist, title, period, client, cache, store, placeholder)):
+    ...     show(chunk)
+    >>> timer.ttft
+    0.41
+"""
+
+import time
+
+from artguide.description_cache import description_key, description_prompt
+from artguide.llm import LLMClient, stream_llm
+
+
+def cached_stream(cache, key, chunks):
+    """Pass chunks through and store the complete text once the stream has ended."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    if parts and cache is not None:
+        cache.put(key, "".join(parts))
+
+
+def description_stream(artist, title, period, client, cache, store, placeholder, flights=None):
+    """
+    Yield the description of an artwork in chunks.
+
+    Lookup order: pre-generated descriptions (store), then - when an LLM
+    client is configured - the description cache and a streamed LLM
+    answer, which is cached once complete. Without a client, when the LLM
+    answer is empty, or when the LLM fails before its first chunk (including an open circuit breaker or
+    a missed deadline), the placeholder is yielded. A failure
+    mid-answer ends the stream with the text received so far.
+
+    With `flights`, concurrent calls for the same artwork share one LLM
+    answer (and one cache write) instead of each making their own.
+
+    Args:
+        artist, title, period: Validated artwork metadata
+        client: LLMClient (deadlines, concurrency limit, circuit breaker),
+                a raw Gemini client / MockGeminiClient, or None
+        cache: DescriptionCache or None
+        store: DescriptionStore or None
+        placeholder: Fallback text
+        flights: Coalescer (artguide/singleflight.py) or None
+
+    Yields:
+        str: Description chunks (concatenate for the full text)
+    """
+    prompt = description_prompt(artist, title, period)
+    key = description_key(artist, title, period, prompt)
+    text = store.get(key) if store is not None else None
+    if text is None and client is not None and cache is not None:
+        text = cache.get(key)
+    if text is not None:
+        yield text
+        return
+
+    if client is not None:
+        started = False
+        try:
+            def generate():
+                chunks = client.stream(prompt) if isinstance(client, LLMClient) else stream_llm(client, prompt)
+                return cached_stream(cache, key, chunks)
+
+            chunks = flights.stream(f"description:{key}", generate) if flights is not None else generate()
+            for chunk in chunks:
+                started = True
+                yield chunk
+            if started:
+                return
+            print("Warning: Gemini returned an empty description. Using placeholder.")
+        except Exception as e:
+            print(f"Warning: Gemini API call failed: {e}. "
+                  f"{'Description truncated.' if started else 'Using placeholder.'}")
+            if started:
+                return
+    yield placeholder
+
+
+class StreamTimer:
+    """
+    Time-to-first-chunk and total duration of a stream.
+
+    Attributes:
+        start: Reference time (e.g. when the request arrived)
+        ttft: Seconds from start to the first text chunk (None before it arrived;
+              None markers, e.g. the latency budget's placeholder signal, do not count)
+        total: Seconds from start to the end of the stream (None while running)
+    """
+
+    def __init__(self, start=None):
+        self.start = time.time() if start is None else start
+        self.ttft = None
+        self.total = None
+
+    def wrap(self, chunks):
+        """Yield chunks unchanged, recording when the first one and the end arrive."""
+        for chunk in chunks:
+            if self.ttft is None and chunk is not None:
+                self.ttft = time.time() - self.start
+            yield chunk
+        self.total = time.time() - self.start
@@ -0,0 +1,233 @@
+"""
+Host-aware thread and batch-size tuning.
+
+scripts/autotune.py benchmarks CLIP embedding on the current host across
+intra-op threads, inter-op threads and batch sizes and writes a runtime
+profile (JSON). app.py and distributed/ai_server.py call apply_profile()
+at startup to configure PyTorch from that profile.
+
+When several workers share a host, set WORKERS_PER_HOST so each worker
+only uses its share of the cores (cpu_count // WORKERS_PER_HOST).
+"""
+
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+import torch
+
+from artguide.config import get_setting
+
+DEFAULT_PROFILE_PATH = "models/runtime_profile.json"
+
+
+def profile_path():
+    """Location of the runtime profile (settings.yaml runtime.profile_path / RUNTIME_PROFILE)."""
+    return get_setting("runtime", "profile_path", DEFAULT_PROFILE_PATH, env="RUNTIME_PROFILE")
+
+
+def workers_per_host():
+    """Number of inference workers sharing this host (WORKERS_PER_HOST, default 1)."""
+    return max(1, int(get_setting("runtime", "workers_per_host", 1, env="WORKERS_PER_HOST")))
+
+
+def host_info():
+    """Describe the current host for the profile header."""
+    return {
+        "hostname": platform.node(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count() or 1,
+        "torch_version": torch.__version__,
+    }
+
+
+def memory_usage():
+    """
+    Memory of the current process in MB.
+
+    On Linux this reads /proc/self/smaps_rollup: `pss` charges shared pages
+    (e.g. a memory-mapped index used by several workers) proportionally to
+    each process, `private` is memory no other process shares.
+
+    Returns:
+        dict with rss, pss, shared and private (MB); only rss elsewhere
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {line.split(":")[0]: int(line.split()[1]) for line in f if line.endswith("kB\n")}
+        return {
+            "rss": round(fields["Rss"] / 1024, 1),
+            "pss": round(fields["Pss"] / 1024, 1),
+            "shared": round((fields["Shared_Clean"] + fields["Shared_Dirty"]) / 1024, 1),
+            "private": round((fields["Private_Clean"] + fields["Private_Dirty"]) / 1024, 1),
+        }
+    except (OSError, KeyError, ValueError):
+        import resource
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if platform.system() == "Darwin":
+            rss_kb //= 1024  # bytes on macOS
+        return {"rss": round(rss_kb / 1024, 1)}
+
+
+def default_thread_counts(cpu_count=None):
+    """Powers of two up to the core count, plus the core count itself."""
+    cpu_count = cpu_count or os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < cpu_count:
+        counts.append(n)
+        n *= 2
+    counts.append(cpu_count)
+    return counts
+
+
+def benchmark_config(embed_fn, images, batch_size, repeats=5, warmup=1):
+    """
+    Time embed_fn on batches of `batch_size` images.
+
+    Args:
+        embed_fn: Callable taking a list of PIL images
+        images: Pool of sample images (repeated if fewer than batch_size)
+        batch_size: Images per call
+        repeats: Timed calls
+        warmup: Untimed calls before measuring
+
+    Returns:
+        dict with latency_ms (per call) and images_per_sec
+    """
+    batch = [images[i % len(images)] for i in range(batch_size)]
+    for _ in range(warmup):
+        embed_fn(batch)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        embed_fn(batch)
+    elapsed = time.perf_counter() - start
+    return {
+        "latency_ms": round(elapsed / repeats * 1000, 2),
+        "images_per_sec": round(batch_size * repeats / elapsed, 2),
+    }
+
+
+def select_best(results, max_threads=None):
+    """
+    Pick the best configurations from benchmark results.
+
+    Args:
+        results: List of result dicts (intra_op_threads, inter_op_threads,
+                 batch_size, latency_ms, images_per_sec)
+        max_threads: Only consider configurations using at most this many
+                     intra-op threads
+
+    Returns:
+        dict: {"throughput": highest images/sec, "latency": lowest batch-of-one latency}
+              (values are result dicts or None)
+    """
+    candidates = [r for r in results if max_threads is None or r["intra_op_threads"] <= max_threads]
+    if not candidates:
+        return {"throughput": None, "latency": None}
+    single = [r for r in candidates if r["batch_size"] == 1] or candidates
+    return {
+        "throughput": max(candidates, key=lambda r: r["images_per_sec"]),
+        "latency": min(single, key=lambda r: r["latency_ms"]),
+    }
+
+
+def build_profile(results, backend):
+    """Assemble the profile written by the autotune command."""
+    best = select_best(results)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "host": host_info(),
+        "backend": backend,
+        "best_throughput": best["throughput"],
+        "best_latency": best["latency"],
+        "results": results,
+    }
+
+
+def save_profile(profile, path=None):
+    """Write a profile to JSON."""
+    path = path or profile_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+    return path
+
+
+def load_profile(path=None):
+    """Read a profile, or return None if there is none."""
+    path = path or profile_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read runtime profile {path}: {e}")
+        return None
+
+
+def resolve_settings(profile, mode="latency", workers=1, cpu_count=None):
+    """
+    Decide thread and batch settings for this process.
+
+    Args:
+        profile: Loaded profile or None
+        mode: "latency" (interactive, batch of one) or "throughput" (batched workers)
+        workers: Workers sharing the host; each gets cpu_count // workers cores
+        cpu_count: Host core count (default: os.cpu_count())
+
+    Returns:
+        dict with intra_op_threads, inter_op_threads, batch_size and source
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    budget = max(1, cpu_count // max(1, workers))
+
+    chosen = None
+    if profile and profile.get("host", {}).get("cpu_count") == cpu_count:
+        chosen = select_best(profile.get("results", []), max_threads=budget)[mode]
+    elif profile:
+        print("Warning: Runtime profile was recorded on a different host; using core-count defaults.")
+
+    if chosen is None:
+        return {
+            "intra_op_threads": budget,
+            "inter_op_threads": 1,
+            "batch_size": 1 if mode == "latency" else 8,
+            "source": "default",
+        }
+    return {
+        "intra_op_threads": chosen["intra_op_threads"],
+        "inter_op_threads": chosen["inter_op_threads"],
+        "batch_size": chosen["batch_size"],
+        "source": "profile",
+    }
+
+
+def apply_profile(mode="latency", path=None, workers=None):
+    """
+    Configure PyTorch threading from the runtime profile.
+
+    Must be called before the first model forward pass (PyTorch only
+    allows setting inter-op threads once, before parallel work starts).
+
+    Args:
+        mode: "latency" or "throughput" (see resolve_settings)
+        path: Profile path (default: profile_path())
+        workers: Workers sharing the host (default: workers_per_host())
+
+    Returns:
+        dict: The applied settings
+    """
+    workers = workers or workers_per_host()
+    settings = resolve_settings(load_profile(path), mode=mode, workers=workers)
+
+    torch.set_num_threads(settings["intra_op_threads"])
+    try:
+        torch.set_num_interop_threads(settings["inter_op_threads"])
+    except RuntimeError:
+        # Inter-op pool already started in this process; keep its size
+        settings["inter_op_threads"] = torch.get_num_interop_threads()
+    return settings
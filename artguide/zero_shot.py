@@ -0,0 +1,225 @@
+"""
+Zero-shot artist / period classification with CLIP's text tower.
+
+One text prompt per artist and per period in the catalog is encoded once
+and stored as a single L2-normalized matrix (one row per prompt). Classifying
+a query is then a single matrix multiply against the image embedding that
+the search already computed.
+
+The matrix is cached on disk next to models/faiss.index
+(models/text_embeddings.npz) together with the labels and prompts it was
+built from, so serving processes do not re-run the text encoder.
+"""
+
+import os
+
+import numpy as np
+import torch
+
+from artguide.config import get_setting
+from artguide.embedding import CLIP_MODEL_NAME, normalize_embeddings
+
+DEFAULT_TEXT_EMBEDDINGS_PATH = "models/text_embeddings.npz"
+ARTIST_PROMPT = "a painting by {}"
+PERIOD_PROMPT = "a painting in the style of {}"
+KINDS = ("artist", "period")
+
+
+def text_embeddings_path():
+    """Location of the cached text matrix (settings.yaml index.text_embeddings_path)."""
+    return get_setting("index", "text_embeddings_path", DEFAULT_TEXT_EMBEDDINGS_PATH,
+                       env="TEXT_EMBEDDINGS_PATH")
+
+
+def build_prompts(metadata):
+    """
+    Create one prompt per distinct artist and period in the catalog.
+
+    Args:
+        metadata: Catalog DataFrame with 'artist' and 'period' columns
+
+    Returns:
+        tuple: (kinds, labels, prompts) - parallel lists
+    """
+    kinds, labels, prompts = [], [], []
+    templates = {"artist": ARTIST_PROMPT, "period": PERIOD_PROMPT}
+    for kind in KINDS:
+        if kind not in metadata.columns:
+            continue
+        for label in sorted(metadata[kind].dropna().unique()):
+            kinds.append(kind)
+            labels.append(str(label))
+            prompts.append(templates[kind].format(label))
+    return kinds, labels, prompts
+
+
+def encode_text(prompts, model, processor, device):
+    """
+    Encode prompts with the CLIP text tower.
+
+    Returns:
+        L2-normalized float32 array of shape (len(prompts), 512)
+    """
+    inputs = processor(text=prompts, return_tensors="pt", padding=True)
+    inputs = {k: v.to(device) for k, v in inputs.items() if k in ("input_ids", "attention_mask")}
+    with torch.no_grad():
+        features = model.get_text_features(**inputs)
+    if not isinstance(features, torch.Tensor):
+        features = features.pooler_output
+    return normalize_embeddings(features.cpu().numpy())
+
+
+class ZeroShotClassifier:
+    """
+    Classify image embeddings against a precomputed text-embedding matrix.
+
+    Example:
+        >>> classifier = ZeroShotClassifier.load_or_build(metadata, model, processor, device)
+        >>> classifier.classify(embedding)
+        {'artist': {'label': 'Claude Monet', 'score': 0.91}, 'period': {...}}
+    """
+
+    def __init__(self, matrix, kinds, labels, prompts, logit_scale=100.0, model_name=CLIP_MODEL_NAME):
+        """
+        Args:
+            matrix: float32 array (n_prompts, dim), rows L2-normalized
+            kinds: "artist" / "period" per row
+            labels: Class label per row
+            prompts: Prompt text per row
+            logit_scale: CLIP temperature applied before the softmax
+            model_name: CLIP model the matrix was encoded with
+        """
+        self.matrix = np.ascontiguousarray(matrix, dtype="float32")
+        self.kinds = np.asarray(kinds)
+        self.labels = np.asarray(labels)
+        self.prompts = list(prompts)
+        self.logit_scale = float(logit_scale)
+        self.model_name = model_name
+        self._rows = {kind: np.flatnonzero(self.kinds == kind) for kind in KINDS}
+
+    @classmethod
+    def build(cls, metadata, model, processor, device, model_name=CLIP_MODEL_NAME):
+        """Encode prompts for every artist and period in metadata."""
+        kinds, labels, prompts = build_prompts(metadata)
+        matrix = encode_text(prompts, model, processor, device)
+        logit_scale = float(model.logit_scale.exp().item()) if hasattr(model, "logit_scale") else 100.0
+        return cls(matrix, kinds, labels, prompts, logit_scale, model_name)
+
+    def save(self, path):
+        """Write the matrix and its labels to an .npz file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            matrix=self.matrix,
+            kinds=self.kinds,
+            labels=self.labels,
+            prompts=np.asarray(self.prompts),
+            logit_scale=np.float32(self.logit_scale),
+            model_name=np.asarray(self.model_name),
+        )
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Read a matrix written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["matrix"], data["kinds"].tolist(), data["labels"].tolist(),
+                data["prompts"].tolist(), float(data["logit_scale"]), str(data["model_name"])
+            )
+
+    @classmethod
+    def load_or_build(cls, metadata, model_loader, processor_loader, device,
+                      path=None, model_name=CLIP_MODEL_NAME):
+        """
+        Load the cached matrix if it matches the catalog, otherwise encode and cache it.
+
+        Args:
+            metadata: Catalog DataFrame
+            model_loader: Callable returning the CLIP model (only called on a rebuild)
+            processor_loader: Callable returning the CLIP processor (only called on a rebuild)
+            device: torch device
+            path: .npz cache file (default: text_embeddings_path())
+            model_name: CLIP model identifier
+
+        Returns:
+            ZeroShotClassifier
+        """
+        path = path or text_embeddings_path()
+        _, _, prompts = build_prompts(metadata)
+        if os.path.exists(path):
+            try:
+                cached = cls.load(path)
+                if cached.prompts == prompts and cached.model_name == model_name:
+                    return cached
+                print(f"Text embeddings in {path} are stale, re-encoding...")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: Could not read {path}: {e}. Re-encoding...")
+
+        classifier = cls.build(metadata, model_loader(), processor_loader(), device, model_name)
+        try:
+            classifier.save(path)
+        except OSError as e:
+            print(f"Warning: Could not cache text embeddings to {path}: {e}")
+        return classifier
+
+    def classify(self, embedding):
+        """
+        Zero-shot artist and period prediction for one image embedding.
+
+        Args:
+            embedding: L2-normalized array of shape (512,) or (1, 512)
+
+        Returns:
+            dict: {kind: {"label": str, "score": float}} with softmax probabilities
+                  over the labels of that kind
+        """
+        sims = self.matrix @ np.asarray(embedding, dtype="float32").reshape(-1)
+        prediction = {}
+        for kind, rows in self._rows.items():
+            if len(rows) == 0:
+                continue
+            logits = self.logit_scale * sims[rows]
+            probs = np.exp(logits - logits.max())
+            probs /= probs.sum()
+            best = int(np.argmax(probs))
+            prediction[kind] = {"label": str(self.labels[rows[best]]), "score": float(probs[best])}
+        return prediction
+
+
+def apply_prediction(results, prediction):
+    """
+    The recognized artwork, with the zero-shot artist and period applied.
+
+    The title and image must belong to the predicted artist: when the
+    prediction overrides the top neighbour's artist, they are taken from
+    the best-ranked neighbour by that artist, or cleared (title "Unknown",
+    image_path None) when no neighbour is by that artist.
+
+    Args:
+        results: Top-k result records, best first (non-empty)
+        prediction: ZeroShotClassifier.classify output, or None
+
+    Returns:
+        dict: Copy of the chosen record with 'artist' / 'period' from the
+              prediction (the top record itself when there is no prediction)
+    """
+    top1 = results[0]
+    if not prediction:
+        return dict(top1)
+    artist = prediction.get("artist", {}).get("label", top1["artist"])
+    record = next((r for r in results if r["artist"] == artist), None)
+    if record is None:
+        # Keep the top neighbour's distance (the confidence that the photo is in the catalog)
+        record = {**top1, "title": "Unknown", "image_path": None}
+    record = {**record, "artist": artist}
+    record["period"] = prediction.get("period", {}).get("label", record.get("period", "Unknown"))
+    return record
+
+
+def zero_shot_enabled():
+    """Whether artist/period come from zero-shot classification (retrieval.zero_shot)."""
+    value = get_setting("retrieval", "zero_shot", False, env="ZERO_SHOT")
+    return str(value).lower() in ("1", "true", "yes")
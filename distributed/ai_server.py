@@ -4,6 +4,9 @@ import json
 import time
 import base64
 import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -12,10 +15,32 @@ import redis
 import numpy as np
 import pandas as pd
 import torch
-import faiss
 from PIL import Image
 from transformers import CLIPProcessor, CLIPModel
 
+# Add parent directory to path for shared modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.backends import backend_from_settings
+from artguide.budget import PENDING_DESCRIPTION_PREFIX, latency_budget_from_settings
+from artguide.coarse import load_two_stage, search_mode, vector_source
+from artguide.description_cache import description_cache_from_settings
+from artguide.description_store import DescriptionStore, descriptions_path
+from artguide.embedding_cache import cache_from_settings, image_digest
+from artguide.filtering import parse_filters, search_records
+from artguide.llm import llm_from_settings, llm_timeouts
+from artguide.metadata_store import MetadataStore
+from artguide.mock_llm import llm_provider, mock_client_from_env
+from artguide.sharding import shard_count, shard_timeout_ms
+from artguide.singleflight import coalescer_from_settings
+from artguide.streaming import description_stream
+from artguide.reload import CONTROL_CHANNEL, CatalogSnapshot, IndexWatcher, catalog_version, load_snapshot
+from artguide.preprocess import FastClipPreprocessor, draft_for_size, preprocessor_from_settings, preprocessor_name
+from artguide.store import load_mode
+from artguide.tuning import apply_profile, memory_usage
+from artguide.zero_shot import ZeroShotClassifier, apply_prediction, zero_shot_enabled
+from shard_router import ShardRouter
+
 # LLM Integration (Gemini API)
 try:
     from google import genai
@@ -28,6 +53,20 @@ REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 REQUEST_QUEUE = "artguide:requests"
 RESPONSE_PREFIX = "artguide:response:"
+STREAM_PREFIX = "artguide:stream:"  # per-request event list read by the interface server's SSE endpoint
+DESCRIPTION_TTL = 300
+BATCH_METRICS_KEY = "artguide:metrics:batch_sizes"
+CACHE_METRICS_KEY = "artguide:metrics:embedding_cache"
+DESCRIPTION_METRICS_KEY = "artguide:metrics:description_cache"
+LLM_METRICS_KEY = "artguide:metrics:llm"
+COALESCING_METRICS_KEY = "artguide:metrics:coalescing"
+BUDGET_METRICS_KEY = "artguide:metrics:description_budget"
+# Thread settings and batch size from the host's runtime profile (scripts/autotune.py)
+runtime_settings = apply_profile(mode="throughput")
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', runtime_settings['batch_size']))
+BATCH_MAX_WAIT_MS = float(os.getenv('BATCH_MAX_WAIT_MS', 5))
+DESCRIPTION_WORKERS = int(os.getenv('DESCRIPTION_WORKERS', 16))
+METRICS_INTERVAL = float(os.getenv('METRICS_INTERVAL', 10))  # seconds between cache/LLM metrics snapshots
 INDEX_PATH = os.getenv('INDEX_PATH', 'models/faiss.index')
 META_PATH = os.getenv('META_PATH', 'models/metadata.parquet')
 
@@ -41,24 +80,97 @@ clip_model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(device
 clip_processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
 print(f"CLIP model loaded on {device}")
 
-# Load FAISS index and metadata
+# Image preprocessing (fast draft-mode path or CLIPProcessor, see settings.yaml)
+preprocess = preprocessor_from_settings(clip_processor)
+
+# Embedding backend (pytorch / torch_int8 / onnx_fp32 / onnx_int8, see settings.yaml)
+embedding_backend = backend_from_settings(clip_model, device)
+print(f"Embedding backend: {embedding_backend.name}")
+
+# Content-addressed embedding cache (memory LRU + optional disk tier)
+embedding_cache = cache_from_settings(f"{embedding_backend.name}-{preprocessor_name()}")
+
+# Gemini descriptions per artwork + prompt, shared with the other workers and app.py
+description_cache = description_cache_from_settings(redis_client)
+print(f"Description cache: {description_cache.name}")
+print(f"Threads: intra-op {runtime_settings['intra_op_threads']}, "
+      f"inter-op {runtime_settings['inter_op_threads']} ({runtime_settings['source']})")
+
+
+def load_catalog():
+    """Load the published catalog and its zero-shot classifier (runs in the reload thread)."""
+    snapshot = load_snapshot(INDEX_PATH, META_PATH)
+    if search_mode() == "two_stage":
+        snapshot.two_stage = load_two_stage(
+            snapshot.metadata_store, vector_source(snapshot.index, snapshot.embedding_store)
+        )
+    if zero_shot_enabled() and len(snapshot.metadata_store) > 0:
+        snapshot.zero_shot = ZeroShotClassifier.load_or_build(
+            snapshot.metadata_store.to_frame(), lambda: clip_model, lambda: clip_processor, device
+        )
+    return snapshot
+
+
+def apply_snapshot(snapshot):
+    """Swap in a loaded catalog. Called between requests, so each request sees one version."""
+    global index, metadata_store, embedding_store, zero_shot, two_stage, flat_searcher, partitions, index_version
+    index, metadata_store, embedding_store = snapshot.index, snapshot.metadata_store, snapshot.embedding_store
+    flat_searcher, partitions = snapshot.searcher, snapshot.partitions
+    zero_shot, two_stage, index_version = snapshot.zero_shot, snapshot.two_stage, snapshot.version
+
+
+def searcher():
+    """Index used for local search: the two-stage centroid index if loaded, else FAISS (re-ranked if compressed)."""
+    return two_stage if two_stage is not None else flat_searcher
+
+
+# Load FAISS index, metadata (columnar store, no pandas on the request path),
+# catalog embeddings (memory-mapped and shared between workers with
+# index.load_mode: mmap) and the zero-shot classifier
 if os.path.exists(INDEX_PATH) and os.path.exists(META_PATH):
-    print(f"Loading FAISS index from {INDEX_PATH}...")
-    index = faiss.read_index(INDEX_PATH)
-    metadata = pd.read_parquet(META_PATH)
-    print(f"Loaded {len(metadata)} artworks from index")
+    print(f"Loading FAISS index from {INDEX_PATH} ({load_mode()})...")
+    catalog = load_catalog()
+    apply_snapshot(catalog)
+    print(f"Loaded {len(metadata_store)} artworks from index (catalog version {index_version})")
+    if catalog.search_params:
+        print(f"Search parameters: {catalog.search_params}")
+    if embedding_store is not None:
+        print(f"Embedding store: {len(embedding_store)} x {embedding_store.vectors.dtype}")
+    if flat_searcher is not index:
+        print(f"Compressed index: re-ranking {flat_searcher.factor}x candidates against the embedding store")
+    if zero_shot is not None:
+        print(f"Zero-shot classification over {len(zero_shot.labels)} prompts")
+    if two_stage is not None:
+        print(f"Two-stage search: {len(two_stage.labels)} '{two_stage.group_column}' centroids, "
+              f"{two_stage.n_groups} groups searched per query")
 else:
     print("Warning: FAISS index or metadata not found. Running without index.")
-    index = None
-    metadata = pd.DataFrame(columns=["artist", "title", "period", "image_path"])
+    apply_snapshot(CatalogSnapshot(
+        None, MetadataStore.from_frame(pd.DataFrame(columns=["artist", "title", "period", "image_path"]))
+    ))
+
+# Sharded catalog: search fans out to shard servers instead of the local index
+shard_router = None
+if shard_count() > 0:
+    shard_router = ShardRouter(redis_client, shard_count(), shard_timeout_ms())
+    print(f"Scatter-gather search over {shard_router.n_shards} shards "
+          f"(timeout {shard_router.timeout_ms:g} ms)")
+
+# Descriptions pre-generated for the catalog (scripts/pregenerate_descriptions.py)
+descriptions = DescriptionStore(descriptions_path(META_PATH))
+print(f"Pre-generated descriptions: {len(descriptions)}")
 
 # Initialize Gemini API client (if API key available)
 gemini_client = None
-if GEMINI_AVAILABLE:
+if llm_provider() == "mock":
+    gemini_client = mock_client_from_env()
+    print("Using the local mock LLM (generation.provider: mock)")
+elif GEMINI_AVAILABLE:
     api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
     if api_key:
         try:
-            gemini_client = genai.Client(api_key=api_key)
+            # HTTP timeout (ms) as a backstop for the LLMClient deadline
+            gemini_client = genai.Client(api_key=api_key, http_options={"timeout": int(llm_timeouts()[0] * 1000)})
             print("✓ Gemini API client initialized successfully")
         except Exception as e:
             print(f"Warning: Failed to initialize Gemini client: {e}")
@@ -66,6 +178,30 @@ if GEMINI_AVAILABLE:
     else:
         print("Info: GOOGLE_API_KEY not set. Using placeholder descriptions.")
 
+# LLM calls share the client (one connection pool) with per-call deadlines,
+# bounded concurrency and a circuit breaker that falls back to the placeholder
+llm = llm_from_settings(gemini_client)
+if llm is not None:
+    print(f"LLM: {llm.max_concurrency} concurrent calls, deadlines {llm.first_chunk_timeout:g}s "
+          f"(first chunk) / {llm.timeout:g}s")
+
+# Identical descriptions in flight are generated once: by one thread of this
+# worker and, through a Redis lock + result key, of all workers
+flights = coalescer_from_settings(redis_client)
+if flights is not None:
+    print(f"Coalescing identical descriptions: {'across workers (Redis)' if flights.client is not None else 'in-process'}")
+
+# Responses wait for the description at most this long; slower descriptions
+# finish in the background and are published under artguide:pending_description:<id>
+latency_budget = latency_budget_from_settings(max_workers=DESCRIPTION_WORKERS)
+if latency_budget is not None:
+    print(f"Description latency budget: {latency_budget.seconds:g}s (placeholder + background completion)")
+
+# Descriptions are written on these threads while the main loop embeds and
+# searches the next requests; the slots cap the requests waiting for one
+description_pool = ThreadPoolExecutor(max_workers=DESCRIPTION_WORKERS, thread_name_prefix="describe")
+description_slots = threading.BoundedSemaphore(2 * DESCRIPTION_WORKERS)
+
 
 def embed_image(img: Image.Image) -> np.ndarray:
     """
@@ -85,42 +221,107 @@ def embed_image(img: Image.Image) -> np.ndarray:
     if not isinstance(img, Image.Image):
         raise ValueError(f"Expected PIL.Image.Image, got {type(img)}")
     
-    inputs = clip_processor(images=img, return_tensors="pt").to(device)
-    with torch.no_grad():
-        emb = clip_model.get_image_features(**inputs)
-    emb = emb.cpu().numpy().astype("float32")
-    emb /= np.linalg.norm(emb)  # L2 normalization
-    return emb
+    return embed_images([img])
 
 
-def search_index(img: Image.Image, k: int = 5):
+def embed_images(images, keys=None):
+    """
+    Generate normalized CLIP embeddings for a batch of images.
+    
+    Images already in the embedding cache are not recomputed; all misses
+    are embedded together in one forward pass.
+    
+    Args:
+        images: List of RGB PIL Images
+        keys: Optional content hashes of the images (e.g. of the uploaded
+              bytes); computed from the pixels if omitted
+        
+    Returns:
+        Array of shape (len(images), 512), each row L2-normalized
+    """
+    if keys is None:
+        keys = [image_digest(img) for img in images]
+    
+    embeddings = [embedding_cache.get(key) for key in keys]
+    misses = [i for i, emb in enumerate(embeddings) if emb is None]
+    if misses:
+        computed = embedding_backend.embed(preprocess([images[i] for i in misses]))
+        for row, i in enumerate(misses):
+            embeddings[i] = computed[row:row + 1].copy()
+            embedding_cache.put(keys[i], embeddings[i])
+    
+    return np.concatenate(embeddings)
+
+
+def search_index(img: Image.Image, k: int = 5, filters=None):
     """
     Search vector database for similar artworks.
     
     Args:
         img: PIL Image
         k: Number of top results to return
+        filters: Optional metadata predicates ({"location": "Room 2"}, ...)
         
     Returns:
-        tuple: (results DataFrame, embedding)
+        tuple: (list of result records with a 'distance' key, embedding)
         
     Raises:
-        ValueError: If k is invalid
+        ValueError: If k or the filters are invalid
     """
     if img is None:
         return None, None
     if not isinstance(k, int) or k <= 0:
         raise ValueError(f"k must be a positive integer, got {k}")
-    if index is None or len(metadata) == 0:
+    filters = parse_filters(filters)
+    if index is None or len(metadata_store) == 0:
         return None, None
 
     emb = embed_image(img)
-    D, I = index.search(emb, k)
+    return search_records(searcher(), metadata_store, emb, k, [filters], partitions)[0], emb
+
+
+def search_images(images, k: int = 5, keys=None, filters=None):
+    """
+    Embed a batch of images and search the index with one multi-row query.
     
-    results = metadata.iloc[I[0]].copy()
-    results["distance"] = D[0]
+    Args:
+        images: List of RGB PIL Images
+        k: Number of top results per image
+        keys: Optional content hashes of the images (embedding cache keys)
+        filters: Optional per-image parsed metadata filters (see
+                 artguide/filtering.py); images with equal filters share
+                 one search call
+        
+    With sharding enabled the embeddings are sent to every shard server and
+    the global top-k is merged from the shards that answer in time.
     
-    return results, emb
+    Returns:
+        tuple: (results, predictions, shard_status) - per image, a list of
+               result records (with a 'distance' key) and the zero-shot
+               prediction (None when zero-shot is off), plus the fan-out
+               status (None without sharding); (None, None, None) if no
+               index is loaded
+        
+    Raises:
+        ValueError: If k is invalid
+    """
+    if not isinstance(k, int) or k <= 0:
+        raise ValueError(f"k must be a positive integer, got {k}")
+    if shard_router is None and (index is None or len(metadata_store) == 0):
+        return None, None, None
+    
+    embs = embed_images(images, keys=keys)
+    shard_status = None
+    if shard_router is not None:
+        all_results, shard_status = shard_router.search(embs, k, filters=filters)
+        if shard_status["partial"]:
+            print(f"Warning: Partial results, shards {shard_status['missing']} did not answer "
+                  f"within {shard_router.timeout_ms:g} ms")
+    else:
+        all_results = search_records(searcher(), metadata_store, embs, k, filters, partitions)
+    predictions = [zero_shot.classify(emb) if zero_shot is not None else None for emb in embs]
+    
+    return all_results, predictions, shard_status
 
 
 def generate_description(artist: str, title: str, period: str) -> str:
@@ -135,6 +336,16 @@ def generate_description(artist: str, title: str, period: str) -> str:
     Returns:
         Generated tour-guide style description (150-250 words)
     """
+    return "".join(generate_description_stream(artist, title, period))
+
+
+def generate_description_stream(artist: str, title: str, period: str):
+    """
+    Stream an artwork description in chunks as they arrive (see generate_description).
+    
+    Yields:
+        Description chunks (concatenated they form the description)
+    """
     # Input validation
     if not artist or not isinstance(artist, str):
         artist = "Unknown Artist"
@@ -143,38 +354,16 @@ def generate_description(artist: str, title: str, period: str) -> str:
     if not period or not isinstance(period, str):
         period = "Unknown Period"
     
-    if gemini_client is not None:
-        try:
-            prompt = f"""You are an enthusiastic and knowledgeable art museum tour guide. Generate a comprehensive, engaging description for this artwork.
-
-**Artwork Details:**
-- Artist: {artist}
-- Title: {title}
-- Period/Style: {period}
-
-**Instructions:**
-Create a detailed 300-400 word description structured in the following sections:
+    # Pre-generated / cached descriptions arrive as one chunk, Gemini answers as they stream in
+    yield from description_stream(
+        artist, title, period, llm, description_cache, descriptions, placeholder_description(artist, title, period),
+        flights
+    )
 
-1. **Introduction** (2-3 sentences): Welcome visitors and introduce the artwork with enthusiasm
-2. **Artist Background** (3-4 sentences): Discuss the artist's significance, life, and contribution to art history
-3. **Artistic Analysis** (4-5 sentences): Analyze the techniques, style, colors, composition, and visual elements
-4. **Historical Context** (3-4 sentences): Explain the period, movement, and cultural significance
-5. **Legacy & Impact** (2-3 sentences): Describe the artwork's influence and importance today
 
-Write in a warm, conversational tone that educates and inspires museum visitors. Use vivid language and make art history accessible to everyone."""
-            
-            response = gemini_client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
-            
-            return response.text
-        except Exception as e:
-            print(f"Warning: Gemini API call failed: {e}. Using placeholder.")
-            # Fall through to placeholder
-    
-    # Placeholder fallback
-    description = (
+def placeholder_description(artist: str, title: str, period: str) -> str:
+    """Template description used when no LLM answer is available (or not yet)."""
+    return (
         f"This artwork, titled '{title}', was created by {artist} during the {period} period. "
         f"{artist} is recognized as a significant figure in the {period} movement, "
         f"known for distinctive style and innovative techniques. "
@@ -183,7 +372,190 @@ Write in a warm, conversational tone that educates and inspires museum visitors.
         f"The work reflects the cultural and artistic values of its time and continues to "
         f"influence contemporary art appreciation."
     )
-    return description
+
+
+def store_description(request_id, description=None, error=None):
+    """
+    Publish the state of a description that missed the latency budget to
+    artguide:pending_description:<request_id>: pending until description (or error) is given.
+    """
+    description_key = f"{PENDING_DESCRIPTION_PREFIX}{request_id}"
+    if description is None and error is None:
+        # nx: a description finished right after the budget ran out is not overwritten
+        redis_client.set(description_key, json.dumps({'status': 'pending'}), ex=DESCRIPTION_TTL, nx=True)
+    elif error is not None:
+        redis_client.setex(description_key, DESCRIPTION_TTL, json.dumps({'status': 'error', 'message': str(error)}))
+    else:
+        redis_client.setex(description_key, DESCRIPTION_TTL, json.dumps({'status': 'complete', 'description': description}))
+
+
+def error_response(request_id, message, description):
+    """Build an error response dictionary for a request."""
+    return {
+        'request_id': request_id,
+        'status': 'error',
+        'message': message,
+        'artist': 'Unknown',
+        'title': 'Unknown',
+        'period': 'Unknown',
+        'confidence': 0.0,
+        'description': description,
+        'index_version': index_version
+    }
+
+
+def decode_request(request_data):
+    """
+    Decode and validate the image of a recognition request.
+    
+    Args:
+        request_data: Dictionary with request_id, image (base64), timestamp
+        
+    Returns:
+        tuple: (RGB PIL Image, image content hash, None) on success,
+               or (None, None, error response dict)
+    """
+    request_id = request_data['request_id']
+    image_b64 = request_data.get('image')
+    
+    # Input validation
+    if not image_b64:
+        return None, None, error_response(
+            request_id, 'No image provided',
+            'Please upload an image to recognize an artwork.'
+        )
+    
+    # Decode image with validation
+    try:
+        image_bytes = base64.b64decode(image_b64)
+        img = Image.open(io.BytesIO(image_bytes))
+    except Exception as e:
+        return None, None, error_response(
+            request_id, f'Failed to decode image: {str(e)}',
+            'The uploaded image could not be processed. Please try a different image format.'
+        )
+    
+    # Validate image
+    if not isinstance(img, Image.Image):
+        return None, None, error_response(
+            request_id, 'Invalid image format',
+            'Please provide a valid image file (JPEG or PNG).'
+        )
+    
+    # Convert to RGB if needed (JPEGs are decoded at reduced scale on the fast path)
+    try:
+        if isinstance(preprocess, FastClipPreprocessor):
+            draft_for_size(img, preprocess.size)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+    except Exception as e:
+        return None, None, error_response(
+            request_id, f'Image conversion failed: {str(e)}',
+            'The image could not be converted to the required format.'
+        )
+    
+    return img, image_digest(image_bytes), None
+
+
+def build_response(request_id, results, show_context, prediction=None, shard_status=None, stream=False,
+                   version=None):
+    """
+    Turn search results into a recognition response.
+    
+    Args:
+        request_id: Request identifier
+        results: Top-k result records (with a 'distance' key) or None
+        show_context: Whether to append similar artworks to the description
+        prediction: Zero-shot prediction for the image (None when disabled)
+        shard_status: Scatter-gather status (None without sharding)
+        stream: Publish the recognition and each description chunk to
+                artguide:stream:<request_id> while generating
+        version: Catalog version the results came from (default: the current one)
+        
+    Returns:
+        Response dictionary with recognition results
+    """
+    if results is None:
+        return error_response(
+            request_id, 'No index loaded',
+            'Recognition service is not available. Please try again later.'
+        )
+    if not results and shard_status is not None and not shard_status['answered']:
+        response = error_response(
+            request_id, 'No shard answered in time',
+            'Recognition service is busy. Please try again.'
+        )
+        response['shards'] = shard_status
+        return response
+    if not results:
+        return error_response(
+            request_id, 'No artworks match the filters',
+            'No artwork in this selection resembles the photo. Try removing the gallery or period filter.'
+        )
+    
+    # Get top result (zero-shot mode: artist/period from the text-prompt matrix,
+    # title from the best neighbour by that artist)
+    top1 = apply_prediction(results, prediction)
+    artist = top1["artist"]
+    title = top1.get("title", "Unknown")
+    period = top1.get("period", "Unknown")
+    distance = float(top1["distance"])
+    
+    # Convert distance to confidence (lower distance = higher confidence)
+    # Using inverse exponential: confidence = exp(-distance)
+    confidence = np.exp(-distance)
+    
+    # Context if requested
+    context = ""
+    if show_context and len(results) > 1:
+        context_items = []
+        for row in results[1:4]:  # Top 2-4
+            context_items.append(
+                f"{row['artist']} - {row.get('title', 'Unknown')} (similarity: {np.exp(-row['distance']):.2f})"
+            )
+        context = "\n\nSimilar artworks: " + "; ".join(context_items)
+    
+    # Generate description (streamed: recognition first, then the text as it arrives)
+    description_status = 'complete'
+    if stream:
+        publish_event(request_id, {
+            'event': 'recognition', 'artist': artist, 'title': title,
+            'period': period, 'confidence': float(confidence)
+        })
+        description = ""
+        for chunk in generate_description_stream(artist, title, period):
+            description += chunk
+            publish_event(request_id, {'event': 'chunk', 'text': chunk})
+    elif latency_budget is None:
+        description = generate_description(artist, title, period)
+    else:
+        # Over budget: answer with the placeholder now, publish the real text when it is done
+        description = latency_budget.run(
+            request_id, lambda: generate_description(artist, title, period),
+            on_complete=lambda text, error: store_description(request_id, text + context, error)
+        )
+        if description is None:
+            description = placeholder_description(artist, title, period)
+            description_status = 'pending'
+            store_description(request_id)
+    description += context
+    
+    response = {
+        'request_id': request_id,
+        'status': 'success',
+        'artist': artist,
+        'title': title,
+        'period': period,
+        'confidence': float(confidence),
+        'description': description,
+        'description_status': description_status,  # 'pending': fetch the full text from artguide:pending_description:<id>
+        'index_version': index_version if version is None else version
+    }
+    if prediction:
+        response['zero_shot'] = prediction
+    if shard_status is not None:
+        response['shards'] = shard_status  # 'partial': True when some shards timed out
+    return response
 
 
 def process_request(request_data):
@@ -191,166 +563,309 @@ def process_request(request_data):
     Process recognition request from orchestrator.
     
     Args:
-        request_data: Dictionary with request_id, image (base64), timestamp
+        request_data: Dictionary with request_id, image (base64), timestamp and
+                      optional show_context, filters ({"location": "Room 2"}, ...)
+                      and stream (publish description chunks while generating)
         
     Returns:
         Response dictionary with recognition results
     """
     try:
         request_id = request_data['request_id']
-        image_b64 = request_data.get('image')
         show_context = request_data.get('show_context', False)
         
-        # Input validation
-        if not image_b64:
-            return {
-                'request_id': request_id,
-                'status': 'error',
-                'message': 'No image provided',
-                'artist': 'Unknown',
-                'title': 'Unknown',
-                'period': 'Unknown',
-                'confidence': 0.0,
-                'description': 'Please upload an image to recognize an artwork.'
-            }
+        img, image_key, error = decode_request(request_data)
+        if error is not None:
+            return error
+        filters = parse_filters(request_data.get('filters'))
         
-        # Decode image with validation
-        try:
-            image_bytes = base64.b64decode(image_b64)
-            img = Image.open(io.BytesIO(image_bytes))
-        except Exception as e:
-            return {
-                'request_id': request_id,
-                'status': 'error',
-                'message': f'Failed to decode image: {str(e)}',
-                'artist': 'Unknown',
-                'title': 'Unknown',
-                'period': 'Unknown',
-                'confidence': 0.0,
-                'description': 'The uploaded image could not be processed. Please try a different image format.'
-            }
+        # Search index (restricted to the filtered artworks)
+        all_results, predictions, shard_status = search_images([img], k=5, keys=[image_key], filters=[filters])
+        if all_results is None:
+            return build_response(request_id, None, show_context)
         
-        # Validate image
-        if not isinstance(img, Image.Image):
-            return {
-                'request_id': request_id,
-                'status': 'error',
-                'message': 'Invalid image format',
-                'artist': 'Unknown',
-                'title': 'Unknown',
-                'period': 'Unknown',
-                'confidence': 0.0,
-                'description': 'Please provide a valid image file (JPEG or PNG).'
-            }
+        return build_response(
+            request_id, all_results[0], show_context, predictions[0], shard_status, request_data.get('stream', False)
+        )
+    
+    except Exception as e:
+        return error_response(
+            request_data.get('request_id', 'unknown'),
+            f'AI processing error: {str(e)}',
+            'An error occurred during recognition.'
+        )
+
+
+def search_batch(batch_requests, k=5):
+    """
+    Decode, embed and search several requests with one embedding pass.
+    
+    All decodable images are embedded as a single tensor batch and searched
+    with one multi-row index.search call per distinct set of filters.
+    Descriptions are not generated here: for searched requests the result
+    is a task that builds the response (see finish_request), so the caller
+    decides where the LLM work runs.
+    
+    Args:
+        batch_requests: List of request dictionaries
+        k: Number of top results per request
         
-        # Convert to RGB if needed
+    Returns:
+        List with, per request (same order as batch_requests), an error
+        response dictionary or a zero-argument response task
+    """
+    tasks = [None] * len(batch_requests)
+    images = []
+    keys = []
+    filters = []
+    positions = []
+    
+    for i, request_data in enumerate(batch_requests):
         try:
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
+            img, image_key, error = decode_request(request_data)
+            request_filters = parse_filters(request_data.get('filters'))
         except Exception as e:
-            return {
-                'request_id': request_id,
-                'status': 'error',
-                'message': f'Image conversion failed: {str(e)}',
-                'artist': 'Unknown',
-                'title': 'Unknown',
-                'period': 'Unknown',
-                'confidence': 0.0,
-                'description': 'The image could not be converted to the required format.'
-            }
-        
-        # Search index
-        results, emb = search_index(img, k=5)
-        
-        if results is None:
-            return {
-                'request_id': request_id,
-                'status': 'error',
-                'message': 'No index loaded',
-                'artist': 'Unknown',
-                'title': 'Unknown',
-                'period': 'Unknown',
-                'confidence': 0.0,
-                'description': 'Recognition service is not available. Please try again later.'
-            }
-        
-        # Get top result
-        top1 = results.iloc[0]
-        artist = top1["artist"]
-        title = top1.get("title", "Unknown")
-        period = top1.get("period", "Unknown")
-        distance = float(top1["distance"])
-        
-        # Convert distance to confidence (lower distance = higher confidence)
-        # Using inverse exponential: confidence = exp(-distance)
-        confidence = np.exp(-distance)
-        
-        # Generate description
-        description = generate_description(artist, title, period)
+            img, image_key, error = None, None, error_response(
+                request_data.get('request_id', 'unknown'),
+                f'AI processing error: {str(e)}',
+                'An error occurred during recognition.'
+            )
+        if error is not None:
+            tasks[i] = error
+        else:
+            images.append(img)
+            keys.append(image_key)
+            filters.append(request_filters)
+            positions.append(i)
+    
+    if images:
+        try:
+            all_results, predictions, shard_status = search_images(images, k=k, keys=keys, filters=filters)
+        except Exception as e:
+            all_results, predictions, shard_status = e, None, None
         
-        # Add context if requested
-        if show_context and len(results) > 1:
-            context_items = []
-            for idx, row in results[1:4].iterrows():  # Top 2-4
-                context_items.append(
-                    f"{row['artist']} - {row.get('title', 'Unknown')} (similarity: {np.exp(-row['distance']):.2f})"
+        for j, i in enumerate(positions):
+            request_data = batch_requests[i]
+            request_id = request_data['request_id']
+            if isinstance(all_results, Exception):
+                tasks[i] = error_response(
+                    request_id, f'AI processing error: {str(all_results)}',
+                    'An error occurred during recognition.'
                 )
-            description += "\n\nSimilar artworks: " + "; ".join(context_items)
-        
-        return {
-            'request_id': request_id,
-            'status': 'success',
-            'artist': artist,
-            'title': title,
-            'period': period,
-            'confidence': float(confidence),
-            'description': description
-        }
+                continue
+            tasks[i] = partial(
+                build_response, request_id,
+                None if all_results is None else all_results[j],
+                request_data.get('show_context', False),
+                None if predictions is None else predictions[j],
+                shard_status, request_data.get('stream', False), index_version
+            )
+    
+    return tasks
+
+
+def finish_request(request_data, task):
+    """Run a search_batch result: error responses pass through, tasks build the response."""
+    if not callable(task):
+        return task
+    try:
+        return task()
+    except Exception as e:
+        return error_response(
+            request_data.get('request_id', 'unknown'), f'AI processing error: {str(e)}',
+            'An error occurred during recognition.'
+        )
+
+
+def process_batch(batch_requests, k=5, on_response=None):
+    """
+    Process several recognition requests with one embedding pass
+    (search_batch), generating their descriptions concurrently on the
+    description pool.
+    
+    Each response is handed to `on_response` as soon as its own description
+    is ready, so a slow LLM call does not hold back the rest of the batch.
     
+    Args:
+        batch_requests: List of request dictionaries
+        k: Number of top results per request
+        on_response: Called with each response dictionary as it completes
+        
+    Returns:
+        List of response dictionaries, in the same order as batch_requests
+    """
+    futures = {
+        description_pool.submit(finish_request, request_data, task): position
+        for position, (request_data, task) in enumerate(zip(batch_requests, search_batch(batch_requests, k)))
+    }
+    responses = [None] * len(batch_requests)
+    for future in as_completed(futures):
+        response = future.result()
+        responses[futures[future]] = response
+        if on_response is not None:
+            try:
+                on_response(response)
+            except Exception as e:
+                print(f"Error handling response {response.get('request_id')}: {e}")
+    return responses
+
+
+def complete_and_send(request_data, task):
+    """Finish a request and publish its response (runs on the description pool)."""
+    try:
+        response = finish_request(request_data, task)
+        send_response(response, request_data.get('stream', False))
+        print(f"Completed request: {response['request_id']} - Status: {response['status']}")
     except Exception as e:
-        return {
-            'request_id': request_data.get('request_id', 'unknown'),
-            'status': 'error',
-            'message': f'AI processing error: {str(e)}',
-            'artist': 'Unknown',
-            'title': 'Unknown',
-            'period': 'Unknown',
-            'confidence': 0.0,
-            'description': 'An error occurred during recognition.'
-        }
+        print(f"Error completing request {request_data.get('request_id')}: {e}")
+    finally:
+        description_slots.release()
+
+
+def dispatch_batch(batch_requests, k=5):
+    """
+    Search a batch and hand its descriptions to the description pool.
+    
+    Returns once the batch is searched, so the main loop can embed and
+    search the next requests while LLM calls are in flight. Blocks only
+    when 2 * DESCRIPTION_WORKERS requests are already waiting for their
+    description (backpressure instead of an unbounded backlog).
+    """
+    for request_data, task in zip(batch_requests, search_batch(batch_requests, k)):
+        description_slots.acquire()
+        description_pool.submit(complete_and_send, request_data, task)
+
+
+def collect_batch(first_request_json, max_size, max_wait_ms):
+    """
+    Drain additional queued requests to form a micro-batch.
+    
+    Stops once `max_size` requests are collected or `max_wait_ms`
+    milliseconds have passed since the first request was popped.
+    
+    Args:
+        first_request_json: Raw JSON of the request returned by blpop
+        max_size: Maximum number of requests in the batch
+        max_wait_ms: Maximum time to wait for more requests
+        
+    Returns:
+        List of raw request JSON payloads
+    """
+    batch = [first_request_json]
+    deadline = time.time() + max_wait_ms / 1000.0
+    
+    while len(batch) < max_size:
+        request_json = redis_client.lpop(REQUEST_QUEUE)
+        if request_json is not None:
+            batch.append(request_json)
+            continue
+        if time.time() >= deadline:
+            break
+        time.sleep(0.001)
+    
+    return batch
+
+
+def publish_event(request_id, event):
+    """Append a streaming event to the request's artguide:stream:<id> list."""
+    stream_key = f"{STREAM_PREFIX}{request_id}"
+    pipe = redis_client.pipeline()
+    pipe.rpush(stream_key, json.dumps(event))
+    pipe.expire(stream_key, 60)  # Expire after 60 seconds if nobody reads it
+    pipe.execute()
+
+
+def send_response(response, stream=False):
+    """
+    Publish a response to its artguide:response:<id> key.
+    
+    For streaming requests the response also ends the request's event
+    stream as a 'done' event (errors included).
+    """
+    response_key = f"{RESPONSE_PREFIX}{response['request_id']}"
+    redis_client.setex(
+        response_key,
+        60,  # Expire after 60 seconds
+        json.dumps(response)
+    )
+    if stream:
+        publish_event(response['request_id'], {'event': 'done', 'response': response})
+
+
+def publish_metrics():
+    """Write the cache, LLM, coalescing and budget counters to their artguide:metrics:* hashes."""
+    redis_client.hset(CACHE_METRICS_KEY, mapping=embedding_cache.stats())
+    redis_client.hset(DESCRIPTION_METRICS_KEY, mapping=description_cache.stats())
+    if llm is not None:
+        redis_client.hset(LLM_METRICS_KEY, mapping=llm.stats())
+    if flights is not None:
+        redis_client.hset(COALESCING_METRICS_KEY, mapping=flights.stats())
+    if latency_budget is not None:
+        redis_client.hset(BUDGET_METRICS_KEY, mapping=latency_budget.stats())
 
 
 def main():
-    """Main loop: listen to orchestrator queue and process requests."""
+    """Main loop: listen to orchestrator queue and process requests in micro-batches."""
     print(f"AI Server started. Listening to queue: {REQUEST_QUEUE}")
     print(f"Orchestrator (Redis): {REDIS_HOST}:{REDIS_PORT}")
+    print(f"Micro-batching: up to {BATCH_MAX_SIZE} requests, {BATCH_MAX_WAIT_MS} ms wait window")
+    print(f"Descriptions: {DESCRIPTION_WORKERS} worker threads (embedding and search continue meanwhile)")
+    print(f"Memory (MB): {memory_usage()}")
+    
+    # Hot reload: new catalog versions are loaded in the background and
+    # swapped in between batches (control channel or manifest poll)
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(CONTROL_CHANNEL)
+    watcher = IndexWatcher(load_catalog, lambda: catalog_version(INDEX_PATH), index_version, pubsub=pubsub).start()
+    print(f"Catalog version {index_version}; reload via {CONTROL_CHANNEL} "
+          f"or manifest poll every {watcher.poll_seconds:g}s")
     
+    metrics_at = 0.0
     while True:
         try:
+            snapshot = watcher.take()
+            if snapshot is not None:
+                previous = index_version
+                apply_snapshot(snapshot)
+                print(f"Swapped catalog version {previous} -> {index_version}")
+            
             # Blocking pop from queue (timeout 1 second)
             result = redis_client.blpop(REQUEST_QUEUE, timeout=1)
             
             if result:
                 _, request_json = result
-                request_data = json.loads(request_json)
+                batch_json = collect_batch(request_json, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
                 
-                print(f"Processing request: {request_data['request_id']}")
+                batch_requests = []
+                for raw in batch_json:
+                    try:
+                        batch_requests.append(json.loads(raw))
+                    except Exception as e:
+                        print(f"Dropping malformed request: {e}")
+                if not batch_requests:
+                    continue
                 
-                # Process request
-                response = process_request(request_data)
+                batch_start = time.time()
+                print(f"Processing batch of {len(batch_requests)}: "
+                      f"{', '.join(str(r.get('request_id')) for r in batch_requests)}")
                 
-                # Send response back via Redis
-                response_key = f"{RESPONSE_PREFIX}{response['request_id']}"
-                redis_client.setex(
-                    response_key,
-                    60,  # Expire after 60 seconds
-                    json.dumps(response)
-                )
+                # Embed + search now; descriptions are generated and the responses
+                # sent back via Redis on the description pool
+                dispatch_batch(batch_requests)
                 
-                print(f"Completed request: {response['request_id']} - Status: {response['status']}")
+                # Report batch size distribution for throughput/latency tuning
+                redis_client.hincrby(BATCH_METRICS_KEY, str(len(batch_requests)), 1)
+                print(f"Batch of {len(batch_requests)} searched in {time.time() - batch_start:.2f}s")
+            
+            # Counter snapshots (also while idle, as background descriptions finish)
+            if time.time() - metrics_at >= METRICS_INTERVAL:
+                publish_metrics()
+                metrics_at = time.time()
         
         except KeyboardInterrupt:
             print("\nShutting down AI Server...")
+            watcher.stop()
+            description_pool.shutdown(wait=True)  # in-flight descriptions still get their response
             break
         
         except Exception as e:
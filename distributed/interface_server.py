@@ -3,11 +3,18 @@ import time
 import csv
 import json
 from datetime import datetime
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, Response, request, jsonify, render_template_string, stream_with_context
 import redis
 from PIL import Image
 import io
+import sys
 import base64
+import threading
+
+# Add parent directory to path for shared modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.budget import PENDING_DESCRIPTION_PREFIX
 
 app = Flask(__name__)
 
@@ -16,16 +23,33 @@ REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 LOG_PATH = "app/logs/telemetry.csv"
 REQUEST_QUEUE = "artguide:requests"
 RESPONSE_PREFIX = "artguide:response:"
+STREAM_PREFIX = "artguide:stream:"  # description events published by the AI server
+REQUEST_TIMEOUT = 30  # seconds
+FILTER_COLUMNS = ("period", "artist", "location")  # form fields forwarded as search filters (artguide/filtering.py)
 
 # Initialize Redis connection (orchestrator)
 redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=False)
 
-# Ensure log directory exists
-os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-if not os.path.exists(LOG_PATH):
-    with open(LOG_PATH, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["timestamp", "request_id", "artist", "confidence", "response_time", "status"])
+TELEMETRY_COLUMNS = ["timestamp", "request_id", "artist", "confidence", "response_time", "status", "ttft"]
+_telemetry_ready = False
+_telemetry_lock = threading.Lock()
+
+
+def _prepare_telemetry_log():
+    """Create the telemetry CSV, or extend the header of a log started before ttft was recorded."""
+    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+    if not os.path.exists(LOG_PATH):
+        with open(LOG_PATH, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(TELEMETRY_COLUMNS)
+        return
+    # Old rows just lack the ttft field
+    with open(LOG_PATH, newline="") as f:
+        lines = f.readlines()
+    if lines and lines[0].strip() == ",".join(TELEMETRY_COLUMNS[:-1]):
+        lines[0] = ",".join(TELEMETRY_COLUMNS) + "\n"
+        with open(LOG_PATH, "w", newline="") as f:
+            f.writelines(lines)
 
 
 def validate_image(image_data):
@@ -53,6 +77,11 @@ def validate_image(image_data):
         if width > 5000 or height > 5000:
             return False, "Image too large. Maximum size is 5000x5000 pixels.", None
         
+        # The image is only validated here (the raw bytes are forwarded), so let
+        # PIL decode JPEGs at reduced scale instead of full resolution
+        if img.format == 'JPEG':
+            img.draft('RGB', (224, 224))
+        
         # Convert to RGB if needed
         if img.mode != 'RGB':
             img = img.convert('RGB')
@@ -63,19 +92,31 @@ def validate_image(image_data):
         return False, f"Failed to process image: {str(e)}", None
 
 
-def log_request(request_id, artist, confidence, response_time, status):
-    """Log request telemetry to CSV."""
+def log_request(request_id, artist, confidence, response_time, status, ttft=None):
+    """
+    Log request telemetry to CSV.
+    
+    ttft is the time until the first description text reached the client:
+    the first streamed chunk, or the whole response for /api/recognize
+    (empty when no text was shown). The file is prepared on the first write.
+    """
+    global _telemetry_ready
     try:
-        with open(LOG_PATH, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                request_id,
-                artist,
-                confidence,
-                response_time,
-                status
-            ])
+        with _telemetry_lock:
+            if not _telemetry_ready:
+                _prepare_telemetry_log()
+                _telemetry_ready = True
+            with open(LOG_PATH, "a", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow([
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    request_id,
+                    artist,
+                    confidence,
+                    response_time,
+                    status,
+                    round(ttft, 3) if ttft is not None else ""
+                ])
     except Exception as e:
         print(f"Error logging request: {e}")
 
@@ -106,6 +147,11 @@ def index():
         <div class="upload-form">
             <input type="file" id="imageInput" accept="image/jpeg,image/png">
             <button onclick="uploadImage()">Recognize Artwork</button>
+            <p>
+                <input type="text" id="locationInput" placeholder="Gallery (optional)">
+                <input type="text" id="periodInput" placeholder="Period (optional)">
+                <input type="text" id="artistInput" placeholder="Artist (optional)">
+            </p>
         </div>
         
         <div id="result"></div>
@@ -122,30 +168,64 @@ def index():
                 
                 const formData = new FormData();
                 formData.append('image', input.files[0]);
+                formData.append('location', document.getElementById('locationInput').value);
+                formData.append('period', document.getElementById('periodInput').value);
+                formData.append('artist', document.getElementById('artistInput').value);
                 
                 resultDiv.innerHTML = '<p>Processing...</p>';
                 resultDiv.style.display = 'block';
                 
                 try {
-                    const response = await fetch('/api/recognize', {
+                    // Server-sent events: the recognition first, then the description as it is written
+                    const response = await fetch('/api/recognize/stream', {
                         method: 'POST',
                         body: formData
                     });
                     
-                    const data = await response.json();
-                    
-                    if (data.status === 'success') {
-                        resultDiv.innerHTML = `
-                            <h3 class="success">Recognition Successful</h3>
-                            <p><strong>Artist:</strong> ${data.artist}</p>
-                            <p><strong>Title:</strong> ${data.title}</p>
-                            <p><strong>Period:</strong> ${data.period}</p>
-                            <p><strong>Confidence:</strong> ${(data.confidence * 100).toFixed(2)}%</p>
-                            <p><strong>Description:</strong> ${data.description}</p>
-                            <p><em>Response time: ${data.response_time}s</em></p>
-                        `;
-                    } else {
+                    if (!response.ok) {
+                        const data = await response.json();
                         resultDiv.innerHTML = `<p class="error">Error: ${data.message}</p>`;
+                        return;
+                    }
+                    
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    let description = null;
+                    
+                    while (true) {
+                        const { done, value } = await reader.read();
+                        if (done) break;
+                        buffer += decoder.decode(value, { stream: true });
+                        
+                        let end;
+                        while ((end = buffer.indexOf('\\n\\n')) >= 0) {
+                            const message = buffer.slice(0, end);
+                            buffer = buffer.slice(end + 2);
+                            const event = message.match(/^event: (.*)$/m)[1];
+                            const data = JSON.parse(message.match(/^data: (.*)$/m)[1]);
+                            
+                            if (event === 'recognition') {
+                                resultDiv.innerHTML = `
+                                    <h3 class="success">Recognition Successful</h3>
+                                    <p><strong>Artist:</strong> ${data.artist}</p>
+                                    <p><strong>Title:</strong> ${data.title}</p>
+                                    <p><strong>Period:</strong> ${data.period}</p>
+                                    <p><strong>Confidence:</strong> ${(data.confidence * 100).toFixed(2)}%</p>
+                                    <p><strong>Description:</strong> <span id="description"></span></p>
+                                    <p><em id="timing"></em></p>
+                                `;
+                                description = document.getElementById('description');
+                            } else if (event === 'chunk' && description) {
+                                description.textContent += data.text;
+                            } else if (event === 'done') {
+                                if (description) description.textContent = data.description;
+                                document.getElementById('timing').textContent =
+                                    `First text after ${data.ttft}s, response time: ${data.response_time}s`;
+                            } else if (event === 'error') {
+                                resultDiv.innerHTML = `<p class="error">Error: ${data.message}</p>`;
+                            }
+                        }
                     }
                 } catch (error) {
                     resultDiv.innerHTML = `<p class="error">Error: ${error.message}</p>`;
@@ -158,28 +238,26 @@ def index():
     return render_template_string(html)
 
 
-@app.route('/api/recognize', methods=['POST'])
-def recognize():
+def prepare_request(request_id, start_time, stream=False):
     """
-    Handle artwork recognition requests.
-    Validates input, sends to orchestrator, waits for AI server response.
-    """
-    start_time = time.time()
-    request_id = f"req_{int(time.time() * 1000)}"
+    Validate the uploaded image and build the AI server request.
     
+    Returns:
+        tuple: (request payload, None) or (None, (error JSON response, HTTP status))
+    """
     # Check if image is in request
     if 'image' not in request.files:
-        return jsonify({
+        return None, (jsonify({
             'status': 'error',
             'message': 'No image provided'
-        }), 400
+        }), 400)
     
     file = request.files['image']
     if file.filename == '':
-        return jsonify({
+        return None, (jsonify({
             'status': 'error',
             'message': 'Empty filename'
-        }), 400
+        }), 400)
     
     # Read and validate image
     image_data = file.read()
@@ -187,25 +265,46 @@ def recognize():
     
     if not is_valid:
         log_request(request_id, "N/A", 0.0, time.time() - start_time, "validation_error")
-        return jsonify({
+        return None, (jsonify({
             'status': 'error',
             'message': error_msg
-        }), 400
+        }), 400)
     
     # Prepare request for AI server via orchestrator
-    request_payload = {
+    return {
         'request_id': request_id,
         'image': base64.b64encode(image_data).decode('utf-8'),
         'timestamp': datetime.now().isoformat(),
-        'show_context': request.form.get('show_context', 'false').lower() == 'true'
-    }
+        'show_context': request.form.get('show_context', 'false').lower() == 'true',
+        # Optional metadata filters (e.g. the visitor's gallery), applied inside the index search
+        'filters': {
+            column: request.form.get(column, '').strip()
+            for column in FILTER_COLUMNS if request.form.get(column, '').strip()
+        },
+        # Publish recognition + description chunks to artguide:stream:<id> while generating
+        'stream': stream
+    }, None
+
+
+@app.route('/api/recognize', methods=['POST'])
+def recognize():
+    """
+    Handle artwork recognition requests.
+    Validates input, sends to orchestrator, waits for AI server response.
+    """
+    start_time = time.time()
+    request_id = f"req_{int(time.time() * 1000)}"
+    
+    request_payload, error = prepare_request(request_id, start_time)
+    if error is not None:
+        return error
     
     try:
         # Send to orchestrator (Redis queue)
         redis_client.rpush(REQUEST_QUEUE, json.dumps(request_payload))
         
         # Wait for response (with timeout)
-        timeout = 30  # seconds
+        timeout = REQUEST_TIMEOUT
         response_key = f"{RESPONSE_PREFIX}{request_id}"
         
         for _ in range(timeout * 10):  # Check every 100ms
@@ -223,19 +322,25 @@ def recognize():
                     response.get('artist', 'Unknown'),
                     response.get('confidence', 0.0),
                     response_time,
-                    'success'
+                    'success',
+                    ttft=response_time  # nothing is shown before the full response
                 )
                 
-                return jsonify({
+                result = {
                     'status': 'success',
                     'artist': response.get('artist', 'Unknown'),
                     'title': response.get('title', 'Unknown'),
                     'period': response.get('period', 'Unknown'),
                     'confidence': response.get('confidence', 0.0),
                     'description': response.get('description', ''),
+                    'description_status': response.get('description_status', 'complete'),
                     'response_time': round(response_time, 2),
                     'request_id': request_id
-                })
+                }
+                if result['description_status'] == 'pending':
+                    # Placeholder text: the full description is still being written
+                    result['description_url'] = f"/api/description/{request_id}"
+                return jsonify(result)
             
             time.sleep(0.1)
         
@@ -254,6 +359,119 @@ def recognize():
         }), 500
 
 
+def sse(event, data):
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route('/api/recognize/stream', methods=['POST'])
+def recognize_stream():
+    """
+    Streaming recognition (server-sent events).
+    
+    Same form fields as /api/recognize. The response is a text/event-stream:
+        recognition - artist, title, period, confidence (as soon as the search is done)
+        chunk       - {"text": ...} description chunks as the LLM produces them
+        done        - the complete response, plus response_time and ttft
+        error       - {"message": ...}
+    Time to first chunk (ttft) is logged to the telemetry CSV.
+    """
+    start_time = time.time()
+    request_id = f"req_{int(time.time() * 1000)}"
+    
+    request_payload, error = prepare_request(request_id, start_time, stream=True)
+    if error is not None:
+        return error
+    
+    stream_key = f"{STREAM_PREFIX}{request_id}"
+    
+    def events():
+        ttft = None
+        try:
+            redis_client.rpush(REQUEST_QUEUE, json.dumps(request_payload))
+            deadline = start_time + REQUEST_TIMEOUT
+            while time.time() < deadline:
+                item = redis_client.blpop(stream_key, timeout=max(1, int(deadline - time.time())))
+                if item is None:
+                    continue
+                event = json.loads(item[1])
+                kind = event.pop('event')
+                if kind == 'chunk' and ttft is None:
+                    ttft = time.time() - start_time
+                if kind != 'done':
+                    yield sse(kind, event)
+                    continue
+                
+                response = event['response']
+                redis_client.delete(f"{RESPONSE_PREFIX}{request_id}", stream_key)  # Clean up
+                response_time = time.time() - start_time
+                status = 'success' if response.get('status') == 'success' else 'error'
+                log_request(request_id, response.get('artist', 'N/A'), response.get('confidence', 0.0),
+                            response_time, status, ttft=ttft)
+                response['response_time'] = round(response_time, 2)
+                response['ttft'] = round(ttft, 3) if ttft is not None else None
+                yield sse('done' if status == 'success' else 'error', response)
+                return
+            
+            # Timeout
+            log_request(request_id, "N/A", 0.0, time.time() - start_time, "timeout", ttft=ttft)
+            yield sse('error', {'message': 'Request timeout - AI server not responding'})
+        except Exception as e:
+            log_request(request_id, "N/A", 0.0, time.time() - start_time, "error", ttft=ttft)
+            yield sse('error', {'message': f'Server error: {str(e)}'})
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # let reverse proxies pass chunks through
+    })
+
+
+@app.route('/api/description/<request_id>', methods=['GET'])
+def get_description(request_id):
+    """
+    Full description of a request answered with the placeholder text.
+    
+    /api/recognize waits for the description only for the AI server's
+    latency budget (DESCRIPTION_BUDGET); slower descriptions are finished in
+    the background and returned here.
+    
+    Returns:
+        200 with the description, 202 while it is still being written,
+        404 for unknown or expired request ids, 502 if generation failed
+    """
+    try:
+        data = redis_client.get(f"{PENDING_DESCRIPTION_PREFIX}{request_id}")
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'Server error: {str(e)}'
+        }), 500
+    if data is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Unknown or expired request id'
+        }), 404
+    
+    try:
+        state = json.loads(data)
+        status = state['status']
+        if status == 'complete':
+            description = state['description']
+    except (ValueError, TypeError, KeyError):
+        return jsonify({
+            'status': 'error',
+            'message': 'Malformed description state'
+        }), 500
+    if status == 'pending':
+        return jsonify({'status': 'pending', 'request_id': request_id}), 202
+    if status == 'error':
+        return jsonify({
+            'status': 'error',
+            'message': f"Description generation failed: {state.get('message', '')}"
+        }), 502
+    return jsonify({'status': 'success', 'request_id': request_id, 'description': description})
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
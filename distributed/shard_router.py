@@ -0,0 +1,112 @@
+"""
+Scatter-gather search over catalog shards.
+
+The AI server embeds the query images and hands the vectors to ShardRouter,
+which pushes one search request to every shard queue
+(artguide:shard:<i>:requests) and collects the answers from a per-fan-out
+reply list. Shards that have not answered when the timeout expires are
+reported as missing and the merge continues with the shards that did
+answer, so one slow shard degrades recall instead of stalling the request.
+
+Authors: AlBeSa Team
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+
+# Add parent directory to path for shared modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.sharding import SHARD_REPLY_PREFIX, encode_queries, merge_topk, shard_queue
+
+
+class ShardRouter:
+    """
+    Fan a query batch out to all shards and merge the global top-k.
+
+    Example:
+        >>> router = ShardRouter(redis_client, n_shards=4, timeout_ms=250)
+        >>> results, status = router.search(embeddings, k=5)
+        >>> status
+        {'shards': 4, 'answered': [0, 1, 3], 'missing': [2], 'partial': True, ...}
+    """
+
+    def __init__(self, redis_client, n_shards, timeout_ms):
+        """
+        Args:
+            redis_client: Redis connection (the request transport)
+            n_shards: Number of shards
+            timeout_ms: Time to wait for shard answers per fan-out
+        """
+        self.redis_client = redis_client
+        self.n_shards = n_shards
+        self.timeout_ms = timeout_ms
+        self.stats = {"fanouts": 0, "partial": 0, "shard_timeouts": 0}
+
+    def search(self, embeddings, k, filters=None):
+        """
+        Search every shard with a (n_queries, dimension) embedding batch.
+
+        Args:
+            embeddings: float32 (n_queries, dimension)
+            k: Results per query
+            filters: Optional per-query parsed metadata filters, applied by
+                     each shard inside its own search
+
+        Returns:
+            tuple: (results, status) - per query, the merged top-k result
+                   records; status lists answered/missing shards, the index
+                   version each shard answered with and the elapsed time
+        """
+        start = time.time()
+        fanout_id = uuid.uuid4().hex
+        reply_to = f"{SHARD_REPLY_PREFIX}{fanout_id}"
+        deadline = start + self.timeout_ms / 1000.0
+        request = json.dumps({
+            "fanout_id": fanout_id,
+            "queries": encode_queries(embeddings),
+            "k": k,
+            "filters": filters,
+            "reply_to": reply_to,
+            "deadline": deadline,
+        })
+
+        pipe = self.redis_client.pipeline()
+        for shard in range(self.n_shards):
+            pipe.rpush(shard_queue(shard), request)
+        pipe.execute()
+
+        replies = {}
+        while len(replies) < self.n_shards:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            item = self.redis_client.blpop(reply_to, timeout=remaining)
+            if item is None:
+                break
+            reply = json.loads(item[1])
+            replies[reply["shard"]] = reply
+        self.redis_client.delete(reply_to)
+
+        missing = [shard for shard in range(self.n_shards) if shard not in replies]
+        self.stats["fanouts"] += 1
+        self.stats["shard_timeouts"] += len(missing)
+        if missing:
+            self.stats["partial"] += 1
+
+        answered = sorted(replies)
+        results = merge_topk([replies[shard]["results"] for shard in answered], k)
+        if not answered:
+            results = [[] for _ in range(len(embeddings))]
+        status = {
+            "shards": self.n_shards,
+            "answered": answered,
+            "missing": missing,
+            "partial": bool(missing),
+            "versions": {str(shard): replies[shard].get("index_version") for shard in answered},
+            "elapsed_ms": round((time.time() - start) * 1000, 1),
+        }
+        return results, status
@@ -0,0 +1,114 @@
+"""
+Shard Server for Art Guide Distributed System
+Serves one partition of a sharded catalog (see scripts/prepare_dataset.py
+--shards). Pops search requests with pre-computed query embeddings from
+artguide:shard:<SHARD_ID>:requests, searches its own index and pushes the
+top-k result records to the request's reply list. No CLIP model is loaded.
+
+Usage:
+    SHARD_ID=0 python distributed/shard_server.py
+    SHARD_ID=1 SHARDS_DIR=/data/shards python distributed/shard_server.py
+
+Authors: AlBeSa Team
+"""
+
+import os
+import sys
+import json
+import time
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import redis
+
+# Add parent directory to path for shared modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.filtering import search_records
+from artguide.reload import IndexWatcher, catalog_version, load_snapshot
+from artguide.sharding import SHARD_REPLY_TTL_SECONDS, decode_queries, shard_paths, shard_queue, shards_dir
+from artguide.store import load_mode
+from artguide.tuning import memory_usage
+
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+SHARD_ID = int(os.getenv('SHARD_ID', 0))
+SHARD_METRICS_KEY = f"artguide:metrics:shard:{SHARD_ID}"
+INDEX_PATH, META_PATH = shard_paths(shards_dir(), SHARD_ID)
+
+redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0, decode_responses=False)
+
+
+def search_shard(snapshot, request):
+    """
+    Answer one fan-out request from this shard.
+
+    Args:
+        snapshot: CatalogSnapshot of the shard
+        request: Decoded request (queries, k, optional per-query filters, reply_to, deadline)
+
+    Returns:
+        dict: Reply with per-query result records
+    """
+    queries = decode_queries(request["queries"])
+    results = search_records(snapshot.searcher, snapshot.metadata_store, queries, int(request["k"]),
+                             request.get("filters"), snapshot.partitions)
+    return {
+        "shard": SHARD_ID,
+        "fanout_id": request["fanout_id"],
+        "index_version": snapshot.version,
+        "results": results,
+    }
+
+
+def main():
+    """Main loop: pop shard search requests and reply until interrupted."""
+    if not (os.path.exists(INDEX_PATH) and os.path.exists(META_PATH)):
+        print(f"Error: Shard catalog {INDEX_PATH} not found. Run scripts/prepare_dataset.py --shards N first.")
+        return 1
+    
+    print(f"Loading shard {SHARD_ID} from {INDEX_PATH} ({load_mode()})...")
+    snapshot = load_snapshot(INDEX_PATH, META_PATH)
+    print(f"Shard {SHARD_ID}: {len(snapshot.metadata_store)} artworks, catalog version {snapshot.version}")
+    print(f"Listening to queue: {shard_queue(SHARD_ID)}")
+    print(f"Memory (MB): {memory_usage()}")
+    
+    # Shard catalogs are republished like the full catalog and hot-reloaded the same way
+    watcher = IndexWatcher(lambda: load_snapshot(INDEX_PATH, META_PATH),
+                           lambda: catalog_version(INDEX_PATH), snapshot.version).start()
+    
+    while True:
+        try:
+            snapshot = watcher.take() or snapshot
+            result = redis_client.blpop(shard_queue(SHARD_ID), timeout=1)
+            if not result:
+                continue
+            
+            request = json.loads(result[1])
+            if time.time() > request["deadline"]:
+                # The router has already answered without this shard
+                redis_client.hincrby(SHARD_METRICS_KEY, "expired", 1)
+                continue
+            
+            reply = search_shard(snapshot, request)
+            pipe = redis_client.pipeline()
+            pipe.rpush(request["reply_to"], json.dumps(reply))
+            pipe.expire(request["reply_to"], SHARD_REPLY_TTL_SECONDS)
+            pipe.hincrby(SHARD_METRICS_KEY, "answered", 1)
+            pipe.execute()
+        
+        except KeyboardInterrupt:
+            print(f"\nShutting down shard {SHARD_ID}...")
+            watcher.stop()
+            break
+        
+        except Exception as e:
+            print(f"Error in shard loop: {e}")
+            time.sleep(1)
+    
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,128 @@
+"""
+Runtime Autotuner for Art Guide System
+Benchmarks CLIP embedding (preprocessing + configured backend) on this host
+across intra-op threads, inter-op threads and batch sizes, and writes the
+runtime profile that app.py and distributed/ai_server.py load at startup.
+
+Each inter-op setting is measured in a fresh process, because PyTorch only
+allows setting the inter-op thread pool size once per process. The backend
+is rebuilt for every intra-op thread count, because ONNX Runtime fixes its
+thread pool when the session is created. Images go through the configured
+preprocessor (model.preprocess), as they do when serving.
+
+Usage:
+    python scripts/autotune.py [--threads 1 2 4 8] [--interop 1 2] [--batch-sizes 1 8 32]
+
+Authors: AlBeSa Team
+"""
+
+import os
+import sys
+import argparse
+import multiprocessing
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.tuning import (
+    benchmark_config, build_profile, save_profile, profile_path, default_thread_counts
+)
+
+DEFAULT_INTEROP = [1, 2]
+DEFAULT_BATCH_SIZES = [1, 4, 8, 16, 32]
+SAMPLE_DIR = "data/sample_images"
+
+
+def _benchmark_interop(inter_op, thread_counts, batch_sizes, repeats):
+    """Run all intra-op/batch-size combinations for one inter-op setting (child process)."""
+    import torch
+    from PIL import Image
+    from artguide.backends import backend_from_settings
+    from artguide.embedding import load_clip_model
+    from artguide.preprocess import preprocessor_from_settings
+
+    torch.set_num_interop_threads(inter_op)
+    model, processor, device = load_clip_model(device="cpu")
+    preprocess = preprocessor_from_settings(processor)
+
+    images = [
+        Image.open(path).convert("RGB")
+        for path in sorted(Path(SAMPLE_DIR).glob("*"))
+        if path.suffix.lower() in {".jpg", ".jpeg", ".png"}
+    ] or [Image.new("RGB", (640, 480), color="gray")]
+
+    results = []
+    backend = None
+    for threads in thread_counts:
+        torch.set_num_threads(threads)
+        # A new session per thread count (ONNX Runtime reads the count only at creation)
+        backend = backend_from_settings(model, device, num_threads=threads)
+
+        def embed_fn(batch, backend=backend):
+            return backend.embed(preprocess(batch))
+
+        for batch_size in batch_sizes:
+            timing = benchmark_config(embed_fn, images, batch_size, repeats=repeats)
+            result = {
+                "intra_op_threads": threads,
+                "inter_op_threads": inter_op,
+                "batch_size": batch_size,
+                **timing,
+            }
+            print(f"  intra={threads:<3} inter={inter_op:<2} batch={batch_size:<3} "
+                  f"{timing['latency_ms']:>9.1f} ms/call {timing['images_per_sec']:>8.1f} images/sec",
+                  flush=True)
+            results.append(result)
+    return backend.name, results
+
+
+def main(argv=None):
+    """Run the benchmark grid and write the runtime profile."""
+    parser = argparse.ArgumentParser(description="Autotune threads and batch size for CLIP embedding.")
+    parser.add_argument("--threads", type=int, nargs="+", default=default_thread_counts(),
+                        help="Intra-op thread counts to try (default: powers of two up to the core count)")
+    parser.add_argument("--interop", type=int, nargs="+", default=DEFAULT_INTEROP,
+                        help="Inter-op thread counts to try")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES,
+                        help="Batch sizes to try")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed calls per configuration")
+    parser.add_argument("--output", default=profile_path(), help="Profile file to write")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("Art Guide - Runtime Autotune")
+    print("=" * 70)
+    print(f"CPU cores: {os.cpu_count()}")
+    print(f"Intra-op threads: {args.threads}")
+    print(f"Inter-op threads: {args.interop}")
+    print(f"Batch sizes: {args.batch_sizes}\n")
+
+    results = []
+    backend = None
+    ctx = multiprocessing.get_context("spawn")
+    for inter_op in args.interop:
+        with ctx.Pool(1) as pool:
+            backend, interop_results = pool.apply(
+                _benchmark_interop, (inter_op, args.threads, args.batch_sizes, args.repeats)
+            )
+        results.extend(interop_results)
+
+    profile = build_profile(results, backend)
+    path = save_profile(profile, args.output)
+
+    best_latency = profile["best_latency"]
+    best_throughput = profile["best_throughput"]
+    print("\n" + "=" * 70)
+    print(f"Best latency:    intra={best_latency['intra_op_threads']} "
+          f"inter={best_latency['inter_op_threads']} batch={best_latency['batch_size']} "
+          f"({best_latency['latency_ms']:.1f} ms)")
+    print(f"Best throughput: intra={best_throughput['intra_op_threads']} "
+          f"inter={best_throughput['inter_op_threads']} batch={best_throughput['batch_size']} "
+          f"({best_throughput['images_per_sec']:.1f} images/sec)")
+    print(f"\n✓ Runtime profile written to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,91 @@
+"""
+Embedding Backend Benchmark for Art Guide System
+Compares the configurable CLIP embedding backends (artguide/backends.py):
+1. Parity check against the fp32 PyTorch get_image_features output (cosine >= 0.99)
+2. Per-backend latency report
+
+Usage:
+    python scripts/benchmark_backends.py [--batch-size 8] [--repeats 10]
+
+Authors: AlBeSa Team
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+import torch
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.backends import (
+    BACKENDS, PARITY_THRESHOLD, TorchBackend, create_backend, parity_check, measure_latency
+)
+from artguide.embedding import load_clip_model
+
+SAMPLE_DIRS = ["data/sample_images", "data/artworks"]
+
+
+def load_sample_images(limit):
+    """Collect up to `limit` RGB sample images."""
+    images = []
+    for sample_dir in SAMPLE_DIRS:
+        if not os.path.exists(sample_dir):
+            continue
+        for path in sorted(Path(sample_dir).rglob("*")):
+            if path.suffix.lower() in {".jpg", ".jpeg", ".png"}:
+                images.append(Image.open(path).convert("RGB"))
+            if len(images) >= limit:
+                return images
+    return images
+
+
+def main(argv=None):
+    """Run parity checks and latency measurements for every backend."""
+    parser = argparse.ArgumentParser(description="Benchmark CLIP embedding backends.")
+    parser.add_argument("--batch-size", type=int, default=8, help="Images per timed call")
+    parser.add_argument("--repeats", type=int, default=10, help="Timed calls per backend")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("Art Guide - Embedding Backend Benchmark")
+    print("=" * 70)
+
+    model, processor, device = load_clip_model(device="cpu")
+    print(f"Torch threads: {torch.get_num_threads()}")
+
+    images = load_sample_images(args.batch_size)
+    if not images:
+        print("Error: No sample images found!")
+        return 1
+    pixel_values = processor(images=images, return_tensors="pt")["pixel_values"]
+    print(f"Benchmark batch: {len(images)} images\n")
+
+    reference = TorchBackend(model, device)
+    all_passed = True
+
+    print(f"{'backend':<12} {'min cosine':>10} {'parity':>7} {'mean ms':>9} "
+          f"{'p95 ms':>9} {'ms/image':>9}")
+    print("-" * 70)
+    for name in args.backends:
+        backend = create_backend(name, model, device)
+        if backend.name != name:
+            print(f"{name:<12} unavailable (fell back to {backend.name})")
+            continue
+        passed, min_cosine = parity_check(backend, reference, pixel_values)
+        latency = measure_latency(backend, pixel_values, repeats=args.repeats)
+        all_passed = all_passed and passed
+        print(f"{name:<12} {min_cosine:>10.4f} {'ok' if passed else 'FAIL':>7} "
+              f"{latency['mean_ms']:>9.1f} {latency['p95_ms']:>9.1f} {latency['per_image_ms']:>9.1f}")
+
+    print("-" * 70)
+    print(f"Parity threshold: cosine >= {PARITY_THRESHOLD}")
+    return 0 if all_passed else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,83 @@
+"""
+Filtered Search Benchmark for Art Guide System
+Compares per-query latency of unfiltered searches with searches restricted
+to one gallery (location filter) on a synthetic catalog, for the main index
+types. Filters go through a PartitionCache as in the serving path: the
+gallery gets an exact fp16 subindex when it fits the cache budget
+(--cache-rows), otherwise it is applied inside the main index search
+(ID selector / exact subset scan).
+
+Usage:
+    python scripts/benchmark_filters.py
+    python scripts/benchmark_filters.py --synthetic 1000000 --galleries 50
+
+Authors: AlBeSa Team
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.filtering import DEFAULT_FILTER_CACHE_ROWS, PartitionCache, search_records
+from artguide.indexing import build_faiss_index
+from artguide.metadata_store import MetadataStore
+from artguide.rerank import with_rerank
+from artguide.store import EmbeddingStore
+from benchmark_index import synthetic_embeddings
+
+INDEX_TYPES = ["flat", "ivf_flat", "hnsw", "pq"]
+
+
+def per_query_ms(searcher, store, queries, k, filters, partitions):
+    """Average search_records latency per query (one query per call)."""
+    search_records(searcher, store, queries[:1], k, [filters], partitions)  # resolve the filter once
+    start = time.perf_counter()
+    for query in queries:
+        search_records(searcher, store, query.reshape(1, -1), k, [filters], partitions)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+def main(argv=None):
+    """Print unfiltered vs single-gallery search latency per index type."""
+    parser = argparse.ArgumentParser(description="Compare filtered and unfiltered search latency.")
+    parser.add_argument("--synthetic", type=int, default=100_000, help="Synthetic catalog size")
+    parser.add_argument("--galleries", type=int, default=20, help="Number of galleries (location values)")
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=INDEX_TYPES, help="Index types")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--cache-rows", type=int, default=DEFAULT_FILTER_CACHE_ROWS,
+                        help="Partition subindex budget (0 = always filter inside the main index)")
+    args = parser.parse_args(argv)
+
+    embeddings = synthetic_embeddings(args.synthetic)
+    ids = np.arange(len(embeddings), dtype="int64")
+    metadata_store = MetadataStore.from_frame(pd.DataFrame({
+        "artwork_id": ids,
+        "location": [f"Room {i % args.galleries + 1}" for i in range(len(ids))],
+    }))
+    embedding_store = EmbeddingStore(ids, embeddings.astype("float16"))
+    queries = embeddings[np.random.default_rng(0).choice(len(embeddings), args.queries, replace=False)]
+    gallery = {"location": ["Room 1"]}
+
+    print("=" * 70)
+    print(f"Art Guide - Filtered Search Benchmark ({len(embeddings)} vectors, "
+          f"{args.galleries} galleries, {len(metadata_store.matching_ids(gallery))} in Room 1)")
+    print("=" * 70)
+    print(f"{'index':<10} {'all ms':>9} {'gallery ms':>11} {'speedup':>8}")
+    for index_type in args.types:
+        searcher = with_rerank(build_faiss_index(embeddings, index_type, ids=ids), embedding_store)
+        partitions = PartitionCache(metadata_store, embedding_store, max_rows=args.cache_rows)
+        unfiltered = per_query_ms(searcher, metadata_store, queries, 5, None, partitions)
+        filtered = per_query_ms(searcher, metadata_store, queries, 5, gallery, partitions)
+        print(f"{index_type:<10} {unfiltered:>9.3f} {filtered:>11.3f} {unfiltered / filtered:>7.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
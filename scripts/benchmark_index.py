@@ -0,0 +1,80 @@
+"""
+FAISS Index Benchmark for Art Guide System
+Builds every supported index type over the catalog embeddings (or a
+synthetic catalog of any size) and reports recall@5 against the exact
+flat index together with per-query search latency, for a sweep of the
+runtime search parameters (nprobe for IVF, efSearch for HNSW).
+
+Usage:
+    python scripts/benchmark_index.py                       # embeddings from models/faiss.index
+    python scripts/benchmark_index.py --synthetic 1000000   # clustered random catalog
+
+Authors: AlBeSa Team
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.indexing import INDEX_TYPES, build_faiss_index, evaluate_index, set_search_params
+
+INDEX_FILE = "models/faiss.index"
+NPROBE_SWEEP = [1, 4, 16, 64]
+EF_SEARCH_SWEEP = [16, 32, 64, 128]
+
+
+def synthetic_embeddings(n, dimension=512, n_clusters=1000, seed=0):
+    """Normalized vectors around random cluster centres (closer to CLIP than pure noise)."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_clusters, dimension)).astype("float32")
+    x = centres[rng.integers(0, n_clusters, n)] + 0.5 * rng.standard_normal((n, dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def catalog_embeddings(index_file=INDEX_FILE):
+    """Reconstruct the stored vectors of an exact (flat) index."""
+    index = faiss.read_index(index_file)
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def main(argv=None):
+    """Benchmark all index types and print a recall/latency table."""
+    parser = argparse.ArgumentParser(description="Compare FAISS index types (recall@5 vs latency).")
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="Benchmark a synthetic catalog with this many vectors")
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES),
+                        help="Index types to build")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    args = parser.parse_args(argv)
+
+    embeddings = synthetic_embeddings(args.synthetic) if args.synthetic else catalog_embeddings()
+    print("=" * 70)
+    print(f"Art Guide - FAISS Index Benchmark ({len(embeddings)} vectors)")
+    print("=" * 70)
+    print(f"{'index':<10} {'param':<14} {'recall@5':>9} {'ms/query':>10} {'flat ms':>9}")
+
+    for index_type in args.types:
+        index = build_faiss_index(embeddings, index_type)
+        sweep = [("", None)]
+        if index_type in ("ivf_flat", "ivf_pq"):
+            sweep = [(f"nprobe={v}", {"nprobe": v}) for v in NPROBE_SWEEP]
+        elif index_type == "hnsw":
+            sweep = [(f"efSearch={v}", {"ef_search": v}) for v in EF_SEARCH_SWEEP]
+
+        for label, params in sweep:
+            if params:
+                set_search_params(index, **params)
+            result = evaluate_index(index, embeddings, k=5, n_queries=args.queries)
+            print(f"{index_type:<10} {label:<14} {result['recall_at_k']:>9.3f} "
+                  f"{result['latency_ms']:>10.3f} {result['flat_latency_ms']:>9.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,107 @@
+"""
+Metadata Lookup Benchmark for Art Guide System
+Measures the per-query cost of turning FAISS results into result records:
+the previous pandas path (row lookup, copy, distance column, top-1 row and
+to_dict) against the columnar MetadataStore, with the FAISS search itself
+as a reference.
+
+Usage:
+    python scripts/benchmark_metadata.py                    # models/metadata.parquet
+    python scripts/benchmark_metadata.py --synthetic 50000  # synthetic catalog
+
+Authors: AlBeSa Team
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.catalog import load_metadata, lookup
+from artguide.metadata_store import MetadataStore
+
+META_PATH = "models/metadata.parquet"
+DIMENSION = 512
+
+
+def synthetic_metadata(n, seed=0):
+    """Catalog-shaped metadata with a few dozen artists and periods."""
+    rng = np.random.default_rng(seed)
+    artists = [f"Artist {i}" for i in range(40)]
+    periods = [f"Period {i}" for i in range(12)]
+    return pd.DataFrame({
+        "artwork_id": np.arange(n),
+        "artist": [artists[i] for i in rng.integers(0, len(artists), n)],
+        "title": [f"Artwork {i}" for i in range(n)],
+        "period": [periods[i] for i in rng.integers(0, len(periods), n)],
+        "image_path": [f"data/artworks/artwork_{i}.jpg" for i in range(n)],
+    })
+
+
+def pandas_lookup(metadata, D, I):
+    """The DataFrame path used before the metadata store."""
+    results = lookup(metadata, I[0]).copy()
+    results["distance"] = D[0][I[0] >= 0]
+    top1 = results.iloc[0]
+    top1.get("title", "Unknown")
+    return results[["artist", "title", "period", "distance"]].to_dict(orient="records")
+
+
+def store_lookup(store, D, I):
+    """The MetadataStore path."""
+    records = store.records(I[0], D[0])
+    records[0].get("title", "Unknown")
+    return records
+
+
+def time_per_query(fn, queries):
+    """Mean microseconds per call over the query list."""
+    start = time.perf_counter()
+    for args in queries:
+        fn(*args)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main(argv=None):
+    """Print per-query lookup overhead before and after."""
+    parser = argparse.ArgumentParser(description="Compare pandas vs columnar metadata lookup per query.")
+    parser.add_argument("--synthetic", type=int, default=None,
+                        help="Benchmark a synthetic catalog with this many artworks")
+    parser.add_argument("--queries", type=int, default=2000, help="Number of queries")
+    parser.add_argument("-k", type=int, default=5, help="Results per query")
+    args = parser.parse_args(argv)
+
+    metadata = load_metadata(META_PATH) if args.synthetic is None else synthetic_metadata(args.synthetic)
+    metadata.index = metadata["artwork_id"].to_numpy()
+    store = MetadataStore.from_frame(metadata)
+
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((len(metadata), DIMENSION)).astype("float32")
+    index = faiss.IndexIDMap2(faiss.IndexFlatL2(DIMENSION))
+    index.add_with_ids(vectors, metadata.index.to_numpy())
+    query_vectors = vectors[rng.integers(0, len(vectors), args.queries)]
+    searches = [index.search(q.reshape(1, -1), args.k) for q in query_vectors]
+
+    search_us = time_per_query(lambda q: index.search(q.reshape(1, -1), args.k), [(q,) for q in query_vectors])
+    pandas_us = time_per_query(lambda D, I: pandas_lookup(metadata, D, I), searches)
+    store_us = time_per_query(lambda D, I: store_lookup(store, D, I), searches)
+
+    print("=" * 60)
+    print(f"Art Guide - Metadata Lookup Benchmark ({len(metadata)} artworks, k={args.k})")
+    print("=" * 60)
+    print(f"{'FAISS flat search':<26} {search_us:>10.1f} us/query")
+    print(f"{'pandas lookup':<26} {pandas_us:>10.1f} us/query")
+    print(f"{'MetadataStore.records':<26} {store_us:>10.1f} us/query")
+    print(f"\nSpeedup: {pandas_us / store_us:.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,106 @@
+"""
+Preprocessing Benchmark for Art Guide System
+Compares CLIPProcessor (full-resolution decode) with the fast preprocessing
+path in artguide/preprocess.py (JPEG draft-mode decode + vectorized NumPy)
+on large phone-camera sized JPEGs.
+
+Reports per-image time for both paths and pixel-level parity; with --embed
+it also loads CLIP and reports the embedding cosine similarity.
+
+Usage:
+    python scripts/benchmark_preprocess.py [--size 4032 3024] [--repeats 5] [--embed]
+
+Authors: AlBeSa Team
+"""
+
+import io
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.preprocess import FastClipPreprocessor
+
+DATA_DIR = "data/artworks"
+
+
+def make_phone_photos(size, count):
+    """Upscale catalog images to phone-photo resolution and encode them as JPEG bytes."""
+    photos = []
+    for path in sorted(Path(DATA_DIR).rglob("*.jpg"))[:count]:
+        img = Image.open(path).convert("RGB").resize(size, Image.BICUBIC)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=90)
+        photos.append(buf.getvalue())
+    return photos
+
+
+def time_per_image(fn, photos, repeats):
+    """Average milliseconds per image for fn(list of freshly opened images)."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for data in photos:
+            fn([Image.open(io.BytesIO(data))])
+    return (time.perf_counter() - start) / (repeats * len(photos)) * 1000
+
+
+def main(argv=None):
+    """Run the preprocessing benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark CLIP image preprocessing.")
+    parser.add_argument("--size", type=int, nargs=2, default=[4032, 3024], help="Photo width height")
+    parser.add_argument("--count", type=int, default=5, help="Number of photos")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes over all photos")
+    parser.add_argument("--embed", action="store_true", help="Also compare CLIP embeddings")
+    args = parser.parse_args(argv)
+
+    from transformers import CLIPProcessor
+    from artguide.embedding import CLIP_MODEL_NAME
+
+    print("=" * 70)
+    print("Art Guide - Preprocessing Benchmark")
+    print("=" * 70)
+
+    processor = CLIPProcessor.from_pretrained(CLIP_MODEL_NAME)
+    fast = FastClipPreprocessor.from_clip_processor(processor)
+
+    photos = make_phone_photos(tuple(args.size), args.count)
+    if not photos:
+        print(f"Error: No images found in {DATA_DIR}!")
+        return 1
+    print(f"Photos: {len(photos)} x {args.size[0]}x{args.size[1]} JPEG\n")
+
+    def clip_path(images):
+        return processor(images=[img.convert("RGB") for img in images], return_tensors="np")["pixel_values"]
+
+    clip_ms = time_per_image(clip_path, photos, args.repeats)
+    fast_ms = time_per_image(fast, photos, args.repeats)
+
+    reference = np.concatenate([clip_path([Image.open(io.BytesIO(d))]) for d in photos])
+    candidate = np.concatenate([fast([Image.open(io.BytesIO(d))]) for d in photos])
+    diff = np.abs(reference - candidate)
+
+    print(f"CLIPProcessor:  {clip_ms:8.1f} ms/image")
+    print(f"Fast path:      {fast_ms:8.1f} ms/image  ({clip_ms / fast_ms:.1f}x faster, "
+          f"{(1 - fast_ms / clip_ms) * 100:.0f}% of preprocessing time removed)")
+    print(f"Pixel diff:     mean {diff.mean():.4f}, max {diff.max():.4f} (normalized units)")
+
+    if args.embed:
+        import torch
+        from artguide.embedding import load_clip_model, embed_pixel_values
+        model, _, device = load_clip_model()
+        ref_emb = embed_pixel_values(torch.from_numpy(reference), model, device)
+        fast_emb = embed_pixel_values(torch.from_numpy(candidate), model, device)
+        cosines = np.sum(ref_emb * fast_emb, axis=1)
+        print(f"Embedding cosine: min {cosines.min():.4f}, mean {cosines.mean():.4f}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,81 @@
+"""
+Compressed Index + Re-ranking Benchmark for Art Guide System
+Builds the compressed index types (pq, binary, ivf_pq) over a synthetic
+catalog and reports, next to the exact flat index:
+- private RAM per worker (the index itself; the float16 embedding store
+  used for re-ranking is memory-mapped and shared by all workers)
+- per-query search latency
+- recall@5 against the flat index
+for several re-rank factors (candidates fetched per result; 0 = the
+compressed ranking as is).
+
+Usage:
+    python scripts/benchmark_rerank.py
+    python scripts/benchmark_rerank.py --synthetic 1000000 --factors 0 10 50
+
+Authors: AlBeSa Team
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.indexing import build_faiss_index, evaluate_index
+from artguide.rerank import RerankIndex
+from artguide.store import EmbeddingStore
+from benchmark_index import synthetic_embeddings
+
+COMPRESSED_TYPES = ["pq", "binary", "ivf_pq"]
+FACTOR_SWEEP = [0, 5, 10, 20]
+
+
+def index_megabytes(index):
+    """Size of the serialized index (what a worker holds in RAM)."""
+    return len(faiss.serialize_index(index)) / 1e6
+
+
+def main(argv=None):
+    """Print memory, latency and recall@5 of compressed indexes with and without re-ranking."""
+    parser = argparse.ArgumentParser(description="Compare compressed indexes + exact re-ranking with the flat index.")
+    parser.add_argument("--synthetic", type=int, default=100_000, help="Synthetic catalog size")
+    parser.add_argument("--types", nargs="+", choices=COMPRESSED_TYPES, default=COMPRESSED_TYPES,
+                        help="Compressed index types to build")
+    parser.add_argument("--factors", nargs="+", type=int, default=FACTOR_SWEEP,
+                        help="Re-rank factors (candidates per result, 0 = no re-ranking)")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    args = parser.parse_args(argv)
+
+    embeddings = synthetic_embeddings(args.synthetic)
+    ids = np.arange(len(embeddings), dtype="int64")
+    store = EmbeddingStore(ids, embeddings.astype("float16"))
+
+    print("=" * 70)
+    print(f"Art Guide - Compressed Index Benchmark ({len(embeddings)} vectors)")
+    print("=" * 70)
+    print(f"float16 embedding store (mmap, shared by all workers): {store.vectors.nbytes / 1e6:.1f} MB")
+    print(f"{'index':<8} {'rerank':>7} {'RAM MB':>8} {'recall@5':>9} {'ms/query':>10}")
+
+    flat = build_faiss_index(embeddings, "flat", ids=ids)
+    result = evaluate_index(flat, embeddings, k=5, n_queries=args.queries)
+    print(f"{'flat':<8} {'-':>7} {index_megabytes(flat):>8.1f} {result['recall_at_k']:>9.3f} "
+          f"{result['latency_ms']:>10.3f}")
+
+    for index_type in args.types:
+        index = build_faiss_index(embeddings, index_type, ids=ids)
+        megabytes = index_megabytes(index)
+        for factor in args.factors:
+            searcher = RerankIndex(index, store, factor) if factor else index
+            result = evaluate_index(searcher, embeddings, k=5, n_queries=args.queries)
+            print(f"{index_type:<8} {factor or '-':>7} {megabytes:>8.1f} {result['recall_at_k']:>9.3f} "
+                  f"{result['latency_ms']:>10.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
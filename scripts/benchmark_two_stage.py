@@ -0,0 +1,88 @@
+"""
+Two-Stage Retrieval Benchmark for Art Guide System
+Compares coarse-to-fine search (per-group centroids, then an exact scan of
+the best groups) with the exact flat FAISS scan for growing synthetic
+catalogs, reporting recall@5 against the flat scan and per-query latency
+for several numbers of groups searched. Recall is measured for photos of
+catalog artworks (catalog vectors plus noise) and for unseen images drawn
+from the same distribution, whose neighbours are more often spread over
+several artists.
+
+Synthetic catalogs mimic the real one: artworks cluster by artist, with
+sub-clusters (series, motifs) inside each artist.
+
+Usage:
+    python scripts/benchmark_two_stage.py
+    python scripts/benchmark_two_stage.py --sizes 10000 100000 1000000 --groups 200
+
+Authors: AlBeSa Team
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.coarse import TwoStageIndex
+from artguide.indexing import evaluate_index, recall_at_k
+
+DIMENSION = 512
+N_GROUPS_SWEEP = [1, 2, 4, 8]
+
+
+def synthetic_catalog(n, n_groups, n_unseen=0, artist_spread=0.2, dimension=DIMENSION, seed=0):
+    """
+    Normalized embeddings clustered by group (artist) and sub-cluster.
+
+    All artists share a common direction (as CLIP embeddings of paintings
+    do); `artist_spread` sets how far apart the artists are around it.
+
+    Returns:
+        tuple: (embeddings, groups, unseen) - `unseen` holds n_unseen extra
+               images from the same distribution that are not in the catalog
+    """
+    rng = np.random.default_rng(seed)
+    common = rng.standard_normal(dimension).astype("float32")
+    artists = common + artist_spread * rng.standard_normal((n_groups, dimension)).astype("float32")
+    motifs = artists.repeat(8, axis=0) + 0.4 * rng.standard_normal((n_groups * 8, dimension)).astype("float32")
+    motif = rng.integers(0, len(motifs), n + n_unseen)
+    x = motifs[motif] + 0.9 * rng.standard_normal((n + n_unseen, dimension)).astype("float32")
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x[:n], motif[:n] // 8, x[n:]
+
+
+def main(argv=None):
+    """Print recall@5 and latency of two-stage search vs the flat scan per catalog size."""
+    parser = argparse.ArgumentParser(description="Two-stage (centroid) search vs flat scan.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Catalog sizes to benchmark")
+    parser.add_argument("--groups", type=int, default=50, help="Number of artists (groups)")
+    parser.add_argument("--queries", type=int, default=300, help="Number of queries")
+    parser.add_argument("--artist-spread", type=float, default=0.2,
+                        help="Separation of the synthetic artists (smaller = harder for two-stage search)")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print(f"Art Guide - Two-Stage Retrieval Benchmark ({args.groups} groups)")
+    print("=" * 70)
+    print(f"{'catalog':>9} {'groups':>7} {'recall@5':>9} {'unseen':>7} {'ms/query':>10} {'flat ms':>9}")
+    for n in args.sizes:
+        embeddings, groups, unseen = synthetic_catalog(n, args.groups, args.queries, args.artist_spread)
+        baseline = faiss.IndexFlatL2(DIMENSION)
+        baseline.add(embeddings)
+        for n_groups in N_GROUPS_SWEEP:
+            coarse = TwoStageIndex.build(embeddings, np.arange(n), groups, n_groups=n_groups)
+            result = evaluate_index(coarse, embeddings, k=5, n_queries=args.queries)
+            unseen_recall = recall_at_k(coarse, baseline, unseen, k=5)
+            print(f"{n:>9} {n_groups:>7} {result['recall_at_k']:>9.3f} {unseen_recall:>7.3f} "
+                  f"{result['latency_ms']:>10.3f} {result['flat_latency_ms']:>9.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,166 @@
+"""
+Incremental Catalog Updates for Art Guide System
+Adds, deletes and replaces artworks in models/faiss.index and
+models/metadata.parquet by stable artwork ID, embedding only the images
+that changed, and writes a new version of models/manifest.json.
+
+Usage:
+    python scripts/ingest.py sync                                # add new files under data/artworks/, drop removed ones
+    python scripts/ingest.py add data/artworks/Monet/new.jpg     # artist from the parent directory
+    python scripts/ingest.py add scan.jpg --artist-key Monet --title "Water Lilies" --location "Room 3"
+    python scripts/ingest.py delete 17 42
+    python scripts/ingest.py replace 17 data/artworks/Monet/better_scan.jpg
+
+Authors: AlBeSa Team
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.catalog import Catalog
+from artguide.coarse import TwoStageIndex, centroids_path, coarse_settings
+from artguide.dedup import ALIASES_COLUMN, split_aliases
+from artguide.embedding import BatchEmbeddingPipeline, DEFAULT_BATCH_SIZE, load_clip_model
+from artguide.preprocess import check_catalog_preprocessor
+from prepare_dataset import ARTIST_INFO, DATA_DIR, INDEX_FILE, METADATA_FILE, artwork_record, collect_artworks
+
+
+def embed_paths(paths, batch_size=DEFAULT_BATCH_SIZE, num_workers=0):
+    """
+    Embed image files with CLIP.
+
+    Returns:
+        tuple: (embeddings, valid_indices) as returned by BatchEmbeddingPipeline.run
+    """
+    if not paths:
+        return None, []
+    model, processor, device = load_clip_model()
+    pipeline = BatchEmbeddingPipeline(model, processor, device, batch_size=batch_size, num_workers=num_workers)
+    return pipeline.run([str(p) for p in paths])
+
+
+def record_for(path, artist_key=None, title=None, location=None):
+    """Metadata row for an image, with the artist taken from its directory unless given."""
+    artist_key = artist_key or Path(path).parent.name
+    if artist_key not in ARTIST_INFO:
+        raise ValueError(f"Unknown artist '{artist_key}' for {path} (use --artist-key, one of {sorted(ARTIST_INFO)})")
+    record = artwork_record(path, artist_key, location)
+    if title:
+        record['title'] = title
+    return record
+
+
+def add_artworks(catalog, records, batch_size, num_workers):
+    """Embed and append artworks; returns the new IDs."""
+    embeddings, valid = embed_paths([r['image_path'] for r in records], batch_size, num_workers)
+    if not valid:
+        return []
+    return list(catalog.add(embeddings, [records[i] for i in valid]))
+
+
+def sync(catalog, data_dir, batch_size, num_workers):
+    """Add images that are not in the catalog yet and delete artworks whose file is gone."""
+    known = set(catalog.metadata['image_path'])
+    if ALIASES_COLUMN in catalog.metadata:
+        # Copies collapsed by prepare_dataset.py are already represented by their canonical artwork
+        known.update(path for value in catalog.metadata[ALIASES_COLUMN] for path in split_aliases(value))
+    on_disk = collect_artworks(data_dir)
+    new_records = [a for a in on_disk if a['image_path'] not in known]
+    disk_paths = {a['image_path'] for a in on_disk}
+    missing = catalog.metadata.index[~catalog.metadata['image_path'].isin(disk_paths)]
+
+    deleted = catalog.delete(missing)
+    added = add_artworks(catalog, new_records, batch_size, num_workers)
+    return added, deleted
+
+
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Incrementally update the Art Guide catalog.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Images per CLIP forward pass (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Preprocessing worker processes (default: 0, in-process)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser("sync", help="Mirror the catalog to the artwork directory")
+    sync_parser.add_argument("--data-dir", default=DATA_DIR, help=f"Artwork directory (default: {DATA_DIR})")
+
+    add_parser = commands.add_parser("add", help="Add image files")
+    add_parser.add_argument("paths", nargs="+", help="Image files")
+    add_parser.add_argument("--artist-key", choices=sorted(ARTIST_INFO), default=None,
+                            help="Artist (default: the image's parent directory name)")
+    add_parser.add_argument("--title", default=None, help="Title (default: from the file name)")
+    add_parser.add_argument("--location", default=None, help="Gallery (default: the artist's gallery)")
+
+    delete_parser = commands.add_parser("delete", help="Delete artworks by ID")
+    delete_parser.add_argument("ids", nargs="+", type=int, help="Artwork IDs")
+
+    replace_parser = commands.add_parser("replace", help="Replace an artwork's image, keeping its ID")
+    replace_parser.add_argument("id", type=int, help="Artwork ID")
+    replace_parser.add_argument("path", help="New image file")
+    replace_parser.add_argument("--artist-key", choices=sorted(ARTIST_INFO), default=None,
+                                help="Artist (default: the image's parent directory name)")
+    replace_parser.add_argument("--title", default=None, help="Title (default: from the file name)")
+    replace_parser.add_argument("--location", default=None, help="Gallery (default: the artist's gallery)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Apply one catalog update and write a new manifest version."""
+    args = parse_args(argv)
+
+    if not (os.path.exists(INDEX_FILE) and os.path.exists(METADATA_FILE)):
+        print(f"Error: {INDEX_FILE} / {METADATA_FILE} not found. Run scripts/prepare_dataset.py first.")
+        return 1
+
+    start = time.time()
+    catalog = Catalog.load(INDEX_FILE, METADATA_FILE)
+    print(f"Loaded catalog version {catalog.version} ({catalog.index.ntotal} artworks)")
+    try:
+        # New embeddings must be preprocessed like the ones already in the catalog
+        check_catalog_preprocessor(catalog.manifest)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.command == "sync":
+        added, deleted = sync(catalog, args.data_dir, args.batch_size, args.workers)
+        summary = f"added {len(added)}, deleted {deleted}"
+    elif args.command == "add":
+        records = [record_for(p, args.artist_key, args.title, args.location) for p in args.paths]
+        added = add_artworks(catalog, records, args.batch_size, args.workers)
+        summary = f"added {len(added)} (IDs {added})"
+    elif args.command == "delete":
+        deleted = catalog.delete(args.ids)
+        summary = f"deleted {deleted}"
+    else:
+        if args.id not in catalog.metadata.index:
+            print(f"Error: Unknown artwork ID {args.id}")
+            return 1
+        embeddings, valid = embed_paths([args.path], args.batch_size, args.workers)
+        if not valid:
+            print(f"Error: Could not embed {args.path}")
+            return 1
+        catalog.replace(args.id, embeddings[0], record_for(args.path, args.artist_key, args.title, args.location))
+        summary = f"replaced {args.id}"
+
+    manifest = catalog.save(f"{args.command}: {summary}")
+    coarse_params = coarse_settings()
+    if catalog.embeddings is not None and coarse_params["group_column"] in catalog.metadata.columns:
+        # Keep the two-stage search centroids in step with the catalog
+        TwoStageIndex.build(catalog.embeddings, catalog.metadata.index,
+                            catalog.metadata[coarse_params["group_column"]], **coarse_params).save(centroids_path())
+    print(f"\n✓ Catalog version {manifest['version']}: {summary} "
+          f"({manifest['ntotal']} artworks, {time.time() - start:.1f}s)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
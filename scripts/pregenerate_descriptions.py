@@ -0,0 +1,211 @@
+"""
+Description Pre-generation for Art Guide System
+Generates the tour-guide description of every artwork in
+models/metadata.parquet ahead of time and appends it to
+models/descriptions.jsonl, which app.py and the AI server read before
+calling the LLM - catalog items are then answered without an LLM
+round-trip. Run it after scripts/prepare_dataset.py / scripts/ingest.py.
+
+Requests run on a bounded thread pool and are retried with exponential
+backoff. Finished descriptions are flushed one by one, so an interrupted
+or partially failed run resumes where it stopped when started again.
+
+Usage:
+    python scripts/pregenerate_descriptions.py                     # Gemini (GOOGLE_API_KEY)
+    python scripts/pregenerate_descriptions.py --concurrency 8 --retries 5
+    python scripts/pregenerate_descriptions.py --mock --mock-failure-rate 0.2   # offline test run
+
+Authors: AlBeSa Team
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.catalog import ID_COLUMN
+from artguide.config import get_setting
+from artguide.description_cache import DESCRIPTION_MODEL, description_key, description_prompt
+from artguide.description_store import append_descriptions, descriptions_path, read_descriptions
+from artguide.mock_llm import MockGeminiClient
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+
+
+def catalog_artworks(metadata):
+    """
+    Distinct (artist, title, period) artworks of a catalog, with their cache keys.
+
+    Returns:
+        list: Dicts with key, artwork_id, artist, title, period and prompt
+    """
+    artworks = {}
+    for row in metadata.to_dict("records"):
+        artist = row.get("artist") or "Unknown Artist"
+        title = row.get("title") or "Untitled"
+        period = row.get("period") or "Unknown Period"
+        prompt = description_prompt(artist, title, period)
+        key = description_key(artist, title, period, prompt)
+        if key not in artworks:
+            artwork_id = row.get(ID_COLUMN)
+            artworks[key] = {
+                "key": key,
+                "artwork_id": int(artwork_id) if artwork_id is not None else None,
+                "artist": artist,
+                "title": title,
+                "period": period,
+                "prompt": prompt,
+            }
+    return list(artworks.values())
+
+
+def generate_with_retries(client, prompt, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Call the LLM, retrying failed calls.
+
+    Args:
+        client: Gemini client (or MockGeminiClient)
+        prompt: Prompt text
+        retries: Additional attempts after the first failure
+        backoff: Base delay in seconds; attempt n waits backoff * 2**n (plus jitter)
+
+    Returns:
+        str: The description
+
+    Raises:
+        Exception: The last error once all attempts failed
+    """
+    for attempt in range(retries + 1):
+        try:
+            text = client.models.generate_content(model=DESCRIPTION_MODEL, contents=prompt).text
+            if not text:
+                raise ValueError("empty response")
+            return text
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def pregenerate(client, artworks, output_path, concurrency=DEFAULT_CONCURRENCY,
+                retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF):
+    """
+    Generate and append the descriptions missing from output_path.
+
+    Args:
+        client: Gemini client (or MockGeminiClient)
+        artworks: Output of catalog_artworks
+        output_path: descriptions.jsonl to resume from and append to
+        concurrency: Parallel LLM requests
+        retries: Retries per artwork
+        backoff: Base retry delay in seconds
+
+    Returns:
+        dict: Counts of generated, skipped (already present) and failed artworks
+              and the failed keys
+    """
+    existing = read_descriptions(output_path)
+    todo = [artwork for artwork in artworks if artwork["key"] not in existing]
+    stats = {"generated": 0, "skipped": len(artworks) - len(todo), "failed": 0, "failed_keys": []}
+    if not todo:
+        return stats
+
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {
+            pool.submit(generate_with_retries, client, artwork["prompt"], retries, backoff): artwork
+            for artwork in todo
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            artwork = futures[future]
+            try:
+                description = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                stats["failed_keys"].append(artwork["key"])
+                print(f"  ✗ {artwork['artist']} - {artwork['title']}: {e}")
+                continue
+            append_descriptions(output_path, [{
+                "key": artwork["key"],
+                "artwork_id": artwork["artwork_id"],
+                "artist": artwork["artist"],
+                "title": artwork["title"],
+                "period": artwork["period"],
+                "model": DESCRIPTION_MODEL,
+                "created": time.time(),
+                "description": description,
+            }])
+            stats["generated"] += 1
+            if done % 25 == 0 or done == len(todo):
+                print(f"  {done}/{len(todo)} done ({time.time() - start:.1f}s)")
+    return stats
+
+
+def gemini_client():
+    """Gemini client from GOOGLE_API_KEY / GEMINI_API_KEY (None if unavailable)."""
+    api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        return None
+    try:
+        from google import genai
+    except ImportError:
+        print("Warning: google-genai not installed.")
+        return None
+    return genai.Client(api_key=api_key)
+
+
+def main(argv=None):
+    """Pre-generate the catalog's descriptions."""
+    parser = argparse.ArgumentParser(description="Generate descriptions for every catalog artwork ahead of time.")
+    parser.add_argument("--meta", default=get_setting("index", "meta_path", "models/metadata.parquet"),
+                        help="Catalog metadata")
+    parser.add_argument("--output", default=None, help="Descriptions file (default: descriptions.jsonl next to --meta)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Parallel LLM requests")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="Retries per artwork")
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF, help="Base retry delay in seconds")
+    parser.add_argument("--limit", type=int, default=None, help="Only the first N artworks (test runs)")
+    parser.add_argument("--mock", action="store_true", help="Use the local mock LLM instead of Gemini")
+    parser.add_argument("--mock-latency", type=float, default=0.5, help="Mock LLM seconds per call")
+    parser.add_argument("--mock-failure-rate", type=float, default=0.0, help="Mock LLM share of failing calls")
+    args = parser.parse_args(argv)
+
+    print("=" * 70)
+    print("Art Guide - Description Pre-generation")
+    print("=" * 70)
+
+    if not os.path.exists(args.meta):
+        print(f"Error: {args.meta} not found. Run scripts/prepare_dataset.py first.")
+        return 1
+    output_path = args.output or descriptions_path(args.meta)
+
+    client = MockGeminiClient(args.mock_latency, args.mock_failure_rate) if args.mock else gemini_client()
+    if client is None:
+        print("Error: GOOGLE_API_KEY not set. Set it or use --mock.")
+        return 1
+
+    artworks = catalog_artworks(pd.read_parquet(args.meta))[:args.limit]
+    print(f"{len(artworks)} artworks, {'mock LLM' if args.mock else DESCRIPTION_MODEL}, "
+          f"concurrency {args.concurrency}, {args.retries} retries -> {output_path}")
+
+    start = time.time()
+    stats = pregenerate(client, artworks, output_path, args.concurrency, args.retries, args.backoff)
+    print(f"\nGenerated {stats['generated']}, already present {stats['skipped']}, "
+          f"failed {stats['failed']} in {time.time() - start:.1f}s")
+    if stats["failed"]:
+        print("Re-run the command to retry the failed artworks (finished ones are kept).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
 """
 Dataset Preparation Script for Art Guide System
 Processes artwork images from data/artworks/ and creates:
-1. FAISS vector index with CLIP embeddings
-2. Metadata parquet file with artwork information
+1. FAISS vector index with CLIP embeddings (near-duplicate images collapsed)
+2. Metadata parquet file with artwork information (copies listed in `aliases`)
+3. Optionally (--shards N), the same catalog split into N shard catalogs
 
 Based on Task 2 requirements: Using Kaggle art datasets (Best Artworks of All Time)
 curated into a subset for exhibition scenario.
@@ -12,17 +13,24 @@ Authors: AlBeSa Team
 
 import os
 import sys
+import argparse
 from pathlib import Path
 import numpy as np
 import pandas as pd
-from PIL import Image
-import torch
-from transformers import CLIPProcessor, CLIPModel
-import faiss
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from artguide.catalog import Catalog, ID_COLUMN, load_manifest, manifest_path_for
+from artguide.coarse import TwoStageIndex, centroids_path, coarse_settings
+from artguide.dedup import ALIASES_COLUMN, collapse_duplicates, dedup_threshold, split_aliases
+from artguide.embedding import BatchEmbeddingPipeline, DEFAULT_BATCH_SIZE, load_clip_model
+from artguide.indexing import INDEX_TYPES, build_faiss_index, evaluate_index, index_settings
+from artguide.rerank import with_rerank
+from artguide.sharding import shard_count, shards_dir, write_shards
+from artguide.store import EmbeddingStore, embedding_dtype
+from artguide.zero_shot import ZeroShotClassifier, text_embeddings_path
+
 # Configuration
 DATA_DIR = "data/artworks"
 OUTPUT_DIR = "models"
@@ -30,55 +38,39 @@ INDEX_FILE = f"{OUTPUT_DIR}/faiss.index"
 METADATA_FILE = f"{OUTPUT_DIR}/metadata.parquet"
 
 # Artist metadata (periods can be refined based on actual data)
+# location: gallery the artist's works hang in (used as a search filter)
 ARTIST_INFO = {
-    "Da_Vinci": {"full_name": "Leonardo da Vinci", "period": "Renaissance", "years": "1452-1519"},
-    "Monet": {"full_name": "Claude Monet", "period": "Impressionism", "years": "1840-1926"},
-    "Picasso": {"full_name": "Pablo Picasso", "period": "Cubism/Modern", "years": "1881-1973"},
-    "Rembrandt": {"full_name": "Rembrandt van Rijn", "period": "Dutch Golden Age", "years": "1606-1669"},
-    "Van_Gogh": {"full_name": "Vincent van Gogh", "period": "Post-Impressionism", "years": "1853-1890"}
+    "Da_Vinci": {"full_name": "Leonardo da Vinci", "period": "Renaissance", "years": "1452-1519", "location": "Room 1"},
+    "Monet": {"full_name": "Claude Monet", "period": "Impressionism", "years": "1840-1926", "location": "Room 3"},
+    "Picasso": {"full_name": "Pablo Picasso", "period": "Cubism/Modern", "years": "1881-1973", "location": "Room 5"},
+    "Rembrandt": {"full_name": "Rembrandt van Rijn", "period": "Dutch Golden Age", "years": "1606-1669", "location": "Room 2"},
+    "Van_Gogh": {"full_name": "Vincent van Gogh", "period": "Post-Impressionism", "years": "1853-1890", "location": "Room 4"}
 }
 
-def load_clip_model():
-    """Load CLIP model for generating embeddings."""
-    print("Loading CLIP model...")
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"Using device: {device}")
-    
-    model = CLIPModel.from_pretrained("openai/clip-vit-base-patch32").to(device)
-    processor = CLIPProcessor.from_pretrained("openai/clip-vit-base-patch32")
-    
-    return model, processor, device
-
-
-def generate_embedding(image_path, model, processor, device):
+def artwork_record(img_file, artist_key, location=None):
     """
-    Generate CLIP embedding for an image.
+    Metadata row for one artwork image.
     
     Args:
-        image_path: Path to image file
-        model: CLIP model
-        processor: CLIP processor
-        device: torch device (cuda/cpu)
+        img_file: Path to the image (the file stem becomes the title)
+        artist_key: Key into ARTIST_INFO (the artist directory name)
+        location: Gallery the artwork hangs in (default: the artist's gallery)
         
     Returns:
-        numpy array of shape (512,) normalized to unit length
+        dict with artist, artist_key, period, years, location, title, image_path, filename
     """
-    try:
-        img = Image.open(image_path).convert("RGB")
-        inputs = processor(images=img, return_tensors="pt").to(device)
-        
-        with torch.no_grad():
-            embedding = model.get_image_features(**inputs)
-        
-        # Convert to numpy and normalize (L2 norm)
-        embedding = embedding.cpu().numpy().astype("float32").flatten()
-        embedding /= np.linalg.norm(embedding)
-        
-        return embedding
-    
-    except Exception as e:
-        print(f"Error processing {image_path}: {e}")
-        return None
+    img_file = Path(img_file)
+    artist_info = ARTIST_INFO[artist_key]
+    return {
+        'artist': artist_info['full_name'],
+        'artist_key': artist_key,
+        'period': artist_info['period'],
+        'years': artist_info['years'],
+        'location': location or artist_info['location'],
+        'title': img_file.stem.replace('_', ' ').title(),
+        'image_path': str(img_file),
+        'filename': img_file.name
+    }
 
 
 def collect_artworks(data_dir):
@@ -113,85 +105,137 @@ def collect_artworks(data_dir):
         print(f"  {artist_info['full_name']}: {len(image_files)} images")
         
         for img_file in image_files:
-            artworks.append({
-                'artist': artist_info['full_name'],
-                'artist_key': artist_key,
-                'period': artist_info['period'],
-                'years': artist_info['years'],
-                'title': img_file.stem.replace('_', ' ').title(),
-                'image_path': str(img_file),
-                'filename': img_file.name
-            })
+            artworks.append(artwork_record(img_file, artist_key))
     
     print(f"\nTotal artworks found: {len(artworks)}")
     return artworks
 
 
-def build_index(artworks, model, processor, device):
+def build_index(artworks, model, processor, device, batch_size=DEFAULT_BATCH_SIZE, num_workers=None,
+                index_type=None, dedup_threshold=None):
     """
     Build FAISS index from artwork images.
     
+    Images are decoded and preprocessed by worker processes and embedded
+    in batches of `batch_size` (one CLIP forward pass per batch). Images
+    whose embeddings are near-duplicates (cosine similarity above the
+    dedup threshold) are collapsed into one artwork before indexing. The
+    index type (flat / ivf_flat / ivf_pq / pq / binary / hnsw) comes from
+    settings.yaml; for approximate indexes recall@5 against the exact flat
+    index is reported (for compressed ones also after exact re-ranking).
+    
     Args:
         artworks: List of artwork dicts
         model: CLIP model
         processor: CLIP processor
         device: torch device
+        batch_size: Number of images per forward pass
+        num_workers: Number of preprocessing processes (0 = main process only,
+                     None = one per CPU core minus one)
+        index_type: Override for settings.yaml index.type (one of INDEX_TYPES)
+        dedup_threshold: Override for settings.yaml index.dedup_threshold (0 = keep all copies)
         
     Returns:
-        tuple: (faiss_index, metadata_df)
+        tuple: (faiss_index, metadata_df, embeddings, dedup_report) - embeddings in metadata row order
     """
-    print("\nGenerating CLIP embeddings...")
-    
-    embeddings = []
-    valid_artworks = []
+    pipeline = BatchEmbeddingPipeline(
+        model, processor, device,
+        batch_size=batch_size,
+        num_workers=num_workers
+    )
+    print(f"\nGenerating CLIP embeddings (batch size {batch_size}, preprocess {pipeline.preprocess})...")
     
-    for i, artwork in enumerate(artworks):
-        if (i + 1) % 10 == 0:
-            print(f"  Processed {i + 1}/{len(artworks)} images...")
-        
-        embedding = generate_embedding(artwork['image_path'], model, processor, device)
-        
-        if embedding is not None:
-            embeddings.append(embedding)
-            valid_artworks.append(artwork)
+    embeddings_array, valid_indices = pipeline.run([a['image_path'] for a in artworks])
+    valid_artworks = [artworks[i] for i in valid_indices]
     
-    print(f"Successfully generated {len(embeddings)} embeddings")
+    print(f"Successfully generated {len(valid_artworks)} embeddings")
     
-    # Convert to numpy array
-    embeddings_array = np.array(embeddings, dtype='float32')
+    # Collapse copies of the same painting fetched from different sources
+    dedup = collapse_duplicates(embeddings_array, valid_artworks, dedup_threshold)
+    embeddings_array, valid_artworks = dedup.embeddings, dedup.records
+    report = dedup.report
+    print(f"Near-duplicates: {report['collapsed']} copies in {report['clusters']} clusters collapsed, "
+          f"{report['before']} -> {report['after']} artworks ({report['shrink']:.1%} smaller)")
+    ids = np.arange(len(valid_artworks), dtype="int64")  # stable artwork IDs
+    for artwork_id, artwork in zip(ids, valid_artworks):
+        for alias in split_aliases(artwork[ALIASES_COLUMN]):
+            print(f"  Dropped {alias} as a copy of artwork {artwork_id} ({artwork['image_path']})")
     
     # Build FAISS index (L2 distance, but embeddings are normalized so it's equivalent to cosine)
-    print("\nBuilding FAISS index...")
+    params = index_settings()
+    if index_type:
+        params["index_type"] = index_type
+    print(f"\nBuilding FAISS index ({params['index_type']})...")
     dimension = embeddings_array.shape[1]  # Should be 512 for CLIP
-    index = faiss.IndexFlatL2(dimension)
-    index.add(embeddings_array)
+    index = build_faiss_index(embeddings_array, ids=ids, **params)
     
     print(f"  Index built with {index.ntotal} vectors of dimension {dimension}")
+    if params["index_type"] != "flat":
+        quality = evaluate_index(index, embeddings_array, k=5)
+        print(f"  recall@5 vs flat: {quality['recall_at_k']:.3f} "
+              f"({quality['latency_ms']:.3f} ms/query vs {quality['flat_latency_ms']:.3f} ms flat)")
+    searcher = with_rerank(index, EmbeddingStore(ids, embeddings_array.astype(embedding_dtype())))
+    if searcher is not index:
+        quality = evaluate_index(searcher, embeddings_array, k=5)
+        print(f"  recall@5 with {searcher.factor}x re-ranking: {quality['recall_at_k']:.3f} "
+              f"({quality['latency_ms']:.3f} ms/query)")
     
     # Create metadata DataFrame
     metadata_df = pd.DataFrame(valid_artworks)
+    metadata_df.insert(0, ID_COLUMN, ids)
     
-    return index, metadata_df
+    return index, metadata_df, embeddings_array, report
 
 
-def save_outputs(index, metadata_df, index_file, metadata_file):
-    """Save FAISS index and metadata to disk."""
-    os.makedirs(os.path.dirname(index_file), exist_ok=True)
+def save_outputs(index, metadata_df, index_file, metadata_file, embeddings=None, dedup_report=None):
+    """Save FAISS index, metadata, embedding store and a new manifest version to disk."""
+    manifest_path = manifest_path_for(index_file)
+    catalog = Catalog(
+        index, metadata_df, index_file, metadata_file, load_manifest(manifest_path), manifest_path, embeddings
+    )
     
-    print(f"\nSaving FAISS index to {index_file}...")
-    faiss.write_index(index, index_file)
-    
-    print(f"Saving metadata to {metadata_file}...")
-    metadata_df.to_parquet(metadata_file, index=False)
+    print(f"\nSaving FAISS index to {index_file} and metadata to {metadata_file}...")
+    changes = {"added": len(metadata_df), "deleted": 0, "replaced": 0}
+    if dedup_report:
+        changes["duplicates_collapsed"] = dedup_report["collapsed"]
+    manifest = catalog.save("rebuild", changes=changes)
     
     print("\n✓ Dataset preparation complete!")
+    print(f"  - Catalog version: {manifest['version']}")
     print(f"  - FAISS index: {index.ntotal} vectors")
+    print(f"  - Embedding store: {manifest['embedding_store']}")
     print(f"  - Metadata: {len(metadata_df)} artworks")
+    if dedup_report:
+        saved_bytes = dedup_report["collapsed"] * index.d * 4
+        print(f"  - Near-duplicates collapsed: {dedup_report['collapsed']} "
+              f"({dedup_report['shrink']:.1%} of the images, ~{saved_bytes / 1024:.0f} KB of float32 vectors)")
     print(f"  - Artists: {metadata_df['artist'].nunique()}")
 
 
-def main():
+def parse_args(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Build the Art Guide FAISS index and metadata.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Images per CLIP forward pass (default: {DEFAULT_BATCH_SIZE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Preprocessing worker processes (default: CPU cores - 1, 0 = no workers)")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=None,
+                        help="FAISS index type (default: index.type in settings.yaml)")
+    parser.add_argument("--shards", type=int, default=None,
+                        help="Also write the catalog split into N shards for scatter-gather search "
+                             "(default: sharding.shards in settings.yaml, 0 = no shards)")
+    parser.add_argument("--shard-by", default=None,
+                        help="Metadata column to partition by, e.g. a museum column (default: artwork_id modulo N)")
+    parser.add_argument("--dedup-threshold", type=float, default=None,
+                        help="Cosine similarity above which images are collapsed as copies of one artwork "
+                             f"(default: index.dedup_threshold in settings.yaml or {dedup_threshold()}, 0 = keep all)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+    
     print("=" * 70)
     print("Art Guide - Dataset Preparation")
     print("=" * 70)
@@ -203,7 +247,9 @@ def main():
         return 1
     
     # Load CLIP model
+    print("Loading CLIP model...")
     model, processor, device = load_clip_model()
+    print(f"Using device: {device}")
     
     # Collect artwork files
     artworks = collect_artworks(DATA_DIR)
@@ -213,10 +259,36 @@ def main():
         return 1
     
     # Build FAISS index
-    index, metadata_df = build_index(artworks, model, processor, device)
+    index, metadata_df, embeddings, dedup_report = build_index(
+        artworks, model, processor, device,
+        batch_size=args.batch_size,
+        num_workers=args.workers,
+        index_type=args.index_type,
+        dedup_threshold=args.dedup_threshold
+    )
     
     # Save outputs
-    save_outputs(index, metadata_df, INDEX_FILE, METADATA_FILE)
+    save_outputs(index, metadata_df, INDEX_FILE, METADATA_FILE, embeddings, dedup_report)
+    
+    # Partition into shard catalogs (models/shards/shard_<i>/) for distributed/shard_server.py
+    n_shards = shard_count() if args.shards is None else args.shards
+    if n_shards > 0:
+        params = index_settings()
+        if args.index_type:
+            params["index_type"] = args.index_type
+        layout = write_shards(embeddings, metadata_df, n_shards, shards_dir(), key_column=args.shard_by, **params)
+        print(f"  - Shards: {layout['shards']} in {shards_dir()} ({layout['partition']}), "
+              f"artworks per shard {layout['counts']}")
+    
+    # Per-artist centroids for two-stage (coarse-to-fine) search
+    coarse_params = coarse_settings()
+    coarse = TwoStageIndex.build(embeddings, metadata_df[ID_COLUMN], metadata_df[coarse_params["group_column"]],
+                                 **coarse_params)
+    print(f"Saving {len(coarse.labels)} '{coarse.group_column}' centroids to {coarse.save(centroids_path())}")
+    
+    # Encode the zero-shot artist/period prompts once, next to the index
+    classifier = ZeroShotClassifier.build(metadata_df, model, processor, device)
+    print(f"Saving {len(classifier.prompts)} zero-shot text embeddings to {classifier.save(text_embeddings_path())}")
     
     # Display summary statistics
     print("\n" + "=" * 70)
@@ -0,0 +1,53 @@
+"""
+Publish a Catalog Version to the AI Servers
+Sends a reload control message on the Redis channel artguide:control so
+every running distributed/ai_server.py loads the current models/faiss.index
+and metadata in the background and swaps them in between requests. Run it
+after scripts/prepare_dataset.py or scripts/ingest.py.
+
+Usage:
+    python scripts/publish_index.py
+    REDIS_HOST=redis.internal python scripts/publish_index.py --force   # reload even if the version is unchanged
+
+Authors: AlBeSa Team
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+import redis
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from artguide.catalog import load_manifest, manifest_path_for
+from artguide.reload import CONTROL_CHANNEL, publish_reload
+
+INDEX_FILE = os.getenv('INDEX_PATH', 'models/faiss.index')
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+
+
+def main(argv=None):
+    """Publish the manifest version on the control channel."""
+    parser = argparse.ArgumentParser(description="Tell all AI servers to hot-reload the catalog.")
+    parser.add_argument("--force", action="store_true",
+                        help="Reload even on workers already serving this version")
+    args = parser.parse_args(argv)
+
+    manifest = load_manifest(manifest_path_for(INDEX_FILE))
+    if not manifest:
+        print(f"Warning: No manifest next to {INDEX_FILE}; workers will reload unconditionally")
+    version = None if args.force else manifest.get("version")
+
+    client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=0)
+    receivers = publish_reload(client, version)
+    print(f"✓ Published catalog version {manifest.get('version', 'unknown')} on {CONTROL_CHANNEL} "
+          f"({receivers} worker(s) listening)")
+    return 0
+
+
+if __name__ == '__main__':
+    exit(main())
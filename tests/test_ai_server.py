@@ -0,0 +1,160 @@
+"""
+Unit tests for the AI server's micro-batching and responses (distributed/ai_server.py).
+
+The CLIP weights are replaced by stubs, so the module imports without
+downloading the model; search and description generation are stubbed per
+test.
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+from unittest import mock
+
+# Add parent and distributed directories to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "distributed"))
+
+SERVER_ENV = {
+    "INDEX_PATH": os.path.join(ROOT, "models", "missing.index"),
+    "META_PATH": os.path.join(ROOT, "models", "missing.parquet"),
+    "PREPROCESS": "clip",
+    "EMBED_BACKEND": "pytorch",
+    "DESCRIPTION_CACHE": "none",
+    "COALESCE": "none",
+    "DESCRIPTION_BUDGET": "0",
+    "INDEX_SHARDS": "0",
+    "ZERO_SHOT": "false",
+    "DESCRIPTION_WORKERS": "4",
+}
+
+
+class StubModel:
+    """Stands in for CLIPModel.from_pretrained (never called by these tests)."""
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+
+def setUpModule():
+    global ai_server
+    with mock.patch.dict(os.environ, SERVER_ENV), \
+            mock.patch("transformers.CLIPModel.from_pretrained", return_value=StubModel()), \
+            mock.patch("transformers.CLIPProcessor.from_pretrained", return_value=object()):
+        import ai_server
+
+
+class ListRedis:
+    """In-process stand-in for the Redis LPOP used by collect_batch."""
+
+    def __init__(self, items=()):
+        self.items = list(items)
+
+    def lpop(self, key):
+        return self.items.pop(0) if self.items else None
+
+
+class TestCollectBatch(unittest.TestCase):
+    """collect_batch drains the queue up to the batch size or the wait window."""
+
+    def collect(self, queued, max_size, max_wait_ms):
+        with mock.patch.object(ai_server, "redis_client", ListRedis(queued)):
+            return ai_server.collect_batch(b"first", max_size, max_wait_ms)
+
+    def test_stops_at_max_size(self):
+        batch = self.collect([b"a", b"b", b"c"], max_size=3, max_wait_ms=50)
+        self.assertEqual(batch, [b"first", b"a", b"b"])
+
+    def test_stops_after_wait_window(self):
+        start = time.time()
+        batch = self.collect([b"a"], max_size=8, max_wait_ms=20)
+        self.assertEqual(batch, [b"first", b"a"])
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_single_request(self):
+        self.assertEqual(self.collect([], max_size=8, max_wait_ms=0), [b"first"])
+
+
+class TestProcessBatch(unittest.TestCase):
+    """process_batch sends each response once its own description is ready."""
+
+    def tasks(self, delays):
+        """search_batch stub: one task per request, finishing after its delay."""
+        def task(request_id, delay):
+            time.sleep(delay)
+            return {"request_id": request_id, "status": "success"}
+
+        def search_batch(batch_requests, k=5):
+            return [lambda r=r, d=d: task(r["request_id"], d) for r, d in zip(batch_requests, delays)]
+        return search_batch
+
+    def test_fast_response_not_blocked_by_slow_one(self):
+        requests = [{"request_id": "slow"}, {"request_id": "fast"}]
+        sent = []
+        slow_done = threading.Event()
+
+        def on_response(response):
+            sent.append((response["request_id"], slow_done.is_set()))
+            if response["request_id"] == "slow":
+                slow_done.set()
+
+        with mock.patch.object(ai_server, "search_batch", self.tasks([0.5, 0.0])):
+            responses = ai_server.process_batch(requests, on_response=on_response)
+
+        # fast was sent before the slow description finished
+        self.assertEqual(sent, [("fast", False), ("slow", False)])
+        self.assertEqual([r["request_id"] for r in responses], ["slow", "fast"])
+
+    def test_descriptions_run_concurrently(self):
+        requests = [{"request_id": f"req_{i}"} for i in range(4)]
+        start = time.time()
+        with mock.patch.object(ai_server, "search_batch", self.tasks([0.3] * 4)):
+            responses = ai_server.process_batch(requests)
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual([r["request_id"] for r in responses], [f"req_{i}" for i in range(4)])
+
+    def test_errors_pass_through_and_failures_become_error_responses(self):
+        requests = [{"request_id": "bad"}, {"request_id": "boom"}]
+        error = ai_server.error_response("bad", "Invalid image", "Could not decode image.")
+
+        def failing():
+            raise RuntimeError("llm down")
+
+        with mock.patch.object(ai_server, "search_batch", lambda batch, k=5: [error, failing]):
+            responses = ai_server.process_batch(requests)
+
+        self.assertEqual(responses[0], error)
+        self.assertEqual(responses[1]["request_id"], "boom")
+        self.assertEqual(responses[1]["status"], "error")
+
+
+class TestBuildResponse(unittest.TestCase):
+    """Zero-shot artist overrides do not keep the neighbour's title."""
+
+    RESULTS = [
+        {"artist": "Claude Monet", "title": "Water Lilies", "period": "Impressionism", "distance": 0.2},
+        {"artist": "Vincent van Gogh", "title": "Starry Night", "period": "Post-Impressionism", "distance": 0.4},
+    ]
+
+    def build(self, prediction):
+        with mock.patch.object(ai_server, "generate_description", lambda artist, title, period: f"{artist}: {title}"):
+            return ai_server.build_response("req_1", self.RESULTS, False, prediction)
+
+    def test_title_from_neighbour_by_predicted_artist(self):
+        response = self.build({"artist": {"label": "Vincent van Gogh", "score": 0.9}})
+        self.assertEqual((response["artist"], response["title"]), ("Vincent van Gogh", "Starry Night"))
+        self.assertEqual(response["description"], "Vincent van Gogh: Starry Night")
+
+    def test_title_cleared_without_such_neighbour(self):
+        response = self.build({"artist": {"label": "Pablo Picasso", "score": 0.9}})
+        self.assertEqual((response["artist"], response["title"]), ("Pablo Picasso", "Unknown"))
+
+
+if __name__ == "__main__":
+    unittest.main()
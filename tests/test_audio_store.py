@@ -0,0 +1,89 @@
+"""
+Unit tests for the narration audio store (artguide/audio_store.py).
+"""
+
+import unittest
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.audio_store import AudioStore, audio_key
+
+
+def writer(size, calls):
+    """Fake gTTS: writes `size` bytes and counts calls."""
+    def write(path):
+        calls.append(path)
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+    return write
+
+
+class TestAudioStore(unittest.TestCase):
+    """Content-addressed narration files."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_narration_is_synthesized_once(self):
+        store = AudioStore(self.directory)
+        calls = []
+        first = store.get_or_synthesize("Water Lilies", "en", writer(100, calls))
+        second = store.get_or_synthesize("Water Lilies", "en", writer(100, calls))
+        self.assertEqual(first, second)
+        self.assertTrue(os.path.exists(first))
+        self.assertEqual(len(calls), 1)
+        stats = store.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (1, 1, 0.5))
+
+    def test_texts_and_languages_get_their_own_files(self):
+        store = AudioStore(self.directory)
+        calls = []
+        paths = {
+            store.get_or_synthesize("Water Lilies", "en", writer(100, calls)),
+            store.get_or_synthesize("Starry Night", "en", writer(100, calls)),
+            store.get_or_synthesize("Water Lilies", "fr", writer(100, calls)),
+        }
+        self.assertEqual(len(paths), 3)
+        self.assertNotEqual(audio_key("Water Lilies", "en"), audio_key("Water Lilies", "fr"))
+
+    def test_least_recently_used_files_are_evicted(self):
+        store = AudioStore(self.directory, max_bytes=250)
+        calls = []
+        old = store.get_or_synthesize("one", "en", writer(100, calls))
+        time.sleep(0.01)
+        used = store.get_or_synthesize("two", "en", writer(100, calls))
+        time.sleep(0.01)
+        store.get(audio_key("one", "en"))  # "one" is now the most recently used
+        time.sleep(0.01)
+        new = store.get_or_synthesize("three", "en", writer(100, calls))
+        self.assertTrue(os.path.exists(old))
+        self.assertFalse(os.path.exists(used))
+        self.assertTrue(os.path.exists(new))
+        self.assertEqual(store.stats()["evictions"], 1)
+        self.assertLessEqual(store.stats()["bytes"], 250)
+
+    def test_failed_synthesis_stores_nothing(self):
+        store = AudioStore(self.directory)
+
+        def failing(path):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+            raise RuntimeError("gTTS: connection reset")
+
+        with self.assertRaises(RuntimeError):
+            store.get_or_synthesize("Water Lilies", "en", failing)
+        self.assertEqual(store.stats()["files"], 0)
+        self.assertIsNone(store.get(audio_key("Water Lilies", "en")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the embedding backends (artguide/backends.py).
+
+A tiny randomly initialized CLIP model stands in for the real weights, so
+nothing is downloaded.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import torch
+from transformers import CLIPConfig, CLIPModel
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide import backends
+from artguide.backends import (
+    ONNX_AVAILABLE, TorchBackend, TorchDynamicQuantBackend, backend_from_settings, create_backend, parity_check
+)
+
+
+def tiny_clip(seed=0):
+    """Randomly initialized CLIP with a 2-layer vision tower (224px input, 16-d embeddings)."""
+    torch.manual_seed(seed)
+    config = CLIPConfig(
+        text_config={"hidden_size": 32, "intermediate_size": 64, "num_hidden_layers": 1,
+                     "num_attention_heads": 2, "vocab_size": 100, "max_position_embeddings": 16},
+        vision_config={"hidden_size": 32, "intermediate_size": 64, "num_hidden_layers": 2,
+                       "num_attention_heads": 2, "image_size": 224, "patch_size": 32},
+        projection_dim=16,
+    )
+    return CLIPModel(config).eval()
+
+
+class TestBackendSelection(unittest.TestCase):
+    """model.backend / EMBED_BACKEND picks the backend."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = tiny_clip()
+
+    def test_selected_from_settings(self):
+        for name, cls in (("pytorch", TorchBackend), ("torch_int8", TorchDynamicQuantBackend)):
+            with mock.patch.dict(os.environ, {"EMBED_BACKEND": name}):
+                backend = backend_from_settings(self.model)
+            self.assertIsInstance(backend, cls)
+            self.assertEqual(backend.name, name)
+
+    def test_unknown_backend_rejected(self):
+        with mock.patch.dict(os.environ, {"EMBED_BACKEND": "tensorrt"}):
+            with self.assertRaises(ValueError):
+                backend_from_settings(self.model)
+
+    def test_falls_back_to_pytorch_without_onnxruntime(self):
+        with mock.patch.object(backends, "ONNX_AVAILABLE", False), tempfile.TemporaryDirectory() as onnx_dir:
+            backend = create_backend("onnx_fp32", self.model, onnx_dir=onnx_dir)
+            self.assertEqual(os.listdir(onnx_dir), [])
+        self.assertIsInstance(backend, TorchBackend)
+        self.assertEqual(backend.name, "pytorch")
+
+    @unittest.skipUnless(ONNX_AVAILABLE, "onnxruntime not installed")
+    def test_onnx_backend_uses_thread_count(self):
+        with tempfile.TemporaryDirectory() as onnx_dir:
+            backend = create_backend("onnx_fp32", self.model, onnx_dir=onnx_dir, num_threads=2)
+            self.assertTrue(os.path.exists(os.path.join(onnx_dir, "clip_vision_fp32.onnx")))
+        self.assertEqual(backend.name, "onnx_fp32")
+        self.assertEqual(backend.session.get_session_options().intra_op_num_threads, 2)
+
+
+class TestParityCheck(unittest.TestCase):
+    """parity_check compares a backend's embeddings with the fp32 reference."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = tiny_clip()
+        cls.reference = TorchBackend(cls.model)
+        cls.pixel_values = np.random.default_rng(0).standard_normal((4, 3, 224, 224)).astype("float32")
+
+    def test_reference_passes(self):
+        passed, min_cosine = parity_check(self.reference, self.reference, self.pixel_values)
+        self.assertTrue(passed)
+        self.assertAlmostEqual(min_cosine, 1.0, places=5)
+
+    def test_mismatching_backend_flagged(self):
+        other = TorchBackend(tiny_clip(seed=1))
+        passed, min_cosine = parity_check(other, self.reference, self.pixel_values)
+        self.assertFalse(passed)
+        self.assertLess(min_cosine, backends.PARITY_THRESHOLD)
+
+    @unittest.skipUnless(ONNX_AVAILABLE, "onnxruntime not installed")
+    def test_onnx_export_matches_reference(self):
+        with tempfile.TemporaryDirectory() as onnx_dir:
+            backend = create_backend("onnx_fp32", self.model, onnx_dir=onnx_dir)
+            passed, min_cosine = parity_check(backend, self.reference, self.pixel_values)
+        self.assertTrue(passed, f"min cosine {min_cosine:.4f}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Unit tests for the description latency budget (artguide/budget.py).
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.budget import LatencyBudget, latency_budget_from_settings
+
+
+def slow(text, seconds):
+    def fn():
+        time.sleep(seconds)
+        return text
+    return fn
+
+
+class TestLatencyBudget(unittest.TestCase):
+    """Waiting for a computation at most the budget."""
+
+    def test_fast_result_is_returned(self):
+        budget = LatencyBudget(0.5)
+        self.assertEqual(budget.run("r1", slow("Water Lilies", 0.01)), "Water Lilies")
+        self.assertEqual(budget.stats()["in_budget"], 1)
+        self.assertIsNone(budget.fetch("r1"))  # the caller already has it
+
+    def test_slow_result_finishes_in_the_background(self):
+        budget = LatencyBudget(0.05)
+        completed = threading.Event()
+        published = []
+
+        def on_complete(text, error):
+            published.append((text, error))
+            completed.set()
+
+        start = time.time()
+        self.assertIsNone(budget.run("r2", slow("Water Lilies", 0.3), on_complete))
+        self.assertLess(time.time() - start, 0.2)
+        self.assertEqual(budget.fetch("r2"), {"status": "pending"})
+
+        self.assertTrue(completed.wait(2))
+        self.assertEqual(published, [("Water Lilies", None)])
+        self.assertEqual(budget.fetch("r2"), {"status": "complete", "text": "Water Lilies"})
+        self.assertEqual(budget.stats()["deferred"], 1)
+        self.assertEqual(budget.stats()["completed_late"], 1)
+
+    def test_background_failure_is_reported(self):
+        budget = LatencyBudget(0.01)
+        completed = threading.Event()
+
+        def failing():
+            time.sleep(0.1)
+            raise RuntimeError("LLM down")
+
+        self.assertIsNone(budget.run("r3", failing, lambda text, error: completed.set()))
+        self.assertTrue(completed.wait(2))
+        self.assertEqual(budget.fetch("r3"), {"status": "error", "message": "LLM down"})
+        self.assertEqual(budget.stats()["failed"], 1)
+
+    def test_stream_announces_the_placeholder_then_continues(self):
+        budget = LatencyBudget(0.05)
+
+        def chunks():
+            time.sleep(0.2)
+            yield "Water "
+            yield "Lilies"
+
+        self.assertEqual(list(budget.stream("r4", chunks)), [None, "Water ", "Lilies"])
+
+    def test_first_chunk_within_budget_streams_without_placeholder(self):
+        budget = LatencyBudget(0.1)
+
+        def chunks():
+            yield "Water "
+            time.sleep(0.2)  # later chunks may take longer than the budget
+            yield "Lilies"
+
+        self.assertEqual(list(budget.stream("r5", chunks)), ["Water ", "Lilies"])
+
+    def test_zero_budget_disables(self):
+        os.environ["DESCRIPTION_BUDGET"] = "0"
+        try:
+            self.assertIsNone(latency_budget_from_settings())
+        finally:
+            del os.environ["DESCRIPTION_BUDGET"]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Unit tests for the incrementally updatable catalog (artguide/catalog.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+import faiss
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.catalog import Catalog, ID_COLUMN, load_metadata, lookup
+from artguide.indexing import build_faiss_index
+
+
+def random_embeddings(n, seed=0, dimension=32):
+    """Normalized random vectors."""
+    x = np.random.default_rng(seed).standard_normal((n, dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def rows(n, start=0):
+    """Metadata rows with distinct titles."""
+    return [{"artist": "Claude Monet", "title": f"Artwork {start + i}", "period": "Impressionism"}
+            for i in range(n)]
+
+
+class TestCatalog(unittest.TestCase):
+    """Test add / delete / replace and the manifest."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "faiss.index")
+        self.meta_path = os.path.join(self.temp_dir, "metadata.parquet")
+        self.embeddings = random_embeddings(20)
+
+        # Legacy layout: plain flat index, metadata without IDs
+        index = faiss.IndexFlatL2(self.embeddings.shape[1])
+        index.add(self.embeddings)
+        faiss.write_index(index, self.index_path)
+        pd.DataFrame(rows(20)).to_parquet(self.meta_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def search_titles(self, catalog, query, k=1):
+        _, I = catalog.index.search(query.reshape(1, -1), k)
+        return list(lookup(catalog.metadata, I[0])["title"])
+
+    def test_legacy_catalog_gets_position_ids(self):
+        catalog = Catalog.load(self.index_path, self.meta_path)
+        self.assertEqual(list(catalog.metadata[ID_COLUMN]), list(range(20)))
+        self.assertEqual(self.search_titles(catalog, self.embeddings[7]), ["Artwork 7"])
+
+    def test_add_delete_replace_keep_ids_stable(self):
+        catalog = Catalog.load(self.index_path, self.meta_path)
+        new = random_embeddings(3, seed=1)
+        ids = catalog.add(new, rows(3, start=100))
+        self.assertEqual(list(ids), [20, 21, 22])
+        self.assertEqual(self.search_titles(catalog, new[1]), ["Artwork 101"])
+
+        self.assertEqual(catalog.delete([5, 999]), 1)
+        self.assertNotIn("Artwork 5", self.search_titles(catalog, self.embeddings[5], k=3))
+        self.assertEqual(self.search_titles(catalog, self.embeddings[6]), ["Artwork 6"])
+
+        replacement = random_embeddings(1, seed=2)[0]
+        catalog.replace(6, replacement, {"title": "Artwork 6 (rescan)"})
+        self.assertEqual(self.search_titles(catalog, replacement), ["Artwork 6 (rescan)"])
+
+        # Deleted IDs are never handed out again
+        self.assertEqual(list(catalog.add(random_embeddings(1, seed=3), rows(1))), [23])
+
+    def test_save_writes_versioned_manifest(self):
+        catalog = Catalog.load(self.index_path, self.meta_path)
+        catalog.add(random_embeddings(2, seed=1), rows(2, start=50))
+        manifest = catalog.save("add")
+        self.assertEqual(manifest["version"], 1)
+        self.assertEqual(manifest["ntotal"], 22)
+        self.assertEqual(manifest["history"][-1]["added"], 2)
+
+        reloaded = Catalog.load(self.index_path, self.meta_path)
+        reloaded.delete([0])
+        manifest = reloaded.save("delete")
+        self.assertEqual(manifest["version"], 2)
+        self.assertEqual(manifest["next_id"], 22)
+        self.assertEqual(len(load_metadata(self.meta_path)), 21)
+        self.assertEqual(faiss.read_index(self.index_path).ntotal, 21)
+
+    def test_hnsw_delete(self):
+        index = build_faiss_index(self.embeddings, "hnsw", ids=np.arange(20))
+        catalog = Catalog(index, pd.DataFrame(rows(20)), self.index_path, self.meta_path)
+        catalog.delete([3])
+        catalog.check()
+        self.assertNotIn("Artwork 3", self.search_titles(catalog, self.embeddings[3], k=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for two-stage (centroid) retrieval (artguide/coarse.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+import faiss
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.coarse import TwoStageIndex, load_two_stage
+from artguide.metadata_store import MetadataStore
+
+
+def clustered_embeddings(n_groups=4, per_group=10, dimension=32, seed=0):
+    """Normalized vectors around one centre per group; returns (embeddings, groups)."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_groups, dimension)).astype("float32")
+    groups = np.repeat(np.arange(n_groups), per_group)
+    x = centres[groups] + 0.3 * rng.standard_normal((len(groups), dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True), np.array([f"artist_{g}" for g in groups])
+
+
+class TestTwoStageIndex(unittest.TestCase):
+    """Test coarse-to-fine search against the flat scan."""
+
+    def setUp(self):
+        self.embeddings, self.groups = clustered_embeddings()
+        self.ids = np.arange(100, 140)
+        self.flat = faiss.IndexIDMap2(faiss.IndexFlatL2(32))
+        self.flat.add_with_ids(self.embeddings, self.ids)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_all_groups_equals_flat_search(self):
+        coarse = TwoStageIndex.build(self.embeddings, self.ids, self.groups)
+        queries = self.embeddings[::7]
+        D1, I1 = self.flat.search(queries, 5)
+        D2, I2 = coarse.search(queries, 5, n_groups=4)
+        np.testing.assert_array_equal(I1, I2)
+        np.testing.assert_allclose(D1, D2, atol=1e-5)
+
+    def test_one_group_finds_own_artist(self):
+        coarse = TwoStageIndex.build(self.embeddings, self.ids, self.groups, n_groups=1)
+        _, I = coarse.search(self.embeddings[12:13], 3)
+        self.assertEqual(I[0, 0], 112)
+        self.assertTrue(all(110 <= i < 120 for i in I[0]))
+
+    def test_pads_like_faiss_when_groups_are_small(self):
+        coarse = TwoStageIndex.build(self.embeddings, self.ids, self.groups, n_groups=1)
+        _, I = coarse.search(self.embeddings[:1], 15)
+        self.assertEqual(list(I[0, 10:]), [-1] * 5)
+
+    def test_saved_centroids_are_reused_until_catalog_changes(self):
+        path = os.path.join(self.temp_dir, "centroids.npz")
+        TwoStageIndex.build(self.embeddings, self.ids, self.groups).save(path)
+        vectors = dict(zip(self.ids, self.embeddings))
+        vectors_for = lambda ids: np.stack([vectors[i] for i in ids])
+        settings = {"group_column": "artist_key", "n_groups": 2}
+
+        store = MetadataStore.from_frame(pd.DataFrame({"artwork_id": self.ids, "artist_key": self.groups}))
+        coarse = load_two_stage(store, vectors_for, path, settings)
+        self.assertEqual(coarse.n_groups, 2)
+        _, I = coarse.search(self.embeddings[:1], 1)
+        self.assertEqual(I[0, 0], 100)
+
+        # Artwork 100 deleted: layout no longer matches and is recomputed
+        store = MetadataStore.from_frame(pd.DataFrame({"artwork_id": self.ids[1:], "artist_key": self.groups[1:]}))
+        coarse = load_two_stage(store, vectors_for, path, settings)
+        self.assertEqual(coarse.ntotal, 39)
+        self.assertNotIn(100, coarse.search(self.embeddings[:1], 3)[1][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
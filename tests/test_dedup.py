@@ -0,0 +1,59 @@
+"""
+Unit tests for near-duplicate collapsing (artguide/dedup.py).
+"""
+
+import unittest
+import os
+import sys
+import numpy as np
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.dedup import ALIASES_COLUMN, collapse_duplicates, dedup_threshold, duplicate_pairs, split_aliases
+
+
+def normalized(x):
+    return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype("float32")
+
+
+class TestDedup(unittest.TestCase):
+    """Test clustering of near-duplicate embeddings."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        originals = normalized(rng.standard_normal((5, 64)))
+        # Rows 5 and 6 are copies of artwork 1, row 7 a copy of artwork 3
+        copies = normalized(originals[[1, 1, 3]] + 0.02 * rng.standard_normal((3, 64)))
+        self.embeddings = np.vstack([originals, copies])
+        self.records = [{'image_path': f"img_{i}.jpg", 'title': f"Artwork {i}"} for i in range(8)]
+
+    def test_range_search_finds_copies_only(self):
+        pairs = {tuple(p) for p in duplicate_pairs(self.embeddings, 0.95, batch_size=3)}
+        self.assertEqual(pairs, {(1, 5), (1, 6), (5, 6), (3, 7)})
+
+    def test_keeps_first_of_cluster_with_aliases(self):
+        result = collapse_duplicates(self.embeddings, self.records, threshold=0.95)
+        self.assertEqual(list(result.keep), [0, 1, 2, 3, 4])
+        self.assertEqual(split_aliases(result.records[1][ALIASES_COLUMN]), ["img_5.jpg", "img_6.jpg"])
+        self.assertEqual(split_aliases(result.records[3][ALIASES_COLUMN]), ["img_7.jpg"])
+        self.assertEqual(split_aliases(result.records[0][ALIASES_COLUMN]), [])
+        np.testing.assert_array_equal(result.embeddings, self.embeddings[:5])
+        self.assertEqual(result.report, {"before": 8, "after": 5, "clusters": 2, "collapsed": 3, "shrink": 0.375})
+
+    def test_disabled_by_default(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop("DEDUP_THRESHOLD", None)
+            self.assertEqual(dedup_threshold(), 0)
+            result = collapse_duplicates(self.embeddings, self.records)
+        self.assertEqual(result.report["collapsed"], 0)
+
+    def test_zero_threshold_keeps_everything(self):
+        result = collapse_duplicates(self.embeddings, self.records, threshold=0)
+        self.assertEqual(result.report["after"], 8)
+        self.assertEqual(result.report["collapsed"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
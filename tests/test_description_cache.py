@@ -0,0 +1,168 @@
+"""
+Unit tests for the persistent description cache (artguide/description_cache.py).
+"""
+
+import unittest
+import os
+import sys
+import time
+import tempfile
+import shutil
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.description_cache import (
+    FileDescriptionCache, RedisDescriptionCache, description_key, description_prompt
+)
+
+
+class DictRedis:
+    """In-process stand-in for the Redis string / sorted-set commands used by the cache."""
+
+    def __init__(self):
+        self.values = {}
+        self.scores = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        return int(self.values.pop(key, None) is not None)
+
+    def zadd(self, key, mapping):
+        self.scores.update(mapping)
+
+    def zrem(self, key, member):
+        self.scores.pop(member, None)
+
+    def zremrangebyscore(self, key, low, high):
+        for member in [m for m, score in self.scores.items() if score <= high]:
+            del self.scores[member]
+
+    def zcard(self, key):
+        return len(self.scores)
+
+    def zpopmin(self, key, count):
+        oldest = sorted(self.scores.items(), key=lambda item: item[1])[:count]
+        for member, _ in oldest:
+            del self.scores[member]
+        return oldest
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+def key_for(title):
+    prompt = description_prompt("Claude Monet", title, "Impressionism")
+    return description_key("Claude Monet", title, "Impressionism", prompt)
+
+
+class TestDescriptionCache(unittest.TestCase):
+    """Keys, TTL, LRU eviction and the get-or-generate helper."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_key_depends_on_artwork_prompt_and_model(self):
+        prompt = description_prompt("Claude Monet", "Water Lilies", "Impressionism")
+        key = description_key("Claude Monet", "Water Lilies", "Impressionism", prompt)
+        self.assertEqual(key, key_for("Water Lilies"))
+        self.assertNotEqual(key, key_for("Impression, Sunrise"))
+        self.assertNotEqual(key, description_key("Claude Monet", "Water Lilies", "Impressionism", prompt + " Be brief."))
+        self.assertNotEqual(key, description_key("Claude Monet", "Water Lilies", "Impressionism", prompt, model="other"))
+
+    def test_file_cache_is_shared_between_instances(self):
+        calls = []
+        first = FileDescriptionCache(self.tmp_dir)
+        text = first.get_or_generate(key_for("Water Lilies"), lambda: calls.append(1) or "Welcome!")
+        second = FileDescriptionCache(self.tmp_dir)  # e.g. another worker process
+        self.assertEqual(second.get_or_generate(key_for("Water Lilies"), lambda: calls.append(1) or "Other"), text)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second.stats()["hits"], 1)
+
+    def test_failed_generation_is_not_cached(self):
+        cache = FileDescriptionCache(self.tmp_dir)
+        self.assertIsNone(cache.get_or_generate(key_for("Water Lilies"), lambda: None))
+        self.assertEqual(cache.size(), 0)
+
+    def test_expired_entries_are_misses(self):
+        cache = FileDescriptionCache(self.tmp_dir, ttl=60)
+        cache.put(key_for("Water Lilies"), "Welcome!")
+        path = cache._path(key_for("Water Lilies"))
+        with open(path, "w") as f:
+            f.write('{"description": "Welcome!", "created": %f}' % (time.time() - 120))
+        self.assertIsNone(cache.get(key_for("Water Lilies")))
+        self.assertFalse(os.path.exists(path))
+
+    def test_file_cache_evicts_least_recently_used(self):
+        cache = FileDescriptionCache(self.tmp_dir, max_items=2)
+        cache.put(key_for("A"), "a")
+        cache.put(key_for("B"), "b")
+        past = time.time() - 100
+        os.utime(cache._path(key_for("A")), (past, past))
+        os.utime(cache._path(key_for("B")), (past + 1, past + 1))
+        cache.get(key_for("A"))  # A becomes the most recently used
+        cache.put(key_for("C"), "c")
+        self.assertEqual(cache.size(), 2)
+        self.assertIsNone(cache.get(key_for("B")))
+        self.assertEqual(cache.get(key_for("A")), "a")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_redis_cache_evicts_least_recently_used(self):
+        cache = RedisDescriptionCache(DictRedis(), max_items=2)
+        cache.put(key_for("A"), "a")
+        time.sleep(0.01)
+        cache.put(key_for("B"), "b")
+        time.sleep(0.01)
+        self.assertEqual(cache.get(key_for("A")), "a")
+        time.sleep(0.01)
+        cache.put(key_for("C"), "c")
+        self.assertIsNone(cache.get(key_for("B")))
+        self.assertEqual(cache.get(key_for("C")), "c")
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_redis_cache_forgets_expired_keys(self):
+        redis = DictRedis()
+        cache = RedisDescriptionCache(redis, ttl=60, max_items=2)
+        cache.put(key_for("A"), "a")
+        cache.put(key_for("B"), "b")
+        redis.scores[key_for("A")] -= 120  # A unused for longer than the TTL...
+        del redis.values["artguide:description:" + key_for("A")]  # ...so Redis expired it
+        self.assertEqual(cache.size(), 1)
+        cache.put(key_for("C"), "c")  # fits without evicting the live B
+        self.assertEqual(cache.get(key_for("B")), "b")
+        self.assertEqual(cache.stats()["evictions"], 0)
+
+    def test_file_cache_counts_without_rescanning(self):
+        cache = FileDescriptionCache(self.tmp_dir, max_items=100)
+        cache.put(key_for("A"), "a")  # first write scans the (empty) directory
+        scans = []
+        entries = cache._entries
+        cache._entries = lambda: scans.append(1) or entries()
+        for title in ("B", "C", "D"):
+            cache.put(key_for(title), title)
+        cache.put(key_for("B"), "b again")  # overwrite: not a new entry
+        self.assertEqual(cache.stats()["size"], 4)
+        self.assertEqual(scans, [])
+
+    def test_file_cache_evicts_to_low_water_mark(self):
+        cache = FileDescriptionCache(self.tmp_dir, max_items=20)
+        for i in range(21):
+            cache.put(key_for(str(i)), str(i))
+        self.assertEqual(cache.size(), 18)  # 90% of max_items
+        self.assertEqual(len(cache._entries()), 18)
+        self.assertEqual(cache.stats()["evictions"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the batched embedding pipeline (artguide/embedding.py).
+
+Uses the tiny randomly initialized CLIP model of test_backends and the
+default CLIP image processor, so nothing is downloaded.
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image
+from transformers import CLIPImageProcessor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.embedding import BatchEmbeddingPipeline, embed_images, embed_pixel_values
+from artguide.preprocess import FastClipPreprocessor
+from tests.test_backends import tiny_clip
+
+
+class TestBatchEmbeddingPipeline(unittest.TestCase):
+    """Batched embeddings match embedding each image on its own."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = tiny_clip()
+        cls.processor = CLIPImageProcessor()
+        cls.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        cls.paths = []
+        for i, size in enumerate([(300, 200), (224, 224), (180, 320), (256, 256), (400, 300)]):
+            path = os.path.join(cls.tmp.name, f"art_{i}.png")
+            Image.fromarray(rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)).save(path)
+            cls.paths.append(path)
+        cls.broken = os.path.join(cls.tmp.name, "broken.jpg")
+        with open(cls.broken, "wb") as f:
+            f.write(b"not an image")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def per_image(self, paths):
+        rows = []
+        for path in paths:
+            with Image.open(path) as img:
+                rows.append(embed_images([img.convert("RGB")], self.model, self.processor, "cpu")[0])
+        return np.stack(rows)
+
+    def test_matches_per_image_embedding(self):
+        expected = self.per_image(self.paths)
+        for num_workers in (0, 2):
+            pipeline = BatchEmbeddingPipeline(self.model, self.processor, "cpu", batch_size=2, num_workers=num_workers)
+            embeddings, valid_indices = pipeline.run(self.paths)
+            self.assertEqual(valid_indices, list(range(len(self.paths))))
+            np.testing.assert_allclose(embeddings, expected, atol=1e-5, err_msg=f"num_workers={num_workers}")
+
+    def test_fast_preprocessing_matches_query_path(self):
+        # Catalog and queries must be preprocessed the same way (model.preprocess: fast)
+        fast = FastClipPreprocessor.from_clip_processor(self.processor)
+        expected = []
+        for path in self.paths:
+            with Image.open(path) as img:
+                expected.append(embed_pixel_values(fast([img]), self.model, "cpu")[0])
+        pipeline = BatchEmbeddingPipeline(self.model, self.processor, "cpu", batch_size=2, num_workers=2,
+                                          preprocess="fast")
+        embeddings, _ = pipeline.run(self.paths)
+        np.testing.assert_allclose(embeddings, np.stack(expected), atol=1e-5)
+
+    def test_unreadable_images_skipped(self):
+        paths = self.paths[:2] + [self.broken] + self.paths[2:3]
+        pipeline = BatchEmbeddingPipeline(self.model, self.processor, "cpu", batch_size=2, num_workers=0)
+        embeddings, valid_indices = pipeline.run(paths)
+        self.assertEqual(valid_indices, [0, 1, 3])
+        np.testing.assert_allclose(embeddings, self.per_image(self.paths[:3]), atol=1e-5)
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            BatchEmbeddingPipeline(self.model, self.processor, "cpu", batch_size=0)
+        with self.assertRaises(ValueError):
+            BatchEmbeddingPipeline(self.model, self.processor, "cpu", preprocess="bicubic")
+
+
+if __name__ == '__main__':
+    unittest.main()
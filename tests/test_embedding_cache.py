@@ -0,0 +1,112 @@
+"""
+Unit tests for the content-addressed embedding cache (artguide/embedding_cache.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.embedding_cache import EmbeddingCache, image_digest
+
+
+def random_embedding(seed):
+    """Create a normalized (1, 512) embedding."""
+    emb = np.random.default_rng(seed).standard_normal((1, 512)).astype("float32")
+    return emb / np.linalg.norm(emb)
+
+
+class TestImageDigest(unittest.TestCase):
+    """Test content hashing of images."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "photo.jpg")
+        Image.new("RGB", (64, 64), color="red").save(self.path, format="JPEG")
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_same_content_same_key(self):
+        """Test that identical images produce the same key."""
+        a = Image.new("RGB", (32, 32), color="blue")
+        b = Image.new("RGB", (32, 32), color="blue")
+        self.assertEqual(image_digest(a), image_digest(b))
+    
+    def test_different_content_different_key(self):
+        """Test that different images produce different keys."""
+        a = Image.new("RGB", (32, 32), color="blue")
+        b = Image.new("RGB", (32, 32), color="green")
+        self.assertNotEqual(image_digest(a), image_digest(b))
+    
+    def test_opened_file_matches_uploaded_bytes(self):
+        """Test that an undecoded file image hashes like its raw bytes (sample vs upload)."""
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self.assertEqual(image_digest(Image.open(self.path)), image_digest(data))
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    """Test memory and disk tiers of the embedding cache."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+    
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted."""
+        cache = EmbeddingCache(max_items=10)
+        calls = []
+        compute = lambda: calls.append(1) or random_embedding(0)
+        
+        first = cache.get_or_compute("key", compute)
+        second = cache.get_or_compute("key", compute)
+        
+        self.assertEqual(len(calls), 1, "Second lookup should not recompute")
+        np.testing.assert_array_equal(first, second)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = EmbeddingCache(max_items=2)
+        cache.put("a", random_embedding(1))
+        cache.put("b", random_embedding(2))
+        cache.get("a")  # a is now most recently used
+        cache.put("c", random_embedding(3))
+        
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"), "b should have been evicted")
+        self.assertEqual(cache.stats()["size"], 2)
+    
+    def test_disk_tier_survives_restart(self):
+        """Test that the disk tier serves entries to a new cache instance."""
+        emb = random_embedding(4)
+        EmbeddingCache(disk_dir=self.temp_dir, namespace="pytorch-fast").put("key", emb)
+        
+        restarted = EmbeddingCache(disk_dir=self.temp_dir, namespace="pytorch-fast")
+        np.testing.assert_array_equal(restarted.get("key"), emb)
+        self.assertEqual(restarted.stats()["disk_hits"], 1)
+        
+        other_backend = EmbeddingCache(disk_dir=self.temp_dir, namespace="onnx_int8-fast")
+        self.assertIsNone(other_backend.get("key"), "Namespaces should not share entries")
+    
+    def test_cached_embeddings_are_read_only(self):
+        """Test that callers cannot corrupt shared cache entries."""
+        cache = EmbeddingCache()
+        cache.put("key", random_embedding(5))
+        with self.assertRaises(ValueError):
+            cache.get("key")[0, 0] = 0.0
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
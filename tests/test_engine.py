@@ -0,0 +1,79 @@
+"""
+Unit tests for the lazily initialized recognition engine (artguide/engine.py).
+"""
+
+import unittest
+import os
+import sys
+import threading
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.engine import ArtGuideEngine
+
+
+class TestLazyInitialization(unittest.TestCase):
+    """Test that resources are only loaded on first use."""
+    
+    def setUp(self):
+        """Point the engine at paths that do not exist."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.engine = ArtGuideEngine(
+            os.path.join(self.temp_dir, "missing.index"),
+            os.path.join(self.temp_dir, "missing.parquet")
+        )
+    
+    def test_nothing_loaded_on_construction(self):
+        """Test that creating the engine does not load any component."""
+        for name in ["clip_model", "clip_processor", "embedding_backend", "catalog", "gemini_client"]:
+            self.assertFalse(self.engine.is_loaded(name),
+                             f"{name} should not be loaded before first use")
+        self.assertEqual(self.engine.startup_times, {})
+    
+    def test_missing_index_loads_empty_catalog(self):
+        """Test graceful degradation when no index is on disk."""
+        self.assertIsNone(self.engine.index)
+        self.assertEqual(len(self.engine.metadata), 0)
+        self.assertIn("artist", self.engine.metadata.columns)
+        self.assertIn("catalog", self.engine.startup_times,
+                      "Catalog load time should be recorded")
+        self.assertFalse(self.engine.is_loaded("clip_model"),
+                         "Loading the catalog should not load CLIP")
+    
+    def test_concurrent_first_access_loads_once(self):
+        """Test that concurrent first access runs the loader only once."""
+        calls = []
+        barrier = threading.Barrier(8)
+        
+        def loader():
+            calls.append(1)
+            return object()
+        
+        results = []
+        
+        def worker():
+            barrier.wait()
+            results.append(self.engine._get("component", loader))
+        
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(len(calls), 1, "Loader should run exactly once")
+        self.assertEqual(len(set(map(id, results))), 1, "All callers should get the same object")
+        self.assertIn("component", self.engine.startup_times)
+    
+    def test_startup_report_lists_components(self):
+        """Test that the startup report includes every timed component."""
+        self.engine.metadata
+        report = self.engine.startup_report()
+        self.assertIn("catalog", report)
+        self.assertIn("total", report)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
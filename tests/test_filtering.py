@@ -0,0 +1,115 @@
+"""
+Unit tests for metadata-filtered search (artguide/filtering.py).
+"""
+
+import unittest
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.coarse import TwoStageIndex
+from artguide.filtering import PartitionCache, filtered_search, parse_filters, search_records
+from artguide.indexing import build_faiss_index
+from artguide.metadata_store import MetadataStore
+from artguide.rerank import RerankIndex
+from artguide.store import EmbeddingStore
+
+ROOMS = ["Room 1", "Room 2", "Room 3"]
+
+
+class TestFilteredSearch(unittest.TestCase):
+    """Test that filters are applied inside the search."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        x = rng.standard_normal((120, 32)).astype("float32")
+        self.embeddings = x / np.linalg.norm(x, axis=1, keepdims=True)
+        self.ids = np.arange(500, 620, dtype="int64")
+        self.store = MetadataStore.from_frame(pd.DataFrame({
+            "artwork_id": self.ids,
+            "artist": ["Claude Monet" if i % 2 else "Pablo Picasso" for i in range(120)],
+            "period": ["Impressionism" if i % 2 else "Cubism/Modern" for i in range(120)],
+            "location": [ROOMS[i % 3] for i in range(120)],
+        }))
+        self.queries = self.embeddings[:4]
+
+    def expected(self, allowed_ids, k=5):
+        """Brute-force top-k over the allowed artworks."""
+        rows = np.searchsorted(self.ids, allowed_ids)
+        distances = ((self.embeddings[rows][None, :, :] - self.queries[:, None, :]) ** 2).sum(axis=2)
+        return np.asarray(allowed_ids)[np.argsort(distances, axis=1)[:, :k]]
+
+    def test_parse_filters(self):
+        self.assertIsNone(parse_filters({}))
+        self.assertIsNone(parse_filters({"location": " "}))
+        self.assertEqual(parse_filters({"location": "Room 2", "period": ["Impressionism", ""]}),
+                         {"location": ["Room 2"], "period": ["Impressionism"]})
+        with self.assertRaises(ValueError):
+            parse_filters({"museum": "Louvre"})
+
+    def test_matching_ids_is_case_insensitive(self):
+        ids = self.store.matching_ids({"location": ["room 2"], "artist": ["CLAUDE MONET"]})
+        self.assertEqual(list(ids), [i for i in self.ids if (i - 500) % 3 == 1 and (i - 500) % 2 == 1])
+        with self.assertRaises(ValueError):
+            self.store.matching_ids({"gallery": ["Room 2"]})
+
+    def test_selector_search_matches_brute_force(self):
+        allowed = self.store.matching_ids({"location": ["Room 2"]})
+        for index_type in ("flat", "hnsw", "ivf_flat"):
+            index = build_faiss_index(self.embeddings, index_type, nlist=1, ids=self.ids)
+            _, I = filtered_search(index, self.queries, 5, allowed)
+            np.testing.assert_array_equal(I, self.expected(allowed), err_msg=index_type)
+
+    def test_rerank_and_two_stage_respect_filters(self):
+        allowed = self.store.matching_ids({"location": ["Room 3"]})
+        pq = build_faiss_index(self.embeddings, "pq", pq_m=8, ids=self.ids)
+        rerank = RerankIndex(pq, EmbeddingStore(self.ids, self.embeddings), factor=10)
+        _, I = filtered_search(rerank, self.queries, 5, allowed)
+        np.testing.assert_array_equal(I, self.expected(allowed))
+
+        groups = self.store.column("artist")
+        coarse = TwoStageIndex.build(self.embeddings, self.ids, groups, n_groups=2)
+        _, I = filtered_search(coarse, self.queries, 5, allowed)
+        np.testing.assert_array_equal(I, self.expected(allowed))
+
+    def test_search_records_per_query_filters(self):
+        index = build_faiss_index(self.embeddings, "flat", ids=self.ids)
+        filters = [{"location": ["Room 1"]}, None, {"location": ["Room 1"]}, {"period": ["Baroque"]}]
+        results = search_records(index, self.store, self.queries, 3, filters)
+        self.assertTrue(all(r["location"] == "Room 1" for r in results[0] + results[2]))
+        self.assertEqual(results[1][0]["artwork_id"], 501)
+        self.assertEqual(results[3], [])
+
+    def test_partition_subindexes_are_cached_within_budget(self):
+        index = build_faiss_index(self.embeddings, "flat", ids=self.ids)
+        partitions = PartitionCache(self.store, EmbeddingStore(self.ids, self.embeddings.astype("float16")), max_rows=90)
+        for room in ROOMS + ROOMS[:1]:
+            results = search_records(index, self.store, self.queries, 5, [{"location": [room]}] * 4, partitions)
+            allowed = self.store.matching_ids({"location": [room]})
+            self.assertEqual([[r["artwork_id"] for r in rows] for rows in results], self.expected(allowed).tolist())
+        # 40 artworks per room: two subindexes fit the budget of 90 rows, the oldest one was evicted
+        self.assertEqual(partitions.stats, {"hits": 0, "misses": 4, "subindexes": 4, "evictions": 2})
+        self.assertIsNotNone(partitions.get({"location": ["Room 1"]}).subindex)
+        self.assertEqual(partitions.stats["hits"], 1)
+
+    def test_partition_count_is_bounded(self):
+        partitions = PartitionCache(self.store, max_entries=2)
+        # client-supplied filters that match nothing are cached too, but only the most recent ones
+        for n in range(10):
+            self.assertEqual(partitions.get({"artist": [f"Unknown {n}"]}).allowed_ids.size, 0)
+        self.assertEqual(len(partitions), 2)
+        self.assertEqual(partitions.stats["evictions"], 8)
+        partitions.get({"artist": ["Unknown 9"]})
+        self.assertEqual(partitions.stats["hits"], 1)
+
+        uncached = PartitionCache(self.store, max_entries=0)
+        uncached.get({"location": ["Room 1"]})
+        self.assertEqual(len(uncached), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
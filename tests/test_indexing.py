@@ -0,0 +1,85 @@
+"""
+Unit tests for configurable FAISS index construction (artguide/indexing.py).
+"""
+
+import unittest
+import os
+import sys
+import numpy as np
+import faiss
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.indexing import (
+    INDEX_TYPES, build_faiss_index, evaluate_index, factory_string, recall_at_k, set_search_params
+)
+
+
+def clustered_embeddings(n=2000, dimension=64, n_clusters=20, seed=0):
+    """Normalized vectors around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((n_clusters, dimension)).astype("float32")
+    x = centres[rng.integers(0, n_clusters, n)] + 0.3 * rng.standard_normal((n, dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+class TestFactoryString(unittest.TestCase):
+    """Test index descriptions for each type."""
+
+    def test_descriptions(self):
+        self.assertEqual(factory_string("flat", 1000, 512), "Flat")
+        self.assertEqual(factory_string("hnsw", 1000, 512, hnsw_m=16), "HNSW16")
+        self.assertEqual(factory_string("ivf_flat", 1000, 512, nlist=10), "IVF10,Flat")
+        self.assertEqual(factory_string("ivf_pq", 10**6, 512, nlist=4096), "IVF4096,PQ64x8")
+
+    def test_small_catalogs_stay_trainable(self):
+        # Few vectors -> few IVF cells and fewer PQ bits
+        self.assertEqual(factory_string("ivf_pq", 100, 512), "IVF2,PQ64x1")
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            factory_string("lsh", 1000, 512)
+        with self.assertRaises(ValueError):
+            factory_string("ivf_pq", 1000, 512, pq_m=60)
+
+
+class TestBuildIndex(unittest.TestCase):
+    """Test building, tuning and evaluating every index type."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.embeddings = clustered_embeddings()
+
+    def test_all_types_hold_every_vector(self):
+        for index_type in INDEX_TYPES:
+            with self.subTest(index_type=index_type):
+                index = build_faiss_index(self.embeddings, index_type, pq_m=8)
+                self.assertEqual(index.ntotal, len(self.embeddings))
+
+    def test_flat_recall_is_exact(self):
+        index = build_faiss_index(self.embeddings, "flat")
+        self.assertEqual(evaluate_index(index, self.embeddings, n_queries=50)["recall_at_k"], 1.0)
+
+    def test_more_probes_do_not_lower_recall(self):
+        index = build_faiss_index(self.embeddings, "ivf_flat")
+        baseline = faiss.IndexFlatL2(self.embeddings.shape[1])
+        baseline.add(self.embeddings)
+        queries = self.embeddings[:100]
+
+        set_search_params(index, nprobe=1)
+        low = recall_at_k(index, baseline, queries)
+        set_search_params(index, nprobe=index.nlist)
+        full = recall_at_k(index, baseline, queries)
+        self.assertGreaterEqual(full, low)
+        self.assertAlmostEqual(full, 1.0, places=2)
+
+    def test_search_params_only_apply_to_matching_index(self):
+        hnsw = build_faiss_index(self.embeddings, "hnsw")
+        self.assertEqual(set_search_params(hnsw, nprobe=8, ef_search=128), {"ef_search": 128})
+        flat = build_faiss_index(self.embeddings, "flat")
+        self.assertEqual(set_search_params(flat, nprobe=8, ef_search=128), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
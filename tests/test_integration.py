@@ -38,7 +38,8 @@ class TestEndToEndPipeline(unittest.TestCase):
                 self.assertIsNone(emb, "Should return None for both when no index")
             else:
                 # If we have results, check structure
-                self.assertIsInstance(results, pd.DataFrame)
+                self.assertIsInstance(results, list)
+                self.assertIn("distance", results[0])
         except Exception as e:
             self.fail(f"Search index should handle empty index gracefully: {e}")
     
@@ -47,13 +48,13 @@ class TestEndToEndPipeline(unittest.TestCase):
         # This should handle the case where index might not be loaded
         result = recognize(self.test_image, show_context=False)
         
-        # Result should be a tuple of (label, image, description)
+        # Result should be a tuple of (label, image, description, audio, description handle)
         self.assertIsInstance(result, tuple,
                             "Recognize should return a tuple")
-        self.assertEqual(len(result), 3,
-                        "Recognize should return 3 elements")
+        self.assertEqual(len(result), 5,
+                        "Recognize should return 5 elements")
         
-        label, img, description = result
+        label, img, description, audio, handle = result
         self.assertIsInstance(label, str, "Label should be a string")
         self.assertIsInstance(description, str, "Description should be a string")
     
@@ -61,7 +62,7 @@ class TestEndToEndPipeline(unittest.TestCase):
         """Test pipeline with context retrieval enabled."""
         result = recognize(self.test_image, show_context=True)
         
-        label, img, description = result
+        label, img, description, audio, handle = result
         self.assertIsInstance(label, str)
         self.assertIsInstance(description, str)
 
@@ -82,8 +83,8 @@ class TestUIToRetrieval(unittest.TestCase):
         # Test search (should handle gracefully even with no index)
         results, emb = search_index(uploaded_image, k=5)
         # Should return None or valid results without crashing
-        self.assertTrue(results is None or isinstance(results, pd.DataFrame),
-                       "Search should return None or DataFrame")
+        self.assertTrue(results is None or isinstance(results, list),
+                       "Search should return None or a list of records")
     
     def test_multiple_image_formats(self):
         """Test that different image formats from UI work through the pipeline."""
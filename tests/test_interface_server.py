@@ -0,0 +1,98 @@
+"""
+Unit tests for the interface server's description endpoint (distributed/interface_server.py).
+"""
+
+import unittest
+import os
+import sys
+import json
+import csv
+import tempfile
+from unittest import mock
+
+# Add parent and distributed directories to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "distributed"))
+
+import interface_server
+from artguide.budget import PENDING_DESCRIPTION_PREFIX
+from artguide.description_cache import REDIS_KEY_PREFIX
+
+
+class DictRedis:
+    """In-process stand-in for the Redis GET used by the endpoint."""
+
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key):
+        return self.values.get(key)
+
+
+class TestDescriptionEndpoint(unittest.TestCase):
+    """GET /api/description/<request_id>."""
+
+    def fetch(self, values, request_id):
+        interface_server.redis_client = DictRedis(values)
+        return interface_server.app.test_client().get(f"/api/description/{request_id}")
+
+    def test_pending_and_complete(self):
+        key = PENDING_DESCRIPTION_PREFIX + "req_1"
+        response = self.fetch({key: json.dumps({"status": "pending"}).encode()}, "req_1")
+        self.assertEqual(response.status_code, 202)
+        response = self.fetch({key: json.dumps({"status": "complete", "description": "Water Lilies"}).encode()}, "req_1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["description"], "Water Lilies")
+
+    def test_description_cache_entries_are_not_exposed(self):
+        cache_key = "ab" * 20
+        response = self.fetch({REDIS_KEY_PREFIX + cache_key: b"A cached description"}, cache_key)
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_state_is_an_error_response(self):
+        response = self.fetch({PENDING_DESCRIPTION_PREFIX + "req_2": b"not json"}, "req_2")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json["status"], "error")
+
+
+
+class TestTelemetryLog(unittest.TestCase):
+    """The telemetry CSV is prepared on the first write, not at import."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "logs", "telemetry.csv")
+        patches = [mock.patch.object(interface_server, "LOG_PATH", self.path),
+                   mock.patch.object(interface_server, "_telemetry_ready", False)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def rows(self):
+        with open(self.path, newline="") as f:
+            return list(csv.reader(f))
+
+    def test_new_log_has_ttft_column(self):
+        interface_server.log_request("req_1", "Claude Monet", 0.9, 1.2, "success", ttft=0.12345)
+        rows = self.rows()
+        self.assertEqual(rows[0], interface_server.TELEMETRY_COLUMNS)
+        self.assertEqual(rows[1][-1], "0.123")
+
+    def test_old_header_migrated_on_first_write(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w", newline="") as f:
+            f.write("timestamp,request_id,artist,confidence,response_time,status\n")
+            f.write("2025-11-20 18:39:09,req_0,Claude Monet,0.9,1.0,success\n")
+        interface_server.log_request("req_1", "N/A", 0.0, 30.0, "timeout", ttft=None)
+        interface_server.log_request("req_2", "N/A", 0.0, 2.0, "error", ttft=1.23456)
+        rows = self.rows()
+        self.assertEqual(rows[0], interface_server.TELEMETRY_COLUMNS)
+        self.assertEqual(len(rows[1]), 6)
+        self.assertEqual([rows[2][-1], rows[3][-1]], ["", "1.235"])
+        self.assertTrue(all(len(row) == 7 for row in rows[2:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
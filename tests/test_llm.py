@@ -0,0 +1,163 @@
+"""
+Unit tests for the concurrent LLM layer (artguide/llm.py).
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.description_cache import description_prompt
+from artguide.llm import CircuitBreaker, LLMClient, LLMUnavailable
+from artguide.mock_llm import MockGeminiClient
+from artguide.streaming import description_stream
+
+PROMPT = description_prompt("Claude Monet", "Water Lilies", "Impressionism")
+
+
+class CountingClient(MockGeminiClient):
+    """Mock LLM recording the peak number of concurrent calls."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active = 0
+        self.peak = 0
+        self._active_lock = threading.Lock()
+
+    def stream(self, prompt):
+        with self._active_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            yield from super().stream(prompt)
+        finally:
+            with self._active_lock:
+                self.active -= 1
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """State transitions."""
+
+    def test_opens_after_consecutive_failures_and_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.1)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        self.assertFalse(breaker.allow())
+        time.sleep(0.15)
+        self.assertEqual(breaker.state, "half_open")
+        breaker.record_failure()  # failed trial: open again
+        self.assertEqual(breaker.state, "open")
+        time.sleep(0.15)
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertEqual(breaker.opened, 2)
+
+    def test_half_open_admits_one_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.1)
+        self.assertTrue(breaker.allow())  # the trial call
+        self.assertFalse(breaker.allow())
+        breaker.release()  # the trial ended without an outcome
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        time.sleep(0.1)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+        self.assertTrue(breaker.allow())
+
+
+class TestLLMClient(unittest.TestCase):
+    """Deadlines, bounded concurrency and breaker fallback."""
+
+    def test_streams_answer(self):
+        llm = LLMClient(MockGeminiClient(chunk_words=5))
+        chunks = list(llm.stream(PROMPT))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), llm.generate(PROMPT))
+        self.assertEqual(llm.stats()["calls"], 2)
+
+    def test_stalled_call_hits_deadline(self):
+        llm = LLMClient(MockGeminiClient(latency=1.0), timeout=2.0, first_chunk_timeout=0.1)
+        start = time.time()
+        with self.assertRaises(LLMUnavailable):
+            llm.generate(PROMPT)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(llm.stats()["timeouts"], 1)
+
+    def test_concurrency_is_bounded(self):
+        client = CountingClient(latency=0.05)
+        llm = LLMClient(client, max_concurrency=2)
+        threads = [threading.Thread(target=llm.generate, args=(PROMPT,)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(client.calls, 6)
+        self.assertEqual(client.peak, 2)
+
+    def test_open_breaker_falls_back_immediately(self):
+        client = MockGeminiClient(failure_rate=1.0)
+        llm = LLMClient(client, breaker=CircuitBreaker(failure_threshold=2, reset_seconds=60))
+        for _ in range(2):
+            with self.assertRaises(RuntimeError):
+                llm.generate(PROMPT)
+        self.assertEqual(llm.stats()["state"], "open")
+
+        chunks = list(description_stream("Claude Monet", "Water Lilies", "Impressionism", llm, None, None, "Placeholder"))
+        self.assertEqual(chunks, ["Placeholder"])
+        self.assertEqual(client.calls, 2)  # the open breaker did not call the LLM
+        self.assertEqual(llm.stats()["rejected"], 1)
+
+    def test_concurrent_callers_on_half_open_breaker(self):
+        client = MockGeminiClient(latency=0.2)
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.1)
+        llm = LLMClient(client, breaker=breaker)
+        outcomes = []
+        barrier = threading.Barrier(2)
+
+        def call():
+            barrier.wait()
+            try:
+                outcomes.append(llm.generate(PROMPT))
+            except LLMUnavailable:
+                outcomes.append(None)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(client.calls, 1)  # only the trial reached the LLM
+        self.assertEqual(outcomes.count(None), 1)
+        self.assertEqual(llm.stats()["rejected"], 1)
+        self.assertEqual(breaker.state, "closed")
+
+    def test_abandoned_trial_is_given_back(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.1)
+        llm = LLMClient(MockGeminiClient(chunk_words=5), breaker=breaker)
+        stream = llm.stream(PROMPT)
+        next(stream)
+        stream.close()
+        self.assertEqual(breaker.state, "half_open")
+        self.assertTrue(llm.generate(PROMPT))
+        self.assertEqual(breaker.state, "closed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the columnar metadata store (artguide/metadata_store.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.catalog import ID_COLUMN, lookup
+from artguide.metadata_store import MetadataStore
+
+METADATA = pd.DataFrame({
+    ID_COLUMN: [3, 7, 12],
+    "artist": ["Claude Monet", "Vincent van Gogh", "Claude Monet"],
+    "title": ["Water Lilies", "Starry Night", None],
+    "period": ["Impressionism", "Post-Impressionism", "Impressionism"],
+    "year": [1906, 1889, 1872],
+})
+
+
+class TestMetadataStore(unittest.TestCase):
+    """Test record lookup by artwork ID."""
+
+    def setUp(self):
+        self.store = MetadataStore.from_frame(METADATA)
+
+    def test_records_match_pandas_lookup(self):
+        ids = np.array([12, 3, -1])
+        distances = np.array([0.1, 0.25, 3.4e38], dtype="float32")
+        records = self.store.records(ids, distances)
+
+        expected = lookup(METADATA.set_index(METADATA[ID_COLUMN]), ids)
+        self.assertEqual([r["artist"] for r in records], list(expected["artist"]))
+        self.assertEqual([r["title"] for r in records], [None, "Water Lilies"])
+        self.assertEqual(records[1]["year"], 1906)
+        self.assertIsInstance(records[1]["year"], int)
+        self.assertAlmostEqual(records[0]["distance"], 0.1, places=6)
+        self.assertEqual(len(records), 2, "-1 (missing result) should be skipped")
+
+    def test_strings_are_shared(self):
+        records = self.store.records([3, 12])
+        self.assertIs(records[0]["artist"], records[1]["artist"])
+
+    def test_unknown_id(self):
+        self.assertNotIn(5, self.store)
+        with self.assertRaises(KeyError):
+            self.store.records([3, 5])
+
+    def test_round_trip_through_parquet(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "metadata.parquet")
+            METADATA.drop(columns=[ID_COLUMN]).to_parquet(path, index=False)
+            store = MetadataStore.load(path)  # legacy file: IDs are row positions
+            self.assertEqual(store.records([1])[0]["title"], "Starry Night")
+            frame = store.to_frame()
+            self.assertEqual(list(frame.index), [0, 1, 2])
+            self.assertEqual(frame.loc[2, "artist"], "Claude Monet")
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_empty_store(self):
+        store = MetadataStore.from_frame(pd.DataFrame(columns=["artist", "title"]))
+        self.assertEqual(len(store), 0)
+        self.assertIn("artist", store.to_frame().columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
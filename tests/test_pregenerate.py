@@ -0,0 +1,82 @@
+"""
+Unit tests for offline description pre-generation
+(scripts/pregenerate_descriptions.py, artguide/description_store.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+from artguide.description_cache import description_key, description_prompt
+from artguide.description_store import DescriptionStore, read_descriptions
+from artguide.mock_llm import MockGeminiClient
+from pregenerate_descriptions import catalog_artworks, pregenerate
+
+
+def catalog(n=12):
+    return pd.DataFrame({
+        "artist": [f"Artist {i % 3}" for i in range(n)],
+        "title": [f"Painting {i}" for i in range(n)],
+        "period": ["Impressionism"] * n,
+        "artwork_id": range(n),
+    })
+
+
+class TestPregenerate(unittest.TestCase):
+    """Concurrency, retries, resume and the serving-side lookup."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmp_dir, "descriptions.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_generates_every_artwork_once(self):
+        artworks = catalog_artworks(pd.concat([catalog(), catalog()]))  # duplicate rows share a key
+        self.assertEqual(len(artworks), 12)
+        client = MockGeminiClient()
+        stats = pregenerate(client, artworks, self.output, concurrency=4, retries=0)
+        self.assertEqual(stats["generated"], 12)
+        self.assertEqual(client.calls, 12)
+        entries = read_descriptions(self.output)
+        self.assertEqual(len(entries), 12)
+        self.assertIn("Painting 5", entries[artworks[5]["key"]]["description"])
+
+    def test_retries_transient_failures(self):
+        client = MockGeminiClient(failure_rate=0.3, seed=1)
+        stats = pregenerate(client, catalog_artworks(catalog()), self.output, concurrency=3, retries=8, backoff=0)
+        self.assertEqual(stats["failed"], 0)
+        self.assertGreater(client.calls, 12)
+
+    def test_resumes_after_failures(self):
+        artworks = catalog_artworks(catalog())
+        stats = pregenerate(MockGeminiClient(failure_rate=0.5, seed=3), artworks, self.output, retries=0)
+        self.assertGreater(stats["failed"], 0)
+        with open(self.output, "a") as f:
+            f.write('{"key": "trunc')  # run killed mid-write
+
+        client = MockGeminiClient()
+        resumed = pregenerate(client, artworks, self.output, retries=0)
+        self.assertEqual(resumed["skipped"], stats["generated"])
+        self.assertEqual(client.calls, stats["failed"])
+        self.assertEqual(len(read_descriptions(self.output)), 12)
+
+    def test_store_serves_pregenerated_descriptions(self):
+        store = DescriptionStore(self.output)
+        prompt = description_prompt("Artist 1", "Painting 1", "Impressionism")
+        key = description_key("Artist 1", "Painting 1", "Impressionism", prompt)
+        self.assertIsNone(store.get(key))
+        pregenerate(MockGeminiClient(), catalog_artworks(catalog()), self.output)
+        self.assertIn("Painting 1", store.get(key))  # picked up without reopening
+
+
+if __name__ == '__main__':
+    unittest.main()
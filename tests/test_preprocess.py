@@ -0,0 +1,95 @@
+"""
+Parity tests for the fast CLIP preprocessing path (artguide/preprocess.py).
+"""
+
+import unittest
+import io
+import os
+import sys
+import numpy as np
+from PIL import Image
+from transformers import CLIPImageProcessor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.preprocess import FastClipPreprocessor, draft_for_size
+
+
+def jpeg_bytes(size):
+    """Encode a test JPEG with some structure so resizing is not trivial."""
+    width, height = size
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)
+    r = np.outer(np.ones(height), x)
+    g = np.outer(y, np.ones(width))
+    b = (r + g) / 2
+    img = Image.fromarray(np.stack([r, g, b], axis=-1).astype(np.uint8))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=95)
+    return buf.getvalue()
+
+
+class TestFastPreprocessingParity(unittest.TestCase):
+    """Compare the fast path with CLIPProcessor's image pipeline."""
+    
+    def setUp(self):
+        """Create reference and fast preprocessors with CLIP's default settings."""
+        self.reference = CLIPImageProcessor()
+        self.fast = FastClipPreprocessor.from_clip_processor(self.reference)
+    
+    def reference_pixels(self, img):
+        return self.reference(images=img.convert("RGB"), return_tensors="np")["pixel_values"]
+    
+    def test_output_layout(self):
+        """Test that the output matches CLIP's (n, 3, 224, 224) float32 layout."""
+        images = [Image.new("RGB", (300, 200)), Image.new("RGB", (200, 300))]
+        pixels = self.fast(images)
+        self.assertEqual(pixels.shape, (2, 3, 224, 224))
+        self.assertEqual(pixels.dtype, np.float32)
+    
+    def test_decoded_image_parity(self):
+        """Test exact parity with CLIPProcessor for already decoded images."""
+        for size in [(640, 480), (480, 640), (224, 224), (1000, 333)]:
+            img = Image.open(io.BytesIO(jpeg_bytes(size))).convert("RGB")
+            np.testing.assert_allclose(
+                self.fast([img]), self.reference_pixels(img), atol=1e-4,
+                err_msg=f"Fast path should match CLIPProcessor for {size}"
+            )
+    
+    def test_non_rgb_input(self):
+        """Test that grayscale and RGBA images are converted like CLIPProcessor does."""
+        for mode in ["L", "RGBA"]:
+            img = Image.new(mode, (320, 240), color=128 if mode == "L" else (10, 20, 30, 255))
+            np.testing.assert_allclose(self.fast([img]), self.reference_pixels(img), atol=1e-4)
+    
+    def test_draft_mode_parity_on_large_photo(self):
+        """Test that draft-mode decoding of a large JPEG stays close to the full decode."""
+        data = jpeg_bytes((4032, 3024))
+        expected = self.reference_pixels(Image.open(io.BytesIO(data)))
+        
+        img = Image.open(io.BytesIO(data))
+        actual = self.fast([img])
+        self.assertLess(img.size[0], 4032, "Large JPEG should be decoded at reduced scale")
+        self.assertLess(np.abs(actual - expected).mean(), 0.05,
+                        "Draft-mode pixels should be close to the full-resolution path")
+    
+    def test_draft_keeps_shortest_edge(self):
+        """Test that draft mode never decodes below the CLIP input size."""
+        img = draft_for_size(Image.open(io.BytesIO(jpeg_bytes((4032, 3024)))), 224)
+        img.load()
+        self.assertGreaterEqual(min(img.size), 224)
+    
+    def test_buffer_reuse_is_opt_in(self):
+        """Test that results are independent unless buffer reuse is enabled."""
+        red, blue = Image.new("RGB", (224, 224), "red"), Image.new("RGB", (224, 224), "blue")
+        first = self.fast([red])
+        self.fast([blue])
+        np.testing.assert_allclose(first, self.reference_pixels(red), atol=1e-4)
+        
+        reusing = FastClipPreprocessor(reuse_buffer=True)
+        self.assertIs(reusing([red]).base, reusing([blue]).base)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,72 @@
+"""
+Unit tests for the monolith's recognition pipeline under the latency budget (app.py).
+
+Search, description generation, narration and telemetry are stubbed, so
+no model is loaded.
+"""
+
+import unittest
+import os
+import sys
+import time
+import types
+from unittest import mock
+
+from PIL import Image
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from artguide.budget import LatencyBudget
+
+RESULTS = [{"artist": "Claude Monet", "title": "Water Lilies", "period": "Impressionism",
+            "image_path": None, "distance": 0.2}]
+
+
+class TestRecognizeBudget(unittest.TestCase):
+    """recognize() returns a handle for descriptions that missed the budget."""
+
+    def recognize(self, delay, budget):
+        def description_stream(artist, title, period):
+            time.sleep(delay)
+            yield f"{title} by {artist}."
+
+        patches = [
+            mock.patch.object(app, "engine", types.SimpleNamespace(latency_budget=budget)),
+            mock.patch.object(app, "search_index", lambda img, k=5: (RESULTS, None)),
+            mock.patch.object(app, "generate_description_stream", description_stream),
+            mock.patch.object(app, "generate_audio", lambda text: None),
+            mock.patch.object(app, "log_telemetry", lambda *args: None),
+            mock.patch.object(app, "zero_shot_enabled", lambda: False),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        return app.recognize(Image.new("RGB", (64, 64)), show_context=False)
+
+    def test_description_within_budget_has_no_handle(self):
+        label, _, description, _, handle = self.recognize(0.0, LatencyBudget(1.0))
+        self.assertEqual(description, "Water Lilies by Claude Monet.")
+        self.assertIsNone(handle)
+
+    def test_late_description_fetched_by_handle(self):
+        label, _, description, _, handle = self.recognize(0.3, LatencyBudget(0.05))
+        self.assertEqual(description, app.placeholder_description("Claude Monet", "Water Lilies", "Impressionism"))
+        self.assertIsNotNone(handle)
+        self.assertEqual(app.fetch_description(handle), {"status": "pending"})
+        deadline = time.time() + 5
+        while app.fetch_description(handle)["status"] == "pending" and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(app.fetch_description(handle),
+                         {"status": "complete", "text": "Water Lilies by Claude Monet."})
+        self.assertIsNone(app.fetch_description("unknown"))
+
+    def test_without_budget(self):
+        *_, handle = self.recognize(0.0, None)
+        self.assertIsNone(handle)
+        self.assertIsNone(app.fetch_description("anything"))
+
+
+if __name__ == '__main__':
+    unittest.main()
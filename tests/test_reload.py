@@ -0,0 +1,127 @@
+"""
+Unit tests for hot catalog reload (artguide/reload.py).
+"""
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.catalog import Catalog
+from artguide.indexing import build_faiss_index
+from artguide.metadata_store import MetadataStore
+from artguide.reload import (
+    CONTROL_CHANNEL, IndexWatcher, catalog_version, check_snapshot, load_snapshot,
+    parse_control_message, publish_reload
+)
+
+
+def random_embeddings(n, seed=0, dimension=32):
+    """Normalized random vectors."""
+    x = np.random.default_rng(seed).standard_normal((n, dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def rows(n, start=0):
+    return [{"artist": "Claude Monet", "title": f"Artwork {start + i}"} for i in range(n)]
+
+
+class RecordingRedis:
+    """Captures published messages."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, data):
+        self.published.append((channel, data))
+        return 2
+
+
+class TestReload(unittest.TestCase):
+    """Test loading, checking and swapping catalog versions."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "faiss.index")
+        self.meta_path = os.path.join(self.temp_dir, "metadata.parquet")
+        index = build_faiss_index(random_embeddings(10), "flat", ids=np.arange(10))
+        Catalog(index, pd.DataFrame(rows(10)), self.index_path, self.meta_path).save("rebuild")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def publish_new_version(self):
+        catalog = Catalog.load(self.index_path, self.meta_path)
+        catalog.add(random_embeddings(2, seed=1), rows(2, start=10))
+        catalog.save("add")
+
+    def test_load_snapshot(self):
+        snapshot = load_snapshot(self.index_path, self.meta_path)
+        self.assertEqual(snapshot.version, 1)
+        self.assertEqual(snapshot.index.ntotal, 10)
+        self.assertEqual(len(snapshot.embedding_store), 10)
+
+    def test_refuses_catalog_embedded_with_other_preprocessing(self):
+        manifest_path = os.path.join(self.temp_dir, "manifest.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest["preprocess"], "clip")
+        with mock.patch.dict(os.environ, {"PREPROCESS": "fast"}):
+            with self.assertRaises(ValueError):
+                load_snapshot(self.index_path, self.meta_path)
+        # Manifests written before the field was recorded: embedded with CLIPProcessor
+        del manifest["preprocess"]
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+        with mock.patch.dict(os.environ, {"PREPROCESS": "clip"}):
+            self.assertEqual(load_snapshot(self.index_path, self.meta_path).version, 1)
+
+    def test_check_rejects_mismatched_metadata(self):
+        snapshot = load_snapshot(self.index_path, self.meta_path)
+        other = MetadataStore.from_frame(pd.DataFrame({"artwork_id": np.arange(1, 11), "artist": ["x"] * 10}))
+        with self.assertRaises(ValueError):
+            check_snapshot(snapshot.index, other)
+
+    def test_watcher_loads_only_newer_versions(self):
+        watcher = IndexWatcher(lambda: load_snapshot(self.index_path, self.meta_path),
+                               lambda: catalog_version(self.index_path), current_version=1, poll_seconds=0)
+        self.assertIsNone(watcher.check())
+        self.assertIsNone(watcher.take())
+
+        self.publish_new_version()
+        watcher.check()
+        snapshot = watcher.take()
+        self.assertEqual(snapshot.version, 2)
+        self.assertEqual(len(snapshot.metadata_store), 12)
+        self.assertIsNone(watcher.take(), "A snapshot is handed out once")
+        self.assertIsNone(watcher.check(), "Version 2 is already current")
+
+    def test_failed_load_keeps_current_version(self):
+        def broken_loader():
+            raise ValueError("torn write")
+
+        watcher = IndexWatcher(broken_loader, lambda: 5, current_version=1, poll_seconds=0)
+        self.assertIsNone(watcher.check())
+        self.assertEqual(watcher.current_version, 1)
+        self.assertEqual(watcher.stats["failures"], 1)
+
+    def test_control_message_round_trip(self):
+        client = RecordingRedis()
+        self.assertEqual(publish_reload(client, version=3), 2)
+        channel, data = client.published[0]
+        self.assertEqual(channel, CONTROL_CHANNEL)
+        self.assertEqual(parse_control_message({"type": "message", "data": data})["version"], 3)
+        self.assertIsNone(parse_control_message({"type": "message", "data": json.dumps({"action": "noop"})}))
+        self.assertIsNone(parse_control_message(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
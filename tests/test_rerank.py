@@ -0,0 +1,71 @@
+"""
+Unit tests for compressed indexes with exact re-ranking (artguide/rerank.py).
+"""
+
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.indexing import build_faiss_index, stores_exact_vectors
+from artguide.rerank import RerankIndex, is_compressed, with_rerank
+from artguide.store import EmbeddingStore
+
+
+def random_embeddings(n=300, dimension=64, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+class TestRerank(unittest.TestCase):
+    """Test that re-ranked compressed search reproduces the flat ranking."""
+
+    def setUp(self):
+        self.embeddings = random_embeddings()
+        self.ids = np.arange(1000, 1300, dtype="int64")
+        self.store = EmbeddingStore(self.ids, self.embeddings.astype("float16"))
+        self.flat = build_faiss_index(self.embeddings, "flat", ids=self.ids)
+        rng = np.random.default_rng(1)
+        queries = self.embeddings[:20] + 0.05 * rng.standard_normal((20, 64)).astype("float32")
+        self.queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+    def test_compressed_types_are_detected(self):
+        for index_type in ("pq", "binary", "ivf_pq"):
+            index = build_faiss_index(self.embeddings, index_type, pq_m=8, ids=self.ids)
+            self.assertTrue(is_compressed(index), index_type)
+            self.assertIsInstance(with_rerank(index, self.store, factor=10), RerankIndex)
+        self.assertTrue(stores_exact_vectors(self.flat))
+        self.assertIs(with_rerank(self.flat, self.store, factor=10), self.flat)
+
+    def test_binary_index_needs_rerank(self):
+        binary = build_faiss_index(self.embeddings, "binary", ids=self.ids)
+        D, _ = binary.search(self.queries, 5)
+        self.assertGreater(D.max(), 4)  # Hamming distances, not squared L2 of unit vectors
+        with self.assertRaises(ValueError):
+            with_rerank(binary, None, factor=10)
+        with self.assertRaises(ValueError):
+            with_rerank(binary, self.store, factor=0)
+        pq = build_faiss_index(self.embeddings, "pq", pq_m=8, ids=self.ids)
+        self.assertIs(with_rerank(pq, None, factor=10), pq)
+
+    def test_rerank_matches_flat_ranking(self):
+        binary = build_faiss_index(self.embeddings, "binary", ids=self.ids)
+        D_flat, I_flat = self.flat.search(self.queries, 5)
+        # All candidates re-ranked: exactly the flat result (up to float16 rounding)
+        D, I = RerankIndex(binary, self.store, factor=60).search(self.queries, 5)
+        np.testing.assert_array_equal(I, I_flat)
+        np.testing.assert_allclose(D, D_flat, atol=1e-2)
+
+    def test_pads_missing_results(self):
+        pq = build_faiss_index(self.embeddings[:3], "pq", pq_m=8, ids=self.ids[:3])
+        D, I = RerankIndex(pq, EmbeddingStore(self.ids[:3], self.embeddings[:3]), factor=4).search(self.queries[:1], 5)
+        self.assertEqual(sorted(I[0, :3]), [1000, 1001, 1002])
+        self.assertEqual(list(I[0, 3:]), [-1, -1])
+
+
+if __name__ == '__main__':
+    unittest.main()
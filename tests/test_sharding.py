@@ -0,0 +1,147 @@
+"""
+Unit tests for catalog sharding and scatter-gather search
+(artguide/sharding.py, distributed/shard_router.py).
+"""
+
+import unittest
+import os
+import sys
+import json
+import time
+import tempfile
+import shutil
+import threading
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "distributed"))
+
+from artguide.indexing import build_faiss_index
+from artguide.reload import load_snapshot
+from artguide.sharding import (
+    decode_queries, load_layout, merge_topk, shard_paths, shard_queue, write_shards
+)
+from shard_router import ShardRouter
+
+
+def random_embeddings(n, seed=0, dimension=32):
+    """Normalized random vectors."""
+    x = np.random.default_rng(seed).standard_normal((n, dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+class ListRedis:
+    """In-process stand-in for the Redis list commands used by the router."""
+
+    def __init__(self):
+        self.lists = defaultdict(list)
+        self.cond = threading.Condition()
+
+    def rpush(self, key, value):
+        with self.cond:
+            self.lists[key].append(value)
+            self.cond.notify_all()
+
+    def blpop(self, key, timeout=0):
+        deadline = time.time() + timeout
+        with self.cond:
+            while not self.lists[key]:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.cond.wait(remaining)
+            return key, self.lists[key].pop(0)
+
+    def delete(self, key):
+        with self.cond:
+            self.lists.pop(key, None)
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+class TestSharding(unittest.TestCase):
+    """Test partitioning and merging."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.embeddings = random_embeddings(40)
+        self.metadata = pd.DataFrame({
+            "artwork_id": np.arange(40),
+            "artist": [f"Artist {i % 4}" for i in range(40)],
+            "title": [f"Artwork {i}" for i in range(40)],
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def shard_results(self, queries, k, shards):
+        results = []
+        for shard in shards:
+            snapshot = load_snapshot(*shard_paths(self.temp_dir, shard))
+            D, I = snapshot.index.search(queries, k)
+            results.append([snapshot.metadata_store.records(I[q], D[q]) for q in range(len(queries))])
+        return results
+
+    def test_merged_shards_match_global_search(self):
+        layout = write_shards(self.embeddings, self.metadata, 3, self.temp_dir, index_type="flat")
+        self.assertEqual(sum(layout["counts"]), 40)
+        self.assertEqual(load_layout(self.temp_dir)["shards"], 3)
+
+        queries = random_embeddings(5, seed=1)
+        merged = merge_topk(self.shard_results(queries, 5, range(3)), 5)
+        _, I = build_faiss_index(self.embeddings, "flat").search(queries, 5)
+        for q in range(5):
+            self.assertEqual([r["artwork_id"] for r in merged[q]], list(I[q]))
+
+    def test_partition_by_column_keeps_groups_together(self):
+        write_shards(self.embeddings, self.metadata, 2, self.temp_dir, key_column="artist", index_type="flat")
+        for shard in range(2):
+            artists = set(load_snapshot(*shard_paths(self.temp_dir, shard)).metadata_store.column("artist"))
+            for other in range(2):
+                if other != shard:
+                    other_artists = load_snapshot(*shard_paths(self.temp_dir, other)).metadata_store.column("artist")
+                    self.assertFalse(artists & set(other_artists))
+
+    def test_router_returns_partial_results_on_timeout(self):
+        write_shards(self.embeddings, self.metadata, 3, self.temp_dir, index_type="flat")
+        redis_client = ListRedis()
+        snapshots = {shard: load_snapshot(*shard_paths(self.temp_dir, shard)) for shard in (0, 1)}
+
+        def shard_worker(shard):
+            # Shard 2 has no worker and never answers
+            _, raw = redis_client.blpop(shard_queue(shard), timeout=5)
+            request = json.loads(raw)
+            queries = decode_queries(request["queries"])
+            D, I = snapshots[shard].index.search(queries, request["k"])
+            redis_client.rpush(request["reply_to"], json.dumps({
+                "shard": shard, "index_version": 1,
+                "results": [snapshots[shard].metadata_store.records(I[q], D[q]) for q in range(len(queries))],
+            }))
+
+        workers = [threading.Thread(target=shard_worker, args=(shard,)) for shard in (0, 1)]
+        for worker in workers:
+            worker.start()
+        queries = random_embeddings(2, seed=2)
+        router = ShardRouter(redis_client, n_shards=3, timeout_ms=300)
+        results, status = router.search(queries, k=4)
+        for worker in workers:
+            worker.join()
+
+        self.assertTrue(status["partial"])
+        self.assertEqual(status["answered"], [0, 1])
+        self.assertEqual(status["missing"], [2])
+        self.assertLess(status["elapsed_ms"], 2000)
+        expected = merge_topk(self.shard_results(queries, 4, (0, 1)), 4)
+        self.assertEqual([[r["artwork_id"] for r in q] for q in results],
+                         [[r["artwork_id"] for r in q] for q in expected])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Unit tests for single-flight coalescing (artguide/singleflight.py).
+"""
+
+import unittest
+import os
+import sys
+import time
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.description_cache import description_prompt
+from artguide.llm import LLMClient
+from artguide.mock_llm import MockGeminiClient
+from artguide.singleflight import Coalescer, SingleFlight
+from artguide.streaming import description_stream
+
+ARTWORK = ("Claude Monet", "Water Lilies", "Impressionism")
+
+
+class LockRedis:
+    """In-process stand-in for the Redis string commands used by the coalescer."""
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.values.get(key)
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        with self.lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value.encode() if isinstance(value, str) else value
+            return True
+
+    def exists(self, key):
+        with self.lock:
+            return int(key in self.values)
+
+    def delete(self, key):
+        with self.lock:
+            self.values.pop(key, None)
+
+
+def run_concurrently(n, fn):
+    results = [None] * n
+
+    def call(i):
+        results[i] = fn()
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+    """In-process coalescing."""
+
+    def test_concurrent_streams_share_one_llm_call(self):
+        client = MockGeminiClient(latency=0.1, chunk_delay=0.01, chunk_words=4)
+        llm, flights = LLMClient(client), Coalescer()
+        texts = run_concurrently(8, lambda: "".join(
+            description_stream(*ARTWORK, llm, None, None, "Placeholder", flights)
+        ))
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(set(texts), {MockGeminiClient.describe(description_prompt(*ARTWORK))})
+        self.assertEqual(flights.stats()["saved"], 7)
+
+    def test_followers_see_the_leaders_error(self):
+        flights = SingleFlight()
+        started = threading.Event()
+
+        def failing():
+            started.set()
+            time.sleep(0.05)
+            raise RuntimeError("LLM down")
+            yield
+
+        def call():
+            try:
+                list(flights.stream("k", failing))
+            except RuntimeError as e:
+                return str(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        self.assertEqual(call(), "LLM down")
+        leader.join()
+        self.assertEqual(flights.shared, 1)
+
+    def test_do_runs_once_and_then_again(self):
+        flights = SingleFlight()
+        calls = []
+
+        def synthesize():
+            calls.append(1)
+            time.sleep(0.05)
+            return "narration.mp3"
+
+        self.assertEqual(run_concurrently(5, lambda: flights.do("audio", synthesize)), ["narration.mp3"] * 5)
+        self.assertEqual(len(calls), 1)
+        flights.do("audio", synthesize)  # finished flights are not reused
+        self.assertEqual(len(calls), 2)
+
+
+class TestCrossWorker(unittest.TestCase):
+    """Coalescing between workers through Redis."""
+
+    def test_other_worker_waits_for_the_leader(self):
+        redis = LockRedis()
+        first, second = Coalescer(redis, wait_timeout=2), Coalescer(redis, wait_timeout=2)
+        calls = []
+
+        def generate():
+            calls.append(1)
+            time.sleep(0.1)
+            yield "Water "
+            yield "Lilies"
+
+        leader = threading.Thread(target=lambda: list(first.stream("k", generate)))
+        leader.start()
+        time.sleep(0.03)
+        self.assertEqual(list(second.stream("k", generate)), ["Water Lilies"])
+        leader.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second.stats()["shared_remote"], 1)
+        self.assertFalse(redis.exists("artguide:flight:k"))  # lock released
+
+    def test_follower_computes_itself_when_the_leader_fails(self):
+        redis = LockRedis()
+        first, second = Coalescer(redis, wait_timeout=2), Coalescer(redis, wait_timeout=2)
+
+        def failing():
+            time.sleep(0.05)
+            raise RuntimeError("LLM down")
+            yield
+
+        def leader():
+            try:
+                list(first.stream("k", failing))
+            except RuntimeError:
+                pass
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        time.sleep(0.01)
+        self.assertEqual(list(second.stream("k", lambda: iter(["own answer"]))), ["own answer"])
+        thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit tests for memory-mapped catalog storage (artguide/store.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+import faiss
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.catalog import Catalog
+from artguide.indexing import build_faiss_index
+from artguide.store import EmbeddingStore, read_index, save_embedding_store
+from artguide.tuning import memory_usage
+
+
+def random_embeddings(n, seed=0, dimension=32):
+    """Normalized random vectors."""
+    x = np.random.default_rng(seed).standard_normal((n, dimension)).astype("float32")
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    """Test writing and memory-mapping the embedding store."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.embeddings = random_embeddings(10)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_missing_store(self):
+        self.assertIsNone(EmbeddingStore.open(self.temp_dir))
+
+    def test_float16_round_trip_by_id(self):
+        ids = np.arange(10)[::-1] + 100  # written in any order, stored sorted
+        save_embedding_store(self.temp_dir, ids, self.embeddings, dtype="float16")
+        store = EmbeddingStore.open(self.temp_dir)
+        self.assertIsInstance(store.vectors, np.memmap)
+        self.assertEqual(store.vectors.dtype, np.float16)
+        np.testing.assert_allclose(store.get([109, 100]), self.embeddings[[0, 9]], atol=1e-3)
+
+    def test_unknown_id(self):
+        save_embedding_store(self.temp_dir, np.arange(10), self.embeddings)
+        with self.assertRaises(KeyError):
+            EmbeddingStore.open(self.temp_dir).get([3, 42])
+
+    def test_mmap_index_matches_memory_index(self):
+        path = os.path.join(self.temp_dir, "faiss.index")
+        faiss.write_index(build_faiss_index(self.embeddings, "flat", ids=np.arange(10)), path)
+        D1, I1 = read_index(path, mmap=False).search(self.embeddings[:3], 3)
+        D2, I2 = read_index(path, mmap=True).search(self.embeddings[:3], 3)
+        np.testing.assert_array_equal(I1, I2)
+        np.testing.assert_allclose(D1, D2)
+
+    def test_catalog_keeps_store_in_sync(self):
+        index_path = os.path.join(self.temp_dir, "faiss.index")
+        meta_path = os.path.join(self.temp_dir, "metadata.parquet")
+        metadata = pd.DataFrame({"artist": ["Claude Monet"] * 10, "title": [f"Artwork {i}" for i in range(10)]})
+        catalog = Catalog(build_faiss_index(self.embeddings, "flat", ids=np.arange(10)), metadata,
+                          index_path, meta_path)
+        catalog.delete([2])
+        new_ids = catalog.add(random_embeddings(1, seed=5), [{"artist": "Claude Monet", "title": "New"}])
+        catalog.save()
+
+        store = EmbeddingStore.open(self.temp_dir)
+        self.assertEqual(list(store.ids), [0, 1, 3, 4, 5, 6, 7, 8, 9, 10])
+        np.testing.assert_allclose(store.get(new_ids), random_embeddings(1, seed=5), atol=1e-3)
+
+
+class TestMemoryUsage(unittest.TestCase):
+    """Test the per-process memory report."""
+
+    def test_reports_rss(self):
+        usage = memory_usage()
+        self.assertGreater(usage["rss"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Unit tests for streaming description generation (artguide/streaming.py).
+"""
+
+import unittest
+import os
+import sys
+import time
+import tempfile
+import shutil
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.description_cache import FileDescriptionCache, description_key, description_prompt
+from artguide.mock_llm import MockGeminiClient
+from artguide.streaming import StreamTimer, description_stream
+
+ARTWORK = ("Claude Monet", "Water Lilies", "Impressionism")
+PLACEHOLDER = "This is 'Water Lilies' by Claude Monet."
+
+
+class FailingMidStream(MockGeminiClient):
+    """Mock LLM whose connection drops after the first chunk."""
+
+    def stream(self, prompt):
+        chunks = super().stream(prompt)
+        yield next(chunks)
+        raise ConnectionError("stream reset")
+
+
+class EmptyAnswer(MockGeminiClient):
+    """Mock LLM that finishes without any text."""
+
+    def stream(self, prompt):
+        self._call()
+        return iter([])
+
+
+class DictStore:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def get(self, key):
+        return self.entries.get(key)
+
+
+class TestDescriptionStream(unittest.TestCase):
+    """Chunking, caching and fallbacks of description_stream."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = FileDescriptionCache(self.tmp_dir)
+        self.key = description_key(*ARTWORK, description_prompt(*ARTWORK))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def stream(self, client, store=None):
+        return list(description_stream(*ARTWORK, client, self.cache, store, PLACEHOLDER))
+
+    def test_llm_answer_streams_in_chunks_and_is_cached(self):
+        client = MockGeminiClient(chunk_words=4)
+        chunks = self.stream(client)
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual("".join(chunks), MockGeminiClient.describe(description_prompt(*ARTWORK)))
+        self.assertEqual(self.cache.get(self.key), "".join(chunks))
+        self.assertEqual(self.stream(client), ["".join(chunks)])  # cache hit: one chunk, no LLM call
+        self.assertEqual(client.calls, 1)
+
+    def test_pregenerated_description_needs_no_client(self):
+        self.assertEqual(self.stream(None, DictStore({self.key: "Pre-generated."})), ["Pre-generated."])
+
+    def test_placeholder_without_client_or_on_failure(self):
+        self.assertEqual(self.stream(None), [PLACEHOLDER])
+        self.assertEqual(self.stream(MockGeminiClient(failure_rate=1.0)), [PLACEHOLDER])
+
+    def test_empty_answer_yields_placeholder(self):
+        self.assertEqual(self.stream(EmptyAnswer()), [PLACEHOLDER])
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_mid_stream_failure_keeps_text_and_is_not_cached(self):
+        chunks = self.stream(FailingMidStream())
+        self.assertEqual(len(chunks), 1)
+        self.assertNotEqual(chunks[0], PLACEHOLDER)
+        self.assertIsNone(self.cache.get(self.key))
+
+    def test_timer_measures_first_chunk(self):
+        timer = StreamTimer()
+        chunks = list(timer.wrap(MockGeminiClient(latency=0.05, chunk_delay=0.02, chunk_words=10).stream(
+            description_prompt(*ARTWORK)
+        )))
+        self.assertGreater(len(chunks), 1)
+        self.assertGreaterEqual(timer.ttft, 0.05)
+        self.assertGreater(timer.total, timer.ttft + 0.02)
+
+    def test_timer_ignores_none_markers(self):
+        def chunks():
+            yield None  # e.g. the latency budget's placeholder signal
+            time.sleep(0.05)
+            yield "Water Lilies"
+
+        timer = StreamTimer()
+        self.assertEqual(list(timer.wrap(chunks())), [None, "Water Lilies"])
+        self.assertGreaterEqual(timer.ttft, 0.05)
+
+    def test_timer_without_chunks(self):
+        timer = StreamTimer()
+        self.assertEqual(list(timer.wrap(iter([]))), [])
+        self.assertIsNone(timer.ttft)
+
+
+if __name__ == '__main__':
+    unittest.main()
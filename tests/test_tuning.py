@@ -0,0 +1,132 @@
+"""
+Unit tests for runtime profile selection (artguide/tuning.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.tuning import (
+    select_best, build_profile, save_profile, load_profile, resolve_settings, default_thread_counts
+)
+
+
+def make_result(threads, batch_size, latency_ms, images_per_sec, inter_op=1):
+    """Create one benchmark result row."""
+    return {
+        "intra_op_threads": threads,
+        "inter_op_threads": inter_op,
+        "batch_size": batch_size,
+        "latency_ms": latency_ms,
+        "images_per_sec": images_per_sec,
+    }
+
+
+class TestProfileSelection(unittest.TestCase):
+    """Test choosing thread/batch settings from benchmark results."""
+    
+    def setUp(self):
+        """Create a small benchmark grid for an 8-core host."""
+        self.results = [
+            make_result(1, 1, 120.0, 8.3),
+            make_result(4, 1, 45.0, 22.2),
+            make_result(8, 1, 40.0, 25.0),
+            make_result(4, 16, 400.0, 40.0),
+            make_result(8, 16, 250.0, 64.0),
+        ]
+        self.profile = build_profile(self.results, "pytorch")
+        self.profile["host"]["cpu_count"] = 8
+    
+    def test_select_best_modes(self):
+        """Test that latency mode uses batch-of-one and throughput maximizes images/sec."""
+        best = select_best(self.results)
+        self.assertEqual(best["latency"]["batch_size"], 1)
+        self.assertEqual(best["latency"]["intra_op_threads"], 8)
+        self.assertEqual(best["throughput"]["batch_size"], 16)
+        self.assertEqual(best["throughput"]["intra_op_threads"], 8)
+    
+    def test_workers_share_cores(self):
+        """Test that several workers per host only use their share of the cores."""
+        settings = resolve_settings(self.profile, mode="throughput", workers=2, cpu_count=8)
+        self.assertEqual(settings["intra_op_threads"], 4)
+        self.assertEqual(settings["batch_size"], 16)
+        self.assertEqual(settings["source"], "profile")
+    
+    def test_defaults_without_profile(self):
+        """Test core-count defaults when no profile exists."""
+        settings = resolve_settings(None, mode="latency", workers=4, cpu_count=32)
+        self.assertEqual(settings["intra_op_threads"], 8)
+        self.assertEqual(settings["batch_size"], 1)
+        self.assertEqual(settings["source"], "default")
+    
+    def test_profile_from_other_host_ignored(self):
+        """Test that a profile recorded on a different host is not applied."""
+        settings = resolve_settings(self.profile, mode="latency", workers=1, cpu_count=32)
+        self.assertEqual(settings["source"], "default")
+        self.assertEqual(settings["intra_op_threads"], 32)
+    
+    def test_profile_round_trip(self):
+        """Test that profiles can be saved and loaded."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "profile.json")
+            save_profile(self.profile, path)
+            self.assertEqual(load_profile(path)["best_throughput"], self.profile["best_throughput"])
+            self.assertIsNone(load_profile(os.path.join(temp_dir, "missing.json")))
+    
+    def test_default_thread_counts(self):
+        """Test the default intra-op thread grid."""
+        self.assertEqual(default_thread_counts(32), [1, 2, 4, 8, 16, 32])
+        self.assertEqual(default_thread_counts(6), [1, 2, 4, 6])
+        self.assertEqual(default_thread_counts(1), [1])
+
+
+class TestAutotuneSweep(unittest.TestCase):
+    """The autotune sweep measures each thread count with its own backend."""
+
+    def test_backend_rebuilt_per_thread_count_with_configured_preprocessor(self):
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+        import autotune
+
+        created = []
+        preprocessed = []
+
+        class StubBackend:
+            name = "onnx_fp32"
+
+            def __init__(self, num_threads):
+                self.num_threads = num_threads
+
+            def embed(self, pixel_values):
+                return np.zeros((len(pixel_values), 512), dtype="float32")
+
+        def backend_from_settings(model, device="cpu", num_threads=None):
+            created.append(num_threads)
+            return StubBackend(num_threads)
+
+        def preprocessor_from_settings(processor):
+            def preprocess(images):
+                preprocessed.append(len(images))
+                return np.zeros((len(images), 3, 224, 224), dtype="float32")
+            return preprocess
+
+        with mock.patch("artguide.embedding.load_clip_model", return_value=(None, None, "cpu")), \
+                mock.patch("artguide.backends.backend_from_settings", backend_from_settings), \
+                mock.patch("artguide.preprocess.preprocessor_from_settings", preprocessor_from_settings), \
+                mock.patch("torch.set_num_interop_threads"), mock.patch("torch.set_num_threads"):
+            name, results = autotune._benchmark_interop(1, [1, 2], [1], repeats=1)
+
+        self.assertEqual(created, [1, 2])
+        self.assertTrue(preprocessed)
+        self.assertEqual(name, "onnx_fp32")
+        self.assertEqual([r["intra_op_threads"] for r in results], [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,140 @@
+"""
+Unit tests for zero-shot artist/period classification (artguide/zero_shot.py).
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from artguide.zero_shot import ZeroShotClassifier, apply_prediction, build_prompts
+
+
+METADATA = pd.DataFrame({
+    "artist": ["Claude Monet", "Vincent van Gogh", "Claude Monet"],
+    "title": ["Water Lilies", "Starry Night", "Haystacks"],
+    "period": ["Impressionism", "Post-Impressionism", "Impressionism"],
+})
+
+
+def unit_rows(n, dim=512):
+    """n orthonormal rows (basis vectors)."""
+    return np.eye(n, dim, dtype="float32")
+
+
+class TestBuildPrompts(unittest.TestCase):
+    """Test prompt generation from the catalog."""
+
+    def test_one_prompt_per_distinct_label(self):
+        kinds, labels, prompts = build_prompts(METADATA)
+        self.assertEqual(kinds, ["artist", "artist", "period", "period"])
+        self.assertEqual(labels, ["Claude Monet", "Vincent van Gogh", "Impressionism", "Post-Impressionism"])
+        self.assertEqual(prompts[0], "a painting by Claude Monet")
+        self.assertEqual(prompts[2], "a painting in the style of Impressionism")
+
+
+class TestZeroShotClassifier(unittest.TestCase):
+    """Test classification and the on-disk matrix cache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        kinds, labels, prompts = build_prompts(METADATA)
+        self.classifier = ZeroShotClassifier(unit_rows(len(prompts)), kinds, labels, prompts)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_classify_picks_best_label_per_kind(self):
+        # Closest to "Vincent van Gogh" (row 1) and "Impressionism" (row 2)
+        emb = np.zeros((1, 512), dtype="float32")
+        emb[0, 1] = 0.8
+        emb[0, 2] = 0.6
+        prediction = self.classifier.classify(emb)
+        self.assertEqual(prediction["artist"]["label"], "Vincent van Gogh")
+        self.assertEqual(prediction["period"]["label"], "Impressionism")
+        self.assertGreater(prediction["artist"]["score"], 0.5)
+        self.assertLessEqual(prediction["artist"]["score"], 1.0)
+
+    def test_save_and_load_round_trip(self):
+        path = os.path.join(self.temp_dir, "text_embeddings.npz")
+        self.classifier.save(path)
+        loaded = ZeroShotClassifier.load(path)
+        np.testing.assert_array_equal(loaded.matrix, self.classifier.matrix)
+        self.assertEqual(loaded.prompts, self.classifier.prompts)
+        self.assertEqual(list(loaded.labels), list(self.classifier.labels))
+
+    def test_load_or_build_uses_cache_without_model(self):
+        path = os.path.join(self.temp_dir, "text_embeddings.npz")
+        self.classifier.save(path)
+
+        def fail():
+            raise AssertionError("text encoder should not be loaded")
+
+        loaded = ZeroShotClassifier.load_or_build(METADATA, fail, fail, "cpu", path=path)
+        self.assertEqual(loaded.prompts, self.classifier.prompts)
+
+    def test_load_or_build_rebuilds_when_catalog_changes(self):
+        path = os.path.join(self.temp_dir, "text_embeddings.npz")
+        self.classifier.save(path)
+        metadata = pd.concat([METADATA, pd.DataFrame({
+            "artist": ["Pablo Picasso"], "title": ["Guernica"], "period": ["Cubism"]
+        })], ignore_index=True)
+
+        rebuilt = []
+
+        def build(cls_metadata, model, processor, device, model_name):
+            rebuilt.append(True)
+            kinds, labels, prompts = build_prompts(cls_metadata)
+            return ZeroShotClassifier(unit_rows(len(prompts)), kinds, labels, prompts)
+
+        with mock.patch.object(ZeroShotClassifier, "build", staticmethod(build)):
+            classifier = ZeroShotClassifier.load_or_build(metadata, lambda: None, lambda: None, "cpu", path=path)
+        self.assertTrue(rebuilt)
+        self.assertIn("Pablo Picasso", list(classifier.labels))
+        self.assertIn("Pablo Picasso", list(ZeroShotClassifier.load(path).labels))
+
+
+
+class TestApplyPrediction(unittest.TestCase):
+    """The recognized title and image belong to the predicted artist."""
+
+    RESULTS = [
+        {"artist": "Claude Monet", "title": "Water Lilies", "period": "Impressionism",
+         "image_path": "monet.jpg", "distance": 0.2},
+        {"artist": "Vincent van Gogh", "title": "Starry Night", "period": "Post-Impressionism",
+         "image_path": "vangogh.jpg", "distance": 0.4},
+    ]
+
+    def prediction(self, artist, period="Impressionism"):
+        return {"artist": {"label": artist, "score": 0.9}, "period": {"label": period, "score": 0.8}}
+
+    def test_without_prediction_top_result(self):
+        self.assertEqual(apply_prediction(self.RESULTS, None), self.RESULTS[0])
+
+    def test_agreeing_prediction_keeps_top_result(self):
+        top1 = apply_prediction(self.RESULTS, self.prediction("Claude Monet"))
+        self.assertEqual((top1["title"], top1["image_path"]), ("Water Lilies", "monet.jpg"))
+
+    def test_override_uses_best_neighbour_by_artist(self):
+        top1 = apply_prediction(self.RESULTS, self.prediction("Vincent van Gogh"))
+        self.assertEqual((top1["artist"], top1["title"], top1["image_path"], top1["distance"]),
+                         ("Vincent van Gogh", "Starry Night", "vangogh.jpg", 0.4))
+        self.assertEqual(top1["period"], "Impressionism")
+        self.assertEqual(self.RESULTS[1]["period"], "Post-Impressionism")  # results not modified
+
+    def test_override_without_neighbour_clears_title_and_image(self):
+        top1 = apply_prediction(self.RESULTS, self.prediction("Pablo Picasso", "Cubism/Modern"))
+        self.assertEqual((top1["artist"], top1["title"], top1["image_path"], top1["period"]),
+                         ("Pablo Picasso", "Unknown", None, "Cubism/Modern"))
+        self.assertEqual(top1["distance"], 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()